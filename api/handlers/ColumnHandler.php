@@ -6,6 +6,8 @@
  */
 
 require_once __DIR__ . '/../utils/ColumnBuilder.php';
+require_once __DIR__ . '/../utils/SchemaCache.php';
+require_once __DIR__ . '/../utils/OnlineSchemaChange.php';
 
 class ColumnHandler {
     private $conn;
@@ -16,8 +18,12 @@ class ColumnHandler {
     
     /**
      * Add a new column to table
+     * 
+     * With $online the change goes through OnlineSchemaChange (INSTANT,
+     * INPLACE or a shadow-table copy job) instead of a plain ALTER TABLE;
+     * the same holds for updateColumn() and deleteColumn().
      */
-    public function addColumn($tableName, $data) {
+    public function addColumn($tableName, $data, $online = false) {
         $tableName = $this->conn->real_escape_string($tableName);
         
         // Build column definition
@@ -42,9 +48,16 @@ class ColumnHandler {
                 break;
         }
         
-        $query = "ALTER TABLE `$tableName` ADD COLUMN `{$data['name']}` $columnDef$positionClause";
+        $clause = "ADD COLUMN `{$data['name']}` $columnDef$positionClause";
+        if ($online) {
+            $this->alterOnline($tableName, $clause, [], 'Column added successfully');
+            return;
+        }
+        
+        $query = "ALTER TABLE `$tableName` $clause";
         
         if ($this->conn->query($query)) {
+            (new SchemaCache($this->conn))->invalidate();
             echo json_encode([
                 'success' => true,
                 'message' => 'Column added successfully'
@@ -57,13 +70,22 @@ class ColumnHandler {
     /**
      * Update an existing column
      */
-    public function updateColumn($tableName, $oldName, $data) {
+    public function updateColumn($tableName, $oldName, $data, $online = false) {
         $tableName = $this->conn->real_escape_string($tableName);
         $oldName = $this->conn->real_escape_string($oldName);
         
         // Build column definition
         $columnDef = ColumnBuilder::buildDefinition($data);
         
+        if ($online) {
+            // One CHANGE COLUMN, so a rename does not cost a second rebuild
+            $newName = $this->conn->real_escape_string($data['name']);
+            $renames = $newName !== $oldName ? [$oldName => $newName] : [];
+            $this->alterOnline($tableName, "CHANGE COLUMN `$oldName` `$newName` $columnDef", $renames,
+                               'Column updated successfully');
+            return;
+        }
+        
         $query = "ALTER TABLE `$tableName` MODIFY COLUMN `$oldName` $columnDef";
         
         if ($this->conn->query($query)) {
@@ -76,6 +98,7 @@ class ColumnHandler {
                 }
             }
             
+            (new SchemaCache($this->conn))->invalidate();
             echo json_encode([
                 'success' => true,
                 'message' => 'Column updated successfully'
@@ -88,13 +111,19 @@ class ColumnHandler {
     /**
      * Delete a column
      */
-    public function deleteColumn($tableName, $columnName) {
+    public function deleteColumn($tableName, $columnName, $online = false) {
         $tableName = $this->conn->real_escape_string($tableName);
         $columnName = $this->conn->real_escape_string($columnName);
         
+        if ($online) {
+            $this->alterOnline($tableName, "DROP COLUMN `$columnName`", [], 'Column deleted successfully');
+            return;
+        }
+        
         $query = "ALTER TABLE `$tableName` DROP COLUMN `$columnName`";
         
         if ($this->conn->query($query)) {
+            (new SchemaCache($this->conn))->invalidate();
             echo json_encode([
                 'success' => true,
                 'message' => 'Column deleted successfully'
@@ -103,6 +132,107 @@ class ColumnHandler {
             throw new Exception("Delete column failed: " . $this->conn->error);
         }
     }
+    
+    /**
+     * Estimate how a column change would be made online and what it costs
+     * 
+     * @param string $operation 'add', 'update' or 'delete'
+     * @param string $columnName Column being updated or deleted
+     * @param array $data New column data (add, update)
+     */
+    public function estimateColumnChange($tableName, $operation, $columnName, $data) {
+        switch ($operation) {
+            case 'add':
+                $change = [
+                    'kind' => 'add',
+                    'atEnd' => ($data['position'] ?? 'end') === 'end',
+                    'index' => !empty($data['primary']) || !empty($data['unique'])
+                ];
+                break;
+            case 'update':
+                $change = ['kind' => $this->describeUpdate($tableName, $columnName, $data)];
+                break;
+            case 'delete':
+                $change = ['kind' => 'drop'];
+                break;
+            default:
+                throw new Exception("Unknown column operation '$operation'");
+        }
+        
+        echo json_encode([
+            'success' => true,
+            'estimate' => (new OnlineSchemaChange($this->conn))->estimate($tableName, $change)
+        ]);
+    }
+    
+    /**
+     * Progress of an online schema change job
+     */
+    public function getSchemaChangeJob($jobId) {
+        echo json_encode([
+            'success' => true,
+            'job' => (new OnlineSchemaChange($this->conn))->getJob($jobId)
+        ]);
+    }
+    
+    /**
+     * Cancel an online schema change job; the table is left unchanged
+     */
+    public function cancelSchemaChangeJob($jobId) {
+        echo json_encode([
+            'success' => true,
+            'job' => (new OnlineSchemaChange($this->conn))->cancelJob($jobId)
+        ]);
+    }
+    
+    /**
+     * Make a change through OnlineSchemaChange and report how it was made
+     */
+    private function alterOnline($tableName, $clause, $renames, $message) {
+        $result = (new OnlineSchemaChange($this->conn))->apply($tableName, $clause, $renames);
+        
+        if (isset($result['job']) && $result['job']['status'] !== 'completed' && !$result['background']) {
+            throw new Exception("Schema change failed: " . ($result['job']['lastError'] ?? 'unknown error'));
+        }
+        if (isset($result['algorithm'])) {
+            (new SchemaCache($this->conn))->invalidate();
+        }
+        
+        echo json_encode(array_merge([
+            'success' => true,
+            'message' => !empty($result['background']) ? 'Schema change started' : $message
+        ], $result));
+    }
+    
+    /**
+     * Most expensive kind of change an update makes to a column
+     * ('type', 'nullability', 'default' or 'rename'; see OnlineSchemaChange::estimate)
+     */
+    private function describeUpdate($tableName, $columnName, $data) {
+        $tableName = $this->conn->real_escape_string($tableName);
+        $columnName = $this->conn->real_escape_string($columnName);
+        $result = $this->conn->query("SHOW FULL COLUMNS FROM `$tableName` LIKE '" . addcslashes($columnName, '%_') . "'");
+        $column = $result ? $result->fetch_assoc() : null;
+        if (!$column) {
+            throw new Exception("Column '$columnName' not found");
+        }
+        
+        $autoIncrement = stripos($column['Extra'], 'auto_increment') !== false;
+        if (strcasecmp(trim($data['type'] ?? ''), $column['Type']) !== 0 || !empty($data['auto_increment']) !== $autoIncrement) {
+            return 'type';
+        }
+        if (!empty($data['null']) !== ($column['Null'] === 'YES')) {
+            return 'nullability';
+        }
+        $default = $data['default'] ?? null;
+        if ($default !== null && $default !== '') {
+            $default = preg_replace("/^'(.*)'$/s", '$1', $default);
+        }
+        if ((string) $default !== (string) $column['Default']) {
+            return 'default';
+        }
+        return 'rename';
+    }
 }
 ?>
 
@@ -5,7 +5,14 @@
  * Handles database management operations
  */
 
+require_once __DIR__ . '/../utils/SchemaCache.php';
+
 class DatabaseHandler {
+    // Seconds cached database sizes stay valid (bypassed with refresh)
+    const SIZE_CACHE_TTL = 60;
+
+    const SYSTEM_DATABASES = ['information_schema', 'performance_schema', 'mysql', 'sys'];
+
     private $conn;
     
     public function __construct($conn) {
@@ -14,33 +21,44 @@ class DatabaseHandler {
     
     /**
      * Get all databases
+     * 
+     * Table counts and sizes come from one aggregated information_schema
+     * query and are cached for SIZE_CACHE_TTL seconds. With $includeSizes
+     * false only the names are returned (tables/size are null), so the list
+     * can be shown before the sizes are known.
+     * 
+     * @param bool $includeSizes Include table count and size per database
+     * @param bool $refresh Ignore cached sizes
+     * @param array|null $only Only return these databases (used to fetch sizes in batches)
      */
-    public function getDatabases() {
+    public function getDatabases($includeSizes = true, $refresh = false, $only = null) {
         $result = $this->conn->query("SHOW DATABASES");
-        $databases = [];
+        if (!$result) {
+            throw new Exception("Failed to list databases: " . $this->conn->error);
+        }
         
+        $names = [];
         while ($row = $result->fetch_assoc()) {
             $dbName = $row['Database'];
             
             // Skip system databases
-            if (in_array($dbName, ['information_schema', 'performance_schema', 'mysql', 'sys'])) {
+            if (in_array($dbName, self::SYSTEM_DATABASES)) {
                 continue;
             }
-            
-            // Get table count and size for each database
-            $this->conn->query("USE `$dbName`");
-            $tableResult = $this->conn->query("SHOW TABLE STATUS");
-            $tableCount = $tableResult->num_rows;
-            $totalSize = 0;
-            
-            while ($table = $tableResult->fetch_assoc()) {
-                $totalSize += ($table['Data_length'] ?? 0) + ($table['Index_length'] ?? 0);
+            if ($only !== null && !in_array($dbName, $only, true)) {
+                continue;
             }
-            
+            $names[] = $dbName;
+        }
+        
+        $sizes = $includeSizes ? $this->getDatabaseSizes($names, $refresh) : [];
+        
+        $databases = [];
+        foreach ($names as $dbName) {
             $databases[] = [
                 'name' => $dbName,
-                'tables' => $tableCount,
-                'size' => $totalSize
+                'tables' => $includeSizes ? ($sizes[$dbName]['tables'] ?? 0) : null,
+                'size' => $includeSizes ? ($sizes[$dbName]['size'] ?? 0) : null
             ];
         }
         
@@ -50,6 +68,120 @@ class DatabaseHandler {
         ]);
     }
     
+    /**
+     * Table count and total size per database, from the cache where possible
+     * 
+     * @return array name => ['tables' => int, 'size' => int]
+     */
+    private function getDatabaseSizes($names, $refresh) {
+        $cached = $refresh ? [] : $this->readSizeCache();
+        $sizes = [];
+        $missing = [];
+        foreach ($names as $name) {
+            if (isset($cached[$name])) {
+                $sizes[$name] = $cached[$name];
+            } else {
+                $missing[] = $name;
+            }
+        }
+        
+        if (!empty($missing)) {
+            $fresh = $this->queryDatabaseSizes($missing);
+            $sizes += $fresh;
+            $this->writeSizeCache($fresh);
+        }
+        
+        return $sizes;
+    }
+    
+    /**
+     * Aggregate table counts and sizes for the given databases in one query
+     * 
+     * Replaces USE + SHOW TABLE STATUS per database, which opened every table.
+     */
+    private function queryDatabaseSizes($names) {
+        $sizes = [];
+        foreach ($names as $name) {
+            // Databases without tables do not appear in information_schema.TABLES
+            $sizes[$name] = ['tables' => 0, 'size' => 0];
+        }
+        
+        $list = implode(', ', array_map(function($name) {
+            return "'" . $this->conn->real_escape_string($name) . "'";
+        }, $names));
+        $result = $this->conn->query("SELECT TABLE_SCHEMA AS db_name, COUNT(*) AS table_count, "
+            . "COALESCE(SUM(DATA_LENGTH + INDEX_LENGTH), 0) AS total_size "
+            . "FROM information_schema.TABLES WHERE TABLE_SCHEMA IN ($list) GROUP BY TABLE_SCHEMA");
+        if (!$result) {
+            throw new Exception("Failed to get database sizes: " . $this->conn->error);
+        }
+        
+        while ($row = $result->fetch_assoc()) {
+            $sizes[$row['db_name']] = [
+                'tables' => (int) $row['table_count'],
+                'size' => (int) $row['total_size']
+            ];
+        }
+        
+        return $sizes;
+    }
+    
+    /**
+     * Cached sizes that have not expired yet
+     */
+    private function readSizeCache() {
+        $file = $this->sizeCacheFile();
+        $data = is_file($file) ? json_decode(@file_get_contents($file), true) : null;
+        if (!is_array($data)) {
+            return [];
+        }
+        $sizes = [];
+        foreach ($data as $name => $entry) {
+            if (($entry['time'] ?? 0) >= time() - self::SIZE_CACHE_TTL) {
+                $sizes[$name] = ['tables' => $entry['tables'], 'size' => $entry['size']];
+            }
+        }
+        return $sizes;
+    }
+    
+    /**
+     * Store sizes in the cache, keeping other unexpired entries
+     * 
+     * @param array $sizes name => sizes to store; null sizes remove the entry
+     */
+    private function writeSizeCache($sizes) {
+        $file = $this->sizeCacheFile();
+        $dir = dirname($file);
+        if (!is_dir($dir)) {
+            @mkdir($dir, 0777, true);
+        }
+        
+        $data = is_file($file) ? json_decode(@file_get_contents($file), true) : null;
+        $data = is_array($data) ? $data : [];
+        foreach ($data as $name => $entry) {
+            if (($entry['time'] ?? 0) < time() - self::SIZE_CACHE_TTL) {
+                unset($data[$name]);
+            }
+        }
+        foreach ($sizes as $name => $entry) {
+            if ($entry === null) {
+                unset($data[$name]);
+            } else {
+                $data[$name] = $entry + ['time' => time()];
+            }
+        }
+        @file_put_contents($file, json_encode($data), LOCK_EX);
+    }
+    
+    /**
+     * Cache file per server and user (users may see different tables)
+     */
+    private function sizeCacheFile() {
+        $result = $this->conn->query("SELECT CURRENT_USER(), @@hostname, @@port");
+        $identity = $result ? implode('|', $result->fetch_row()) : '';
+        return __DIR__ . '/../../tmp/cache/databases/' . md5($identity) . '.json';
+    }
+    
     /**
      * Create a new database
      */
@@ -66,6 +198,7 @@ class DatabaseHandler {
         $sql = "CREATE DATABASE `$name` CHARACTER SET $charset COLLATE $collation";
         
         if ($this->conn->query($sql)) {
+            $this->writeSizeCache([$name => null]);
             echo json_encode([
                 'success' => true,
                 'message' => "Database '$name' created successfully"
@@ -84,13 +217,16 @@ class DatabaseHandler {
         }
         
         // Prevent deletion of system databases
-        if (in_array($name, ['information_schema', 'performance_schema', 'mysql', 'sys'])) {
+        if (in_array($name, self::SYSTEM_DATABASES)) {
             throw new Exception("Cannot delete system database");
         }
         
         $sql = "DROP DATABASE `$name`";
         
         if ($this->conn->query($sql)) {
+            $this->writeSizeCache([$name => null]);
+            (new SchemaCache($this->conn))->invalidate($name);
+            
             // Clear session variable if the deleted database was the currently selected one
             if (session_status() === PHP_SESSION_NONE) {
                 session_start();
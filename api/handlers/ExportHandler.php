@@ -5,243 +5,338 @@
  * Handles database export operations
  */
 
+require_once __DIR__ . '/../utils/OutputStream.php';
+
 class ExportHandler {
+    // Default upper bound for the size of a single multi-row INSERT statement;
+    // callers may pick another value within the MIN/MAX range (insertBatchBytes)
+    const INSERT_BATCH_BYTES = 1048576;
+    const MIN_INSERT_BATCH_BYTES = 4096;
+    const MAX_INSERT_BATCH_BYTES = 16777216;
+    
+    // File extension and content type of a dump per compression format
+    const FILE_TYPES = [
+        'none' => ['.sql', 'application/octet-stream'],
+        'gzip' => ['.sql.gz', 'application/gzip'],
+        'zstd' => ['.sql.zst', 'application/zstd']
+    ];
+    
+    // Worker processes used by exportDatabaseParallel()
+    const DEFAULT_PARALLEL_WORKERS = 4;
+    const MAX_PARALLEL_WORKERS = 32;
+    
     private $conn;
+    private $stream = null;         // OutputStream the dump is written to
+    private $outputHandle = null;   // File handle when exporting to a file instead of the client
+    private $insertBatchBytes = self::INSERT_BATCH_BYTES;
     
-    public function __construct($conn) {
+    /**
+     * @param mysqli $conn Database connection
+     * @param int|null $insertBatchBytes INSERT size limit; defaults to the insertBatchBytes POST parameter
+     */
+    public function __construct($conn, $insertBatchBytes = null) {
         $this->conn = $conn;
+        
+        $insertBatchBytes = $insertBatchBytes ?? ($_POST['insertBatchBytes'] ?? null);
+        if (is_numeric($insertBatchBytes)) {
+            $this->insertBatchBytes = max(self::MIN_INSERT_BATCH_BYTES,
+                min(self::MAX_INSERT_BATCH_BYTES, (int) $insertBatchBytes));
+        }
     }
     
     /**
      * Export database to SQL
+     * 
+     * The dump is streamed to the client as a file download: table data is
+     * read unbuffered (MYSQLI_USE_RESULT), written as multi-row INSERTs and
+     * flushed in chunks, optionally through a gzip or zstd compressor, so
+     * memory use does not grow with the size of the database. All tables are
+     * read from one consistent snapshot.
      */
     public function exportDatabase($name) {
         if (empty($name)) {
             throw new Exception("Database name is required");
         }
         
-        $includeCreateDatabase = $_POST['includeCreateDatabase'] ?? true;
-        $dataOnly = $_POST['dataOnly'] ?? false;
-        
-        $sql = "-- Database Export: $name\n";
-        $sql .= "-- Generated: " . date('Y-m-d H:i:s') . "\n\n";
-        
-        // Include CREATE DATABASE statement if requested
-        if ($includeCreateDatabase) {
-            $sql .= "-- Create database\n";
-            $sql .= "CREATE DATABASE IF NOT EXISTS `$name`;\n";
-            $sql .= "USE `$name`;\n\n";
-        }
-        
-        $sql .= "SET FOREIGN_KEY_CHECKS = 0;\n\n";
+        $includeCreateDatabase = $this->getBoolParam('includeCreateDatabase', true);
+        $dataOnly = $this->getBoolParam('dataOnly', false);
+        $compression = $_POST['compression'] ?? 'none';
+        $customFilename = $_POST['filename'] ?? $name . '_export';
         
         // Switch to the database
-        $this->conn->query("USE `$name`");
+        if (!$this->conn->select_db($name)) {
+            throw new Exception("Failed to select database '$name': " . $this->conn->error);
+        }
         
-        // Get all tables
-        $result = $this->conn->query("SHOW TABLES");
+        // Get all base tables (views hold no data of their own)
+        $result = $this->conn->query("SHOW FULL TABLES WHERE Table_type = 'BASE TABLE'");
+        if (!$result) {
+            throw new Exception("Failed to list tables: " . $this->conn->error);
+        }
         $tables = [];
-        
         while ($row = $result->fetch_array()) {
             $tables[] = $row[0];
         }
         
+        // Everything below is streamed; errors can no longer be reported as JSON
+        $this->beginDownload(preg_replace('/\.sql$/i', '', $customFilename), $compression);
+        
+        $this->write("-- Database Export: $name\n");
+        $this->write("-- Generated: " . date('Y-m-d H:i:s') . "\n\n");
+        
+        // Include CREATE DATABASE statement if requested
+        if ($includeCreateDatabase) {
+            $this->write("-- Create database\n");
+            $this->write("CREATE DATABASE IF NOT EXISTS `$name`;\n");
+            $this->write("USE `$name`;\n\n");
+        }
+        
+        $this->write("SET FOREIGN_KEY_CHECKS = 0;\n\n");
+        
         // Export each table
+        $this->beginSnapshot();
         foreach ($tables as $table) {
             if (!$dataOnly) {
-                // Get table structure
-                $createResult = $this->conn->query("SHOW CREATE TABLE `$table`");
-                $createRow = $createResult->fetch_assoc();
-                $sql .= "-- Table structure for table `$table`\n";
-                $sql .= "DROP TABLE IF EXISTS `$table`;\n";
-                $sql .= $createRow['Create Table'] . ";\n\n";
-            }
-            
-            // Get table data
-            $dataResult = $this->conn->query("SELECT * FROM `$table`");
-            if ($dataResult->num_rows > 0) {
-                $sql .= "-- Data for table `$table`\n";
-                
-                while ($row = $dataResult->fetch_assoc()) {
-                    $columns = array_keys($row);
-                    $values = array_map(function($value) {
-                        return $value === null ? 'NULL' : "'" . $this->conn->real_escape_string($value) . "'";
-                    }, array_values($row));
-                    
-                    $sql .= "INSERT INTO `$table` (`" . implode('`, `', $columns) . "`) VALUES (" . implode(', ', $values) . ");\n";
-                }
-                $sql .= "\n";
+                $this->writeTableStructure($table);
             }
+            $this->writeTableData($table);
         }
+        $this->endSnapshot();
         
-        $sql .= "SET FOREIGN_KEY_CHECKS = 1;\n";
+        $this->write("SET FOREIGN_KEY_CHECKS = 1;\n");
+        $this->endDownload();
         
-        echo json_encode([
-            'success' => true,
-            'sql' => $sql
-        ]);
+        exit;
     }
     
     /**
-     * Export all databases to SQL (optimized for speed)
+     * Export all databases to SQL
+     * 
+     * Streams like exportDatabase(): every table is read in a single
+     * unbuffered pass, and all databases are read inside one
+     * START TRANSACTION WITH CONSISTENT SNAPSHOT so the dump reflects a
+     * single point in time (for InnoDB tables) even while writes continue.
      */
     public function exportAllDatabases() {
-        $includeCreateDatabase = $_POST['includeCreateDatabase'] ?? true;
-        $dataOnly = $_POST['dataOnly'] ?? false;
+        $includeCreateDatabase = $this->getBoolParam('includeCreateDatabase', true);
+        $dataOnly = $this->getBoolParam('dataOnly', false);
+        $compression = $_POST['compression'] ?? 'none';
         $customFilename = $_POST['filename'] ?? 'all_databases_export';
         
-        // Optimize PHP settings for speed
-        ini_set('memory_limit', '1G');
-        set_time_limit(0);
-        ini_set('max_execution_time', 0);
-        
-        // Set headers for file download
-        $filename = $customFilename . '_' . date('Y-m-d_H-i-s') . '.sql';
-        header('Content-Type: application/octet-stream');
-        header('Content-Disposition: attachment; filename="' . $filename . '"');
-        header('Cache-Control: no-cache, must-revalidate');
-        header('Expires: Sat, 26 Jul 1997 05:00:00 GMT');
+        $databases = $this->getUserDatabases();
         
-        // Disable output buffering for faster streaming
-        if (ob_get_level()) {
-            ob_end_clean();
-        }
+        $this->beginDownload($customFilename . '_' . date('Y-m-d_H-i-s'), $compression);
         
         // Output header
-        echo "-- Complete Database Export\n";
-        echo "-- Generated: " . date('Y-m-d H:i:s') . "\n";
-        echo "-- Exported all user databases\n\n";
-        echo "SET FOREIGN_KEY_CHECKS = 0;\n\n";
+        $this->write("-- Complete Database Export\n");
+        $this->write("-- Generated: " . date('Y-m-d H:i:s') . "\n");
+        $this->write("-- Exported all user databases\n\n");
+        $this->write("SET FOREIGN_KEY_CHECKS = 0;\n\n");
         
-        // Flush output immediately
-        if (ob_get_level()) {
-            ob_flush();
-            flush();
-        }
-        
-        // Get all databases
-        $result = $this->conn->query("SHOW DATABASES");
-        $systemDatabases = ['information_schema', 'performance_schema', 'mysql', 'sys'];
-        $databaseCount = 0;
+        $this->beginSnapshot();
         
-        while ($row = $result->fetch_array()) {
-            $dbName = $row[0];
-            if (in_array($dbName, $systemDatabases)) {
-                continue;
-            }
-            
-            $databaseCount++;
-            
+        foreach ($databases as $dbName) {
             // Output database separator
-            echo "-- =============================================\n";
-            echo "-- Database: $dbName\n";
-            echo "-- =============================================\n\n";
+            $this->write("-- =============================================\n");
+            $this->write("-- Database: $dbName\n");
+            $this->write("-- =============================================\n\n");
             
             // Include CREATE DATABASE statement if requested
             if ($includeCreateDatabase) {
-                echo "-- Create database\n";
-                echo "CREATE DATABASE IF NOT EXISTS `$dbName`;\n";
-                echo "USE `$dbName`;\n\n";
+                $this->write("-- Create database\n");
+                $this->write("CREATE DATABASE IF NOT EXISTS `$dbName`;\n");
+                $this->write("USE `$dbName`;\n\n");
             }
             
             // Switch to the database
-            $this->conn->query("USE `$dbName`");
+            if (!$this->conn->select_db($dbName)) {
+                $this->write("-- Skipped: cannot select database `$dbName`\n\n");
+                continue;
+            }
             
-            // Get all tables in this database
-            $tableResult = $this->conn->query("SHOW TABLES");
+            // Get all base tables in this database
+            $tableResult = $this->conn->query("SHOW FULL TABLES WHERE Table_type = 'BASE TABLE'");
             $tables = [];
-            
-            while ($tableRow = $tableResult->fetch_array()) {
+            while ($tableResult && $tableRow = $tableResult->fetch_array()) {
                 $tables[] = $tableRow[0];
             }
             
             if (empty($tables)) {
-                echo "-- No tables found in database `$dbName`\n\n";
+                $this->write("-- No tables found in database `$dbName`\n\n");
                 continue;
             }
             
             // Export each table
             foreach ($tables as $table) {
                 if (!$dataOnly) {
-                    // Get table structure
-                    $createResult = $this->conn->query("SHOW CREATE TABLE `$table`");
-                    $createRow = $createResult->fetch_assoc();
-                    echo "-- Table structure for table `$table`\n";
-                    echo "DROP TABLE IF EXISTS `$table`;\n";
-                    echo $createRow['Create Table'] . ";\n\n";
-                }
-                
-                // Export table data using optimized bulk insert
-                $dataResult = $this->conn->query("SELECT COUNT(*) as total_rows FROM `$table`");
-                $totalRows = $dataResult->fetch_assoc()['total_rows'];
-                
-                if ($totalRows > 0) {
-                    echo "-- Data for table `$table` ($totalRows rows)\n";
-                    
-                    // Use larger chunk size for better performance
-                    $chunkSize = 5000; // Increased from 1000 to 5000
-                    $offset = 0;
-                    $bulkInsertBuffer = [];
-                    $bulkInsertSize = 100; // Insert 100 rows at once
-                    
-                    while ($offset < $totalRows) {
-                        $chunkResult = $this->conn->query("SELECT * FROM `$table` LIMIT $chunkSize OFFSET $offset");
-                        
-                        while ($row = $chunkResult->fetch_assoc()) {
-                            $columns = array_keys($row);
-                            $values = array_map(function($value) {
-                                return $value === null ? 'NULL' : "'" . $this->conn->real_escape_string($value) . "'";
-                            }, array_values($row));
-                            
-                            $bulkInsertBuffer[] = "(" . implode(', ', $values) . ")";
-                            
-                            // When buffer is full, output bulk insert
-                            if (count($bulkInsertBuffer) >= $bulkInsertSize) {
-                                echo "INSERT INTO `$table` (`" . implode('`, `', $columns) . "`) VALUES " . implode(', ', $bulkInsertBuffer) . ";\n";
-                                $bulkInsertBuffer = [];
-                            }
-                        }
-                        
-                        // Output remaining rows in buffer
-                        if (!empty($bulkInsertBuffer)) {
-                            echo "INSERT INTO `$table` (`" . implode('`, `', $columns) . "`) VALUES " . implode(', ', $bulkInsertBuffer) . ";\n";
-                            $bulkInsertBuffer = [];
-                        }
-                        
-                        $offset += $chunkSize;
-                        
-                        // Flush output less frequently for better performance
-                        if ($offset % ($chunkSize * 2) === 0) {
-                            if (ob_get_level()) {
-                                ob_flush();
-                                flush();
-                            }
-                        }
-                    }
-                    echo "\n";
-                } else {
-                    echo "-- No data in table `$table`\n\n";
+                    $this->writeTableStructure($table);
                 }
+                $this->writeTableData($table);
             }
             
-            echo "\n";
-            
-            // Flush output after each database
-            if (ob_get_level()) {
-                ob_flush();
-                flush();
+            $this->write("\n");
+        }
+        
+        $this->endSnapshot();
+        
+        $this->write("SET FOREIGN_KEY_CHECKS = 1;\n");
+        $this->endDownload();
+        
+        exit;
+    }
+    
+    /**
+     * Export a database in parallel to per-table files on the server
+     * 
+     * Tables are handed out (largest first) to a pool of worker processes
+     * (api/workers/export_table.php), each of which writes one table through
+     * exportTableToFile(). The files land in tmp/exports/<exportId>/ next to
+     * a manifest.json with the row count, size and SHA-256 of every file;
+     * ImportHandler::importDatabaseParallel() restores such a directory.
+     * 
+     * Every table is read consistently on its own, but the tables are read
+     * by different connections, so the export as a whole is not a single
+     * snapshot.
+     */
+    public function exportDatabaseParallel($name) {
+        if (empty($name)) {
+            throw new Exception("Database name is required");
+        }
+        
+        $dataOnly = $this->getBoolParam('dataOnly', false);
+        $compression = $_POST['compression'] ?? 'none';
+        $workers = (int) ($_POST['workers'] ?? self::DEFAULT_PARALLEL_WORKERS);
+        $workers = max(1, min(self::MAX_PARALLEL_WORKERS, $workers));
+        
+        // Fail early (as JSON) if the compression cannot be used by the workers
+        new OutputStream($compression);
+        list($extension) = self::FILE_TYPES[$compression];
+        
+        // Largest tables first, so one big table does not end up last in the queue
+        $stmt = $this->conn->prepare("SELECT TABLE_NAME FROM information_schema.TABLES
+                                      WHERE TABLE_SCHEMA = ? AND TABLE_TYPE = 'BASE TABLE'
+                                      ORDER BY (DATA_LENGTH + INDEX_LENGTH) DESC, TABLE_NAME");
+        $stmt->bind_param('s', $name);
+        $stmt->execute();
+        $result = $stmt->get_result();
+        $tables = [];
+        while ($row = $result->fetch_array()) {
+            $tables[] = $row[0];
+        }
+        $stmt->close();
+        
+        if (empty($tables)) {
+            throw new Exception("Database '$name' has no tables to export");
+        }
+        
+        set_time_limit(0);
+        $startTime = microtime(true);
+        
+        $exportId = preg_replace('/[^A-Za-z0-9_-]/', '_', $name) . '_' . date('Ymd_His');
+        $directory = self::getParallelExportDir($exportId, true);
+        
+        $jobs = [];
+        foreach ($tables as $index => $table) {
+            $jobs[] = [
+                'database' => $name,
+                'table' => $table,
+                'file' => $directory . '/' . sprintf('%04d_', $index + 1)
+                    . preg_replace('/[^A-Za-z0-9_-]/', '_', $table) . $extension,
+                'compression' => $compression,
+                'dataOnly' => $dataOnly,
+                'insertBatchBytes' => $this->insertBatchBytes
+            ];
+        }
+        
+        require_once __DIR__ . '/../utils/WorkerPool.php';
+        require_once __DIR__ . '/../../db_connection.php';
+        $pool = new WorkerPool(__DIR__ . '/../workers/export_table.php', $workers, getDbCredentials());
+        $results = $pool->run($jobs);
+        
+        $manifestTables = [];
+        $errors = [];
+        $totalRows = 0;
+        foreach ($jobs as $index => $job) {
+            $jobResult = $results[$index];
+            if (empty($jobResult['success'])) {
+                $errors[] = "{$job['table']}: " . ($jobResult['error'] ?? 'unknown error');
+                continue;
             }
+            $totalRows += $jobResult['rows'];
+            $manifestTables[] = [
+                'table' => $job['table'],
+                'file' => basename($job['file']),
+                'rows' => $jobResult['rows'],
+                'bytes' => $jobResult['bytes'],
+                'sha256' => $jobResult['sha256'],
+                'seconds' => $jobResult['seconds']
+            ];
         }
         
-        echo "SET FOREIGN_KEY_CHECKS = 1;\n";
+        $manifest = [
+            'version' => 1,
+            'database' => $name,
+            'created' => date('c'),
+            'compression' => $compression,
+            'dataOnly' => $dataOnly,
+            'tables' => $manifestTables
+        ];
+        file_put_contents($directory . '/manifest.json', json_encode($manifest, JSON_PRETTY_PRINT));
+        
+        $response = [
+            'success' => empty($errors),
+            'exportId' => $exportId,
+            'workers' => $workers,
+            'tables' => count($manifestTables),
+            'rows' => $totalRows,
+            'seconds' => round(microtime(true) - $startTime, 2)
+        ];
+        if (!empty($errors)) {
+            $response['error'] = "Export completed with errors: " . implode('; ', $errors);
+        }
+        echo json_encode($response);
+    }
+    
+    /**
+     * Export one table (structure and data) of the current database to a file
+     * 
+     * Used by the parallel export workers.
+     * 
+     * @return array ['rows' => int, 'bytes' => int, 'sha256' => string]
+     */
+    public function exportTableToFile($table, $path, $compression = 'none', $dataOnly = false) {
+        $this->beginFileOutput($path, $compression);
+        
+        $this->write("-- Table export: `$table`\n");
+        $this->write("-- Generated: " . date('Y-m-d H:i:s') . "\n\n");
+        $this->write("SET FOREIGN_KEY_CHECKS = 0;\n\n");
+        if (!$dataOnly) {
+            $this->writeTableStructure($table);
+        }
+        $rows = $this->writeTableData($table);
+        $this->write("SET FOREIGN_KEY_CHECKS = 1;\n");
         
-        // Final flush
-        if (ob_get_level()) {
-            ob_flush();
-            flush();
+        return ['rows' => $rows] + $this->endFileOutput();
+    }
+    
+    /**
+     * Directory of a parallel export under tmp/exports
+     * 
+     * @param string $exportId Export id as returned by exportDatabaseParallel()
+     * @param bool $create Create the directory
+     */
+    public static function getParallelExportDir($exportId, $create = false) {
+        if (!preg_match('/^[A-Za-z0-9_-]+$/', $exportId)) {
+            throw new Exception("Invalid export id");
         }
         
-        exit;
+        $directory = __DIR__ . '/../../tmp/exports/' . $exportId;
+        if ($create) {
+            if (!is_dir($directory) && !@mkdir($directory, 0777, true)) {
+                throw new Exception("Failed to create export directory");
+            }
+        }
+        return $directory;
     }
     
     /**
@@ -284,29 +379,12 @@ class ExportHandler {
         }
         
         // Get all databases
-        $result = $this->conn->query("SHOW DATABASES");
-        $systemDatabases = ['information_schema', 'performance_schema', 'mysql', 'sys'];
-        $databases = [];
-        
-        while ($row = $result->fetch_array()) {
-            $dbName = $row[0];
-            if (!in_array($dbName, $systemDatabases)) {
-                $databases[] = $dbName;
-            }
-        }
+        $databases = $this->getUserDatabases();
         
         if (empty($databases)) {
             return false; // No databases to export
         }
         
-        // Set headers for file download
-        $customFilename = $_POST['filename'] ?? 'all_databases_export';
-        $filename = $customFilename . '_' . date('Y-m-d_H-i-s') . '.sql';
-        header('Content-Type: application/octet-stream');
-        header('Content-Disposition: attachment; filename="' . $filename . '"');
-        header('Cache-Control: no-cache, must-revalidate');
-        header('Expires: Sat, 26 Jul 1997 05:00:00 GMT');
-        
         // Build mysqldump command
         $command = escapeshellarg($mysqldumpPath);
         $command .= ' --host=' . escapeshellarg($host);
@@ -320,6 +398,7 @@ class ExportHandler {
         $command .= ' --triggers';
         $command .= ' --events';
         $command .= ' --add-drop-database';
+        $command .= ' --net-buffer-length=' . (int) $this->insertBatchBytes; // Caps extended INSERT size
         $command .= ' --databases ' . implode(' ', array_map('escapeshellarg', $databases));
         
         // Execute mysqldump and stream output
@@ -329,18 +408,208 @@ class ExportHandler {
             return false; // Failed to execute mysqldump
         }
         
-        // Stream output directly to browser
+        // Set headers for file download
+        $customFilename = $_POST['filename'] ?? 'all_databases_export';
+        try {
+            $this->beginDownload($customFilename . '_' . date('Y-m-d_H-i-s'), $_POST['compression'] ?? 'none');
+        } catch (Exception $e) {
+            pclose($handle);
+            throw $e;
+        }
+        
+        // Stream output (through the compressor, if any) to the browser
         while (!feof($handle)) {
-            echo fread($handle, 8192); // Read in 8KB chunks
-            if (ob_get_level()) {
-                ob_flush();
-                flush();
-            }
+            $this->write(fread($handle, OutputStream::CHUNK_BYTES));
         }
+        $this->endDownload();
         
         pclose($handle);
         return true;
     }
+    
+    /**
+     * Names of all non-system databases
+     */
+    private function getUserDatabases() {
+        $result = $this->conn->query("SHOW DATABASES");
+        if (!$result) {
+            throw new Exception("Failed to list databases: " . $this->conn->error);
+        }
+        
+        $systemDatabases = ['information_schema', 'performance_schema', 'mysql', 'sys'];
+        $databases = [];
+        while ($row = $result->fetch_array()) {
+            if (!in_array($row[0], $systemDatabases)) {
+                $databases[] = $row[0];
+            }
+        }
+        return $databases;
+    }
+    
+    /**
+     * Start a read-only point-in-time view for the tables read next
+     * 
+     * InnoDB tables are read from the snapshot taken here; other engines
+     * (MyISAM, MEMORY) are not transactional and are read as they are.
+     */
+    private function beginSnapshot() {
+        // Applies to the next transaction only
+        $this->conn->query("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ");
+        if (!$this->conn->query("START TRANSACTION WITH CONSISTENT SNAPSHOT")) {
+            throw new Exception("Failed to start consistent snapshot: " . $this->conn->error);
+        }
+    }
+    
+    private function endSnapshot() {
+        $this->conn->query("COMMIT");
+    }
+    
+    /**
+     * Write the DROP/CREATE statements for a table
+     */
+    private function writeTableStructure($table) {
+        $createResult = $this->conn->query("SHOW CREATE TABLE `$table`");
+        if (!$createResult) {
+            throw new Exception("Failed to get structure of table '$table': " . $this->conn->error);
+        }
+        $createRow = $createResult->fetch_assoc();
+        $this->write("-- Table structure for table `$table`\n");
+        $this->write("DROP TABLE IF EXISTS `$table`;\n");
+        $this->write($createRow['Create Table'] . ";\n\n");
+    }
+    
+    /**
+     * Write the rows of a table as multi-row INSERT statements
+     * 
+     * Rows are read with an unbuffered result set, so only the current
+     * statement (at most insertBatchBytes) is held in memory. No other
+     * query may run on the connection until the result is freed.
+     * 
+     * @return int Number of rows written
+     */
+    private function writeTableData($table) {
+        $dataResult = $this->conn->query("SELECT * FROM `$table`", MYSQLI_USE_RESULT);
+        if (!$dataResult) {
+            throw new Exception("Failed to read data from table '$table': " . $this->conn->error);
+        }
+        
+        $rowCount = 0;
+        $insertPrefix = null;
+        $batch = '';
+        
+        while ($row = $dataResult->fetch_assoc()) {
+            if ($insertPrefix === null) {
+                $insertPrefix = "INSERT INTO `$table` (`" . implode('`, `', array_keys($row)) . "`) VALUES\n";
+                $this->write("-- Data for table `$table`\n");
+            }
+            
+            $values = array_map(function($value) {
+                return $value === null ? 'NULL' : "'" . $this->conn->real_escape_string($value) . "'";
+            }, array_values($row));
+            $tuple = "(" . implode(', ', $values) . ")";
+            
+            if ($batch !== '' && strlen($batch) + strlen($tuple) > $this->insertBatchBytes) {
+                $this->write($insertPrefix . $batch . ";\n");
+                $batch = '';
+            }
+            $batch .= ($batch === '' ? '' : ",\n") . $tuple;
+            $rowCount++;
+        }
+        
+        $error = $this->conn->errno ? $this->conn->error : '';
+        $dataResult->free();
+        if ($error !== '') {
+            throw new Exception("Failed to read data from table '$table': " . $error);
+        }
+        
+        if ($batch !== '') {
+            $this->write($insertPrefix . $batch . ";\n");
+        }
+        $this->write($rowCount > 0 ? "\n" : "-- No data in table `$table`\n\n");
+        
+        return $rowCount;
+    }
+    
+    /**
+     * Send download headers and set up the (optionally compressed) output stream
+     * 
+     * @param string $baseFilename Filename without extension
+     * @param string $compression 'none', 'gzip' or 'zstd'
+     */
+    private function beginDownload($baseFilename, $compression) {
+        // Validate before any header is sent so the error still reaches the client as JSON
+        $this->stream = new OutputStream($compression);
+        list($extension, $contentType) = self::FILE_TYPES[$compression];
+        
+        set_time_limit(0);
+        ini_set('max_execution_time', 0);
+        
+        $filename = str_replace(['"', "\r", "\n"], '', $baseFilename) . $extension;
+        header('Content-Type: ' . $contentType);
+        header('Content-Disposition: attachment; filename="' . $filename . '"');
+        header('Cache-Control: no-cache, must-revalidate');
+        header('Expires: Sat, 26 Jul 1997 05:00:00 GMT');
+        
+        // Disable output buffering so chunks reach the client as they are written
+        OutputStream::disableBuffering();
+    }
+    
+    /**
+     * Direct the output stream to a file instead of the client
+     */
+    private function beginFileOutput($path, $compression) {
+        $this->outputHandle = fopen($path, 'wb');
+        if ($this->outputHandle === false) {
+            $this->outputHandle = null;
+            throw new Exception("Failed to open '$path' for writing");
+        }
+        try {
+            $this->stream = new OutputStream($compression, OutputStream::CHUNK_BYTES, $this->outputHandle);
+        } catch (Exception $e) {
+            fclose($this->outputHandle);
+            $this->outputHandle = null;
+            throw $e;
+        }
+    }
+    
+    /**
+     * Finish the file output stream
+     * 
+     * @return array ['bytes' => int, 'sha256' => string] of the written (compressed) file
+     */
+    private function endFileOutput() {
+        $this->stream->close();
+        fclose($this->outputHandle);
+        $this->outputHandle = null;
+        
+        $summary = $this->stream->getFileSummary();
+        $this->stream = null;
+        return $summary;
+    }
+    
+    /**
+     * Queue output on the current stream
+     */
+    private function write($data) {
+        $this->stream->write($data);
+    }
+    
+    /**
+     * Flush the remaining output and close the compressed stream
+     */
+    private function endDownload() {
+        $this->stream->close();
+        $this->stream = null;
+    }
+    
+    /**
+     * Read a boolean POST parameter ("true"/"false", "1"/"0", ...)
+     */
+    private function getBoolParam($name, $default) {
+        if (!isset($_POST[$name])) {
+            return $default;
+        }
+        return filter_var($_POST[$name], FILTER_VALIDATE_BOOLEAN);
+    }
 }
 ?>
-
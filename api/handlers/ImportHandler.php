@@ -5,7 +5,23 @@
  * Handles database import operations
  */
 
+require_once __DIR__ . '/../utils/SqlStatementReader.php';
+
 class ImportHandler {
+    // Statements are sent in multi_query batches of at most this many statements/bytes
+    const BATCH_STATEMENTS = 500;
+    const BATCH_BYTES = 1048576;
+    
+    // Errors kept in detail per import (all are counted)
+    const MAX_RECORDED_ERRORS = 100;
+    
+    // Seconds after its last update that an import job (with its upload) is removed
+    const JOB_TTL = 86400;
+    
+    // Worker processes used by importDatabaseParallel()
+    const DEFAULT_PARALLEL_WORKERS = 4;
+    const MAX_PARALLEL_WORKERS = 32;
+    
     private $conn;
     
     public function __construct($conn) {
@@ -14,6 +30,13 @@ class ImportHandler {
     
     /**
      * Import database from SQL file
+     * 
+     * The upload (plain, gzip or zstd) is stored under tmp/imports/ and
+     * imported by a background job (api/workers/import_job.php), so the
+     * import is not bound to this request. The response carries a jobId to
+     * poll with getImportJob(). Where background processes are not available
+     * the job runs inside this request instead. Jobs not updated for JOB_TTL
+     * seconds are removed, uploads included.
      */
     public function importDatabase() {
         if (!isset($_FILES['file']) || $_FILES['file']['error'] !== UPLOAD_ERR_OK) {
@@ -21,49 +44,240 @@ class ImportHandler {
         }
         
         $database = $_POST['database'] ?? '';
-        $dropExisting = $_POST['dropExisting'] ?? false;
+        $dropExisting = filter_var($_POST['dropExisting'] ?? false, FILTER_VALIDATE_BOOLEAN);
         
         if (empty($database)) {
             throw new Exception("Target database is required");
         }
         
-        // Read SQL file
-        $sql = file_get_contents($_FILES['file']['tmp_name']);
-        if ($sql === false) {
-            throw new Exception("Failed to read SQL file");
+        $jobId = 'import_' . date('Ymd_His') . '_' . bin2hex(random_bytes(4));
+        $uploadFile = self::getJobPath($jobId, 'upload');
+        if (!is_dir(dirname($uploadFile)) && !@mkdir(dirname($uploadFile), 0777, true)) {
+            throw new Exception("Failed to create import directory");
+        }
+        $this->purgeOldJobs(dirname($uploadFile));
+        if (!move_uploaded_file($_FILES['file']['tmp_name'], $uploadFile)) {
+            throw new Exception("Failed to store uploaded file");
+        }
+        
+        $this->saveJob([
+            'id' => $jobId,
+            'database' => $database,
+            'fileName' => $_FILES['file']['name'],
+            'fileSize' => filesize($uploadFile),
+            'dropExisting' => $dropExisting,
+            'status' => 'queued',
+            'offset' => 0,
+            'delimiter' => ';',
+            'statements' => 0,
+            'rows' => 0,
+            'bytesRead' => 0,
+            'table' => null,
+            'errors' => [],
+            'errorCount' => 0,
+            'resumes' => 0,
+            'createdAt' => time()
+        ]);
+        
+        $this->startJob($jobId);
+    }
+    
+    /**
+     * State of an import job, with throughput and remaining time
+     */
+    public function getImportJob($jobId) {
+        $job = $this->loadJob($jobId);
+        
+        // A "running" job whose lock is free has died (crash, timeout, restart)
+        if ($job['status'] === 'running' && !$this->isJobLocked($jobId)) {
+            $job['status'] = 'interrupted';
+        }
+        
+        $elapsed = max(0.001, ($job['updatedAt'] ?? microtime(true)) - ($job['runStartedAt'] ?? microtime(true)));
+        $bytesPerSecond = (($job['bytesRead'] - ($job['runStartBytes'] ?? 0)) / $elapsed);
+        $job['rowsPerSecond'] = isset($job['runStartedAt']) ? round(($job['rows'] - $job['runStartRows']) / $elapsed) : 0;
+        $job['mbPerSecond'] = isset($job['runStartedAt']) ? round($bytesPerSecond / 1048576, 2) : 0;
+        $job['percent'] = $job['fileSize'] > 0 ? min(100, round($job['bytesRead'] * 100 / $job['fileSize'], 1)) : 0;
+        $job['etaSeconds'] = $job['status'] === 'running' && $bytesPerSecond > 0
+            ? round(($job['fileSize'] - $job['bytesRead']) / $bytesPerSecond)
+            : null;
+        $job['resumable'] = in_array($job['status'], ['interrupted', 'failed'], true)
+            && is_file(self::getJobPath($jobId, 'upload'));
+        
+        echo json_encode([
+            'success' => true,
+            'job' => $job
+        ]);
+    }
+    
+    /**
+     * Restart an interrupted or failed import job from its last checkpoint
+     */
+    public function resumeImportJob($jobId) {
+        $job = $this->loadJob($jobId);
+        if ($job['status'] === 'completed') {
+            throw new Exception("Import job has already completed");
+        }
+        if ($this->isJobLocked($jobId)) {
+            throw new Exception("Import job is still running");
+        }
+        if (!is_file(self::getJobPath($jobId, 'upload'))) {
+            throw new Exception("The uploaded file of this import job is no longer available");
+        }
+        
+        $job['status'] = 'queued';
+        $job['resumes']++;
+        $this->saveJob($job);
+        
+        $this->startJob($jobId);
+    }
+    
+    /**
+     * Remove an import job that will not be resumed, with its uploaded file
+     */
+    public function discardImportJob($jobId) {
+        $job = $this->loadJob($jobId);
+        if ($this->isJobLocked($jobId)) {
+            throw new Exception("Import job is still running");
+        }
+        $this->deleteJobFiles($jobId);
+        
+        echo json_encode([
+            'success' => true,
+            'message' => "Import of '{$job['fileName']}' discarded"
+        ]);
+    }
+    
+    /**
+     * Run (or continue) an import job until the end of its file
+     * 
+     * A checkpoint (byte offset, delimiter and counters) is saved after every
+     * committed batch; a resumed job continues from there, so at most the
+     * batch that was in flight when the job died is executed again.
+     * 
+     * @return array Final job state
+     */
+    public function runImportJob($jobId) {
+        $lock = fopen(self::getJobPath($jobId, 'lock'), 'c');
+        if (!$lock || !flock($lock, LOCK_EX | LOCK_NB)) {
+            throw new Exception("Import job is already running");
         }
         
-        // Switch to target database
-        $this->conn->query("USE `$database`");
+        $job = $this->loadJob($jobId);
+        $uploadFile = self::getJobPath($jobId, 'upload');
+        set_time_limit(0);
+        ignore_user_abort(true);
         
-        // Drop existing tables if requested
-        if ($dropExisting) {
-            $result = $this->conn->query("SHOW TABLES");
-            while ($row = $result->fetch_array()) {
-                $this->conn->query("DROP TABLE IF EXISTS `" . $row[0] . "`");
+        try {
+            if (!$this->conn->select_db($job['database'])) {
+                throw new Exception("Failed to select database '{$job['database']}': " . $this->conn->error);
             }
+            
+            // Drop existing tables if requested (only before the first statement)
+            if ($job['dropExisting'] && $job['offset'] === 0 && empty($job['dropped'])) {
+                $this->dropAllTables();
+                $job['dropped'] = true;
+            }
+            
+            $reader = new SqlStatementReader($uploadFile);
+            if ($job['offset'] > 0) {
+                $reader->seek($job['offset'], $job['delimiter']);
+            }
+            
+            $job['status'] = 'running';
+            $job['startedAt'] = $job['startedAt'] ?? microtime(true);
+            $job['runStartedAt'] = microtime(true);
+            $job['runStartBytes'] = $reader->getBytesRead();
+            $job['runStartRows'] = $job['rows'];
+            $this->saveJob($job);
+            
+            $job = $this->executeStatements($reader, $job, function($progress) {
+                $this->saveJob($progress);
+            });
+            $reader->close();
+            
+            $job['status'] = 'completed';
+            $job['finishedAt'] = microtime(true);
+            @unlink($uploadFile);
+        } catch (Exception $e) {
+            $job['status'] = 'failed';
+            $job['lastError'] = $e->getMessage();
+        }
+        
+        $this->saveJob($job);
+        flock($lock, LOCK_UN);
+        fclose($lock);
+        
+        return $job;
+    }
+    
+    /**
+     * Restore a parallel export (see ExportHandler::exportDatabaseParallel)
+     * 
+     * The checksums in the manifest are verified first; the table files are
+     * then loaded by a pool of worker processes (api/workers/import_table.php).
+     */
+    public function importDatabaseParallel() {
+        $exportId = $_POST['exportId'] ?? '';
+        $database = $_POST['database'] ?? '';
+        $workers = (int) ($_POST['workers'] ?? self::DEFAULT_PARALLEL_WORKERS);
+        $workers = max(1, min(self::MAX_PARALLEL_WORKERS, $workers));
+        
+        if (empty($exportId)) {
+            throw new Exception("Export id is required");
+        }
+        if (empty($database)) {
+            throw new Exception("Target database is required");
         }
         
-        // Split SQL into individual statements
-        $statements = array_filter(array_map('trim', explode(';', $sql)));
+        require_once __DIR__ . '/ExportHandler.php';
+        $directory = ExportHandler::getParallelExportDir($exportId);
+        $manifest = json_decode(@file_get_contents($directory . '/manifest.json'), true);
+        if (!is_array($manifest) || !isset($manifest['tables'])) {
+            throw new Exception("Export '$exportId' not found or has no manifest");
+        }
+        
+        set_time_limit(0);
+        $startTime = microtime(true);
+        
+        // Refuse to load files that do not match the manifest
+        $jobs = [];
+        foreach ($manifest['tables'] as $entry) {
+            $file = $directory . '/' . basename($entry['file']);
+            if (!is_file($file) || hash_file('sha256', $file) !== $entry['sha256']) {
+                throw new Exception("Checksum mismatch for table '{$entry['table']}' ({$entry['file']})");
+            }
+            $jobs[] = [
+                'database' => $database,
+                'table' => $entry['table'],
+                'file' => $file,
+                'compression' => $manifest['compression'] ?? 'none'
+            ];
+        }
+        
+        require_once __DIR__ . '/../utils/WorkerPool.php';
+        require_once __DIR__ . '/../../db_connection.php';
+        $pool = new WorkerPool(__DIR__ . '/../workers/import_table.php', $workers, getDbCredentials());
+        $results = $pool->run($jobs);
         
         $executed = 0;
         $errors = [];
-        
-        foreach ($statements as $statement) {
-            if (!empty($statement) && !preg_match('/^--/', $statement)) {
-                if ($this->conn->query($statement)) {
-                    $executed++;
-                } else {
-                    $errors[] = "Error executing: " . substr($statement, 0, 100) . "... - " . $this->conn->error;
-                }
+        foreach ($jobs as $index => $job) {
+            if (empty($results[$index]['success'])) {
+                $errors[] = "{$job['table']}: " . ($results[$index]['error'] ?? 'unknown error');
+            } else {
+                $executed += $results[$index]['statements'];
             }
         }
         
+        $seconds = round(microtime(true) - $startTime, 2);
         if (empty($errors)) {
             echo json_encode([
                 'success' => true,
-                'message' => "Database imported successfully. $executed statements executed."
+                'message' => "Restored " . count($jobs) . " tables with $workers workers in {$seconds}s. $executed statements executed.",
+                'tables' => count($jobs),
+                'statements' => $executed,
+                'seconds' => $seconds
             ]);
         } else {
             echo json_encode([
@@ -72,6 +286,260 @@ class ImportHandler {
             ]);
         }
     }
+    
+    /**
+     * Execute a table file written by ExportHandler::exportTableToFile()
+     * 
+     * @return int Number of statements executed
+     */
+    public function importTableFile($path, $compression = 'none') {
+        $reader = new SqlStatementReader($path, $compression);
+        $progress = $this->executeStatements($reader);
+        $reader->close();
+        
+        if ($progress['errorCount'] > 0) {
+            throw new Exception(implode('; ', array_map(function($error) {
+                return "Error executing: {$error['sql']}... - {$error['error']}";
+            }, $progress['errors'])));
+        }
+        return $progress['statements'];
+    }
+    
+    /**
+     * Run every statement from the reader
+     * 
+     * Statements are grouped into multi_query batches (one round trip and
+     * one transaction per batch); stored programs read under a custom
+     * DELIMITER are sent on their own. A failing statement is recorded and
+     * the rest of its batch is resubmitted.
+     * 
+     * @param SqlStatementReader $reader
+     * @param array $progress Counters to continue from (see the defaults below)
+     * @param callable|null $checkpoint Called with the progress after every committed batch
+     * @return array Progress: statements, rows, errors, errorCount, bytesRead,
+     *               fileSize, table, offset, delimiter
+     */
+    private function executeStatements(SqlStatementReader $reader, $progress = [], $checkpoint = null) {
+        $this->conn->query("SET FOREIGN_KEY_CHECKS = 0");
+        $this->conn->query("SET UNIQUE_CHECKS = 0");
+        $this->conn->query("SET autocommit = 0");
+        
+        $progress = array_merge([
+            'statements' => 0,
+            'rows' => 0,
+            'errors' => [],
+            'errorCount' => 0,
+            'table' => null
+        ], $progress);
+        $progress['fileSize'] = $reader->getFileSize();
+        $batch = [];
+        $batchBytes = 0;
+        
+        while (($statement = $reader->next()) !== null) {
+            $table = $this->getStatementTable($statement);
+            if ($table !== null) {
+                $progress['table'] = $table;
+            }
+            
+            if ($reader->getStatementDelimiter() !== ';') {
+                $this->runBatch($batch, $progress);
+                $this->runBatch([$statement], $progress);
+            } else {
+                $batch[] = $statement;
+                $batchBytes += strlen($statement);
+                if (count($batch) < self::BATCH_STATEMENTS && $batchBytes < self::BATCH_BYTES) {
+                    continue;
+                }
+                $this->runBatch($batch, $progress);
+            }
+            $batch = [];
+            $batchBytes = 0;
+            $this->checkpoint($reader, $progress, $checkpoint);
+        }
+        $this->runBatch($batch, $progress);
+        $this->checkpoint($reader, $progress, $checkpoint);
+        
+        $this->conn->query("SET autocommit = 1");
+        $this->conn->query("SET UNIQUE_CHECKS = 1");
+        $this->conn->query("SET FOREIGN_KEY_CHECKS = 1");
+        
+        return $progress;
+    }
+    
+    /**
+     * Record the reader position after a committed batch
+     */
+    private function checkpoint(SqlStatementReader $reader, &$progress, $checkpoint) {
+        $progress['offset'] = $reader->getOffset();
+        $progress['delimiter'] = $reader->getDelimiter();
+        $progress['bytesRead'] = $reader->getBytesRead();
+        if ($checkpoint !== null) {
+            $checkpoint($progress);
+        }
+    }
+    
+    /**
+     * Send a batch of statements with multi_query and commit it
+     */
+    private function runBatch($statements, &$progress) {
+        if (empty($statements)) {
+            return;
+        }
+        
+        while (!empty($statements)) {
+            $done = 0;
+            if ($this->conn->multi_query(implode("\n;\n", $statements))) {
+                do {
+                    if ($result = $this->conn->store_result()) {
+                        $result->free();
+                    } elseif ($this->conn->affected_rows > 0) {
+                        $progress['rows'] += $this->conn->affected_rows;
+                    }
+                    $done++;
+                } while ($this->conn->more_results() && $this->conn->next_result());
+            }
+            $progress['statements'] += $done;
+            
+            if (!$this->conn->errno) {
+                break;
+            }
+            
+            // Statement $done failed; the rest of the batch was not executed
+            $progress['errorCount']++;
+            if (count($progress['errors']) < self::MAX_RECORDED_ERRORS) {
+                $progress['errors'][] = [
+                    'statement' => $progress['statements'] + $progress['errorCount'],
+                    'sql' => substr($statements[$done], 0, 100),
+                    'error' => $this->conn->error
+                ];
+            }
+            $statements = array_slice($statements, $done + 1);
+        }
+        $this->conn->query("COMMIT");
+    }
+    
+    /**
+     * Table a statement works on, for progress reporting
+     */
+    private function getStatementTable($statement) {
+        $pattern = '/^(?:INSERT(?:\s+IGNORE)?\s+INTO|REPLACE\s+INTO|CREATE\s+TABLE(?:\s+IF\s+NOT\s+EXISTS)?'
+                 . '|DROP\s+TABLE(?:\s+IF\s+EXISTS)?|ALTER\s+TABLE|LOCK\s+TABLES)\s+`?([^`\s(,;]+)`?/i';
+        if (preg_match($pattern, substr($statement, 0, 200), $matches)) {
+            return $matches[1];
+        }
+        return null;
+    }
+    
+    /**
+     * Drop every table and view of the current database
+     */
+    private function dropAllTables() {
+        $this->conn->query("SET FOREIGN_KEY_CHECKS = 0");
+        $result = $this->conn->query("SHOW FULL TABLES");
+        while ($row = $result->fetch_array()) {
+            $keyword = $row[1] === 'VIEW' ? 'VIEW' : 'TABLE';
+            $this->conn->query("DROP $keyword IF EXISTS `" . $row[0] . "`");
+        }
+    }
+    
+    /**
+     * Run a queued job in a background worker, or in this request if that is not possible
+     */
+    private function startJob($jobId) {
+        require_once __DIR__ . '/../utils/WorkerPool.php';
+        require_once __DIR__ . '/../../db_connection.php';
+        $credentials = getDbCredentials();
+        
+        // Release the session lock so polls are not blocked while the job runs here
+        if (session_status() === PHP_SESSION_ACTIVE) {
+            session_write_close();
+        }
+        
+        if (WorkerPool::startDetached(__DIR__ . '/../workers/import_job.php', [$jobId], $credentials)) {
+            echo json_encode([
+                'success' => true,
+                'jobId' => $jobId,
+                'background' => true
+            ]);
+            return;
+        }
+        
+        $job = $this->runImportJob($jobId);
+        $response = [
+            'success' => $job['status'] === 'completed' && $job['errorCount'] === 0,
+            'jobId' => $jobId,
+            'background' => false,
+            'job' => $job
+        ];
+        if ($job['status'] !== 'completed') {
+            $response['error'] = "Import stopped: " . ($job['lastError'] ?? 'unknown error');
+        } elseif ($job['errorCount'] > 0) {
+            $response['error'] = "Import completed with {$job['errorCount']} errors. {$job['statements']} statements executed.";
+        } else {
+            $response['message'] = "Database imported successfully. {$job['statements']} statements executed.";
+        }
+        echo json_encode($response);
+    }
+    
+    private function loadJob($jobId) {
+        $job = json_decode(@file_get_contents(self::getJobPath($jobId, 'json')), true);
+        if (!is_array($job)) {
+            throw new Exception("Import job '$jobId' not found");
+        }
+        return $job;
+    }
+    
+    private function saveJob($job) {
+        $job['updatedAt'] = microtime(true);
+        $file = self::getJobPath($job['id'], 'json');
+        // Write to a temporary file first so pollers never read a partial checkpoint
+        if (@file_put_contents($file . '.tmp', json_encode($job), LOCK_EX) !== false) {
+            @rename($file . '.tmp', $file);
+        }
+    }
+    
+    /**
+     * Remove jobs that have not been updated for JOB_TTL seconds
+     */
+    private function purgeOldJobs($dir) {
+        foreach (glob($dir . '/import_*.json') ?: [] as $file) {
+            $jobId = basename($file, '.json');
+            if (filemtime($file) < time() - self::JOB_TTL && !$this->isJobLocked($jobId)) {
+                $this->deleteJobFiles($jobId);
+            }
+        }
+    }
+    
+    private function deleteJobFiles($jobId) {
+        foreach (['upload', 'json', 'lock'] as $extension) {
+            @unlink(self::getJobPath($jobId, $extension));
+        }
+    }
+    
+    /**
+     * True while a process holds the job lock (i.e. the job is running)
+     */
+    private function isJobLocked($jobId) {
+        $lock = @fopen(self::getJobPath($jobId, 'lock'), 'c');
+        if (!$lock) {
+            return false;
+        }
+        $free = flock($lock, LOCK_EX | LOCK_NB);
+        if ($free) {
+            flock($lock, LOCK_UN);
+        }
+        fclose($lock);
+        return !$free;
+    }
+    
+    /**
+     * Path of an import job file (json = state, upload = SQL file, lock)
+     */
+    private static function getJobPath($jobId, $extension) {
+        if (!preg_match('/^[A-Za-z0-9_-]+$/', $jobId)) {
+            throw new Exception("Invalid import job id");
+        }
+        return __DIR__ . '/../../tmp/imports/' . $jobId . '.' . $extension;
+    }
 }
 ?>
-
@@ -5,12 +5,32 @@
  * Handles SQL query execution
  */
 
+require_once __DIR__ . '/../utils/AppSettings.php';
+require_once __DIR__ . '/../utils/OutputStream.php';
+require_once __DIR__ . '/../utils/JsonStreamWriter.php';
+require_once __DIR__ . '/../utils/QueryPlanAnalyzer.php';
+
 class QueryHandler {
     private $conn;
+    private $csvLine = null;    // Scratch stream for formatting CSV lines
+    
+    // Rows per page for SELECT queries (default and maximum)
+    const QUERY_PAGE_SIZE = 100;
+    const MAX_QUERY_PAGE_SIZE = 1000;
+    
+    // Export formats: format => [file extension, content type]
+    const EXPORT_FORMATS = [
+        'csv' => ['.csv', 'text/csv; charset=utf-8'],
+        'tsv' => ['.tsv', 'text/tab-separated-values; charset=utf-8'],
+        'ndjson' => ['.ndjson', 'application/x-ndjson']
+    ];
     
-    // Maximum rows to return for SELECT queries
-    const MAX_QUERY_RESULTS = 100;
-    const MAX_EXPORT_RESULTS = 5000;
+    // Execution time limits in seconds (MAX_EXECUTION_TIME / max_statement_time)
+    const QUERY_TIMEOUT = 30;
+    const COUNT_TIMEOUT = 120;
+    
+    // Seconds a result session can be paged after it was last used
+    const SESSION_TTL = 3600;
     
     public function __construct($conn) {
         $this->conn = $conn;
@@ -19,35 +39,30 @@ class QueryHandler {
     /**
      * Execute a SQL query
      * Supports SELECT, INSERT, UPDATE, DELETE, and other SQL commands
-     * Results limited to first MAX_QUERY_RESULTS rows for SELECT queries
+     * 
+     * SELECT queries open a result session: the first page is returned with
+     * a sessionId, further pages come from fetchQueryPage and the exact row
+     * count (when wanted) from countQueryResults. Only pageSize + 1 rows are
+     * read per page, so the first screen of a huge result arrives without
+     * the server producing the rest.
      */
-    public function executeQuery($query) {
+    public function executeQuery($query, $pageSize = null) {
         $query = $this->normalizeQuery($query);
         $queryType = strtoupper(substr(ltrim($query), 0, 6));
         
         try {
             if (strpos($queryType, 'SELECT') === 0) {
-                $limitedQuery = $this->enforceRowLimit($query, self::MAX_QUERY_RESULTS);
-                
-                $result = $this->conn->query($limitedQuery);
-                
-                if ($result === false) {
-                    throw new Exception($this->conn->error);
-                }
+                $dbResult = $this->conn->query("SELECT DATABASE()");
+                $session = [
+                    'id' => 'query_' . bin2hex(random_bytes(8)),
+                    'query' => $query,
+                    'database' => $dbResult ? $dbResult->fetch_array()[0] : null,
+                    'pageSize' => max(1, min((int) ($pageSize ?: self::QUERY_PAGE_SIZE), self::MAX_QUERY_PAGE_SIZE)),
+                    'pageable' => true,
+                    'total' => null
+                ];
                 
-                $data = [];
-                while ($row = $result->fetch_assoc()) {
-                    $data[] = $row;
-                }
-                
-                echo json_encode([
-                    'success' => true,
-                    'type' => 'select',
-                    'data' => $data,
-                    'rowCount' => count($data),
-                    'totalRows' => count($data),
-                    'message' => count($data) . ' rows returned'
-                ]);
+                $this->sendPage($session, 0);
             } else {
                 $result = $this->conn->query($query);
                 
@@ -58,6 +73,12 @@ class QueryHandler {
                 $affectedRows = $this->conn->affected_rows;
                 $message = '';
                 
+                // Schema changes make the cached schema metadata stale
+                if (preg_match('/^\s*(CREATE|ALTER|DROP|RENAME)\b/i', $query)) {
+                    require_once __DIR__ . '/../utils/SchemaCache.php';
+                    (new SchemaCache($this->conn))->invalidate();
+                }
+                
                 if (strpos($queryType, 'INSERT') === 0) {
                     $message = "Record inserted successfully. Insert ID: " . $this->conn->insert_id;
                 } else if (strpos($queryType, 'UPDATE') === 0) {
@@ -81,65 +102,426 @@ class QueryHandler {
         }
     }
 
-    public function exportQuery($query) {
+    /**
+     * Show the execution plan of a query, with issues and index suggestions
+     * 
+     * Without $analyze the query is only explained, never run, so any
+     * statement EXPLAIN accepts can be inspected. With $analyze it is run
+     * (EXPLAIN ANALYZE / ANALYZE) for actual rows and times, which is only
+     * allowed for SELECT queries, including a WITH whose main statement is a
+     * SELECT. See QueryPlanAnalyzer.
+     */
+    public function analyzeQuery($query, $analyze = false) {
+        $query = $this->normalizeQuery($query);
+        $statement = strtoupper(preg_match('/^\s*(\w+)/', $query, $matches) ? $matches[1] : '');
+        
+        if (!in_array($statement, ['SELECT', 'WITH', 'UPDATE', 'DELETE', 'INSERT', 'REPLACE'], true)) {
+            throw new Exception("Only SELECT, UPDATE, DELETE, INSERT and REPLACE statements can be explained");
+        }
+        if ($statement === 'WITH') {
+            // WITH ... UPDATE/DELETE would be run as well
+            $statement = $this->statementAfterCtes($query);
+        }
+        if ($analyze && $statement !== 'SELECT') {
+            throw new Exception("Analyze runs the query, so it is only available for SELECT queries");
+        }
+        
+        $this->applyTimeLimit(self::QUERY_TIMEOUT);
+        try {
+            $analyzer = new QueryPlanAnalyzer($this->conn);
+            $result = $analyzer->analyze($query, $analyze);
+        } catch (Exception $e) {
+            $message = in_array($this->conn->errno, [3024, 1969]) ? $this->describeError(self::QUERY_TIMEOUT) : $e->getMessage();
+            throw new Exception("Query analysis failed: " . $message);
+        }
+        
+        echo json_encode(['success' => true, 'analyzed' => $analyze] + $result);
+    }
+
+    /**
+     * Return another page of a result session
+     */
+    public function fetchQueryPage($sessionId, $offset) {
+        $session = $this->loadSession($sessionId);
+        if (!$session['pageable']) {
+            throw new Exception("This query cannot be paged; add a LIMIT to see other rows");
+        }
+        
+        $this->sendPage($session, max(0, (int) $offset));
+    }
+    
+    /**
+     * Count all rows of a result session (run in the background by the UI)
+     */
+    public function countQueryResults($sessionId) {
+        $session = $this->loadSession($sessionId);
+        
+        if ($session['total'] === null) {
+            $this->useSessionDatabase($session);
+            $this->applyTimeLimit(self::COUNT_TIMEOUT);
+            $result = $this->conn->query("SELECT COUNT(*) AS total FROM (" . $session['query'] . ") AS query_count");
+            if ($result === false) {
+                throw new Exception("Count failed: " . $this->describeError(self::COUNT_TIMEOUT));
+            }
+            $session['total'] = (int) $result->fetch_assoc()['total'];
+            $this->saveSession($session);
+        }
+        
+        echo json_encode([
+            'success' => true,
+            'sessionId' => $session['id'],
+            'totalRows' => $session['total']
+        ]);
+    }
+    
+    /**
+     * Stream one page of a result session as the JSON response
+     * 
+     * Queries without their own LIMIT get LIMIT offset, pageSize + 1 appended;
+     * queries with one are wrapped in a derived table so their LIMIT still
+     * applies. The extra row tells whether another page exists. Rows are read
+     * unbuffered and written as they arrive; the values that are only known
+     * afterwards (hasMore, totalRows, message) follow the data array. Updates
+     * the session's total once the last page has been seen. A read error
+     * (time limit, lost connection) ends the rows early and is reported with
+     * JsonStreamWriter::fail(); the session is then left as it was.
+     */
+    private function sendPage(&$session, $offset) {
+        $this->useSessionDatabase($session);
+        $pageSize = $session['pageSize'];
+        $limit = " LIMIT $offset, " . ($pageSize + 1);
+        
+        if (stripos($session['query'], 'LIMIT') === false) {
+            $sql = $session['query'] . $limit;
+        } else {
+            $sql = "SELECT * FROM (" . $session['query'] . ") AS query_page" . $limit;
+        }
+        
+        $this->applyTimeLimit(self::QUERY_TIMEOUT);
+        $result = $this->conn->query($sql, MYSQLI_USE_RESULT);
+        
+        if ($result === false && $this->conn->errno == 1060 && $offset === 0) {
+            // Duplicate column names cannot be wrapped: return the first rows only
+            $session['pageable'] = false;
+            $result = $this->conn->query($this->enforceRowLimit($session['query'], $pageSize + 1), MYSQLI_USE_RESULT);
+        }
+        if ($result === false) {
+            throw new Exception($this->describeError(self::QUERY_TIMEOUT));
+        }
+        
+        $columns = [];
+        foreach ($result->fetch_fields() as $field) {
+            $columns[] = $field->name;
+        }
+        
+        $json = new JsonStreamWriter();
+        $json->beginObject();
+        $json->values([
+            'success' => true,
+            'type' => 'select',
+            'sessionId' => $session['id'],
+            'columns' => $columns
+        ]);
+        $json->beginArray('data');
+        $rowCount = 0;
+        $hasMore = false;
+        $readError = null;
+        try {
+            while ($row = $result->fetch_assoc()) {
+                if ($rowCount === $pageSize) {
+                    $hasMore = true;
+                    continue;
+                }
+                $json->value($row);
+                $rowCount++;
+            }
+        } catch (mysqli_sql_exception $e) {
+            $readError = $e->getMessage();
+        }
+        // Without exceptions a read error ends fetch_assoc() like the end of the result
+        if ($readError !== null || $this->conn->errno) {
+            $error = $this->conn->errno ? $this->describeError(self::QUERY_TIMEOUT) : $readError;
+            $result->free();
+            $json->fail($error);
+            return;
+        }
+        $json->endArray();
+        $result->free();
+        
+        if (!$hasMore && $session['pageable']) {
+            $session['total'] = $offset + $rowCount;
+        }
+        $this->saveSession($session);
+        
+        $last = $offset + $rowCount;
+        $json->values([
+            'rowCount' => $rowCount,
+            'offset' => $offset,
+            'pageSize' => $pageSize,
+            'hasMore' => $hasMore && $session['pageable'],
+            'totalRows' => $session['total'],
+            'message' => $rowCount > 0
+                ? "Rows " . ($offset + 1) . "-$last" . ($session['total'] !== null ? " of {$session['total']}" : '')
+                : 'No rows returned'
+        ]);
+        $json->endObject();
+        $json->close();
+    }
+    
+    /**
+     * Limit the execution time of the following statements on this connection
+     * 
+     * MySQL uses MAX_EXECUTION_TIME (milliseconds, SELECT only), MariaDB
+     * max_statement_time (seconds). Pooled connections are reset between
+     * requests, so the limit does not leak into other requests.
+     */
+    private function applyTimeLimit($seconds) {
+        // Each SET on its own: an unknown variable returns false or throws
+        // (mysqli_sql_exception), depending on the mysqli error mode
+        try {
+            if ($this->conn->query("SET SESSION MAX_EXECUTION_TIME = " . ((int) $seconds * 1000))) {
+                return;
+            }
+        } catch (mysqli_sql_exception $e) {
+            // Not MySQL; try MariaDB's variable
+        }
+        try {
+            $this->conn->query("SET SESSION max_statement_time = " . (int) $seconds);
+        } catch (mysqli_sql_exception $e) {
+            // Server without either variable: run without a limit
+        }
+    }
+    
+    /**
+     * Current error message, made readable when the time limit was hit
+     */
+    private function describeError($seconds) {
+        // 3024: MySQL MAX_EXECUTION_TIME exceeded, 1969: MariaDB max_statement_time exceeded
+        if (in_array($this->conn->errno, [3024, 1969])) {
+            return "Query exceeded the time limit of {$seconds} seconds";
+        }
+        return $this->conn->error;
+    }
+    
+    private function useSessionDatabase($session) {
+        if ($session['database'] !== null && $session['database'] !== '') {
+            if (!$this->conn->select_db($session['database'])) {
+                throw new Exception("Cannot select database '{$session['database']}': " . $this->conn->error);
+            }
+        }
+    }
+    
+    private function loadSession($sessionId) {
+        $session = json_decode(@file_get_contents(self::getSessionPath($sessionId)), true);
+        if (!is_array($session)) {
+            throw new Exception("Query results have expired; run the query again");
+        }
+        return $session;
+    }
+    
+    private function saveSession($session) {
+        $file = self::getSessionPath($session['id']);
+        $dir = dirname($file);
+        if (!is_dir($dir)) {
+            @mkdir($dir, 0777, true);
+        }
+        @file_put_contents($file, json_encode($session), LOCK_EX);
+        
+        // Clean up sessions that have not been used for a while
+        if (mt_rand(1, 50) === 1) {
+            foreach (glob($dir . '/query_*.json') ?: [] as $old) {
+                if (filemtime($old) < time() - self::SESSION_TTL) {
+                    @unlink($old);
+                }
+            }
+        }
+    }
+    
+    /**
+     * Path of a result session file
+     */
+    private static function getSessionPath($sessionId) {
+        if (!preg_match('/^query_[a-f0-9]+$/', $sessionId)) {
+            throw new Exception("Invalid query session id");
+        }
+        return __DIR__ . '/../../tmp/query_sessions/' . $sessionId . '.json';
+    }
+    
+    /**
+     * Export the full result of a SELECT query as a file download
+     * 
+     * Rows are read unbuffered (MYSQLI_USE_RESULT) and written as they
+     * arrive, optionally gzip-compressed, so memory use stays constant
+     * whatever the size of the result. The number of rows is only limited
+     * by the 'export row limit' admin setting (0 = no limit) and by maxRows
+     * when the client asks for fewer. A read error after the download has
+     * started ends the file with an error line and, when compressed,
+     * without the gzip trailer, so it cannot pass for a complete export.
+     * 
+     * @param string $format 'csv', 'tsv' (\N for NULL, backslash escapes) or 'ndjson'
+     * @param string $compression 'none' or 'gzip'
+     */
+    public function exportQuery($query, $format = 'csv', $compression = 'none') {
         $query = $this->normalizeQuery($query);
         
         if (stripos($query, 'SELECT') !== 0) {
             throw new Exception("Only SELECT queries can be exported");
         }
+        if (!isset(self::EXPORT_FORMATS[$format])) {
+            throw new Exception("Unsupported export format: $format");
+        }
         
-        $requestedMaxRows = isset($_POST['maxRows']) ? intval($_POST['maxRows']) : self::MAX_EXPORT_RESULTS;
-        if ($requestedMaxRows <= 0) {
-            $requestedMaxRows = self::MAX_EXPORT_RESULTS;
+        $maxRows = (int) AppSettings::get('Query Builder', 'export row limit', 0);
+        $requestedMaxRows = isset($_POST['maxRows']) ? intval($_POST['maxRows']) : 0;
+        if ($requestedMaxRows > 0 && ($maxRows <= 0 || $requestedMaxRows < $maxRows)) {
+            $maxRows = $requestedMaxRows;
         }
-        $maxRows = min($requestedMaxRows, self::MAX_EXPORT_RESULTS);
         
-        $exportQuery = $this->enforceRowLimit($query, $maxRows);
+        // Validates the compression before anything is sent
+        $stream = new OutputStream($compression);
         
-        $result = $this->conn->query($exportQuery);
+        $exportQuery = $maxRows > 0 ? $this->enforceRowLimit($query, $maxRows) : $query;
+        $result = $this->conn->query($exportQuery, MYSQLI_USE_RESULT);
         
         if ($result === false) {
             throw new Exception($this->conn->error);
         }
         
+        list($extension, $contentType) = self::EXPORT_FORMATS[$format];
+        if ($compression === 'gzip') {
+            $extension .= '.gz';
+            $contentType = 'application/gzip';
+        }
+        
         $filename = $_POST['filename'] ?? ('query-results-' . date('Y-m-d_H-i-s'));
-        if (stripos($filename, '.csv') === false) {
-            $filename .= '.csv';
+        $filename = str_replace(['"', "\r", "\n"], '', $filename);
+        if (substr($filename, -strlen($extension)) !== $extension) {
+            $filename .= $extension;
         }
         
-        header('Content-Type: text/csv; charset=utf-8');
+        set_time_limit(0);
+        header('Content-Type: ' . $contentType);
         header('Content-Disposition: attachment; filename="' . $filename . '"');
         header('Cache-Control: no-store, no-cache, must-revalidate, max-age=0');
         header('Pragma: no-cache');
         header('Expires: 0');
+        OutputStream::disableBuffering();
         
-        $output = fopen('php://output', 'w');
-        if ($output === false) {
-            $result->free();
-            throw new Exception('Failed to prepare export stream');
+        $columns = [];
+        foreach ($result->fetch_fields() as $field) {
+            $columns[] = $field->name;
         }
         
-        fwrite($output, "\xEF\xBB\xBF");
+        if ($format === 'csv') {
+            $stream->write("\xEF\xBB\xBF");
+            $stream->write($this->formatCsvLine($columns));
+        } elseif ($format === 'tsv') {
+            $stream->write(implode("\t", array_map([$this, 'formatTsvValue'], $columns)) . "\n");
+        }
         
-        $fields = $result->fetch_fields();
-        if ($fields) {
-            $headers = [];
-            foreach ($fields as $field) {
-                $headers[] = $field->name;
+        $readError = null;
+        try {
+            while ($row = $result->fetch_row()) {
+                if ($format === 'csv') {
+                    $stream->write($this->formatCsvLine(array_map([$this, 'formatCsvValue'], $row)));
+                } elseif ($format === 'tsv') {
+                    $stream->write(implode("\t", array_map([$this, 'formatTsvValue'], $row)) . "\n");
+                } else {
+                    $stream->write(json_encode(array_combine($columns, $row),
+                        JSON_UNESCAPED_UNICODE | JSON_UNESCAPED_SLASHES | JSON_INVALID_UTF8_SUBSTITUTE) . "\n");
+                }
             }
-            fputcsv($output, $headers);
+        } catch (mysqli_sql_exception $e) {
+            $readError = $e->getMessage();
         }
         
-        while ($row = $result->fetch_assoc()) {
-            $values = [];
-            foreach ($row as $value) {
-                $values[] = $this->formatCsvValue($value);
+        // Without exceptions a read error ends fetch_row() like the end of the result
+        if ($readError !== null || $this->conn->errno) {
+            $error = $this->conn->errno ? $this->conn->error : $readError;
+            $result->free();
+            if (!$stream->hasStarted()) {
+                // Nothing sent yet: answer with a JSON error instead of a download
+                header_remove('Content-Disposition');
+                header('Content-Type: application/json');
+                throw new Exception("Export failed: " . $error);
+            }
+            // The file must not look complete: NDJSON gets an error record,
+            // CSV/TSV a last line, and a compressed file no trailer
+            error_log("exportQuery stopped early: " . $error);
+            if ($format === 'ndjson') {
+                $stream->write(json_encode(['error' => "Export stopped early: $error"]) . "\n");
+            } else {
+                $stream->write("\n# Export stopped early: " . str_replace(["\r", "\n"], ' ', $error) . "\n");
             }
-            fputcsv($output, $values);
+            $stream->abort();
+            return;
         }
-        
-        fclose($output);
         $result->free();
+        $stream->close();
+    }
+    
+    /**
+     * One CSV line (RFC 4180 quoting, as fputcsv)
+     */
+    private function formatCsvLine(array $values) {
+        if ($this->csvLine === null) {
+            $this->csvLine = fopen('php://memory', 'w+');
+        }
+        rewind($this->csvLine);
+        ftruncate($this->csvLine, 0);
+        fputcsv($this->csvLine, $values);
+        rewind($this->csvLine);
+        return stream_get_contents($this->csvLine);
+    }
+    
+    /**
+     * TSV field in the format of LOAD DATA / mysql --batch
+     */
+    private function formatTsvValue($value) {
+        if ($value === null) {
+            return '\\N';
+        }
+        return strtr((string) $value, ["\\" => "\\\\", "\t" => "\\t", "\n" => "\\n", "\r" => "\\r", "\0" => "\\0"]);
+    }
+
+    /**
+     * Keyword of the main statement of a WITH query ('' if it cannot be found)
+     * 
+     * Quoted text, comments and everything in parentheses (the CTE bodies and
+     * column lists) are skipped, so only the statement after the CTE list
+     * can match. MySQL executable comments are not looked into; a query with
+     * one before its main statement gives ''.
+     */
+    private function statementAfterCtes(string $query): string {
+        $length = strlen($query);
+        $depth = 0;
+        for ($i = 0; $i < $length; $i++) {
+            $char = $query[$i];
+            if ($char === "'" || $char === '"' || $char === '`') {
+                // Doubled quotes simply close and reopen the string
+                for ($i++; $i < $length && $query[$i] !== $char; $i++) {
+                    if ($query[$i] === '\\' && $char !== '`') {
+                        $i++;
+                    }
+                }
+            } elseif ($char === '#' || substr($query, $i, 3) === '-- ' || substr($query, $i, 3) === "--\t") {
+                $end = strpos($query, "\n", $i);
+                $i = $end === false ? $length : $end;
+            } elseif (substr($query, $i, 2) === '/*') {
+                if (substr($query, $i, 3) === '/*!') {
+                    return '';
+                }
+                $end = strpos($query, '*/', $i + 2);
+                $i = $end === false ? $length : $end + 1;
+            } elseif ($char === '(') {
+                $depth++;
+            } elseif ($char === ')') {
+                $depth--;
+            } elseif ($depth === 0 && preg_match('/\b(SELECT|TABLE|VALUES|UPDATE|DELETE|INSERT|REPLACE)\b/Ai', $query, $matches, 0, $i)) {
+                return strtoupper($matches[1]);
+            }
+        }
+        return '';
     }
 
     private function normalizeQuery(string $query): string {
@@ -5,7 +5,19 @@
  * Handles CRUD operations on database records
  */
 
+require_once __DIR__ . '/../utils/RecordCounter.php';
+require_once __DIR__ . '/../utils/FilterBuilder.php';
+require_once __DIR__ . '/../utils/JsonStreamWriter.php';
+require_once __DIR__ . '/../utils/BulkWriter.php';
+require_once __DIR__ . '/../utils/GridUsageStats.php';
+
 class RecordHandler {
+    // Rows (or keys) accepted by one bulk request
+    const MAX_BULK_ROWS = 10000;
+    
+    // Rows returned by one getRecords call (the data grid fetches blocks of rows)
+    const MAX_PAGE_ROWS = 1000;
+    
     private $conn;
     
     public function __construct($conn) {
@@ -14,57 +26,64 @@ class RecordHandler {
     
     /**
      * Get records from table with filtering and sorting
+     *
+     * When a cursor is given the page is located by seeking on the sort column
+     * plus the primary key (keyset paging) instead of LIMIT/OFFSET, so deep
+     * pages cost the same as the first one. Tables without a single-column
+     * primary key (and views) always use offset paging.
+     *
+     * $countMode selects how the total is obtained (see RecordCounter):
+     * 'auto' (estimate/cached), 'exact', or 'lazy' to skip counting here and
+     * let the client fetch it separately through getRecordCount.
+     *
+     * $limit is clamped to 1..MAX_PAGE_ROWS.
      */
-    public function getRecords($tableName, $offset, $limit, $sortColumn, $sortOrder, $filters) {
+    public function getRecords($tableName, $offset, $limit, $sortColumn, $sortOrder, $filters, $cursor = '', $direction = 'next', $countMode = 'auto') {
         $tableName = $this->conn->real_escape_string($tableName);
+        $offset = max(0, (int) $offset);
+        $limit = max(1, min((int) $limit, self::MAX_PAGE_ROWS));
         
         // Build WHERE clause for filters
-        $whereConditions = [];
-        $params = [];
-        $types = '';
+        list($whereConditions, $params, $types, $filterStrategies) = $this->buildFilterConditions($tableName, $filters);
         
-        foreach ($filters as $column => $value) {
-            if ($value !== '') {
-                $column = $this->conn->real_escape_string($column);
-                $whereConditions[] = "`$column` LIKE ?";
-                $params[] = "%$value%";
-                $types .= 's';
-            }
+        $whereClause = count($whereConditions) > 0 ? 'WHERE ' . implode(' AND ', $whereConditions) : '';
+        
+        // Keyset paging needs a unique tie-breaker to seek on
+        $primaryKey = $this->getSinglePrimaryKey($tableName);
+        $sortOrder = strtoupper($sortOrder) === 'DESC' ? 'DESC' : 'ASC';
+        if ($sortColumn) {
+            $sortColumn = $this->conn->real_escape_string($sortColumn);
         }
         
-        $whereClause = count($whereConditions) > 0 ? 'WHERE ' . implode(' AND ', $whereConditions) : '';
+        // Count the columns new grid queries filter and sort on, for the index advisor
+        if ($cursor === '' && $offset === 0 && ($sortColumn || !empty($filterStrategies))) {
+            (new GridUsageStats($this->conn))->record($tableName, $filterStrategies, (string) $sortColumn);
+        }
         
         // Build ORDER BY clause
         $orderClause = '';
         if ($sortColumn) {
-            $sortColumn = $this->conn->real_escape_string($sortColumn);
-            $sortOrder = strtoupper($sortOrder) === 'DESC' ? 'DESC' : 'ASC';
             $orderClause = "ORDER BY `$sortColumn` $sortOrder";
         }
         
         // Get total count
-        $countQuery = "SELECT COUNT(*) as total FROM `$tableName` $whereClause";
-        try {
-            if (count($params) > 0) {
-                $stmt = $this->conn->prepare($countQuery);
-                if (!$stmt) {
-                    throw new Exception("Prepare failed for count query: " . $this->conn->error);
-                }
-                $stmt->bind_param($types, ...$params);
-                if (!$stmt->execute()) {
-                    throw new Exception("Execute failed for count query: " . $stmt->error);
-                }
-                $countResult = $stmt->get_result();
-                $total = $countResult->fetch_assoc()['total'];
-            } else {
-                $countResult = $this->conn->query($countQuery);
-                if (!$countResult) {
-                    throw new Exception("Count query failed: " . $this->conn->error);
-                }
-                $total = $countResult->fetch_assoc()['total'];
+        if (!in_array($countMode, RecordCounter::MODES, true)) {
+            $countMode = 'auto';
+        }
+        if ($countMode === 'lazy') {
+            $count = ['total' => null, 'estimated' => false, 'strategy' => 'deferred'];
+        } else {
+            try {
+                $counter = new RecordCounter($this->conn);
+                $count = $counter->count($tableName, $whereClause, $params, $types, $countMode);
+            } catch (Exception $e) {
+                throw new Exception("Error getting record count from '$tableName': " . $e->getMessage());
             }
-        } catch (Exception $e) {
-            throw new Exception("Error getting record count from '$tableName': " . $e->getMessage());
+        }
+        
+        if ($primaryKey !== null) {
+            $this->getRecordsByKeyset($tableName, $primaryKey, $whereConditions, $params, $types, $offset, $limit, $sortColumn, $sortOrder, $cursor, $direction, $count, $filterStrategies);
+            return;
         }
         
         // Get records
@@ -73,34 +92,312 @@ class RecordHandler {
         $params[] = $offset;
         $types .= 'ii';
         
+        // Rows are streamed to the client as they are fetched
+        $json = new JsonStreamWriter();
+        $json->beginObject();
+        $json->value(true, 'success');
+        $json->beginArray('records');
         try {
-            $stmt = $this->conn->prepare($query);
-            if (!$stmt) {
-                throw new Exception("Prepare failed: " . $this->conn->error);
-            }
-            if (count($params) > 0) {
-                $stmt->bind_param($types, ...$params);
-            }
-            if (!$stmt->execute()) {
-                throw new Exception("Execute failed: " . $stmt->error);
-            }
-            $result = $stmt->get_result();
-            
-            $records = [];
-            while ($row = $result->fetch_assoc()) {
-                $records[] = $row;
-            }
+            $this->eachRow($query, $params, $types, function($row) use ($json) {
+                $json->value($row);
+            });
+        } catch (Exception $e) {
+            $json->fail("Error fetching records from '$tableName': " . $e->getMessage());
+            return;
+        }
+        $json->endArray();
+        
+        $json->values([
+            'total' => $count['total'],
+            'totalEstimated' => $count['estimated'],
+            'countStrategy' => $count['strategy'],
+            'offset' => $offset,
+            'limit' => $limit,
+            'paging' => 'offset',
+            'nextCursor' => null,
+            'prevCursor' => null,
+            'filterStrategies' => (object) $filterStrategies
+        ]);
+        $json->endObject();
+        $json->close();
+    }
+    
+    /**
+     * Get the number of records matching the filters
+     *
+     * Used by the data grid in lazy count mode, after the first page is shown.
+     */
+    public function getRecordCount($tableName, $filters, $countMode = 'auto') {
+        $tableName = $this->conn->real_escape_string($tableName);
+        
+        list($whereConditions, $params, $types) = $this->buildFilterConditions($tableName, $filters);
+        $whereClause = count($whereConditions) > 0 ? 'WHERE ' . implode(' AND ', $whereConditions) : '';
+        
+        try {
+            $counter = new RecordCounter($this->conn);
+            $count = $counter->count($tableName, $whereClause, $params, $types, $countMode === 'exact' ? 'exact' : 'auto');
         } catch (Exception $e) {
-            throw new Exception("Error fetching records from '$tableName': " . $e->getMessage());
+            throw new Exception("Error getting record count from '$tableName': " . $e->getMessage());
         }
         
         echo json_encode([
             'success' => true,
-            'records' => $records,
-            'total' => $total,
+            'total' => $count['total'],
+            'totalEstimated' => $count['estimated'],
+            'countStrategy' => $count['strategy']
+        ]);
+    }
+    
+    /**
+     * Build WHERE conditions for the grid filters
+     *
+     * @return array [conditions, params, types, strategies] (see FilterBuilder)
+     */
+    private function buildFilterConditions($tableName, $filters) {
+        $hasFilters = count(array_filter($filters, function($value) {
+            return trim((string) $value) !== '';
+        })) > 0;
+        if (!$hasFilters) {
+            return [[], [], '', []];
+        }
+        
+        $builder = new FilterBuilder($this->conn, $tableName);
+        return $builder->build($filters);
+    }
+    
+    /**
+     * Fetch one page by seeking past the cursor row
+     *
+     * Rows are ordered by (sort column, primary key). Paging backwards runs
+     * the query in reverse order and flips the rows afterwards. One extra row
+     * is fetched to find out whether another page exists in that direction.
+     */
+    private function getRecordsByKeyset($tableName, $primaryKey, $whereConditions, $params, $types, $offset, $limit, $sortColumn, $sortOrder, $cursor, $direction, $count, $filterStrategies) {
+        $position = null;
+        $backwards = false;
+        
+        // Without a cursor (first page or a direct jump) the offset is used as-is
+        if ($cursor !== '') {
+            $position = $this->decodeCursor($cursor, $sortColumn, $sortOrder);
+            $backwards = $direction === 'prev';
+        }
+        
+        // Walk ascending when paging forward through an ASC sort or backward through a DESC sort
+        $ascending = ($sortOrder === 'ASC') !== $backwards;
+        $scanOrder = $ascending ? 'ASC' : 'DESC';
+        
+        if ($position !== null) {
+            $seek = $this->buildSeekCondition($sortColumn, $primaryKey, $position, $ascending);
+            $whereConditions[] = $seek['sql'];
+            $params = array_merge($params, $seek['params']);
+            $types .= $seek['types'];
+        }
+        
+        $whereClause = count($whereConditions) > 0 ? 'WHERE ' . implode(' AND ', $whereConditions) : '';
+        $orderClause = $sortColumn && $sortColumn !== $primaryKey
+            ? "ORDER BY `$sortColumn` $scanOrder, `$primaryKey` $scanOrder"
+            : "ORDER BY `$primaryKey` $scanOrder";
+        
+        $query = "SELECT * FROM `$tableName` $whereClause $orderClause LIMIT ?";
+        $params[] = $limit + 1;
+        $types .= 'i';
+        
+        if ($position === null && $offset > 0) {
+            $query .= " OFFSET ?";
+            $params[] = $offset;
+            $types .= 'i';
+        }
+        
+        $json = new JsonStreamWriter();
+        $json->beginObject();
+        $json->value(true, 'success');
+        $json->beginArray('records');
+        
+        // Forward pages are streamed as they are fetched; the extra row only
+        // tells that there is a next page. Backward pages arrive in reverse
+        // order and are collected (at most $limit + 1 rows) to be flipped.
+        $first = null;
+        $last = null;
+        $emitted = 0;
+        $hasMore = false;
+        $reversed = [];
+        try {
+            $this->eachRow($query, $params, $types, function($row) use ($json, $limit, $backwards, &$first, &$last, &$emitted, &$hasMore, &$reversed) {
+                if ($emitted === $limit) {
+                    $hasMore = true;
+                    return;
+                }
+                $emitted++;
+                if ($backwards) {
+                    $reversed[] = $row;
+                    return;
+                }
+                $json->value($row);
+                if ($first === null) {
+                    $first = $row;
+                }
+                $last = $row;
+            });
+        } catch (Exception $e) {
+            $json->fail("Error fetching records from '$tableName': " . $e->getMessage());
+            return;
+        }
+        if ($backwards && !empty($reversed)) {
+            $records = array_reverse($reversed);
+            foreach ($records as $row) {
+                $json->value($row);
+            }
+            $first = $records[0];
+            $last = $records[count($records) - 1];
+        }
+        $json->endArray();
+        
+        $nextCursor = null;
+        $prevCursor = null;
+        if ($emitted > 0) {
+            if ($backwards) {
+                // We came from a later page, so there is always one after this
+                $nextCursor = $this->encodeCursor($last, $sortColumn, $sortOrder, $primaryKey);
+                $prevCursor = $hasMore ? $this->encodeCursor($first, $sortColumn, $sortOrder, $primaryKey) : null;
+            } else {
+                $nextCursor = $hasMore ? $this->encodeCursor($last, $sortColumn, $sortOrder, $primaryKey) : null;
+                $prevCursor = ($position !== null || $offset > 0) ? $this->encodeCursor($first, $sortColumn, $sortOrder, $primaryKey) : null;
+            }
+        }
+        
+        $json->values([
+            'total' => $count['total'],
+            'totalEstimated' => $count['estimated'],
+            'countStrategy' => $count['strategy'],
             'offset' => $offset,
-            'limit' => $limit
+            'limit' => $limit,
+            'paging' => 'keyset',
+            'nextCursor' => $nextCursor,
+            'prevCursor' => $prevCursor,
+            'filterStrategies' => (object) $filterStrategies
         ]);
+        $json->endObject();
+        $json->close();
+    }
+    
+    /**
+     * Build the WHERE fragment that selects rows after the cursor position
+     *
+     * MySQL sorts NULL before any value in ascending order, so a NULL sort
+     * value needs its own comparison on each side.
+     */
+    private function buildSeekCondition($sortColumn, $primaryKey, $position, $ascending) {
+        $cmp = $ascending ? '>' : '<';
+        
+        if (!$sortColumn || $sortColumn === $primaryKey) {
+            return [
+                'sql' => "`$primaryKey` $cmp ?",
+                'params' => [$position['k']],
+                'types' => 's'
+            ];
+        }
+        
+        if ($position['v'] === null) {
+            $sql = $ascending
+                ? "((`$sortColumn` IS NULL AND `$primaryKey` > ?) OR `$sortColumn` IS NOT NULL)"
+                : "(`$sortColumn` IS NULL AND `$primaryKey` < ?)";
+            return [
+                'sql' => $sql,
+                'params' => [$position['k']],
+                'types' => 's'
+            ];
+        }
+        
+        $sql = $ascending
+            ? "(`$sortColumn` > ? OR (`$sortColumn` = ? AND `$primaryKey` > ?))"
+            : "(`$sortColumn` < ? OR `$sortColumn` IS NULL OR (`$sortColumn` = ? AND `$primaryKey` < ?))";
+        return [
+            'sql' => $sql,
+            'params' => [$position['v'], $position['v'], $position['k']],
+            'types' => 'sss'
+        ];
+    }
+    
+    /**
+     * Encode the position of a row as an opaque cursor string
+     */
+    private function encodeCursor($row, $sortColumn, $sortOrder, $primaryKey) {
+        $payload = [
+            'c' => $sortColumn,
+            'o' => $sortOrder,
+            'v' => $sortColumn ? $row[$sortColumn] : null,
+            'k' => $row[$primaryKey]
+        ];
+        return rtrim(strtr(base64_encode(json_encode($payload)), '+/', '-_'), '=');
+    }
+    
+    /**
+     * Decode a cursor and check it belongs to the current sort
+     */
+    private function decodeCursor($cursor, $sortColumn, $sortOrder) {
+        $json = base64_decode(strtr($cursor, '-_', '+/'), true);
+        $payload = $json !== false ? json_decode($json, true) : null;
+        
+        if (!is_array($payload) || !array_key_exists('k', $payload) || !array_key_exists('v', $payload)) {
+            throw new Exception("Invalid paging cursor");
+        }
+        if (($payload['c'] ?? '') !== (string) $sortColumn || ($payload['o'] ?? '') !== $sortOrder) {
+            throw new Exception("Paging cursor does not match the current sort order");
+        }
+        
+        return $payload;
+    }
+    
+    /**
+     * Get the primary key column if the table has exactly one
+     */
+    private function getSinglePrimaryKey($tableName) {
+        $result = $this->conn->query("SHOW KEYS FROM `$tableName` WHERE Key_name = 'PRIMARY'");
+        if (!$result || $result->num_rows !== 1) {
+            return null;
+        }
+        return $result->fetch_assoc()['Column_name'];
+    }
+    
+    /**
+     * Run a prepared SELECT and pass each row to $callback as it is fetched
+     * 
+     * The result is not stored on the client side (no get_result()), so
+     * rows are read from the server one by one.
+     */
+    private function eachRow($query, $params, $types, callable $callback) {
+        $stmt = $this->conn->prepare($query);
+        if (!$stmt) {
+            throw new Exception("Prepare failed: " . $this->conn->error);
+        }
+        if (count($params) > 0) {
+            $stmt->bind_param($types, ...$params);
+        }
+        if (!$stmt->execute()) {
+            throw new Exception("Execute failed: " . $stmt->error);
+        }
+        
+        $row = [];
+        $refs = [];
+        foreach ($stmt->result_metadata()->fetch_fields() as $field) {
+            $row[$field->name] = null;
+            $refs[] = &$row[$field->name];
+        }
+        $stmt->bind_result(...$refs);
+        
+        while ($stmt->fetch()) {
+            // Copy the values; the bound variables are overwritten by the next fetch
+            $record = [];
+            foreach ($row as $name => $value) {
+                $record[$name] = $value;
+            }
+            $callback($record);
+        }
+        $error = $stmt->errno ? $stmt->error : '';
+        $stmt->close();
+        if ($error !== '') {
+            throw new Exception("Fetch failed: " . $error);
+        }
     }
     
     /**
@@ -157,6 +454,7 @@ class RecordHandler {
         }
         
         if ($stmt->execute()) {
+            (new RecordCounter($this->conn))->invalidate($tableName);
             echo json_encode([
                 'success' => true,
                 'message' => 'Record inserted successfully',
@@ -195,6 +493,7 @@ class RecordHandler {
         $stmt->bind_param($types, ...$params);
         
         if ($stmt->execute()) {
+            (new RecordCounter($this->conn))->invalidate($tableName);
             echo json_encode([
                 'success' => true,
                 'message' => 'Record updated successfully',
@@ -216,6 +515,7 @@ class RecordHandler {
         $stmt->bind_param('s', $primaryValue);
         
         if ($stmt->execute()) {
+            (new RecordCounter($this->conn))->invalidate($tableName);
             echo json_encode([
                 'success' => true,
                 'message' => 'Record deleted successfully',
@@ -225,6 +525,194 @@ class RecordHandler {
             throw new Exception("Delete failed: " . $stmt->error);
         }
     }
+    
+    /**
+     * Insert many records in one transaction
+     * 
+     * Rows with the same columns are sent as multi-row prepared INSERTs (see
+     * BulkWriter). Without $skipErrors a failing row rolls everything back;
+     * with it the other rows are committed. Errors are reported per row index.
+     * 
+     * @param array $rows List of column => value arrays ('' is stored as NULL)
+     */
+    public function bulkInsertRecords($tableName, $rows, $skipErrors = false) {
+        $tableName = $this->conn->real_escape_string($tableName);
+        $this->checkBulkInput($rows);
+        
+        $this->runBulk($tableName, 'inserted', $skipErrors, function($writer) use ($tableName, $rows) {
+            foreach ($this->groupByColumns($rows) as $group) {
+                $columns = $group['columns'];
+                $placeholders = '(' . implode(', ', array_fill(0, count($columns), '?')) . ')';
+                $writer->write($group['rows'], count($columns), function($batch) use ($tableName, $columns, $placeholders) {
+                    $params = [];
+                    foreach ($batch as $row) {
+                        foreach ($columns as $column) {
+                            $params[] = $row[$column] === '' ? null : $row[$column];
+                        }
+                    }
+                    $query = "INSERT INTO `$tableName` (" . $this->columnList($columns) . ") VALUES "
+                        . implode(', ', array_fill(0, count($batch), $placeholders));
+                    return [$query, $params];
+                });
+            }
+        });
+    }
+    
+    /**
+     * Update many records by primary key in one transaction
+     * 
+     * Rows changing the same columns are combined into one UPDATE ... SET
+     * col = CASE key WHEN ? THEN ? ... END WHERE key IN (...) per batch.
+     * 
+     * @param array $rows List of ['key' => primary key value, 'data' => column => value]
+     */
+    public function bulkUpdateRecords($tableName, $primaryKey, $rows, $skipErrors = false) {
+        $tableName = $this->conn->real_escape_string($tableName);
+        $primaryKey = $this->conn->real_escape_string($primaryKey);
+        $this->checkBulkInput($rows);
+        
+        $data = [];
+        foreach ($rows as $index => $row) {
+            if (!isset($row['key']) || !is_array($row['data'] ?? null) || empty($row['data'])) {
+                throw new Exception("Row $index needs a 'key' and non-empty 'data'");
+            }
+            $data[$index] = $row['data'];
+        }
+        
+        $this->runBulk($tableName, 'updated', $skipErrors, function($writer) use ($tableName, $primaryKey, $rows, $data) {
+            foreach ($this->groupByColumns($data) as $group) {
+                $columns = $group['columns'];
+                $writer->write($group['rows'], 2 * count($columns) + 1, function($batch) use ($tableName, $primaryKey, $columns, $rows) {
+                    $params = [];
+                    $setParts = [];
+                    foreach ($columns as $column) {
+                        $setParts[] = "`" . $this->conn->real_escape_string($column) . "` = CASE `$primaryKey`"
+                            . str_repeat(' WHEN ? THEN ?', count($batch)) . ' END';
+                        foreach ($batch as $index => $row) {
+                            $params[] = $rows[$index]['key'];
+                            $params[] = $row[$column] === '' ? null : $row[$column];
+                        }
+                    }
+                    foreach ($batch as $index => $row) {
+                        $params[] = $rows[$index]['key'];
+                    }
+                    $query = "UPDATE `$tableName` SET " . implode(', ', $setParts)
+                        . " WHERE `$primaryKey` IN (" . implode(', ', array_fill(0, count($batch), '?')) . ")";
+                    return [$query, $params];
+                });
+            }
+        });
+    }
+    
+    /**
+     * Delete many records by primary key in one transaction
+     * 
+     * @param array $keys Primary key values
+     */
+    public function bulkDeleteRecords($tableName, $primaryKey, $keys, $skipErrors = false) {
+        $tableName = $this->conn->real_escape_string($tableName);
+        $primaryKey = $this->conn->real_escape_string($primaryKey);
+        $this->checkBulkInput($keys);
+        
+        $this->runBulk($tableName, 'deleted', $skipErrors, function($writer) use ($tableName, $primaryKey, $keys) {
+            $writer->write($keys, 1, function($batch) use ($tableName, $primaryKey) {
+                $query = "DELETE FROM `$tableName` WHERE `$primaryKey` IN ("
+                    . implode(', ', array_fill(0, count($batch), '?')) . ")";
+                return [$query, array_values($batch)];
+            });
+        });
+    }
+    
+    /**
+     * Load an uploaded CSV or TSV file into a table (see DataFileLoader)
+     * 
+     * @param array $options 'format', 'header', 'duplicates'
+     */
+    public function loadRecordsFile($tableName, $options) {
+        if (!isset($_FILES['file']) || $_FILES['file']['error'] !== UPLOAD_ERR_OK) {
+            throw new Exception("No file uploaded or upload error");
+        }
+        
+        require_once __DIR__ . '/../utils/DataFileLoader.php';
+        $result = (new DataFileLoader($this->conn))->load($_FILES['file']['tmp_name'], $tableName, $options);
+        if ($result['rows'] > 0 && $result['committed']) {
+            (new RecordCounter($this->conn))->invalidate($tableName);
+        }
+        
+        $response = array_merge(['success' => $result['committed']], $result);
+        if ($result['committed']) {
+            $response['message'] = "{$result['rows']} rows loaded from {$_FILES['file']['name']}"
+                . ($result['errorCount'] > 0 ? " ({$result['errorCount']} rows with warnings or errors)" : '');
+        } else {
+            $response['error'] = "Load rolled back: {$result['errorCount']} rows had errors";
+        }
+        echo json_encode($response);
+    }
+    
+    /**
+     * Run a bulk operation in one transaction and send its outcome
+     * 
+     * @param callable $write function(BulkWriter $writer) issuing the statements
+     */
+    private function runBulk($tableName, $verb, $skipErrors, callable $write) {
+        $writer = new BulkWriter($this->conn);
+        $writer->begin();
+        try {
+            $write($writer);
+        } catch (Exception $e) {
+            $writer->rollback();
+            throw new Exception("Bulk operation failed, nothing was $verb: " . $e->getMessage());
+        }
+        
+        $result = $writer->getErrorCount() === 0 || $skipErrors ? $writer->commit() : $writer->rollback();
+        if ($result['committed'] && $result['affectedRows'] > 0) {
+            (new RecordCounter($this->conn))->invalidate($tableName);
+        }
+        
+        $response = array_merge(['success' => $result['committed']], $result);
+        if ($result['committed']) {
+            $response['message'] = "{$result['affectedRows']} records $verb"
+                . ($result['errorCount'] > 0 ? ", {$result['errorCount']} rows skipped" : '');
+        } else {
+            $response['error'] = "Rolled back, nothing was $verb: {$result['errorCount']} rows failed";
+        }
+        echo json_encode($response);
+    }
+    
+    private function checkBulkInput($rows) {
+        if (!is_array($rows) || empty($rows)) {
+            throw new Exception("No rows given");
+        }
+        if (count($rows) > self::MAX_BULK_ROWS) {
+            throw new Exception("At most " . self::MAX_BULK_ROWS . " rows can be sent at once");
+        }
+    }
+    
+    /**
+     * Split rows by their set of columns, keeping their indexes
+     * 
+     * @return array List of ['columns' => string[], 'rows' => index => row]
+     */
+    private function groupByColumns($rows) {
+        $groups = [];
+        foreach ($rows as $index => $row) {
+            if (!is_array($row) || empty($row)) {
+                throw new Exception("Row $index has no columns");
+            }
+            $columns = array_keys($row);
+            sort($columns);
+            $signature = json_encode($columns);
+            $groups[$signature]['columns'] = $columns;
+            $groups[$signature]['rows'][$index] = $row;
+        }
+        return array_values($groups);
+    }
+    
+    private function columnList($columns) {
+        return implode(', ', array_map(function($column) {
+            return "`" . $this->conn->real_escape_string($column) . "`";
+        }, $columns));
+    }
 }
 ?>
 
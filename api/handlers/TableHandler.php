@@ -5,6 +5,8 @@
  * Handles table-related operations
  */
 
+require_once __DIR__ . '/../utils/SchemaCache.php';
+
 class TableHandler
 {
     private $conn;
@@ -124,38 +126,15 @@ class TableHandler
         $primaryKey = null;
 
         while ($row = $result->fetch_assoc()) {
-            $columnInfo = [
-                'name' => $row['Field'],
-                'type' => $row['Type'],
-                'null' => $row['Null'] === 'YES',
-                'key' => $row['Key'],
-                'default' => $row['Default'],
-                'extra' => $row['Extra']
-            ];
-
-            // Parse type to get base type and length
-            preg_match('/^(\w+)(\(([^)]+)\))?/', $row['Type'], $matches);
-            $columnInfo['baseType'] = strtolower($matches[1]);
-            $columnInfo['length'] = $matches[3] ?? null;
-
-            // Extract enum/set values
-            if (in_array($columnInfo['baseType'], ['enum', 'set'])) {
-                preg_match_all("/'([^']+)'/", $row['Type'], $enumMatches);
-                $columnInfo['enumValues'] = $enumMatches[1];
-            }
-
-            // Add foreign key information if exists
-            if (isset($foreignKeys[$row['Field']])) {
-                // Use the first foreign key if multiple exist
-                $fk = $foreignKeys[$row['Field']][0];
-                $columnInfo['foreignKey'] = [
-                    'referenced_table' => $fk['referenced_table'],
-                    'referenced_column' => $fk['referenced_column'],
-                    'update_rule' => $fk['update_rule'],
-                    'delete_rule' => $fk['delete_rule'],
-                    'constraint_name' => $fk['constraint_name']
-                ];
-            }
+            // Use the first foreign key if multiple exist
+            $fk = $foreignKeys[$row['Field']][0] ?? null;
+            $columnInfo = SchemaCache::buildColumnInfo($row, $fk === null ? null : [
+                'referenced_table' => $fk['referenced_table'],
+                'referenced_column' => $fk['referenced_column'],
+                'update_rule' => $fk['update_rule'],
+                'delete_rule' => $fk['delete_rule'],
+                'constraint_name' => $fk['constraint_name']
+            ]);
 
             $columns[] = $columnInfo;
 
@@ -173,6 +152,32 @@ class TableHandler
         ]);
     }
 
+    /**
+     * Get columns, indexes and foreign keys of all tables in the current database
+     * 
+     * Served from SchemaCache with an ETag; a matching If-None-Match gets an
+     * empty 304 response so the browser reuses its cached copy.
+     */
+    public function getSchema($ifNoneMatch = '')
+    {
+        $cache = new SchemaCache($this->conn);
+        $cached = $cache->get();
+
+        header('ETag: ' . $cached['etag']);
+        header('Cache-Control: private, no-cache');
+
+        $etags = array_map('trim', explode(',', $ifNoneMatch));
+        if (in_array($cached['etag'], $etags, true) || in_array('W/' . $cached['etag'], $etags, true)) {
+            http_response_code(304);
+            return;
+        }
+
+        echo json_encode([
+            'success' => true,
+            'tables' => $cached['schema']
+        ]);
+    }
+
     /**
      * Get maximum used length for a VARCHAR column
      */
@@ -254,6 +259,7 @@ class TableHandler
         $sql = "CREATE TABLE `$name` (" . implode(', ', $columnDefinitions) . ") ENGINE=$engine";
 
         if ($this->conn->query($sql)) {
+            (new SchemaCache($this->conn))->invalidate($database);
             echo json_encode([
                 'success' => true,
                 'message' => "Table '$name' created successfully in database '$database'"
@@ -278,6 +284,7 @@ class TableHandler
         $sql = "DROP TABLE `$name`";
 
         if ($this->conn->query($sql)) {
+            (new SchemaCache($this->conn))->invalidate($database);
             echo json_encode([
                 'success' => true,
                 'message' => "Table '$name' deleted successfully from database '$database'"
@@ -323,6 +330,7 @@ class TableHandler
         $sql = "RENAME TABLE `$oldName` TO `$newName`";
 
         if ($this->conn->query($sql)) {
+            (new SchemaCache($this->conn))->invalidate($database);
             echo json_encode([
                 'success' => true,
                 'message' => "Table '$oldName' was renamed to '$newName' in database '$database'"
@@ -417,6 +425,7 @@ class TableHandler
                 ON UPDATE $onUpdate";
 
         if ($this->conn->query($sql)) {
+            (new SchemaCache($this->conn))->invalidate($database);
             echo json_encode([
                 'success' => true,
                 'message' => "Foreign key '$constraintName' added successfully"
@@ -444,6 +453,7 @@ class TableHandler
         $sql = "ALTER TABLE `$table` DROP FOREIGN KEY `$constraintName`";
 
         if ($this->conn->query($sql)) {
+            (new SchemaCache($this->conn))->invalidate($database);
             echo json_encode([
                 'success' => true,
                 'message' => "Foreign key '$constraintName' dropped successfully"
@@ -8,17 +8,33 @@
  * extracted into handler classes for better maintainability.
  */
 
+require_once __DIR__ . '/utils/RequestTimer.php';
+RequestTimer::start();
+
 // IP Authorization Check
 require_once '../login/auth_check.php';
+RequestTimer::mark('auth');
 
 header('Content-Type: application/json');
 require_once '../db_connection.php';
+require_once __DIR__ . '/utils/SqlProfiler.php';
 
 // Get the action from request
 $action = $_GET['action'] ?? $_POST['action'] ?? '';
+SqlProfiler::start($action);
+
+// The response is buffered so the Server-Timing header can still include the
+// handler's SQL statements; streaming responses flush it themselves (OutputStream)
+$outputLevel = ob_get_level();
+ob_start();
+
+// Actions that use the session; every other request releases the session lock
+// once setup is done, so parallel requests from the same tab do not queue
+$sessionActions = ['deleteDatabase', 'setCurrentDatabase', 'getCurrentDatabase', 'setCurrentTable', 'getCurrentTable'];
 
 try {
     $conn = getDbConnection();
+    RequestTimer::mark('connect');
 
     // Determine which database to use
     $database = $_GET['database'] ?? $_POST['database'] ?? DB_NAME;
@@ -51,6 +67,12 @@ try {
         selectDatabase($conn, $database);
     }
 
+    if (!in_array($action, $sessionActions, true) && session_status() === PHP_SESSION_ACTIVE) {
+        session_write_close();
+    }
+    RequestTimer::mark('db');
+    RequestTimer::add('setup', RequestTimer::elapsed());
+
     // Route requests to appropriate handlers (lazy loading)
     switch ($action) {
         // Table Operations
@@ -67,6 +89,12 @@ try {
             $handler->getTableInfo($tableName);
             break;
 
+        case 'getSchema':
+            require_once __DIR__ . '/handlers/TableHandler.php';
+            $handler = new TableHandler($conn);
+            $handler->getSchema($_SERVER['HTTP_IF_NONE_MATCH'] ?? '');
+            break;
+
         case 'getColumnMaxLength':
             require_once __DIR__ . '/handlers/TableHandler.php';
             $handler = new TableHandler($conn);
@@ -148,7 +176,19 @@ try {
             $sortColumn = $_GET['sortColumn'] ?? '';
             $sortOrder = $_GET['sortOrder'] ?? 'ASC';
             $filters = json_decode($_GET['filters'] ?? '{}', true) ?: [];
-            $handler->getRecords($tableName, $offset, $limit, $sortColumn, $sortOrder, $filters);
+            $cursor = $_GET['cursor'] ?? '';
+            $direction = $_GET['direction'] ?? 'next';
+            $countMode = $_GET['countMode'] ?? 'auto';
+            $handler->getRecords($tableName, $offset, $limit, $sortColumn, $sortOrder, $filters, $cursor, $direction, $countMode);
+            break;
+
+        case 'getRecordCount':
+            require_once __DIR__ . '/handlers/RecordHandler.php';
+            $handler = new RecordHandler($conn);
+            $tableName = $_GET['table'] ?? '';
+            $filters = json_decode($_GET['filters'] ?? '{}', true) ?: [];
+            $countMode = $_GET['countMode'] ?? 'auto';
+            $handler->getRecordCount($tableName, $filters, $countMode);
             break;
 
         case 'getRecord':
@@ -187,13 +227,54 @@ try {
             $handler->deleteRecord($tableName, $primaryKey, $primaryValue);
             break;
 
+        case 'bulkInsertRecords':
+            require_once __DIR__ . '/handlers/RecordHandler.php';
+            $handler = new RecordHandler($conn);
+            $tableName = $_POST['table'] ?? '';
+            $rows = json_decode($_POST['rows'] ?? '[]', true);
+            $skipErrors = filter_var($_POST['skipErrors'] ?? false, FILTER_VALIDATE_BOOLEAN);
+            $handler->bulkInsertRecords($tableName, $rows, $skipErrors);
+            break;
+
+        case 'bulkUpdateRecords':
+            require_once __DIR__ . '/handlers/RecordHandler.php';
+            $handler = new RecordHandler($conn);
+            $tableName = $_POST['table'] ?? '';
+            $primaryKey = $_POST['primaryKey'] ?? '';
+            $rows = json_decode($_POST['rows'] ?? '[]', true);
+            $skipErrors = filter_var($_POST['skipErrors'] ?? false, FILTER_VALIDATE_BOOLEAN);
+            $handler->bulkUpdateRecords($tableName, $primaryKey, $rows, $skipErrors);
+            break;
+
+        case 'bulkDeleteRecords':
+            require_once __DIR__ . '/handlers/RecordHandler.php';
+            $handler = new RecordHandler($conn);
+            $tableName = $_POST['table'] ?? '';
+            $primaryKey = $_POST['primaryKey'] ?? '';
+            $keys = json_decode($_POST['keys'] ?? '[]', true);
+            $skipErrors = filter_var($_POST['skipErrors'] ?? false, FILTER_VALIDATE_BOOLEAN);
+            $handler->bulkDeleteRecords($tableName, $primaryKey, $keys, $skipErrors);
+            break;
+
+        case 'loadRecordsFile':
+            require_once __DIR__ . '/handlers/RecordHandler.php';
+            $handler = new RecordHandler($conn);
+            $tableName = $_POST['table'] ?? '';
+            $handler->loadRecordsFile($tableName, [
+                'format' => $_POST['format'] ?? 'csv',
+                'header' => filter_var($_POST['header'] ?? true, FILTER_VALIDATE_BOOLEAN),
+                'duplicates' => $_POST['duplicates'] ?? 'error'
+            ]);
+            break;
+
         // Column Operations
         case 'addColumn':
             require_once __DIR__ . '/handlers/ColumnHandler.php';
             $handler = new ColumnHandler($conn);
             $tableName = $_POST['table'] ?? '';
             $data = json_decode($_POST['data'] ?? '{}', true) ?: [];
-            $handler->addColumn($tableName, $data);
+            $online = filter_var($_POST['online'] ?? false, FILTER_VALIDATE_BOOLEAN);
+            $handler->addColumn($tableName, $data, $online);
             break;
 
         case 'updateColumn':
@@ -202,7 +283,8 @@ try {
             $tableName = $_POST['table'] ?? '';
             $oldName = $_POST['oldName'] ?? '';
             $data = json_decode($_POST['data'] ?? '{}', true) ?: [];
-            $handler->updateColumn($tableName, $oldName, $data);
+            $online = filter_var($_POST['online'] ?? false, FILTER_VALIDATE_BOOLEAN);
+            $handler->updateColumn($tableName, $oldName, $data, $online);
             break;
 
         case 'deleteColumn':
@@ -210,7 +292,32 @@ try {
             $handler = new ColumnHandler($conn);
             $tableName = $_POST['table'] ?? '';
             $columnName = $_POST['columnName'] ?? '';
-            $handler->deleteColumn($tableName, $columnName);
+            $online = filter_var($_POST['online'] ?? false, FILTER_VALIDATE_BOOLEAN);
+            $handler->deleteColumn($tableName, $columnName, $online);
+            break;
+
+        case 'estimateColumnChange':
+            require_once __DIR__ . '/handlers/ColumnHandler.php';
+            $handler = new ColumnHandler($conn);
+            $tableName = $_POST['table'] ?? '';
+            $operation = $_POST['operation'] ?? '';
+            $columnName = $_POST['columnName'] ?? '';
+            $data = json_decode($_POST['data'] ?? '{}', true) ?: [];
+            $handler->estimateColumnChange($tableName, $operation, $columnName, $data);
+            break;
+
+        case 'getSchemaChangeJob':
+            require_once __DIR__ . '/handlers/ColumnHandler.php';
+            $handler = new ColumnHandler($conn);
+            $jobId = $_GET['jobId'] ?? '';
+            $handler->getSchemaChangeJob($jobId);
+            break;
+
+        case 'cancelSchemaChangeJob':
+            require_once __DIR__ . '/handlers/ColumnHandler.php';
+            $handler = new ColumnHandler($conn);
+            $jobId = $_POST['jobId'] ?? '';
+            $handler->cancelSchemaChangeJob($jobId);
             break;
 
         // Query Execution
@@ -218,21 +325,50 @@ try {
             require_once __DIR__ . '/handlers/QueryHandler.php';
             $handler = new QueryHandler($conn);
             $query = $_POST['query'] ?? '';
-            $handler->executeQuery($query);
+            $pageSize = isset($_POST['pageSize']) ? (int) $_POST['pageSize'] : null;
+            $handler->executeQuery($query, $pageSize);
+            break;
+
+        case 'analyzeQuery':
+            require_once __DIR__ . '/handlers/QueryHandler.php';
+            $handler = new QueryHandler($conn);
+            $query = $_POST['query'] ?? '';
+            $analyze = filter_var($_POST['analyze'] ?? false, FILTER_VALIDATE_BOOLEAN);
+            $handler->analyzeQuery($query, $analyze);
+            break;
+
+        case 'fetchQueryPage':
+            require_once __DIR__ . '/handlers/QueryHandler.php';
+            $handler = new QueryHandler($conn);
+            $sessionId = $_POST['sessionId'] ?? '';
+            $offset = (int) ($_POST['offset'] ?? 0);
+            $handler->fetchQueryPage($sessionId, $offset);
+            break;
+
+        case 'countQueryResults':
+            require_once __DIR__ . '/handlers/QueryHandler.php';
+            $handler = new QueryHandler($conn);
+            $sessionId = $_POST['sessionId'] ?? '';
+            $handler->countQueryResults($sessionId);
             break;
 
         case 'exportQuery':
             require_once __DIR__ . '/handlers/QueryHandler.php';
             $handler = new QueryHandler($conn);
             $query = $_POST['query'] ?? '';
-            $handler->exportQuery($query);
+            $format = $_POST['format'] ?? 'csv';
+            $compression = $_POST['compression'] ?? 'none';
+            $handler->exportQuery($query, $format, $compression);
             break;
 
         // Database Management Operations
         case 'getDatabases':
             require_once __DIR__ . '/handlers/DatabaseHandler.php';
             $handler = new DatabaseHandler($conn);
-            $handler->getDatabases();
+            $includeSizes = ($_GET['sizes'] ?? 'true') !== 'false';
+            $refresh = ($_GET['refresh'] ?? 'false') === 'true';
+            $only = isset($_GET['databases']) ? json_decode($_GET['databases'], true) : null;
+            $handler->getDatabases($includeSizes, $refresh, is_array($only) ? $only : null);
             break;
 
         case 'createDatabase':
@@ -298,6 +434,13 @@ try {
             $handler->exportDatabase($name);
             break;
 
+        case 'exportDatabaseParallel':
+            require_once __DIR__ . '/handlers/ExportHandler.php';
+            $handler = new ExportHandler($conn);
+            $name = $_POST['name'] ?? '';
+            $handler->exportDatabaseParallel($name);
+            break;
+
         // Import Operations
         case 'importDatabase':
             require_once __DIR__ . '/handlers/ImportHandler.php';
@@ -305,6 +448,33 @@ try {
             $handler->importDatabase();
             break;
 
+        case 'importDatabaseParallel':
+            require_once __DIR__ . '/handlers/ImportHandler.php';
+            $handler = new ImportHandler($conn);
+            $handler->importDatabaseParallel();
+            break;
+
+        case 'getImportJob':
+            require_once __DIR__ . '/handlers/ImportHandler.php';
+            $handler = new ImportHandler($conn);
+            $jobId = $_GET['jobId'] ?? '';
+            $handler->getImportJob($jobId);
+            break;
+
+        case 'resumeImportJob':
+            require_once __DIR__ . '/handlers/ImportHandler.php';
+            $handler = new ImportHandler($conn);
+            $jobId = $_POST['jobId'] ?? '';
+            $handler->resumeImportJob($jobId);
+            break;
+
+        case 'discardImportJob':
+            require_once __DIR__ . '/handlers/ImportHandler.php';
+            $handler = new ImportHandler($conn);
+            $jobId = $_POST['jobId'] ?? '';
+            $handler->discardImportJob($jobId);
+            break;
+
         // View Operations
         case 'getViewSource':
             require_once __DIR__ . '/handlers/ViewHandler.php';
@@ -320,10 +490,21 @@ try {
     closeDbConnection($conn);
 
 } catch (Exception $e) {
-    http_response_code(500);
-    echo json_encode([
-        'success' => false,
-        'error' => $e->getMessage()
-    ]);
+    if (headers_sent()) {
+        // A streamed response is partly sent; an appended error object would
+        // only corrupt it (JSON streams report errors with streamError)
+        error_log("API action '$action' failed after output started: " . $e->getMessage());
+    } else {
+        http_response_code(500);
+        echo json_encode([
+            'success' => false,
+            'error' => $e->getMessage()
+        ]);
+    }
+}
+
+RequestTimer::sendHeader(['total' => RequestTimer::elapsed()]);
+while (ob_get_level() > $outputLevel) {
+    ob_end_flush();
 }
 ?>
\ No newline at end of file
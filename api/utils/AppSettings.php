@@ -0,0 +1,27 @@
+<?php
+/**
+ * Application Settings Utility
+ *
+ * Read access to the settings edited on the settings page
+ * (settings/settings.json), for use by the API handlers.
+ */
+
+class AppSettings {
+    private static $settings = null;
+
+    /**
+     * Value of a setting, or $default when it is not set
+     *
+     * @param string $section Settings section, e.g. 'Query Builder'
+     * @param string $key Setting name within the section
+     */
+    public static function get($section, $key, $default = null) {
+        if (self::$settings === null) {
+            $settingsFile = __DIR__ . '/../../settings/settings.json';
+            $decoded = is_file($settingsFile) ? json_decode(@file_get_contents($settingsFile), true) : null;
+            self::$settings = is_array($decoded) ? $decoded : [];
+        }
+        return self::$settings[$section][$key] ?? $default;
+    }
+}
+?>
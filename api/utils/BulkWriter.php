@@ -0,0 +1,153 @@
+<?php
+/**
+ * Bulk Writer Utility
+ *
+ * Runs many rows through multi-row prepared statements inside one
+ * transaction, with an error per failing row:
+ *
+ *   $writer = new BulkWriter($conn);
+ *   $writer->begin();
+ *   $writer->write($rows, count($columns), function($batch) { return [$sql, $params]; });
+ *   $result = $writer->getErrorCount() === 0 ? $writer->commit() : $writer->rollback();
+ *
+ * Rows are sent in batches of BATCH_ROWS (fewer when a batch would exceed
+ * the 65535 placeholders of a prepared statement); statements of the same
+ * shape are prepared once. When a batch fails, InnoDB has undone just that
+ * statement and its rows are retried one by one to find the failing ones.
+ * Errors that abort the whole transaction (deadlock, lock wait timeout,
+ * lost connection) are thrown.
+ */
+
+class BulkWriter {
+    // Rows per multi-row statement
+    const BATCH_ROWS = 500;
+
+    // Placeholders allowed in one prepared statement
+    const MAX_PLACEHOLDERS = 65535;
+
+    // Row errors kept in detail (all are counted)
+    const MAX_REPORTED_ERRORS = 100;
+
+    // Errors after which the transaction cannot go on
+    const FATAL_ERRORS = [1205, 1213, 2006, 2013];
+
+    private $conn;
+    private $statements = [];
+    private $affectedRows = 0;
+    private $errors = [];
+    private $errorCount = 0;
+
+    public function __construct($conn) {
+        $this->conn = $conn;
+    }
+
+    /**
+     * Start the transaction the statements run in
+     */
+    public function begin() {
+        $this->conn->begin_transaction();
+    }
+
+    /**
+     * Run one statement per batch of rows
+     *
+     * @param array $rows Rows keyed by the identifier reported with their errors
+     * @param int $paramsPerRow Placeholders each row adds to a statement
+     * @param callable $build function(array $batch): [string $query, array $params],
+     *                        called with a slice of $rows (keys preserved)
+     */
+    public function write(array $rows, $paramsPerRow, callable $build) {
+        $batchRows = max(1, min(self::BATCH_ROWS, intdiv(self::MAX_PLACEHOLDERS, max(1, $paramsPerRow))));
+
+        foreach (array_chunk($rows, $batchRows, true) as $batch) {
+            try {
+                $this->execute(...$build($batch));
+                continue;
+            } catch (Exception $e) {
+                if (in_array($e->getCode(), self::FATAL_ERRORS, true)) {
+                    throw $e;
+                }
+                if (count($batch) === 1) {
+                    $this->addError(array_key_first($batch), $e->getMessage());
+                    continue;
+                }
+            }
+
+            foreach ($batch as $key => $row) {
+                try {
+                    $this->execute(...$build([$key => $row]));
+                } catch (Exception $e) {
+                    if (in_array($e->getCode(), self::FATAL_ERRORS, true)) {
+                        throw $e;
+                    }
+                    $this->addError($key, $e->getMessage());
+                }
+            }
+        }
+    }
+
+    public function getErrorCount() {
+        return $this->errorCount;
+    }
+
+    /**
+     * Commit the rows that were written
+     *
+     * @return array ['committed' => true, 'affectedRows', 'errorCount', 'errors']
+     */
+    public function commit() {
+        $this->conn->commit();
+        return $this->finish(true);
+    }
+
+    /**
+     * Undo everything written since begin()
+     *
+     * @return array Same as commit(), with 'committed' => false and 'affectedRows' => 0
+     */
+    public function rollback() {
+        $this->conn->rollback();
+        return $this->finish(false);
+    }
+
+    private function execute($query, array $params) {
+        if (!isset($this->statements[$query])) {
+            $stmt = $this->conn->prepare($query);
+            if (!$stmt) {
+                throw new Exception($this->conn->error, $this->conn->errno);
+            }
+            $this->statements[$query] = $stmt;
+        }
+
+        $stmt = $this->statements[$query];
+        if (!empty($params)) {
+            $stmt->bind_param(str_repeat('s', count($params)), ...$params);
+        }
+        if (!$stmt->execute()) {
+            throw new Exception($stmt->error, $stmt->errno);
+        }
+        $this->affectedRows += max(0, $stmt->affected_rows);
+    }
+
+    private function addError($key, $message) {
+        $this->errorCount++;
+        if (count($this->errors) < self::MAX_REPORTED_ERRORS) {
+            $this->errors[] = ['row' => $key, 'error' => $message];
+        }
+    }
+
+    private function finish($committed) {
+        foreach ($this->statements as $stmt) {
+            $stmt->close();
+        }
+        $this->statements = [];
+
+        return [
+            'committed' => $committed,
+            'affectedRows' => $committed ? $this->affectedRows : 0,
+            'errorCount' => $this->errorCount,
+            'errors' => $this->errors
+        ];
+    }
+}
+?>
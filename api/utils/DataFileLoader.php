@@ -0,0 +1,330 @@
+<?php
+/**
+ * Data File Loader Utility
+ *
+ * Loads a CSV or TSV file into a table in one transaction:
+ *
+ * - CSV: RFC 4180 quoting (as written by exportQuery); empty fields are
+ *   loaded as NULL, like empty fields in the record form
+ * - TSV: the LOAD DATA / mysql --batch format, with backslash escapes and
+ *   \N for NULL (as written by exportQuery)
+ *
+ * The file is sent with LOAD DATA LOCAL INFILE over a connection of its own,
+ * because the client has to allow LOCAL INFILE before connecting. Where the
+ * server (local_infile=OFF) or PHP does not allow it, the file is parsed
+ * here and inserted in multi-row batches through BulkWriter.
+ *
+ * Duplicate keys: 'error' rejects the whole file when any row fails or
+ * raises a warning, 'ignore' skips such rows, 'replace' overwrites the
+ * existing rows. Row numbers in the reported errors are data rows, counted
+ * from 1 (the header line is not counted).
+ */
+
+require_once __DIR__ . '/BulkWriter.php';
+
+class DataFileLoader {
+    const FORMATS = ['csv', 'tsv'];
+    const DUPLICATE_MODES = ['error', 'ignore', 'replace'];
+
+    // Errors meaning LOAD DATA LOCAL is not allowed here; the file is inserted instead
+    // (mysqlnd reports its own refusal as 2000)
+    const LOCAL_INFILE_DISABLED = [1148, 2000, 2068, 3948, 3950];
+
+    // Bytes read to detect the line terminator
+    const SNIFF_BYTES = 65536;
+
+    private $conn;
+
+    public function __construct($conn) {
+        $this->conn = $conn;
+    }
+
+    /**
+     * Load a file into a table
+     *
+     * @param string $path File to load
+     * @param string $table Target table
+     * @param array $options 'format' => csv|tsv, 'header' => bool (first line
+     *                       names the columns; otherwise all table columns in order),
+     *                       'duplicates' => error|ignore|replace
+     * @return array ['committed', 'rows', 'method' => 'LOAD DATA'|'INSERT', 'errorCount', 'errors']
+     */
+    public function load($path, $table, $options) {
+        $format = $options['format'] ?? 'csv';
+        $duplicates = $options['duplicates'] ?? 'error';
+        if (!in_array($format, self::FORMATS, true)) {
+            throw new Exception("Unsupported file format '$format'");
+        }
+        if (!in_array($duplicates, self::DUPLICATE_MODES, true)) {
+            throw new Exception("Unsupported duplicate handling '$duplicates'");
+        }
+
+        $tableColumns = $this->getTableColumns($table);
+        $header = !empty($options['header']);
+        $columns = $header ? $this->readHeader($path, $format) : $tableColumns;
+        $unknown = array_diff($columns, $tableColumns);
+        if (!empty($unknown)) {
+            throw new Exception("Unknown columns in file: " . implode(', ', $unknown));
+        }
+
+        $result = $this->loadData($path, $table, $format, $header, $columns, $duplicates);
+        if ($result === null) {
+            $result = $this->insertRows($path, $table, $format, $header, $columns, $duplicates);
+        }
+        return $result;
+    }
+
+    /**
+     * LOAD DATA LOCAL INFILE; null when LOCAL INFILE is not available
+     */
+    private function loadData($path, $table, $format, $header, $columns, $duplicates) {
+        $loader = $this->openLocalInfileConnection($path);
+        if ($loader === null) {
+            return null;
+        }
+
+        $quotedTable = '`' . str_replace('`', '``', $table) . '`';
+        $quoted = array_map(function($column) {
+            return '`' . str_replace('`', '``', $column) . '`';
+        }, $columns);
+
+        if ($format === 'csv') {
+            // Read into variables so empty fields become NULL
+            $variables = [];
+            $assignments = [];
+            foreach ($quoted as $i => $column) {
+                $variables[] = "@c$i";
+                $assignments[] = "$column = NULLIF(@c$i, '')";
+            }
+            $fields = "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY ''";
+            $columnClause = '(' . implode(', ', $variables) . ') SET ' . implode(', ', $assignments);
+        } else {
+            $fields = "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'";
+            $columnClause = '(' . implode(', ', $quoted) . ')';
+        }
+        $lines = $this->detectLineTerminator($path) === "\r\n" ? "'\\r\\n'" : "'\\n'";
+
+        $query = "LOAD DATA LOCAL INFILE '" . $loader->real_escape_string($path) . "'"
+            . ($duplicates === 'replace' ? ' REPLACE' : ' IGNORE')
+            . " INTO TABLE $quotedTable CHARACTER SET utf8mb4 $fields LINES TERMINATED BY $lines"
+            . ($header ? ' IGNORE 1 LINES' : '') . " $columnClause";
+
+        $loader->begin_transaction();
+        try {
+            if (!$loader->query($query)) {
+                throw new Exception($loader->error, $loader->errno);
+            }
+        } catch (Exception $e) {
+            $loader->rollback();
+            $loader->close();
+            if (in_array($e->getCode(), self::LOCAL_INFILE_DISABLED, true)) {
+                return null;
+            }
+            throw new Exception("Load failed: " . $e->getMessage());
+        }
+
+        $rows = max(0, $loader->affected_rows);
+        $errorCount = $loader->warning_count;
+        $errors = $errorCount > 0 ? $this->readWarnings($loader) : [];
+
+        $committed = $duplicates !== 'error' || $errorCount === 0;
+        if ($committed) {
+            $loader->commit();
+        } else {
+            $loader->rollback();
+        }
+        $loader->close();
+
+        return [
+            'committed' => $committed,
+            'rows' => $committed ? $rows : 0,
+            'method' => 'LOAD DATA',
+            'errorCount' => $errorCount,
+            'errors' => $errors
+        ];
+    }
+
+    /**
+     * Parse the file here and insert it in multi-row batches
+     */
+    private function insertRows($path, $table, $format, $header, $columns, $duplicates) {
+        $handle = fopen($path, 'r');
+        if (!$handle) {
+            throw new Exception("Failed to open uploaded file");
+        }
+
+        $verb = ['error' => 'INSERT', 'ignore' => 'INSERT IGNORE', 'replace' => 'REPLACE'][$duplicates];
+        $quotedTable = '`' . str_replace('`', '``', $table) . '`';
+        $columnList = implode(', ', array_map(function($column) {
+            return '`' . str_replace('`', '``', $column) . '`';
+        }, $columns));
+        $placeholders = '(' . implode(', ', array_fill(0, count($columns), '?')) . ')';
+        $build = function($batch) use ($verb, $quotedTable, $columnList, $placeholders) {
+            return [
+                "$verb INTO $quotedTable ($columnList) VALUES " . implode(', ', array_fill(0, count($batch), $placeholders)),
+                array_merge(...array_values($batch))
+            ];
+        };
+
+        $writer = new BulkWriter($this->conn);
+        $writer->begin();
+        try {
+            if ($header) {
+                $this->readRecord($handle, $format);
+            }
+            $batch = [];
+            $rowNumber = 0;
+            while (($record = $this->readRecord($handle, $format)) !== null) {
+                $rowNumber++;
+                // Missing fields are NULL and extra fields are dropped, as LOAD DATA does
+                $batch[$rowNumber] = array_slice(array_pad($record, count($columns), null), 0, count($columns));
+                if (count($batch) >= BulkWriter::BATCH_ROWS) {
+                    $writer->write($batch, count($columns), $build);
+                    $batch = [];
+                }
+            }
+            if (!empty($batch)) {
+                $writer->write($batch, count($columns), $build);
+            }
+        } catch (Exception $e) {
+            fclose($handle);
+            $writer->rollback();
+            throw new Exception("Load failed: " . $e->getMessage());
+        }
+        fclose($handle);
+
+        $result = $duplicates !== 'error' || $writer->getErrorCount() === 0 ? $writer->commit() : $writer->rollback();
+        return [
+            'committed' => $result['committed'],
+            'rows' => $result['affectedRows'],
+            'method' => 'INSERT',
+            'errorCount' => $result['errorCount'],
+            'errors' => $result['errors']
+        ];
+    }
+
+    /**
+     * Next record of the file as a list of values (null at the end)
+     */
+    private function readRecord($handle, $format) {
+        if ($format === 'csv') {
+            do {
+                $record = fgetcsv($handle, 0, ',', '"', '');
+                if ($record === false) {
+                    return null;
+                }
+            } while ($record === [null]);    // Blank line
+            return array_map(function($value) {
+                return $value === '' ? null : $value;
+            }, $record);
+        }
+
+        do {
+            $line = fgets($handle);
+            if ($line === false) {
+                return null;
+            }
+            $line = rtrim($line, "\r\n");
+        } while ($line === '');
+        return array_map(function($field) {
+            if ($field === '\\N') {
+                return null;
+            }
+            return preg_replace_callback('/\\\\(.)/s', function($match) {
+                $escapes = ['t' => "\t", 'n' => "\n", 'r' => "\r", '0' => "\0", 'Z' => "\x1A"];
+                return $escapes[$match[1]] ?? $match[1];
+            }, $field);
+        }, explode("\t", $line));
+    }
+
+    /**
+     * Column names from the first line of the file
+     */
+    private function readHeader($path, $format) {
+        $handle = fopen($path, 'r');
+        if (!$handle) {
+            throw new Exception("Failed to open uploaded file");
+        }
+        $record = $this->readRecord($handle, $format);
+        fclose($handle);
+        if (empty($record)) {
+            throw new Exception("The file is empty");
+        }
+
+        // A UTF-8 byte order mark would end up in the first column name
+        $record[0] = preg_replace('/^\xEF\xBB\xBF/', '', (string) $record[0]);
+        return array_map(function($name) {
+            return trim((string) $name);
+        }, $record);
+    }
+
+    private function getTableColumns($table) {
+        $result = $this->conn->query("SHOW COLUMNS FROM `" . str_replace('`', '``', $table) . "`");
+        if (!$result) {
+            throw new Exception("Failed to read columns of '$table': " . $this->conn->error);
+        }
+        $columns = [];
+        while ($row = $result->fetch_assoc()) {
+            $columns[] = $row['Field'];
+        }
+        return $columns;
+    }
+
+    private function detectLineTerminator($path) {
+        $sample = (string) @file_get_contents($path, false, null, 0, self::SNIFF_BYTES);
+        return strpos($sample, "\r\n") !== false ? "\r\n" : "\n";
+    }
+
+    /**
+     * Warnings of the last statement, with the data row they refer to
+     */
+    private function readWarnings($conn) {
+        $errors = [];
+        $result = $conn->query("SHOW WARNINGS LIMIT " . BulkWriter::MAX_REPORTED_ERRORS);
+        if ($result) {
+            while ($warning = $result->fetch_assoc()) {
+                preg_match('/at row (\d+)/', $warning['Message'], $matches);
+                $errors[] = [
+                    'row' => isset($matches[1]) ? (int) $matches[1] : null,
+                    'error' => $warning['Message']
+                ];
+            }
+            $result->free();
+        }
+        return $errors;
+    }
+
+    /**
+     * Connection of its own that may send the file, or null when not possible
+     *
+     * Where PHP supports it (8.1+) LOCAL INFILE is limited to the directory
+     * of the uploaded file.
+     */
+    private function openLocalInfileConnection($path) {
+        $result = $this->conn->query("SELECT @@GLOBAL.local_infile, DATABASE()");
+        $row = $result ? $result->fetch_row() : null;
+        if (!$row || !(int) $row[0]) {
+            return null;
+        }
+
+        require_once __DIR__ . '/../../db_connection.php';
+        $credentials = getDbCredentials();
+        $loader = new ProfiledConnection();
+        if (defined('MYSQLI_OPT_LOAD_DATA_LOCAL_DIR')) {
+            $loader->options(MYSQLI_OPT_LOAD_DATA_LOCAL_DIR, dirname(realpath($path)));
+        } else {
+            $loader->options(MYSQLI_OPT_LOCAL_INFILE, true);
+        }
+
+        try {
+            if (!@$loader->real_connect($credentials['host'], $credentials['user'], $credentials['pass'], $row[1])) {
+                return null;
+            }
+        } catch (mysqli_sql_exception $e) {
+            return null;
+        }
+        $loader->set_charset(DB_CHARSET);
+        return $loader;
+    }
+}
+?>
@@ -0,0 +1,268 @@
+<?php
+/**
+ * Filter Builder Utility
+ *
+ * Turns the data grid's per-column filter values into WHERE conditions that
+ * can use an index, based on the column types and indexes of the table:
+ * - numeric columns: equality, comparisons (>, >=, <, <=) and ranges (a..b)
+ * - date/datetime columns: a partial date ("2024", "2024-03") becomes a range
+ * - strings with a single-column FULLTEXT index: MATCH ... AGAINST
+ * - other strings: prefix match LIKE 'v%' (uses an index if the column leads one)
+ * - a leading '%' opts in to a substring match LIKE '%v%' (always a scan)
+ *
+ * For every filtered column the chosen strategy is reported, together with
+ * whether it can use an index, so callers can surface filters that scan.
+ */
+
+class FilterBuilder {
+    const NUMERIC_TYPES = ['tinyint', 'smallint', 'mediumint', 'int', 'integer', 'bigint',
+                           'decimal', 'numeric', 'float', 'double', 'real', 'year', 'bit'];
+    const DATE_TYPES = ['date', 'datetime', 'timestamp'];
+
+    private $conn;
+    private $columns = [];          // column name => base type
+    private $leadingIndexed = [];   // column name => true when it is the first column of a B-tree index
+    private $fulltext = [];         // column name => true when it has its own FULLTEXT index
+
+    /**
+     * @param mysqli $conn Database connection
+     * @param string $tableName Escaped table name
+     */
+    public function __construct($conn, $tableName) {
+        $this->conn = $conn;
+        $this->loadMetadata($tableName);
+    }
+
+    /**
+     * Build WHERE conditions for the given filters
+     *
+     * @param array $filters Column name => filter value
+     * @return array [conditions, params, types, strategies]
+     */
+    public function build($filters) {
+        $conditions = [];
+        $params = [];
+        $types = '';
+        $strategies = [];
+
+        foreach ($filters as $column => $value) {
+            $value = trim((string) $value);
+            if ($value === '' || !isset($this->columns[$column])) {
+                continue;
+            }
+
+            $filter = $this->buildColumnFilter($column, $value);
+            $conditions[] = $filter['sql'];
+            $params = array_merge($params, $filter['params']);
+            $types .= str_repeat('s', count($filter['params']));
+            $strategies[$column] = [
+                'strategy' => $filter['strategy'],
+                'usesIndex' => $filter['usesIndex']
+            ];
+        }
+
+        return [$conditions, $params, $types, $strategies];
+    }
+
+    private function buildColumnFilter($column, $value) {
+        $baseType = $this->columns[$column];
+        $quoted = '`' . str_replace('`', '``', $column) . '`';
+
+        // Explicit opt-in for a substring search
+        if ($value[0] === '%') {
+            $needle = trim($value, '%');
+            return $this->filter("$quoted LIKE ?", ['%' . $this->escapeLike($needle) . '%'], 'contains', false);
+        }
+
+        $isNumeric = in_array($baseType, self::NUMERIC_TYPES, true);
+        $isDate = in_array($baseType, self::DATE_TYPES, true);
+
+        if ($isNumeric) {
+            $filter = $this->buildNumericFilter($quoted, $column, $value);
+        } elseif ($isDate) {
+            $filter = $this->buildDateFilter($quoted, $column, $value);
+        } elseif ($value[0] === '=' && strlen($value) > 1) {
+            // Exact string match with a leading '='
+            $filter = $this->filter("$quoted = ?", [substr($value, 1)], 'equality', $this->isIndexed($column));
+        } elseif (!empty($this->fulltext[$column])) {
+            $filter = $this->buildFulltextFilter($quoted, $value);
+        } else {
+            $filter = null;
+        }
+        if ($filter !== null) {
+            return $filter;
+        }
+
+        // Prefix match; only index-friendly for string columns compared as-is
+        $usesIndex = !$isNumeric && !$isDate && $this->isIndexed($column);
+        return $this->filter("$quoted LIKE ?", [$this->escapeLike($value) . '%'], 'prefix', $usesIndex);
+    }
+
+    /**
+     * Numeric equality, comparison or range; null when the value is not numeric
+     */
+    private function buildNumericFilter($quoted, $column, $value) {
+        $indexed = $this->isIndexed($column);
+
+        if (preg_match('/^(.+?)\s*\.\.\s*(.+)$/', $value, $m) && is_numeric($m[1]) && is_numeric($m[2])) {
+            return $this->filter("$quoted BETWEEN ? AND ?", [$m[1], $m[2]], 'range', $indexed);
+        }
+
+        if (preg_match('/^(>=|<=|>|<|=)\s*(.+)$/', $value, $m) && is_numeric($m[2])) {
+            $strategy = $m[1] === '=' ? 'equality' : 'range';
+            return $this->filter("$quoted {$m[1]} ?", [$m[2]], $strategy, $indexed);
+        }
+
+        if (is_numeric($value)) {
+            return $this->filter("$quoted = ?", [$value], 'equality', $indexed);
+        }
+
+        return null;
+    }
+
+    /**
+     * Date range filter; null when the value is not a (partial) date
+     *
+     * Every date is treated as the period it names, e.g. "2024-03" covers
+     * [2024-03-01, 2024-04-01), so comparisons stay sargable.
+     */
+    private function buildDateFilter($quoted, $column, $value) {
+        $indexed = $this->isIndexed($column);
+
+        if (preg_match('/^(.+?)\s*\.\.\s*(.+)$/', $value, $m)) {
+            $from = $this->parseDatePeriod($m[1]);
+            $to = $this->parseDatePeriod($m[2]);
+            if ($from !== null && $to !== null) {
+                return $this->filter("$quoted >= ? AND $quoted < ?", [$from[0], $to[1]], 'range', $indexed);
+            }
+            return null;
+        }
+
+        $operator = '=';
+        if (preg_match('/^(>=|<=|>|<|=)\s*(.+)$/', $value, $m)) {
+            $operator = $m[1];
+            $value = $m[2];
+        }
+
+        $period = $this->parseDatePeriod($value);
+        if ($period === null) {
+            return null;
+        }
+        list($start, $end) = $period;
+
+        switch ($operator) {
+            case '>':
+                return $this->filter("$quoted >= ?", [$end], 'range', $indexed);
+            case '>=':
+                return $this->filter("$quoted >= ?", [$start], 'range', $indexed);
+            case '<':
+                return $this->filter("$quoted < ?", [$start], 'range', $indexed);
+            case '<=':
+                return $this->filter("$quoted < ?", [$end], 'range', $indexed);
+            default:
+                return $this->filter("($quoted >= ? AND $quoted < ?)", [$start, $end], 'range', $indexed);
+        }
+    }
+
+    /**
+     * Parse YYYY, YYYY-MM, YYYY-MM-DD or YYYY-MM-DD HH:MM[:SS] into [start, end)
+     */
+    private function parseDatePeriod($value) {
+        $value = trim($value);
+
+        if (preg_match('/^(\d{4})$/', $value, $m)) {
+            return [sprintf('%04d-01-01', $m[1]), sprintf('%04d-01-01', $m[1] + 1)];
+        }
+        if (preg_match('/^(\d{4})-(\d{1,2})$/', $value, $m) && checkdate((int) $m[2], 1, (int) $m[1])) {
+            $start = new DateTime(sprintf('%04d-%02d-01', $m[1], $m[2]));
+            return [$start->format('Y-m-d'), $start->modify('+1 month')->format('Y-m-d')];
+        }
+        if (preg_match('/^(\d{4})-(\d{1,2})-(\d{1,2})$/', $value, $m) && checkdate((int) $m[2], (int) $m[3], (int) $m[1])) {
+            $start = new DateTime(sprintf('%04d-%02d-%02d', $m[1], $m[2], $m[3]));
+            return [$start->format('Y-m-d'), $start->modify('+1 day')->format('Y-m-d')];
+        }
+        if (preg_match('/^\d{4}-\d{1,2}-\d{1,2}[ T]\d{1,2}:\d{2}(:\d{2})?$/', $value, $m)) {
+            try {
+                $start = new DateTime(str_replace('T', ' ', $value));
+            } catch (Exception $e) {
+                return null;
+            }
+            $startText = $start->format('Y-m-d H:i:s');
+            $start->modify(isset($m[1]) ? '+1 second' : '+1 minute');
+            return [$startText, $start->format('Y-m-d H:i:s')];
+        }
+
+        return null;
+    }
+
+    /**
+     * Full-text search in boolean mode; every word must match as a prefix
+     */
+    private function buildFulltextFilter($quoted, $value) {
+        $words = preg_split('/\s+/', trim(preg_replace('/[+\-<>()~*"@]+/', ' ', $value)));
+        $words = array_filter($words, 'strlen');
+        if (empty($words)) {
+            return null;
+        }
+
+        $search = implode(' ', array_map(function($word) {
+            return '+' . $word . '*';
+        }, $words));
+
+        return $this->filter("MATCH($quoted) AGAINST (? IN BOOLEAN MODE)", [$search], 'fulltext', true);
+    }
+
+    private function filter($sql, $params, $strategy, $usesIndex) {
+        return [
+            'sql' => $sql,
+            'params' => $params,
+            'strategy' => $strategy,
+            'usesIndex' => $usesIndex
+        ];
+    }
+
+    private function isIndexed($column) {
+        return !empty($this->leadingIndexed[$column]);
+    }
+
+    private function escapeLike($value) {
+        return addcslashes($value, '\\%_');
+    }
+
+    /**
+     * Load column types and index layout for the table
+     */
+    private function loadMetadata($tableName) {
+        $result = $this->conn->query("SHOW COLUMNS FROM `$tableName`");
+        if (!$result) {
+            throw new Exception("Failed to get columns from '$tableName': " . $this->conn->error);
+        }
+        while ($row = $result->fetch_assoc()) {
+            preg_match('/^(\w+)/', $row['Type'], $matches);
+            $this->columns[$row['Field']] = strtolower($matches[1] ?? '');
+        }
+
+        // Views have no indexes; SHOW INDEX simply returns nothing for them
+        $indexResult = $this->conn->query("SHOW INDEX FROM `$tableName`");
+        if (!$indexResult) {
+            return;
+        }
+
+        $fulltextColumns = [];
+        while ($row = $indexResult->fetch_assoc()) {
+            if ($row['Index_type'] === 'FULLTEXT') {
+                $fulltextColumns[$row['Key_name']][] = $row['Column_name'];
+            } elseif ((int) $row['Seq_in_index'] === 1) {
+                $this->leadingIndexed[$row['Column_name']] = true;
+            }
+        }
+
+        // MATCH() needs an index over exactly the searched column list
+        foreach ($fulltextColumns as $indexColumns) {
+            if (count($indexColumns) === 1) {
+                $this->fulltext[$indexColumns[0]] = true;
+            }
+        }
+    }
+}
+?>
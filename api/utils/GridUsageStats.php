@@ -0,0 +1,116 @@
+<?php
+/**
+ * Grid Usage Stats Utility
+ *
+ * Counts the columns the data grid filters and sorts on, per table, so the
+ * index advisor (QueryPlanAnalyzer) can suggest indexes for the ones used
+ * most often. A grid query is counted once, when its first rows are
+ * fetched (a new filter or sort); further blocks of the same query are not.
+ *
+ * Stats are kept per database in tmp/grid_usage, one small JSON file that
+ * is updated under an exclusive lock. Recording is best effort: a file that
+ * cannot be written is skipped silently.
+ */
+
+class GridUsageStats {
+    // Tables kept per database; the least recently used are dropped
+    const MAX_TABLES = 500;
+
+    // Columns kept per table and kind (filters, sorts); the least used are dropped
+    const MAX_COLUMNS = 100;
+
+    private $conn;
+
+    public function __construct($conn) {
+        $this->conn = $conn;
+    }
+
+    /**
+     * Count one grid query
+     *
+     * @param string $tableName Table name
+     * @param array $filterStrategies Column => ['strategy', 'usesIndex'] as reported by FilterBuilder
+     * @param string $sortColumn Sort column ('' when unsorted)
+     */
+    public function record($tableName, $filterStrategies, $sortColumn) {
+        $file = $this->getStatsPath();
+        $dir = dirname($file);
+        if (!is_dir($dir)) {
+            @mkdir($dir, 0777, true);
+        }
+        $handle = @fopen($file, 'c+');
+        if (!$handle) {
+            return;
+        }
+
+        if (flock($handle, LOCK_EX)) {
+            $stats = json_decode(stream_get_contents($handle), true) ?: [];
+            $table = $stats[$tableName] ?? ['queries' => 0, 'filters' => [], 'sorts' => []];
+
+            $table['queries']++;
+            $table['updated'] = time();
+            foreach ($filterStrategies as $column => $info) {
+                $filter = $table['filters'][$column] ?? ['uses' => 0, 'scans' => 0, 'contains' => 0];
+                $filter['uses']++;
+                if ($info['strategy'] === 'contains') {
+                    // A substring match cannot use a B-tree index
+                    $filter['contains']++;
+                } elseif (!$info['usesIndex']) {
+                    $filter['scans']++;
+                }
+                $table['filters'][$column] = $filter;
+            }
+            if ($sortColumn !== '') {
+                $table['sorts'][$sortColumn] = ($table['sorts'][$sortColumn] ?? 0) + 1;
+            }
+            $table['filters'] = $this->trim($table['filters'], function($filter) {
+                return $filter['uses'];
+            });
+            $table['sorts'] = $this->trim($table['sorts'], function($uses) {
+                return $uses;
+            });
+
+            $stats[$tableName] = $table;
+            $stats = $this->trim($stats, function($table) {
+                return $table['updated'] ?? 0;
+            }, self::MAX_TABLES);
+
+            ftruncate($handle, 0);
+            rewind($handle);
+            fwrite($handle, json_encode($stats));
+            fflush($handle);
+            flock($handle, LOCK_UN);
+        }
+        fclose($handle);
+    }
+
+    /**
+     * Usage of one table, or null when the grid has not queried it
+     *
+     * @return array|null ['queries', 'filters' => [column => ['uses', 'scans', 'contains']], 'sorts' => [column => uses]]
+     */
+    public function forTable($tableName) {
+        $stats = json_decode(@file_get_contents($this->getStatsPath()), true);
+        return is_array($stats) && isset($stats[$tableName]) ? $stats[$tableName] : null;
+    }
+
+    /**
+     * Keep the $max entries with the highest weight
+     */
+    private function trim($entries, callable $weight, $max = self::MAX_COLUMNS) {
+        if (count($entries) <= $max) {
+            return $entries;
+        }
+        uasort($entries, function($a, $b) use ($weight) {
+            return $weight($b) <=> $weight($a);
+        });
+        return array_slice($entries, 0, $max, true);
+    }
+
+    private function getStatsPath() {
+        $result = $this->conn->query("SELECT DATABASE()");
+        $database = $result ? (string) $result->fetch_array()[0] : '';
+        return __DIR__ . '/../../tmp/grid_usage/' . md5($database) . '.json';
+    }
+}
+?>
@@ -0,0 +1,153 @@
+<?php
+/**
+ * JSON Stream Writer Utility
+ *
+ * Writes a JSON document piece by piece, so rows can be sent while they are
+ * fetched instead of being collected into an array for json_encode. Output
+ * goes through an OutputStream and is flushed to the client every
+ * $flushBytes bytes; peak memory is one chunk plus one row.
+ *
+ *   $json = new JsonStreamWriter();
+ *   $json->beginObject();
+ *   $json->value(true, 'success');
+ *   $json->beginArray('records');
+ *   while ($row = $result->fetch_assoc()) {
+ *       $json->value($row);
+ *   }
+ *   $json->endArray();
+ *   $json->endObject();
+ *   $json->close();
+ *
+ * Nothing reaches the client before the first flush, so an error thrown
+ * while the first chunk is being built can still be answered with a normal
+ * JSON error response. Errors after that are reported with fail(), which
+ * ends the document with a "streamError" member; clients must check it
+ * before trusting a streamed response.
+ */
+
+require_once __DIR__ . '/OutputStream.php';
+
+class JsonStreamWriter {
+    // Default number of bytes collected before output is flushed to the client
+    const FLUSH_BYTES = 65536;
+
+    const JSON_FLAGS = JSON_INVALID_UTF8_SUBSTITUTE;
+
+    private $stream;
+    private $stack = [];    // One entry per open object/array: true until it has a first member
+    private $closers = [];  // Closing bracket of each open object/array
+
+    /**
+     * @param int $flushBytes Bytes collected before output is flushed
+     * @param string $compression 'none', 'gzip' or 'zstd' (see OutputStream::negotiateEncoding)
+     */
+    public function __construct($flushBytes = self::FLUSH_BYTES, $compression = 'none') {
+        $this->stream = new OutputStream($compression, $flushBytes);
+    }
+
+    /**
+     * Open an object; $key is required inside an object and ignored inside an array
+     */
+    public function beginObject($key = null) {
+        $this->writeKey($key);
+        $this->stream->write('{');
+        $this->stack[] = true;
+        $this->closers[] = '}';
+    }
+
+    public function endObject() {
+        array_pop($this->stack);
+        array_pop($this->closers);
+        $this->stream->write('}');
+    }
+
+    /**
+     * Open an array; $key is required inside an object and ignored inside an array
+     */
+    public function beginArray($key = null) {
+        $this->writeKey($key);
+        $this->stream->write('[');
+        $this->stack[] = true;
+        $this->closers[] = ']';
+    }
+
+    public function endArray() {
+        array_pop($this->stack);
+        array_pop($this->closers);
+        $this->stream->write(']');
+    }
+
+    /**
+     * Write a complete value (scalar, row or any other json_encode-able data)
+     */
+    public function value($value, $key = null) {
+        $encoded = json_encode($value, self::JSON_FLAGS);
+        if ($encoded === false) {
+            throw new Exception("Failed to encode JSON: " . json_last_error_msg());
+        }
+        $this->writeKey($key);
+        $this->stream->write($encoded);
+    }
+
+    /**
+     * Write several members of the current object at once
+     */
+    public function values(array $values) {
+        foreach ($values as $key => $value) {
+            $this->value($value, $key);
+        }
+    }
+
+    /**
+     * Report an error that happened while the document was being written
+     *
+     * Before the first flush nothing has been sent, so the error is thrown
+     * as an Exception and answered with a normal JSON error response.
+     * Afterwards the response has already started (with "success": true):
+     * every open array and object is closed, the outermost object gets the
+     * error as its last member, "streamError", and the response is ended.
+     * The document stays valid JSON.
+     */
+    public function fail($message) {
+        if (!$this->stream->hasStarted()) {
+            throw new Exception($message);
+        }
+        while (count($this->closers) > 1) {
+            array_pop($this->stack);
+            $this->stream->write(array_pop($this->closers));
+        }
+        if (!empty($this->closers)) {
+            $this->value((string) $message, 'streamError');
+            $this->endObject();
+        }
+        $this->close();
+    }
+
+    /**
+     * Send everything that is still pending and end the response
+     */
+    public function close() {
+        $this->stream->close();
+    }
+
+    /**
+     * Uncompressed bytes written so far
+     */
+    public function getBytesWritten() {
+        return $this->stream->getBytesWritten();
+    }
+
+    private function writeKey($key) {
+        if (empty($this->stack)) {
+            return;
+        }
+        $first = end($this->stack);
+        $this->stack[count($this->stack) - 1] = false;
+        $separator = $first ? '' : ',';
+        if ($key !== null) {
+            $separator .= json_encode((string) $key, self::JSON_FLAGS) . ':';
+        }
+        $this->stream->write($separator);
+    }
+}
+?>
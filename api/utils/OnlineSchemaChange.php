@@ -0,0 +1,734 @@
+<?php
+/**
+ * Online Schema Change Utility
+ *
+ * Runs an ALTER TABLE with as little blocking as the server allows:
+ *
+ * 1. ALGORITHM=INSTANT: a metadata-only change (MySQL 8.0+, MariaDB 10.3+)
+ * 2. ALGORITHM=INPLACE, LOCK=NONE: the table is rebuilt while reads and
+ *    writes continue
+ * 3. a shadow-table copy: the change is made to an empty copy of the table,
+ *    triggers replay writes to the original on the copy while the rows are
+ *    copied over in primary key chunks (with a pause between chunks), and
+ *    the tables are swapped with one atomic RENAME TABLE
+ *
+ * INSTANT is tried within the request. Steps 2 and 3 run as a background
+ * job (api/workers/schema_change_job.php) whose state is kept under
+ * tmp/schema_changes/ for progress polling. estimate() predicts the step a
+ * change will take and its cost before it is confirmed.
+ *
+ * The shadow copy needs a primary key and does not carry foreign keys or
+ * triggers over, so tables with foreign keys (in either direction) or
+ * triggers of their own are refused.
+ */
+
+require_once __DIR__ . '/AppSettings.php';
+require_once __DIR__ . '/SchemaCache.php';
+
+class OnlineSchemaChange {
+    // Server errors meaning "this algorithm cannot make this change"; the next step is tried
+    const UNSUPPORTED_ERRORS = [1845, 1846];
+
+    // Servers without INSTANT reject ALGORITHM=INSTANT as a syntax error
+    const SYNTAX_ERROR = 1064;
+
+    // Defaults of the 'Table Structure' settings
+    const DEFAULT_CHUNK_ROWS = 1000;
+    const DEFAULT_THROTTLE_MS = 50;
+
+    // Rough throughput (bytes of data and indexes per second) used by estimate()
+    const REBUILD_BYTES_PER_SECOND = 52428800;
+    const COPY_BYTES_PER_SECOND = 20971520;
+
+    // Seconds between progress saves during the copy
+    const SAVE_INTERVAL = 1;
+
+    private $conn;
+
+    public function __construct($conn) {
+        $this->conn = $conn;
+    }
+
+    /**
+     * Predict how a change will be made and what it costs
+     *
+     * @param string $table Table name
+     * @param array $change 'kind' => add|drop|rename|default|nullability|type,
+     *                      'atEnd' => bool (add), 'index' => bool (add with a key)
+     * @return array Table size, expected algorithm, whether the table is
+     *               rebuilt, estimated seconds and the reasons a shadow copy
+     *               is not possible ('copyBlockers')
+     */
+    public function estimate($table, $change) {
+        $stats = $this->tableStats($table);
+        $expected = $this->expectedAlgorithm($change);
+        $bytes = $stats['dataBytes'] + $stats['indexBytes'];
+        $chunkRows = self::chunkRows();
+        $throttleMs = self::throttleMs();
+
+        $seconds = 0;
+        if ($expected['algorithm'] === 'COPY') {
+            $seconds = $bytes / self::COPY_BYTES_PER_SECOND + ceil($stats['rows'] / $chunkRows) * $throttleMs / 1000;
+        } elseif ($expected['rebuild']) {
+            $seconds = $bytes / self::REBUILD_BYTES_PER_SECOND;
+        }
+
+        $server = $this->serverVersion();
+        return [
+            'table' => $table,
+            'server' => ($server['mariadb'] ? 'MariaDB ' : 'MySQL ') . $server['version'],
+            'rows' => $stats['rows'],
+            'dataBytes' => $stats['dataBytes'],
+            'indexBytes' => $stats['indexBytes'],
+            'algorithm' => $expected['algorithm'],
+            'rebuild' => $expected['rebuild'],
+            'estimatedSeconds' => round($seconds, 1),
+            'chunkRows' => $chunkRows,
+            'throttleMs' => $throttleMs,
+            'copyBlockers' => $expected['algorithm'] === 'COPY' ? $this->copyBlockers($table) : []
+        ];
+    }
+
+    /**
+     * Make the change "ALTER TABLE `$table` $clause" online
+     *
+     * @param array $renames Old => new name of renamed columns, so their data is copied
+     * @return array ['algorithm' => 'INSTANT'] when done instantly, otherwise
+     *               ['jobId', 'background', 'job'] of the started job
+     */
+    public function apply($table, $clause, $renames = []) {
+        $error = $this->tryAlter($table, $clause, 'ALGORITHM=INSTANT');
+        if ($error === null) {
+            return ['algorithm' => 'INSTANT'];
+        }
+        $server = $this->serverVersion();
+        $instantKnown = $server['mariadb'] ? version_compare($server['version'], '10.3.2', '>=')
+                                          : version_compare($server['version'], '8.0.12', '>=');
+        if (!in_array($error['errno'], self::UNSUPPORTED_ERRORS, true)
+            && ($error['errno'] !== self::SYNTAX_ERROR || $instantKnown)) {
+            throw new Exception("Schema change failed: " . $error['error']);
+        }
+
+        $stats = $this->tableStats($table);
+        $jobId = 'alter_' . date('Ymd_His') . '_' . bin2hex(random_bytes(4));
+        $dir = dirname(self::getJobPath($jobId, 'json'));
+        if (!is_dir($dir) && !@mkdir($dir, 0777, true)) {
+            throw new Exception("Failed to create schema change directory");
+        }
+
+        $this->saveJob([
+            'id' => $jobId,
+            'database' => $this->currentDatabase(),
+            'table' => $table,
+            'clause' => $clause,
+            'renames' => $renames,
+            'status' => 'queued',
+            'stage' => 'inplace',
+            'algorithm' => null,
+            'rows' => $stats['rows'],
+            'copiedRows' => 0,
+            'chunks' => 0,
+            'lastKey' => null,
+            'chunkRows' => self::chunkRows(),
+            'throttleMs' => self::throttleMs(),
+            'estimatedSeconds' => $this->estimateRebuild($stats),
+            'createdAt' => time()
+        ]);
+
+        return $this->startJob($jobId);
+    }
+
+    /**
+     * Run a queued job: INPLACE with LOCK=NONE, else the shadow-table copy
+     *
+     * @return array Final job state
+     */
+    public function runJob($jobId) {
+        $lock = fopen(self::getJobPath($jobId, 'lock'), 'c');
+        if (!$lock || !flock($lock, LOCK_EX | LOCK_NB)) {
+            throw new Exception("Schema change job is already running");
+        }
+
+        $job = $this->loadJob($jobId);
+        if ($job['status'] !== 'queued') {
+            flock($lock, LOCK_UN);
+            fclose($lock);
+            return $job;
+        }
+        set_time_limit(0);
+        ignore_user_abort(true);
+
+        try {
+            if (!$this->conn->select_db($job['database'])) {
+                throw new Exception("Failed to select database '{$job['database']}': " . $this->conn->error);
+            }
+
+            $job['status'] = 'running';
+            $job['startedAt'] = microtime(true);
+            $job['connectionId'] = $this->conn->thread_id;
+            $this->saveJob($job);
+
+            $error = $this->tryAlter($job['table'], $job['clause'], 'ALGORITHM=INPLACE, LOCK=NONE');
+            if ($error === null) {
+                $job['algorithm'] = 'INPLACE';
+            } elseif (in_array($error['errno'], self::UNSUPPORTED_ERRORS, true)) {
+                $job['algorithm'] = 'COPY';
+                $this->copyTable($job);
+            } else {
+                throw new Exception("Schema change failed: " . $error['error']);
+            }
+
+            $job['status'] = 'completed';
+            $job['stage'] = 'done';
+            (new SchemaCache($this->conn))->invalidate($job['database']);
+        } catch (Exception $e) {
+            $job['status'] = $this->isCancelRequested($jobId) ? 'cancelled' : 'failed';
+            $job['lastError'] = $e->getMessage();
+        }
+
+        $job['finishedAt'] = microtime(true);
+        $this->saveJob($job);
+        @unlink(self::getJobPath($jobId, 'cancel'));
+        flock($lock, LOCK_UN);
+        fclose($lock);
+
+        return $job;
+    }
+
+    /**
+     * State of a job, with percentage, throughput and remaining time
+     */
+    public function getJob($jobId) {
+        $job = $this->loadJob($jobId);
+
+        // A "running" job whose lock is free has died (crash, timeout, restart)
+        if ($job['status'] === 'running' && !$this->isJobLocked($jobId)) {
+            $job['status'] = 'interrupted';
+        }
+
+        $elapsed = isset($job['startedAt']) ? max(0.001, ($job['finishedAt'] ?? microtime(true)) - $job['startedAt']) : 0;
+        $job['elapsedSeconds'] = round($elapsed, 1);
+        $job['rowsPerSecond'] = 0;
+        $job['etaSeconds'] = null;
+
+        if ($job['status'] === 'completed') {
+            $job['percent'] = 100;
+        } elseif ($job['stage'] === 'copy' || $job['stage'] === 'swap') {
+            $copyElapsed = max(0.001, microtime(true) - ($job['copyStartedAt'] ?? microtime(true)));
+            $job['rowsPerSecond'] = round($job['copiedRows'] / $copyElapsed);
+            $job['percent'] = $job['rows'] > 0 ? min(99, round($job['copiedRows'] * 100 / $job['rows'], 1)) : 99;
+            if ($job['status'] === 'running' && $job['rowsPerSecond'] > 0) {
+                $job['etaSeconds'] = round(max(0, $job['rows'] - $job['copiedRows']) / $job['rowsPerSecond']);
+            }
+        } elseif ($job['stage'] === 'inplace' && $job['status'] === 'running' && $job['estimatedSeconds'] > 0) {
+            // The server does not report INPLACE progress; go by the estimate
+            $job['percent'] = min(95, round($elapsed * 100 / $job['estimatedSeconds'], 1));
+            $job['etaSeconds'] = round(max(0, $job['estimatedSeconds'] - $elapsed));
+        } else {
+            $job['percent'] = 0;
+        }
+
+        return $job;
+    }
+
+    /**
+     * Stop a job; the original table is left as it was
+     *
+     * A running job stops at its next chunk (a running INPLACE ALTER is
+     * killed); for an interrupted job the triggers and shadow table it left
+     * behind are removed here.
+     */
+    public function cancelJob($jobId) {
+        $job = $this->getJob($jobId);
+        if (in_array($job['status'], ['completed', 'failed', 'cancelled'], true)) {
+            throw new Exception("Schema change job has already finished");
+        }
+
+        if ($job['status'] === 'interrupted') {
+            if (!$this->conn->select_db($job['database'])) {
+                throw new Exception("Failed to select database '{$job['database']}': " . $this->conn->error);
+            }
+            if ($job['stage'] !== 'swap') {
+                $this->removeHelpers($job['table']);
+            }
+            $job = $this->loadJob($jobId);
+            $job['status'] = 'cancelled';
+            $job['finishedAt'] = microtime(true);
+            $this->saveJob($job);
+            return $this->getJob($jobId);
+        }
+
+        @touch(self::getJobPath($jobId, 'cancel'));
+        if ($job['stage'] === 'inplace' && !empty($job['connectionId'])) {
+            try {
+                $this->conn->query("KILL QUERY " . (int) $job['connectionId']);
+            } catch (mysqli_sql_exception $e) {
+                // Not allowed or already finished; the job stops at its next check
+            }
+        }
+        return $job;
+    }
+
+    /**
+     * Shadow-table copy of a job's table with the change applied, then swap
+     */
+    private function copyTable(&$job) {
+        $table = $job['table'];
+        $blockers = $this->copyBlockers($table);
+        if (!empty($blockers)) {
+            throw new Exception("This change cannot be made online: " . implode('; ', $blockers));
+        }
+
+        $shadow = self::helperName($table, 'osc');
+        $old = self::helperName($table, 'osc_old');
+        foreach ([$shadow, $old] as $name) {
+            if ($this->tableExists($name)) {
+                throw new Exception("Table '$name' already exists (left over from an earlier schema change?)");
+            }
+        }
+
+        $job['stage'] = 'prepare';
+        $this->saveJob($job);
+
+        $swapped = false;
+        try {
+            $this->run("CREATE TABLE " . self::quote($shadow) . " LIKE " . self::quote($table));
+            $this->run("ALTER TABLE " . self::quote($shadow) . " " . $job['clause']);
+
+            $columns = $this->columnMapping($table, $shadow, $job['renames'] ?? []);
+            $primaryKey = $this->primaryKey($table);
+            foreach ($primaryKey as $column) {
+                if (!isset($columns[$column])) {
+                    throw new Exception("The change removes primary key column '$column'; this cannot be done online");
+                }
+            }
+            $this->createTriggers($table, $shadow, $columns, $primaryKey);
+
+            $job['stage'] = 'copy';
+            $job['copyStartedAt'] = microtime(true);
+            $this->saveJob($job);
+            $this->copyRows($job, $shadow, $columns, $primaryKey);
+
+            $job['stage'] = 'swap';
+            $this->saveJob($job);
+            $this->run("RENAME TABLE " . self::quote($table) . " TO " . self::quote($old) . ", "
+                . self::quote($shadow) . " TO " . self::quote($table));
+            $swapped = true;
+
+            // The triggers moved with the original table, which no longer receives writes
+            $this->dropTriggers($table);
+            $this->run("DROP TABLE " . self::quote($old));
+        } catch (Exception $e) {
+            if (!$swapped) {
+                $this->removeHelpers($table);
+            }
+            throw $e;
+        }
+    }
+
+    /**
+     * Copy the rows in primary key order, one locked chunk at a time
+     *
+     * Rows the triggers have already written are newer than the chunk being
+     * copied and are skipped. Any other failure, or a warning (a value
+     * truncated or clamped by the change), stops the copy, as it would
+     * have stopped a plain ALTER TABLE.
+     */
+    private function copyRows(&$job, $shadow, $columns, $primaryKey) {
+        $table = self::quote($job['table']);
+        $keyList = implode(', ', array_map([self::class, 'quote'], $primaryKey));
+        $keyTuple = '(' . $keyList . ')';
+        $sourceList = implode(', ', array_map([self::class, 'quote'], array_keys($columns)));
+        $targetList = implode(', ', array_map([self::class, 'quote'], array_values($columns)));
+        $notCopied = "NOT EXISTS (SELECT 1 FROM " . self::quote($shadow) . " s WHERE "
+            . implode(' AND ', array_map(function($column) use ($columns, $table) {
+                return "s." . self::quote($columns[$column]) . " = $table." . self::quote($column);
+            }, $primaryKey)) . ")";
+        $lastSave = microtime(true);
+
+        while (true) {
+            if ($this->isCancelRequested($job['id'])) {
+                throw new Exception("Cancelled");
+            }
+
+            $after = $job['lastKey'] !== null ? "WHERE $keyTuple > " . $this->tuple($job['lastKey']) : '';
+            $result = $this->run("SELECT $keyList FROM $table $after ORDER BY $keyList LIMIT "
+                . ($job['chunkRows'] - 1) . ", 1");
+            $upper = $result->fetch_row();
+            $result->free();
+
+            $conditions = [$notCopied];
+            if ($job['lastKey'] !== null) {
+                $conditions[] = "$keyTuple > " . $this->tuple($job['lastKey']);
+            }
+            if ($upper !== null) {
+                $conditions[] = "$keyTuple <= " . $this->tuple($upper);
+            }
+            $this->run("INSERT INTO " . self::quote($shadow) . " ($targetList) "
+                . "SELECT $sourceList FROM $table WHERE " . implode(' AND ', $conditions) . " LOCK IN SHARE MODE");
+            if ($this->conn->warning_count > 0) {
+                $warning = $this->run("SHOW WARNINGS LIMIT 1")->fetch_assoc();
+                throw new Exception("Schema change failed: " . ($warning['Message'] ?? 'the copy raised a warning')
+                    . "; the table was not changed");
+            }
+
+            $job['chunks']++;
+            if ($upper === null) {
+                $job['copiedRows'] += max(0, $this->conn->affected_rows);
+                $this->saveJob($job);
+                return;
+            }
+            $job['copiedRows'] += $job['chunkRows'];
+            $job['lastKey'] = $upper;
+
+            if (microtime(true) - $lastSave >= self::SAVE_INTERVAL) {
+                $this->saveJob($job);
+                $lastSave = microtime(true);
+            }
+            if ($job['throttleMs'] > 0) {
+                usleep($job['throttleMs'] * 1000);
+            }
+        }
+    }
+
+    /**
+     * Triggers that replay inserts, updates and deletes on the shadow table
+     */
+    private function createTriggers($table, $shadow, $columns, $primaryKey) {
+        $targetList = implode(', ', array_map([self::class, 'quote'], array_values($columns)));
+        $newValues = implode(', ', array_map(function($column) {
+            return 'NEW.' . self::quote($column);
+        }, array_keys($columns)));
+        $oldKey = implode(' AND ', array_map(function($column) use ($columns) {
+            return self::quote($columns[$column]) . ' = OLD.' . self::quote($column);
+        }, $primaryKey));
+
+        $on = " ON " . self::quote($table) . " FOR EACH ROW ";
+        $replace = "REPLACE INTO " . self::quote($shadow) . " ($targetList) VALUES ($newValues)";
+        $delete = "DELETE IGNORE FROM " . self::quote($shadow) . " WHERE $oldKey";
+
+        $this->run("CREATE TRIGGER " . self::quote(self::helperName($table, 'osc_ins')) . " AFTER INSERT" . $on . $replace);
+        $this->run("CREATE TRIGGER " . self::quote(self::helperName($table, 'osc_upd')) . " AFTER UPDATE" . $on
+            . "BEGIN $delete; $replace; END");
+        $this->run("CREATE TRIGGER " . self::quote(self::helperName($table, 'osc_del')) . " AFTER DELETE" . $on . $delete);
+    }
+
+    private function dropTriggers($table) {
+        foreach (['osc_ins', 'osc_upd', 'osc_del'] as $suffix) {
+            $this->run("DROP TRIGGER IF EXISTS " . self::quote(self::helperName($table, $suffix)));
+        }
+    }
+
+    /**
+     * Remove the triggers and shadow table of an unfinished copy
+     */
+    private function removeHelpers($table) {
+        try {
+            $this->dropTriggers($table);
+            $this->run("DROP TABLE IF EXISTS " . self::quote(self::helperName($table, 'osc')));
+        } catch (Exception $e) {
+            // Keep the original error; leftovers are reported by the next attempt
+        }
+    }
+
+    /**
+     * Source column => shadow column for every column that exists in both
+     * (generated columns are computed, not copied)
+     */
+    private function columnMapping($table, $shadow, $renames) {
+        $sourceColumns = $this->storedColumns($table);
+        $shadowColumns = array_flip($this->storedColumns($shadow));
+
+        $columns = [];
+        foreach ($sourceColumns as $column) {
+            $target = $renames[$column] ?? $column;
+            if (isset($shadowColumns[$target])) {
+                $columns[$column] = $target;
+            }
+        }
+        if (empty($columns)) {
+            throw new Exception("The changed table has no columns in common with the original");
+        }
+        return $columns;
+    }
+
+    private function storedColumns($table) {
+        $stmt = $this->conn->prepare("SELECT COLUMN_NAME, EXTRA FROM information_schema.COLUMNS
+                                      WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = ?
+                                      ORDER BY ORDINAL_POSITION");
+        $stmt->bind_param('s', $table);
+        $stmt->execute();
+        $result = $stmt->get_result();
+        $columns = [];
+        while ($row = $result->fetch_assoc()) {
+            if (stripos($row['EXTRA'], 'GENERATED') === false) {
+                $columns[] = $row['COLUMN_NAME'];
+            }
+        }
+        $stmt->close();
+        return $columns;
+    }
+
+    private function primaryKey($table) {
+        $stmt = $this->conn->prepare("SELECT COLUMN_NAME FROM information_schema.STATISTICS
+                                      WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = ? AND INDEX_NAME = 'PRIMARY'
+                                      ORDER BY SEQ_IN_INDEX");
+        $stmt->bind_param('s', $table);
+        $stmt->execute();
+        $result = $stmt->get_result();
+        $columns = [];
+        while ($row = $result->fetch_row()) {
+            $columns[] = $row[0];
+        }
+        $stmt->close();
+        return $columns;
+    }
+
+    /**
+     * Reasons the shadow-table copy cannot be used for a table
+     */
+    private function copyBlockers($table) {
+        $blockers = [];
+        if (empty($this->primaryKey($table))) {
+            $blockers[] = "the table has no primary key";
+        }
+
+        $stmt = $this->conn->prepare("SELECT
+                SUM(TABLE_NAME = ? AND REFERENCED_TABLE_NAME IS NOT NULL),
+                SUM(REFERENCED_TABLE_NAME = ?)
+            FROM information_schema.KEY_COLUMN_USAGE
+            WHERE TABLE_SCHEMA = DATABASE() AND REFERENCED_TABLE_SCHEMA = DATABASE()");
+        $stmt->bind_param('ss', $table, $table);
+        $stmt->execute();
+        $row = $stmt->get_result()->fetch_row();
+        $stmt->close();
+        if ((int) $row[0] > 0) {
+            $blockers[] = "the table has foreign keys";
+        }
+        if ((int) $row[1] > 0) {
+            $blockers[] = "other tables refer to it with foreign keys";
+        }
+
+        // CREATE TABLE ... LIKE does not copy triggers; the swap would drop them
+        $stmt = $this->conn->prepare("SELECT COUNT(*) FROM information_schema.TRIGGERS
+                                      WHERE EVENT_OBJECT_SCHEMA = DATABASE() AND EVENT_OBJECT_TABLE = ?");
+        $stmt->bind_param('s', $table);
+        $stmt->execute();
+        $triggers = (int) $stmt->get_result()->fetch_row()[0];
+        $stmt->close();
+        if ($triggers > 0) {
+            $blockers[] = "the table has triggers, which a table copy would drop";
+        }
+        return $blockers;
+    }
+
+    /**
+     * Algorithm a change is expected to get on this server
+     *
+     * @return array ['algorithm' => INSTANT|INPLACE|COPY, 'rebuild' => bool]
+     */
+    private function expectedAlgorithm($change) {
+        $server = $this->serverVersion();
+        $version = $server['version'];
+        $instantAdd = $server['mariadb'] ? version_compare($version, '10.3.2', '>=')
+                                         : version_compare($version, '8.0.12', '>=');
+        $instantAnywhere = $server['mariadb'] ? version_compare($version, '10.4.0', '>=')
+                                              : version_compare($version, '8.0.29', '>=');
+        $instant = ['algorithm' => 'INSTANT', 'rebuild' => false];
+        $rebuild = ['algorithm' => 'INPLACE', 'rebuild' => true];
+
+        switch ($change['kind'] ?? '') {
+            case 'add':
+                if (!empty($change['index'])) {
+                    return $rebuild;
+                }
+                return $instantAnywhere || ($instantAdd && !empty($change['atEnd'])) ? $instant : $rebuild;
+            case 'drop':
+                return $instantAnywhere ? $instant : $rebuild;
+            case 'rename':
+            case 'default':
+                return $instantAdd ? $instant : ['algorithm' => 'INPLACE', 'rebuild' => false];
+            case 'nullability':
+                return $rebuild;
+            default:
+                return ['algorithm' => 'COPY', 'rebuild' => true];
+        }
+    }
+
+    /**
+     * Estimated seconds of an INPLACE rebuild (progress of the 'inplace' stage)
+     */
+    private function estimateRebuild($stats) {
+        return round(($stats['dataBytes'] + $stats['indexBytes']) / self::REBUILD_BYTES_PER_SECOND, 1);
+    }
+
+    /**
+     * Approximate row count and size of a table
+     */
+    private function tableStats($table) {
+        $stmt = $this->conn->prepare("SELECT TABLE_ROWS, DATA_LENGTH, INDEX_LENGTH FROM information_schema.TABLES
+                                      WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = ?");
+        $stmt->bind_param('s', $table);
+        $stmt->execute();
+        $row = $stmt->get_result()->fetch_row();
+        $stmt->close();
+        if ($row === null) {
+            throw new Exception("Table '$table' not found");
+        }
+        return [
+            'rows' => (int) $row[0],
+            'dataBytes' => (int) $row[1],
+            'indexBytes' => (int) $row[2]
+        ];
+    }
+
+    private function tableExists($table) {
+        $stmt = $this->conn->prepare("SELECT 1 FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = ?");
+        $stmt->bind_param('s', $table);
+        $stmt->execute();
+        $exists = $stmt->get_result()->fetch_row() !== null;
+        $stmt->close();
+        return $exists;
+    }
+
+    /**
+     * Server flavour and version, e.g. ['mariadb' => false, 'version' => '8.0.36']
+     */
+    private function serverVersion() {
+        $result = $this->conn->query("SELECT VERSION()");
+        $version = $result ? (string) $result->fetch_row()[0] : '';
+        preg_match('/^(\d+\.\d+\.\d+)/', $version, $matches);
+        return [
+            'mariadb' => stripos($version, 'mariadb') !== false,
+            'version' => $matches[1] ?? '0.0.0'
+        ];
+    }
+
+    private function currentDatabase() {
+        $result = $this->conn->query("SELECT DATABASE()");
+        $database = $result ? $result->fetch_row()[0] : null;
+        if ($database === null || $database === '') {
+            throw new Exception("No database selected");
+        }
+        return $database;
+    }
+
+    /**
+     * Run an ALTER TABLE with an algorithm clause
+     *
+     * @return array|null Null on success, else ['errno' => int, 'error' => string]
+     */
+    private function tryAlter($table, $clause, $algorithm) {
+        try {
+            if ($this->conn->query("ALTER TABLE " . self::quote($table) . " $clause, $algorithm")) {
+                return null;
+            }
+            return ['errno' => $this->conn->errno, 'error' => $this->conn->error];
+        } catch (mysqli_sql_exception $e) {
+            return ['errno' => $e->getCode(), 'error' => $e->getMessage()];
+        }
+    }
+
+    private function run($sql) {
+        $result = $this->conn->query($sql);
+        if ($result === false) {
+            throw new Exception("Schema change failed: " . $this->conn->error);
+        }
+        return $result;
+    }
+
+    /**
+     * SQL row constructor of quoted key values
+     */
+    private function tuple($values) {
+        return '(' . implode(', ', array_map(function($value) {
+            return "'" . $this->conn->real_escape_string($value) . "'";
+        }, $values)) . ')';
+    }
+
+    /**
+     * Name of a helper table or trigger, within the 64 character identifier limit
+     */
+    private static function helperName($table, $suffix) {
+        return '_' . substr($table, 0, 62 - strlen($suffix)) . '_' . $suffix;
+    }
+
+    private static function quote($name) {
+        return '`' . str_replace('`', '``', $name) . '`';
+    }
+
+    private static function chunkRows() {
+        return max(1, (int) AppSettings::get('Table Structure', 'online chunk rows', self::DEFAULT_CHUNK_ROWS));
+    }
+
+    private static function throttleMs() {
+        return max(0, (int) AppSettings::get('Table Structure', 'online throttle ms', self::DEFAULT_THROTTLE_MS));
+    }
+
+    /**
+     * Run a queued job in a background worker, or in this request if that is not possible
+     */
+    private function startJob($jobId) {
+        require_once __DIR__ . '/WorkerPool.php';
+        require_once __DIR__ . '/../../db_connection.php';
+
+        // Release the session lock so polls are not blocked while the job runs here
+        if (session_status() === PHP_SESSION_ACTIVE) {
+            session_write_close();
+        }
+
+        if (WorkerPool::startDetached(__DIR__ . '/../workers/schema_change_job.php', [$jobId], getDbCredentials())) {
+            return ['jobId' => $jobId, 'background' => true, 'job' => $this->getJob($jobId)];
+        }
+        $this->runJob($jobId);
+        return ['jobId' => $jobId, 'background' => false, 'job' => $this->getJob($jobId)];
+    }
+
+    private function isCancelRequested($jobId) {
+        return is_file(self::getJobPath($jobId, 'cancel'));
+    }
+
+    private function loadJob($jobId) {
+        $job = json_decode(@file_get_contents(self::getJobPath($jobId, 'json')), true);
+        if (!is_array($job)) {
+            throw new Exception("Schema change job '$jobId' not found");
+        }
+        return $job;
+    }
+
+    private function saveJob($job) {
+        $job['updatedAt'] = microtime(true);
+        $file = self::getJobPath($job['id'], 'json');
+        // Write to a temporary file first so pollers never read a partial state
+        if (@file_put_contents($file . '.tmp', json_encode($job), LOCK_EX) !== false) {
+            @rename($file . '.tmp', $file);
+        }
+    }
+
+    /**
+     * True while a process holds the job lock (i.e. the job is running)
+     */
+    private function isJobLocked($jobId) {
+        $lock = @fopen(self::getJobPath($jobId, 'lock'), 'c');
+        if (!$lock) {
+            return false;
+        }
+        $free = flock($lock, LOCK_EX | LOCK_NB);
+        if ($free) {
+            flock($lock, LOCK_UN);
+        }
+        fclose($lock);
+        return !$free;
+    }
+
+    /**
+     * Path of a job file (json = state, lock, cancel = cancel request)
+     */
+    private static function getJobPath($jobId, $extension) {
+        if (!preg_match('/^[A-Za-z0-9_-]+$/', $jobId)) {
+            throw new Exception("Invalid schema change job id");
+        }
+        return __DIR__ . '/../../tmp/schema_changes/' . $jobId . '.' . $extension;
+    }
+}
+?>
@@ -0,0 +1,190 @@
+<?php
+/**
+ * Output Stream Utility
+ *
+ * Sends a response body to the client in chunks while it is being produced,
+ * optionally gzip- or zstd-compressed on the fly. Memory use is bounded by
+ * the chunk size, whatever the size of the response. Given a file handle,
+ * the stream writes to that file instead of the client.
+ */
+
+class OutputStream {
+    // Bytes collected before a chunk is sent (before compression)
+    const CHUNK_BYTES = 65536;
+
+    const COMPRESSION_FORMATS = ['none', 'gzip', 'zstd'];
+
+    private $compression;
+    private $compressor = null;
+    private $buffer = '';
+    private $chunkBytes;
+    private $bytesWritten = 0;
+    private $started = false;
+    private $handle;
+    private $fileBytes = 0;
+    private $fileHash = null;
+
+    /**
+     * @param string $compression 'none', 'gzip' or 'zstd'
+     * @param int $chunkBytes Bytes collected before a chunk is sent
+     * @param resource|null $handle File to write to instead of the client
+     */
+    public function __construct($compression = 'none', $chunkBytes = self::CHUNK_BYTES, $handle = null) {
+        if (!in_array($compression, self::COMPRESSION_FORMATS, true)) {
+            throw new Exception("Unsupported compression format: $compression");
+        }
+        if ($compression === 'gzip') {
+            if (!function_exists('deflate_init')) {
+                throw new Exception("gzip compression is not available (PHP zlib extension missing)");
+            }
+            $this->compressor = deflate_init(ZLIB_ENCODING_GZIP, ['level' => 6]);
+        } elseif ($compression === 'zstd') {
+            if (!function_exists('zstd_compress_init')) {
+                throw new Exception("zstd compression is not available (PHP zstd extension missing)");
+            }
+            $this->compressor = zstd_compress_init();
+        }
+        $this->compression = $compression;
+        $this->chunkBytes = max(1, (int) $chunkBytes);
+        $this->handle = $handle;
+        if ($handle !== null) {
+            $this->fileHash = hash_init('sha256');
+        }
+    }
+
+    /**
+     * Best compression the client accepts for a streamed response ('none' if none)
+     *
+     * Sends the matching Content-Encoding header; the stream must then be
+     * created with the returned compression.
+     */
+    public static function negotiateEncoding() {
+        $accept = $_SERVER['HTTP_ACCEPT_ENCODING'] ?? '';
+        header('Vary: Accept-Encoding');
+        if (stripos($accept, 'zstd') !== false && function_exists('zstd_compress_init')) {
+            header('Content-Encoding: zstd');
+            return 'zstd';
+        }
+        if (stripos($accept, 'gzip') !== false && function_exists('deflate_init')) {
+            header('Content-Encoding: gzip');
+            return 'gzip';
+        }
+        return 'none';
+    }
+
+    /**
+     * Turn off PHP output buffering so chunks reach the client as they are sent
+     */
+    public static function disableBuffering() {
+        while (ob_get_level()) {
+            ob_end_clean();
+        }
+    }
+
+    /**
+     * Queue output; sent once the chunk size has been reached
+     */
+    public function write($data) {
+        $this->buffer .= $data;
+        if (strlen($this->buffer) >= $this->chunkBytes) {
+            $this->flush();
+        }
+    }
+
+    /**
+     * Send the pending output (through the compressor, if any)
+     *
+     * @param bool $final True for the last call; finishes the compressed stream
+     */
+    public function flush($final = false) {
+        $chunk = $this->buffer;
+        $this->buffer = '';
+        $this->bytesWritten += strlen($chunk);
+
+        if ($this->compression === 'gzip') {
+            // Sync flush so every chunk can be decoded by the client right away;
+            // nobody reads a file while it is written, so that can compress freely
+            $mode = $final ? ZLIB_FINISH : ($this->handle !== null ? ZLIB_NO_FLUSH : ZLIB_SYNC_FLUSH);
+            $chunk = deflate_add($this->compressor, $chunk, $mode);
+        } elseif ($this->compression === 'zstd') {
+            $chunk = zstd_compress_add($this->compressor, $chunk, $final);
+        }
+        if ($chunk === '' || $chunk === false) {
+            return;
+        }
+
+        if ($this->handle !== null) {
+            if (fwrite($this->handle, $chunk) !== strlen($chunk)) {
+                throw new Exception("Failed to write output file (disk full?)");
+            }
+            hash_update($this->fileHash, $chunk);
+            $this->fileBytes += strlen($chunk);
+            return;
+        }
+
+        if (!$this->started) {
+            // Last chance for headers; then let the output through any buffers
+            $this->started = true;
+            if (class_exists('RequestTimer', false)) {
+                RequestTimer::sendHeader(['total' => RequestTimer::elapsed()]);
+            }
+            while (ob_get_level()) {
+                ob_end_flush();
+            }
+        }
+        echo $chunk;
+        flush();
+    }
+
+    /**
+     * Send the remaining output and end the stream
+     */
+    public function close() {
+        $this->flush(true);
+        $this->compressor = null;
+    }
+
+    /**
+     * End a stream that could not be completed
+     *
+     * The pending output is sent, but a compressed stream is not finished:
+     * without its trailer the client's decoder reports the download as
+     * truncated instead of accepting it as complete.
+     */
+    public function abort() {
+        $this->flush();
+        $this->compressor = null;
+    }
+
+    /**
+     * True once output has reached the client (headers are sent)
+     */
+    public function hasStarted() {
+        return $this->started;
+    }
+
+    /**
+     * Uncompressed bytes sent so far
+     */
+    public function getBytesWritten() {
+        return $this->bytesWritten + strlen($this->buffer);
+    }
+
+    /**
+     * Size and SHA-256 of what was written to the file (after compression)
+     *
+     * Only for a stream created with a file handle; call after close().
+     *
+     * @return array ['bytes' => int, 'sha256' => string]
+     */
+    public function getFileSummary() {
+        if ($this->fileHash === null) {
+            throw new Exception("Output stream does not write to a file");
+        }
+        return [
+            'bytes' => $this->fileBytes,
+            'sha256' => hash_final(hash_copy($this->fileHash))
+        ];
+    }
+}
+?>
@@ -0,0 +1,92 @@
+<?php
+/**
+ * Profiled Connection Utility
+ *
+ * mysqli connection that reports every statement it runs (query,
+ * multi_query and prepared statement executions) to SqlProfiler. A drop-in
+ * replacement for mysqli: handlers use it unchanged. When profiling is not
+ * active the calls go straight to mysqli.
+ */
+
+require_once __DIR__ . '/SqlProfiler.php';
+
+class ProfiledConnection extends mysqli {
+    #[\ReturnTypeWillChange]
+    public function query($query, $resultMode = MYSQLI_STORE_RESULT) {
+        if (!SqlProfiler::isActive()) {
+            return parent::query($query, $resultMode);
+        }
+        $start = SqlProfiler::begin($this);
+        try {
+            return parent::query($query, $resultMode);
+        } finally {
+            SqlProfiler::end($this, $query, $start);
+        }
+    }
+
+    #[\ReturnTypeWillChange]
+    public function multi_query($query) {
+        if (!SqlProfiler::isActive()) {
+            return parent::multi_query($query);
+        }
+        $start = SqlProfiler::begin($this);
+        try {
+            return parent::multi_query($query);
+        } finally {
+            SqlProfiler::end($this, $query, $start);
+        }
+    }
+
+    /**
+     * Prepare a statement whose executions are profiled
+     *
+     * The preparation time is counted with the first execution.
+     */
+    #[\ReturnTypeWillChange]
+    public function prepare($query) {
+        if (!SqlProfiler::isActive()) {
+            return parent::prepare($query);
+        }
+        $start = microtime(true);
+        $stmt = new ProfiledStatement($this);
+        if (!$stmt->prepare($query)) {
+            // Prepare the plain way so the error ends up on the connection, as callers expect
+            return parent::prepare($query);
+        }
+        $stmt->setProfile($this, $query, (microtime(true) - $start) * 1000);
+        return $stmt;
+    }
+
+    #[\ReturnTypeWillChange]
+    public function close() {
+        SqlProfiler::release($this);
+        return parent::close();
+    }
+}
+
+class ProfiledStatement extends mysqli_stmt {
+    private $connection = null;
+    private $sql = null;
+    private $prepareMs = 0.0;
+
+    public function setProfile($connection, $sql, $prepareMs) {
+        $this->connection = $connection;
+        $this->sql = $sql;
+        $this->prepareMs = $prepareMs;
+    }
+
+    #[\ReturnTypeWillChange]
+    public function execute($params = null) {
+        if ($this->sql === null || !SqlProfiler::isActive()) {
+            return $params === null ? parent::execute() : parent::execute($params);
+        }
+        $start = SqlProfiler::begin($this->connection);
+        try {
+            return $params === null ? parent::execute() : parent::execute($params);
+        } finally {
+            SqlProfiler::end($this->connection, $this->sql, $start, $this->prepareMs, $this->affected_rows);
+            $this->prepareMs = 0.0;
+        }
+    }
+}
+?>
@@ -0,0 +1,622 @@
+<?php
+/**
+ * Query Plan Analyzer Utility
+ *
+ * Explains a query and advises on indexes:
+ *
+ * - EXPLAIN FORMAT=JSON is turned into a tree of plan nodes with the
+ *   access type, index, estimated rows, filtered percentage and cost
+ * - with $analyze the query is also run: MySQL's EXPLAIN ANALYZE tree
+ *   (8.0.18+) or MariaDB's ANALYZE FORMAT=JSON add the actual rows, loops
+ *   and time per node
+ * - full table/index scans, filesorts, temporary tables and joins without
+ *   an index are reported as issues
+ * - for the tables with such an issue an index is suggested from the
+ *   columns in the WHERE, JOIN ... ON, ORDER BY and GROUP BY clauses:
+ *   equality columns first, then the sort columns (or one range column)
+ * - the columns the data grid filters and sorts on most often (see
+ *   GridUsageStats) are checked for a leading index as well
+ *
+ * The clauses are read with regular expressions rather than a full SQL
+ * parser, so unusual queries may get no suggestion; the plan and issues
+ * come from the server and are always complete.
+ */
+
+require_once __DIR__ . '/GridUsageStats.php';
+
+class QueryPlanAnalyzer {
+    // Columns in a suggested index
+    const MAX_INDEX_COLUMNS = 3;
+
+    // Grid queries that must have used a column before an index is advised for it
+    const MIN_GRID_USES = 5;
+
+    // Full scans of fewer (estimated) rows are reported as info rather than a warning
+    const FULL_SCAN_ROWS = 1000;
+
+    // Plan keys holding nested operations, with the label shown for them
+    // (MySQL and MariaDB EXPLAIN FORMAT=JSON)
+    const OPERATIONS = [
+        'query_block' => 'Query block',
+        'nested_loop' => 'Nested loop join',
+        'ordering_operation' => 'Order',
+        'grouping_operation' => 'Group',
+        'duplicates_removal' => 'Remove duplicates',
+        'windowing' => 'Window functions',
+        'union_result' => 'Union',
+        'query_specifications' => 'Union parts',
+        'materialized_from_subquery' => 'Materialized subquery',
+        'attached_subqueries' => 'Subqueries',
+        'optimized_away_subqueries' => 'Optimized away subqueries',
+        'select_list_subqueries' => 'Select list subqueries',
+        'having_subqueries' => 'HAVING subqueries',
+        'order_by_subqueries' => 'ORDER BY subqueries',
+        'group_by_subqueries' => 'GROUP BY subqueries',
+        'filesort' => 'Filesort',
+        'temporary_table' => 'Temporary table',
+        'read_sorted_file' => 'Read sorted file',
+        'block-nl-join' => 'Block nested loop join',
+        'materialized' => 'Materialized subquery',
+        'subqueries' => 'Subqueries'
+    ];
+
+    const ACCESS_LABELS = [
+        'ALL' => 'Full table scan',
+        'index' => 'Full index scan',
+        'range' => 'Index range scan',
+        'ref' => 'Index lookup',
+        'ref_or_null' => 'Index lookup (or NULL)',
+        'eq_ref' => 'Unique index lookup',
+        'const' => 'Constant row',
+        'system' => 'Constant row',
+        'fulltext' => 'Fulltext search',
+        'index_merge' => 'Index merge',
+        'unique_subquery' => 'Unique subquery lookup',
+        'index_subquery' => 'Subquery index lookup'
+    ];
+
+    // Words that end a table reference instead of being its alias
+    const NOT_ALIASES = ['WHERE', 'ON', 'USING', 'JOIN', 'LEFT', 'RIGHT', 'INNER', 'OUTER', 'CROSS', 'NATURAL',
+                         'STRAIGHT_JOIN', 'GROUP', 'ORDER', 'LIMIT', 'HAVING', 'SET', 'UNION', 'WINDOW', 'FOR',
+                         'LOCK', 'FORCE', 'USE', 'IGNORE', 'PARTITION', 'VALUES', 'SELECT'];
+
+    // Error of servers without EXPLAIN ANALYZE
+    const SYNTAX_ERROR = 1064;
+
+    // Identifier (plain or backquoted) in the clauses
+    const IDENTIFIER = '`(?:[^`]|``)+`|[A-Za-z_$][A-Za-z0-9_$]*';
+
+    private $conn;
+    private $collectIssues = true;
+    private $issues = [];
+    private $flagged = [];      // table alias => reasons the plan gives for an index
+    private $sortFlagged = [];  // reasons for an index serving ORDER BY / GROUP BY
+    private $tableInfo = [];    // table => ['columns' => [...], 'indexes' => [name => [columns]]] or null
+
+    public function __construct($conn) {
+        $this->conn = $conn;
+    }
+
+    /**
+     * Explain a query
+     *
+     * @param string $query Statement to explain (SELECT, or UPDATE/DELETE/INSERT ... SELECT without $analyze)
+     * @param bool $analyze Also run the query for the actual rows and times
+     * @return array ['server', 'plan', 'analyzedPlan', 'cost', 'issues', 'suggestions', 'gridAdvice']
+     */
+    public function analyze($query, $analyze = false) {
+        $isMariaDb = stripos($this->queryValue("SELECT VERSION()"), 'MariaDB') !== false;
+
+        $explain = json_decode($this->queryValue("EXPLAIN FORMAT=JSON $query"), true);
+        if (!is_array($explain)) {
+            throw new Exception("The server returned no JSON plan for this statement");
+        }
+        $plan = $this->children($explain);
+
+        $analyzedPlan = null;
+        if ($analyze) {
+            if ($isMariaDb) {
+                $this->collectIssues = false;
+                $analyzedPlan = $this->children(json_decode($this->queryValue("ANALYZE FORMAT=JSON $query"), true));
+                $this->collectIssues = true;
+            } else {
+                try {
+                    $analyzedPlan = $this->parseTree($this->queryValue("EXPLAIN ANALYZE $query"));
+                } catch (Exception $e) {
+                    if ($e->getCode() !== self::SYNTAX_ERROR) {
+                        throw $e;
+                    }
+                    $this->addIssue('info', 'EXPLAIN ANALYZE needs MySQL 8.0.18 or later; only the estimated plan is shown', null);
+                }
+            }
+        }
+
+        $clauses = $this->readClauses($query);
+        $tables = array_values(array_unique(array_column($clauses['tables'], 'table')));
+        $gridAdvice = [];
+        foreach ($tables as $table) {
+            $gridAdvice = array_merge($gridAdvice, $this->adviseFromGridUsage($table));
+        }
+
+        return [
+            'server' => $isMariaDb ? 'MariaDB' : 'MySQL',
+            'plan' => $plan,
+            'analyzedPlan' => $analyzedPlan,
+            'cost' => $this->number($explain['query_block']['cost_info']['query_cost'] ?? $explain['query_block']['cost'] ?? null),
+            'issues' => $this->issues,
+            'suggestions' => $this->suggestIndexes($clauses),
+            'gridAdvice' => $gridAdvice
+        ];
+    }
+
+    /**
+     * Indexes for the columns the data grid filters and sorts on most often
+     *
+     * Filters that ran without an index and sort columns that do not lead
+     * an index are advised once they were used MIN_GRID_USES times.
+     * Substring filters ('%value') are left out: no B-tree index helps them.
+     */
+    public function adviseFromGridUsage($table) {
+        $stats = (new GridUsageStats($this->conn))->forTable($table);
+        $info = $this->getTableInfo($table);
+        if ($stats === null || $info === null) {
+            return [];
+        }
+
+        $advice = [];
+        $filters = $stats['filters'] ?? [];
+        uasort($filters, function($a, $b) {
+            return $b['scans'] <=> $a['scans'];
+        });
+        foreach ($filters as $column => $filter) {
+            if ($filter['scans'] >= self::MIN_GRID_USES && in_array($column, $info['columns'], true)
+                && !$this->isCovered($info, [$column])) {
+                $advice[] = $this->suggestion($table, [$column], 'grid',
+                    "Filtered in the data grid {$filter['uses']} times, {$filter['scans']} of them without an index");
+            }
+        }
+
+        $sorts = $stats['sorts'] ?? [];
+        arsort($sorts);
+        foreach ($sorts as $column => $uses) {
+            if ($uses >= self::MIN_GRID_USES && in_array($column, $info['columns'], true)
+                && !$this->isCovered($info, [$column]) && $column !== $info['primaryKey']) {
+                // InnoDB appends the primary key to secondary indexes, which is
+                // exactly the (sort column, primary key) order keyset paging reads
+                $advice[] = $this->suggestion($table, [$column], 'grid',
+                    "Sorted on in the data grid $uses times; without an index every page is sorted with a filesort");
+            }
+        }
+        return $advice;
+    }
+
+    /**
+     * Plan nodes for the operations and tables directly below a JSON plan element
+     */
+    private function children($data) {
+        $nodes = [];
+        if (!is_array($data)) {
+            return $nodes;
+        }
+        foreach ($data as $key => $value) {
+            if (!is_array($value)) {
+                continue;
+            }
+            if ($key === 'table') {
+                $nodes[] = $this->tableNode($value);
+            } elseif (is_string($key) && isset(self::OPERATIONS[$key])) {
+                $nodes[] = $this->operationNode($key, $value);
+            } elseif (is_int($key)) {
+                // Element of a list (nested_loop, attached_subqueries, ...)
+                $nodes = array_merge($nodes, $this->children($value));
+            }
+        }
+        return $nodes;
+    }
+
+    private function operationNode($key, $value) {
+        $node = $this->node(self::OPERATIONS[$key]);
+        $node['children'] = $this->children($value);
+        if (isset($value[0])) {
+            return $node;
+        }
+
+        $node['cost'] = $this->number($value['cost_info']['query_cost'] ?? $value['cost_info']['sort_cost'] ?? $value['cost'] ?? null);
+        $node['actualTime'] = $this->number($value['r_total_time_ms'] ?? null);
+        $node['loops'] = $this->number($value['r_loops'] ?? null);
+        if (isset($value['select_id'])) {
+            $node['operation'] .= ' #' . $value['select_id'];
+        }
+        if (isset($value['sort_key'])) {
+            $node['details'][] = 'Sort key: ' . $value['sort_key'];
+        }
+
+        if ($key === 'filesort' || !empty($value['using_filesort'])) {
+            $node['flags'][] = 'filesort';
+            $this->addIssue('warning', 'Rows are sorted with a filesort instead of being read in index order', null);
+            $this->sortFlagged[] = 'filesort';
+        }
+        if ($key === 'temporary_table' || !empty($value['using_temporary_table'])) {
+            $node['flags'][] = 'temporary';
+            $this->addIssue('warning', 'An internal temporary table is used (GROUP BY, DISTINCT or UNION)', null);
+            $this->sortFlagged[] = 'temporary table';
+        }
+        if ($key === 'block-nl-join') {
+            $node['flags'][] = 'join-buffer';
+            $node['condition'] = $value['attached_condition'] ?? null;
+        }
+        return $node;
+    }
+
+    private function tableNode($table) {
+        $alias = $table['table_name'] ?? '?';
+        $access = $table['access_type'] ?? null;
+        $rows = $this->number($table['rows_examined_per_scan'] ?? $table['rows'] ?? null);
+
+        $node = $this->node(self::ACCESS_LABELS[$access] ?? ($access ?: 'Table'));
+        $node['table'] = $alias;
+        $node['accessType'] = $access;
+        $node['key'] = $table['key'] ?? null;
+        $node['possibleKeys'] = $table['possible_keys'] ?? [];
+        $node['rows'] = $rows;
+        $node['filtered'] = $this->number($table['filtered'] ?? null);
+        $node['cost'] = $this->number($table['cost_info']['prefix_cost'] ?? $table['cost_info']['read_cost'] ?? $table['cost'] ?? null);
+        $node['actualRows'] = $this->number($table['r_rows'] ?? null);
+        $node['actualTime'] = $this->number($table['r_total_time_ms'] ?? $table['r_table_time_ms'] ?? null);
+        $node['loops'] = $this->number($table['r_loops'] ?? null);
+        $node['condition'] = $table['attached_condition'] ?? null;
+        if (!empty($table['using_index'])) {
+            $node['details'][] = 'Covering index';
+        }
+        if (isset($table['index_condition'])) {
+            $node['details'][] = 'Index condition: ' . $table['index_condition'];
+        }
+
+        $rowText = $rows !== null ? ' (~' . number_format($rows) . ' rows)' : '';
+        if ($access === 'ALL') {
+            $node['flags'][] = 'full-scan';
+            $this->addIssue($rows !== null && $rows < self::FULL_SCAN_ROWS ? 'info' : 'warning',
+                "Full table scan on `$alias`$rowText", $alias);
+            $this->flagged[$alias][] = "full table scan$rowText";
+        } elseif ($access === 'index' && empty($table['using_index'])) {
+            $node['flags'][] = 'index-scan';
+            $this->addIssue('info', "Full index scan on `$alias`$rowText", $alias);
+            $this->flagged[$alias][] = "full index scan$rowText";
+        }
+        if (!empty($node['possibleKeys']) && $node['key'] === null) {
+            $this->addIssue('info', "`$alias` has possible keys (" . implode(', ', $node['possibleKeys']) . ") but none is used", $alias);
+        }
+        if (!empty($table['using_join_buffer'])) {
+            $node['flags'][] = 'join-buffer';
+            $node['details'][] = 'Join buffer: ' . $table['using_join_buffer'];
+            $this->addIssue('warning', "`$alias` is joined without an index ({$table['using_join_buffer']})", $alias);
+            $this->flagged[$alias][] = 'join without an index';
+        }
+
+        $node['children'] = $this->children($table);
+        return $node;
+    }
+
+    private function node($operation) {
+        return [
+            'operation' => $operation,
+            'table' => null,
+            'accessType' => null,
+            'key' => null,
+            'possibleKeys' => [],
+            'rows' => null,
+            'filtered' => null,
+            'cost' => null,
+            'actualRows' => null,
+            'actualTime' => null,
+            'loops' => null,
+            'condition' => null,
+            'details' => [],
+            'flags' => [],
+            'children' => []
+        ];
+    }
+
+    /**
+     * Plan nodes from MySQL's EXPLAIN ANALYZE text tree
+     *
+     * Each line reads "-> operation  (cost=a..b rows=n) (actual time=x..y rows=n loops=n)",
+     * indented four spaces per level.
+     */
+    private function parseTree($text) {
+        $items = [];
+        foreach (preg_split('/\R/', (string) $text) as $line) {
+            if (!preg_match('/^(\s*)-> (.*)$/', $line, $matches)) {
+                continue;   // Continuation of a long condition
+            }
+            $node = $this->node(trim(preg_replace('/\s*\((?:cost|actual time)=[^)]*\)|\s*\(never executed\)/', '', $matches[2])));
+            $number = '(\d+(?:\.\d+)?(?:e[+-]?\d+)?)';
+            if (preg_match("/\\(cost=$number(?:\\.\\.$number)? rows=$number\\)/", $matches[2], $cost)) {
+                $node['cost'] = $this->number($cost[2] !== '' ? $cost[2] : $cost[1]);
+                $node['rows'] = $this->number($cost[3]);
+            }
+            if (preg_match("/\\(actual time=$number\\.\\.$number rows=$number loops=(\\d+)\\)/", $matches[2], $actual)) {
+                // Time and rows are per loop
+                $node['actualTime'] = $this->number($actual[2]) * (int) $actual[4];
+                $node['actualRows'] = $this->number($actual[3]);
+                $node['loops'] = (int) $actual[4];
+            } elseif (strpos($matches[2], '(never executed)') !== false) {
+                $node['loops'] = 0;
+            }
+            if (preg_match('/^Table scan on/', $node['operation'])) {
+                $node['flags'][] = 'full-scan';
+            } elseif (preg_match('/^Sort\b/', $node['operation'])) {
+                $node['flags'][] = 'filesort';
+            } elseif (preg_match('/temporary table/i', $node['operation'])) {
+                $node['flags'][] = 'temporary';
+            }
+            $items[] = [strlen($matches[1]), $node];
+        }
+
+        $i = 0;
+        return $this->nestTree($items, $i, -1);
+    }
+
+    private function nestTree($items, &$i, $parentDepth) {
+        $nodes = [];
+        while ($i < count($items) && $items[$i][0] > $parentDepth) {
+            list($depth, $node) = $items[$i];
+            $i++;
+            $node['children'] = $this->nestTree($items, $i, $depth);
+            $nodes[] = $node;
+        }
+        return $nodes;
+    }
+
+    /**
+     * Tables, aliases and the column conditions of a query
+     *
+     * @return array ['tables' => [alias => ['table', 'alias']], 'equality' => [[alias|null, column]],
+     *                'range' => [...], 'order' => [...]]
+     */
+    private function readClauses($query) {
+        // Blank out comments and string literals so their contents are not read
+        // as SQL; a literal starting with % is kept as '%' (LIKE cannot use an index)
+        $sql = preg_replace('/--[^\n]*|#[^\n]*|\/\*.*?\*\//s', ' ', $query);
+        $sql = preg_replace_callback('/\'(?:[^\'\\\\]|\\\\.|\'\')*\'|"(?:[^"\\\\]|\\\\.|"")*"/s', function($match) {
+            return $match[0][1] === '%' ? "'%'" : "''";
+        }, $sql);
+
+        $id = self::IDENTIFIER;
+        $column = "(?:(?:$id)\\s*\\.\\s*)?(?:$id)";
+        $clauses = ['tables' => [], 'equality' => [], 'range' => [], 'order' => []];
+
+        // FROM / JOIN / UPDATE / INTO table references (comma-separated lists included)
+        preg_match_all('/\b(?:FROM|UPDATE|INTO)\b(.*?)(?=\bWHERE\b|\bGROUP\s+BY\b|\bORDER\s+BY\b|\bLIMIT\b|\bHAVING\b|\bUNION\b|\bSET\b|\bSELECT\b|\bVALUES\b|\)|$)/is', $sql, $segments);
+        foreach ($segments[1] as $segment) {
+            foreach (preg_split('/\bJOIN\b|,/i', $segment) as $part) {
+                $part = preg_replace('/\b(?:ON|USING)\b.*$/is', '', $part);
+                $part = preg_replace('/^\s*(?:(?:LEFT|RIGHT|INNER|OUTER|CROSS|NATURAL|STRAIGHT_JOIN)\s+)*/i', '', $part);
+                if (!preg_match("/^\\s*((?:$id)(?:\\s*\\.\\s*(?:$id))?)(?:\\s+(?:AS\\s+)?($id))?/i", $part, $match)) {
+                    continue;
+                }
+                $name = $this->unquote(preg_replace('/^.*\.\s*/', '', $match[1]));
+                $alias = isset($match[2]) && !in_array(strtoupper($match[2]), self::NOT_ALIASES, true)
+                    ? $this->unquote($match[2]) : $name;
+                if ($this->getTableInfo($name) !== null) {
+                    $clauses['tables'][$alias] = ['table' => $name, 'alias' => $alias];
+                }
+            }
+        }
+
+        // WHERE and ON conditions: col = / IN / IS (equality), col < > BETWEEN LIKE (range)
+        preg_match_all('/\b(?:WHERE|ON)\b(.*?)(?=\bGROUP\s+BY\b|\bORDER\s+BY\b|\bLIMIT\b|\bHAVING\b|\bUNION\b|\b(?:LEFT|RIGHT|INNER|CROSS|NATURAL|STRAIGHT_JOIN|JOIN)\b|$)/is', $sql, $conditions);
+        foreach ($conditions[1] as $condition) {
+            preg_match_all("/(?<![\\w.`])($column)\\s*(<=>|!=|<>|>=|<=|=|>|<|\\bNOT\\s+(?:IN|LIKE|BETWEEN)\\b|\\bIN\\b|\\bLIKE\\b|\\bBETWEEN\\b|\\bIS(?:\\s+NOT)?\\b)\\s*((?>$column)(?!\\s*\\()|'%')?/i", $condition, $predicates, PREG_SET_ORDER);
+            foreach ($predicates as $predicate) {
+                $operator = strtoupper(preg_replace('/\s+/', ' ', $predicate[2]));
+                $right = $predicate[3] ?? '';
+                if (in_array($operator, ['!=', '<>', 'NOT IN', 'NOT LIKE', 'NOT BETWEEN', 'IS NOT'], true)
+                    || ($operator === 'LIKE' && $right === "'%'")) {
+                    continue;
+                }
+                $kind = in_array($operator, ['=', '<=>', 'IN', 'IS'], true) ? 'equality' : 'range';
+                $clauses[$kind][] = $this->splitColumn($predicate[1]);
+                // col = other.col: the other side is a join column too
+                if ($operator === '=' && $right !== '' && $right !== "'%'" && !preg_match('/^(?:NULL|TRUE|FALSE)$/i', $right)) {
+                    $clauses['equality'][] = $this->splitColumn($right);
+                }
+            }
+        }
+
+        // ORDER BY (or GROUP BY when there is no ORDER BY) columns, in order
+        if (!preg_match('/\bORDER\s+BY\b(.*?)(?=\bLIMIT\b|\bUNION\b|\bFOR\b|\)|$)/is', $sql, $order)) {
+            preg_match('/\bGROUP\s+BY\b(.*?)(?=\bHAVING\b|\bORDER\s+BY\b|\bLIMIT\b|\bUNION\b|\bWITH\b|\)|$)/is', $sql, $order);
+        }
+        if (!empty($order)) {
+            foreach (explode(',', $order[1]) as $item) {
+                if (preg_match("/^\\s*($column)\\s*(?:ASC|DESC)?\\s*$/i", $item, $match)) {
+                    $clauses['order'][] = $this->splitColumn($match[1]);
+                }
+            }
+        }
+
+        return $clauses;
+    }
+
+    /**
+     * Suggest an index for each table the plan reports an issue for
+     */
+    private function suggestIndexes($clauses) {
+        $tables = $clauses['tables'];
+        $resolved = [];
+        foreach (['equality', 'range', 'order'] as $kind) {
+            foreach ($clauses[$kind] as $reference) {
+                $alias = $this->resolveColumn($reference, $tables);
+                if ($alias !== null) {
+                    $resolved[$alias][$kind][] = $reference[1];
+                }
+            }
+        }
+
+        // A sort served by an index needs all ORDER BY columns in one table
+        $orderAliases = array_unique(array_keys(array_filter($resolved, function($kinds) {
+            return !empty($kinds['order']);
+        })));
+        $sortTable = count($orderAliases) === 1 && count($clauses['order']) === count($resolved[$orderAliases[0]]['order'])
+            ? $orderAliases[0] : null;
+
+        $suggestions = [];
+        foreach ($resolved as $alias => $kinds) {
+            $reasons = $this->flagged[$alias] ?? [];
+            $useOrder = $alias === $sortTable && !empty($this->sortFlagged);
+            if ($useOrder) {
+                $reasons = array_merge($reasons, array_unique($this->sortFlagged));
+            }
+            if (empty($reasons)) {
+                continue;
+            }
+
+            // Equality columns first, then the sort columns or else one range column
+            $columns = array_unique($kinds['equality'] ?? []);
+            if ($useOrder && empty($kinds['range'])) {
+                $columns = array_merge($columns, $kinds['order']);
+            } elseif (!empty($kinds['range'])) {
+                $columns[] = $kinds['range'][0];
+            } elseif ($alias === $sortTable) {
+                $columns = array_merge($columns, $kinds['order']);
+            }
+            $columns = array_slice(array_values(array_unique($columns)), 0, self::MAX_INDEX_COLUMNS);
+
+            $info = $this->getTableInfo($tables[$alias]['table']);
+            if (empty($columns) || $this->isCovered($info, $columns)) {
+                continue;
+            }
+
+            $uses = [];
+            foreach (['equality' => 'WHERE/JOIN', 'range' => 'range', 'order' => 'ORDER BY'] as $kind => $label) {
+                $used = array_intersect($columns, $kinds[$kind] ?? []);
+                if (!empty($used)) {
+                    $uses[] = "$label: " . implode(', ', array_unique($used));
+                }
+            }
+            $suggestions[] = $this->suggestion($tables[$alias]['table'], $columns, 'plan',
+                ucfirst(implode(', ', array_unique($reasons))) . ' (' . implode('; ', $uses) . ')');
+        }
+        return $suggestions;
+    }
+
+    /**
+     * Alias of the table a column reference belongs to, or null when unknown or ambiguous
+     */
+    private function resolveColumn($reference, $tables) {
+        list($qualifier, $column) = $reference;
+        if ($qualifier !== null) {
+            return isset($tables[$qualifier]) && in_array($column, $this->getTableInfo($tables[$qualifier]['table'])['columns'], true)
+                ? $qualifier : null;
+        }
+        $matches = array_filter($tables, function($table) use ($column) {
+            return in_array($column, $this->getTableInfo($table['table'])['columns'], true);
+        });
+        return count($matches) === 1 ? array_key_first($matches) : null;
+    }
+
+    /**
+     * True when an existing B-tree index starts with these columns
+     */
+    private function isCovered($info, $columns) {
+        foreach ($info['indexes'] as $indexColumns) {
+            if (array_slice($indexColumns, 0, count($columns)) === array_values($columns)) {
+                return true;
+            }
+        }
+        return false;
+    }
+
+    private function suggestion($table, $columns, $source, $reason) {
+        $name = substr('idx_' . preg_replace('/[^A-Za-z0-9_]/', '_', implode('_', $columns)), 0, 64);
+        $quoted = array_map(function($column) {
+            return '`' . str_replace('`', '``', $column) . '`';
+        }, $columns);
+        return [
+            'table' => $table,
+            'columns' => array_values($columns),
+            'source' => $source,
+            'reason' => $reason,
+            'sql' => "CREATE INDEX `$name` ON `" . str_replace('`', '``', $table) . "` (" . implode(', ', $quoted) . ")"
+        ];
+    }
+
+    /**
+     * Columns, primary key and B-tree indexes (columns in order) of a table; null when it does not exist
+     */
+    private function getTableInfo($table) {
+        if (array_key_exists($table, $this->tableInfo)) {
+            return $this->tableInfo[$table];
+        }
+
+        $quoted = '`' . str_replace('`', '``', $table) . '`';
+        $info = null;
+        try {
+            $result = $this->conn->query("SHOW INDEX FROM $quoted");
+            $columns = $this->conn->query("SHOW COLUMNS FROM $quoted");
+            if ($result && $columns) {
+                $info = ['columns' => [], 'primaryKey' => null, 'indexes' => []];
+                while ($row = $columns->fetch_assoc()) {
+                    $info['columns'][] = $row['Field'];
+                }
+                while ($row = $result->fetch_assoc()) {
+                    if (in_array($row['Index_type'], ['FULLTEXT', 'SPATIAL'], true)) {
+                        continue;
+                    }
+                    $info['indexes'][$row['Key_name']][(int) $row['Seq_in_index'] - 1] = $row['Column_name'];
+                    if ($row['Key_name'] === 'PRIMARY' && (int) $row['Seq_in_index'] === 1) {
+                        $info['primaryKey'] = $row['Column_name'];
+                    }
+                }
+                foreach ($info['indexes'] as $name => $indexColumns) {
+                    ksort($indexColumns);
+                    $info['indexes'][$name] = array_values($indexColumns);
+                }
+            }
+        } catch (mysqli_sql_exception $e) {
+            // Not a table (e.g. a CTE or derived table name)
+        }
+
+        return $this->tableInfo[$table] = $info;
+    }
+
+    private function splitColumn($reference) {
+        $parts = preg_split('/\s*\.\s*(?=`|[A-Za-z_$])/', trim($reference), 2);
+        return count($parts) === 2
+            ? [$this->unquote($parts[0]), $this->unquote($parts[1])]
+            : [null, $this->unquote($parts[0])];
+    }
+
+    private function unquote($identifier) {
+        $identifier = trim($identifier);
+        if (strlen($identifier) > 1 && $identifier[0] === '`') {
+            return str_replace('``', '`', substr($identifier, 1, -1));
+        }
+        return $identifier;
+    }
+
+    private function addIssue($severity, $message, $table) {
+        if ($this->collectIssues) {
+            $this->issues[] = ['severity' => $severity, 'message' => $message, 'table' => $table];
+        }
+    }
+
+    private function number($value) {
+        return is_numeric($value) ? $value + 0 : null;
+    }
+
+    /**
+     * First column of the first row of a statement
+     */
+    private function queryValue($sql) {
+        $result = $this->conn->query($sql);
+        if ($result === false) {
+            throw new Exception($this->conn->error, $this->conn->errno);
+        }
+        $row = $result->fetch_row();
+        $result->free();
+        return $row ? $row[0] : null;
+    }
+}
+?>
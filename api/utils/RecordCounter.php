@@ -0,0 +1,156 @@
+<?php
+/**
+ * Record Counter Utility
+ *
+ * Picks the cheapest way to get a row count for the data grid:
+ * - unfiltered counts on large InnoDB tables use the TABLE_ROWS estimate
+ * - filtered counts are cached per (database, table, filter set) with a TTL
+ * - everything else falls back to an exact COUNT(*)
+ *
+ * Cached counts for a table are dropped whenever a record is written through
+ * RecordHandler (see invalidate()).
+ */
+
+class RecordCounter {
+    // Seconds a cached filtered count stays valid
+    const CACHE_TTL = 60;
+
+    // Below this many (estimated) rows an exact COUNT(*) is cheap enough
+    const EXACT_COUNT_THRESHOLD = 20000;
+
+    const MODES = ['auto', 'exact', 'lazy'];
+
+    private $conn;
+
+    public function __construct($conn) {
+        $this->conn = $conn;
+    }
+
+    /**
+     * Count rows matching a WHERE clause using the requested mode
+     *
+     * @param string $tableName Escaped table name
+     * @param string $whereClause WHERE clause (may be empty)
+     * @param array $params Bound parameters for the WHERE clause
+     * @param string $types Bind types for $params
+     * @param string $mode 'auto' or 'exact' ('lazy' is handled by the caller)
+     * @return array ['total' => int, 'estimated' => bool, 'strategy' => string]
+     */
+    public function count($tableName, $whereClause, $params, $types, $mode = 'auto') {
+        if ($mode === 'exact') {
+            return $this->result($this->countExact($tableName, $whereClause, $params, $types), false, 'exact');
+        }
+
+        if ($whereClause === '') {
+            $estimate = $this->estimate($tableName);
+            if ($estimate !== null && $estimate >= self::EXACT_COUNT_THRESHOLD) {
+                return $this->result($estimate, true, 'estimate');
+            }
+            return $this->result($this->countExact($tableName, $whereClause, $params, $types), false, 'exact');
+        }
+
+        $cacheFile = $this->cacheFile($tableName, $whereClause . '|' . $types . '|' . json_encode($params));
+        $cached = $this->readCache($cacheFile);
+        if ($cached !== null) {
+            return $this->result($cached, false, 'cache');
+        }
+
+        $total = $this->countExact($tableName, $whereClause, $params, $types);
+        $this->writeCache($cacheFile, $total);
+        return $this->result($total, false, 'exact');
+    }
+
+    /**
+     * Run SELECT COUNT(*) for the given WHERE clause
+     */
+    public function countExact($tableName, $whereClause, $params, $types) {
+        $countQuery = "SELECT COUNT(*) as total FROM `$tableName` $whereClause";
+
+        if (count($params) > 0) {
+            $stmt = $this->conn->prepare($countQuery);
+            if (!$stmt) {
+                throw new Exception("Prepare failed for count query: " . $this->conn->error);
+            }
+            $stmt->bind_param($types, ...$params);
+            if (!$stmt->execute()) {
+                throw new Exception("Execute failed for count query: " . $stmt->error);
+            }
+            $countResult = $stmt->get_result();
+        } else {
+            $countResult = $this->conn->query($countQuery);
+            if (!$countResult) {
+                throw new Exception("Count query failed: " . $this->conn->error);
+            }
+        }
+
+        return (int) $countResult->fetch_assoc()['total'];
+    }
+
+    /**
+     * Drop all cached counts for a table
+     */
+    public function invalidate($tableName) {
+        $dir = $this->tableCacheDir($tableName);
+        if (!is_dir($dir)) {
+            return;
+        }
+        foreach (glob($dir . '/*.json') ?: [] as $file) {
+            @unlink($file);
+        }
+    }
+
+    /**
+     * Row estimate from SHOW TABLE STATUS, or null when it is not usable
+     *
+     * Only InnoDB estimates are returned; other engines (and views) report
+     * exact or missing row counts, so COUNT(*) is used for them instead.
+     */
+    private function estimate($tableName) {
+        $tableLike = addcslashes($tableName, '%_');
+        $result = $this->conn->query("SHOW TABLE STATUS LIKE '$tableLike'");
+        if (!$result) {
+            return null;
+        }
+        $status = $result->fetch_assoc();
+        if (!$status || ($status['Engine'] ?? '') !== 'InnoDB' || $status['Rows'] === null) {
+            return null;
+        }
+        return (int) $status['Rows'];
+    }
+
+    private function result($total, $estimated, $strategy) {
+        return [
+            'total' => $total,
+            'estimated' => $estimated,
+            'strategy' => $strategy
+        ];
+    }
+
+    private function readCache($file) {
+        if (!is_file($file) || filemtime($file) < time() - self::CACHE_TTL) {
+            return null;
+        }
+        $data = json_decode(@file_get_contents($file), true);
+        return isset($data['total']) ? (int) $data['total'] : null;
+    }
+
+    private function writeCache($file, $total) {
+        $dir = dirname($file);
+        if (!is_dir($dir)) {
+            @mkdir($dir, 0777, true);
+        }
+        @file_put_contents($file, json_encode(['total' => $total]), LOCK_EX);
+    }
+
+    private function cacheFile($tableName, $filterKey) {
+        return $this->tableCacheDir($tableName) . '/' . md5($filterKey) . '.json';
+    }
+
+    private function tableCacheDir($tableName) {
+        // Per server and account, like the database and schema caches
+        $result = $this->conn->query("SELECT CURRENT_USER(), @@hostname, @@port, DATABASE()");
+        $identity = $result ? implode('|', $result->fetch_row()) : '';
+        return __DIR__ . '/../../tmp/cache/record_counts/' . md5($identity . '.' . $tableName);
+    }
+}
+?>
@@ -0,0 +1,103 @@
+<?php
+/**
+ * Request Timer Utility
+ *
+ * Measures the phases of an API request and reports them in a
+ * Server-Timing header, which browsers show in the network panel:
+ *
+ *   Server-Timing: auth;dur=1.9, connect;dur=0.4, db;dur=0.1, setup;dur=2.6
+ *
+ * Each mark() records the time since the previous mark (or since the start
+ * of the request for the first one). Providers (see addProvider()) add
+ * metrics of their own, such as the SQL statements from SqlProfiler, each
+ * time the header is sent.
+ */
+
+class RequestTimer {
+    private static $last = null;
+    private static $start = null;
+    private static $timings = [];
+    private static $providers = [];
+
+    /**
+     * Start timing; defaults to the moment PHP received the request
+     */
+    public static function start($time = null) {
+        self::$start = $time ?? ($_SERVER['REQUEST_TIME_FLOAT'] ?? microtime(true));
+        self::$last = self::$start;
+        self::$timings = [];
+    }
+
+    /**
+     * Record the time spent since the previous mark under $name
+     */
+    public static function mark($name) {
+        if (self::$start === null) {
+            self::start();
+        }
+        $now = microtime(true);
+        self::$timings[$name] = ($now - self::$last) * 1000;
+        self::$last = $now;
+    }
+
+    /**
+     * Add $ms to the timing recorded under $name
+     */
+    public static function add($name, $ms) {
+        self::$timings[$name] = (self::$timings[$name] ?? 0) + $ms;
+    }
+
+    /**
+     * Register a callable returning extra metrics (name => ms, or
+     * name => ['dur' => ms, 'desc' => text]) for the header
+     */
+    public static function addProvider(callable $provider) {
+        self::$providers[] = $provider;
+    }
+
+    /**
+     * Milliseconds since start()
+     */
+    public static function elapsed() {
+        if (self::$start === null) {
+            return 0.0;
+        }
+        return (microtime(true) - self::$start) * 1000;
+    }
+
+    /**
+     * Recorded timings in milliseconds, by name
+     */
+    public static function getTimings() {
+        return self::$timings;
+    }
+
+    /**
+     * Send the recorded timings (plus $extra name => ms) as a Server-Timing header
+     * 
+     * May be called more than once; the last call before the response body
+     * is sent wins.
+     */
+    public static function sendHeader($extra = []) {
+        if (headers_sent()) {
+            return;
+        }
+        $all = self::$timings;
+        foreach (self::$providers as $provider) {
+            $all = array_merge($all, call_user_func($provider));
+        }
+        $metrics = [];
+        foreach (array_merge($all, $extra) as $name => $metric) {
+            if (is_array($metric)) {
+                $desc = str_replace(['\\', '"'], ['\\\\', '\\"'], $metric['desc'] ?? '');
+                $metrics[] = $name . ';dur=' . round($metric['dur'], 1) . ($desc !== '' ? ';desc="' . $desc . '"' : '');
+            } else {
+                $metrics[] = $name . ';dur=' . round($metric, 1);
+            }
+        }
+        if (!empty($metrics)) {
+            header('Server-Timing: ' . implode(', ', $metrics));
+        }
+    }
+}
+?>
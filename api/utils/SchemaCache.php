@@ -0,0 +1,238 @@
+<?php
+/**
+ * Schema Cache Utility
+ *
+ * Builds the metadata of all tables in a database (columns, indexes and
+ * foreign keys) from four batched information_schema queries and caches it
+ * per database under tmp/cache/schema. Each cached schema carries an ETag
+ * (hash of its content) so browsers can revalidate with If-None-Match.
+ *
+ * The cache for a database is dropped by DDL run through TableHandler,
+ * ColumnHandler and QueryHandler (see invalidate()); CACHE_TTL bounds how
+ * long changes made outside this tool stay unnoticed.
+ */
+
+class SchemaCache {
+    // Seconds a cached schema stays valid
+    const CACHE_TTL = 300;
+
+    private $conn;
+
+    public function __construct($conn) {
+        $this->conn = $conn;
+    }
+
+    /**
+     * Schema of a database, from the cache when possible
+     *
+     * @param string|null $database Database name (null = current database)
+     * @return array ['etag' => string, 'schema' => array]
+     */
+    public function get($database = null) {
+        $database = $database ?? $this->currentDatabase();
+        $file = $this->cacheFile($database);
+
+        if (is_file($file) && filemtime($file) >= time() - self::CACHE_TTL) {
+            $cached = json_decode(@file_get_contents($file), true);
+            if (isset($cached['etag'], $cached['schema'])) {
+                return $cached;
+            }
+        }
+
+        $schema = $this->load($database);
+        $cached = [
+            'etag' => '"' . md5(json_encode($schema)) . '"',
+            'schema' => $schema
+        ];
+
+        $dir = dirname($file);
+        if (!is_dir($dir)) {
+            @mkdir($dir, 0777, true);
+        }
+        @file_put_contents($file, json_encode($cached), LOCK_EX);
+
+        return $cached;
+    }
+
+    /**
+     * Drop the cached schema of a database (null = current database)
+     */
+    public function invalidate($database = null) {
+        if ($database === null) {
+            $result = $this->conn->query("SELECT DATABASE()");
+            $database = $result ? $result->fetch_array()[0] : null;
+            if ($database === null || $database === '') {
+                return;
+            }
+        }
+        @unlink($this->cacheFile($database));
+    }
+
+    /**
+     * Read the metadata of all tables and views of a database
+     *
+     * @return array table name => ['type', 'columns', 'primaryKey', 'indexes', 'foreignKeys']
+     */
+    private function load($database) {
+        $db = $this->conn->real_escape_string($database);
+        $tables = [];
+
+        $result = $this->query("SELECT TABLE_NAME, TABLE_TYPE FROM information_schema.TABLES "
+            . "WHERE TABLE_SCHEMA = '$db' ORDER BY TABLE_NAME");
+        while ($row = $result->fetch_assoc()) {
+            $tables[$row['TABLE_NAME']] = [
+                'type' => $row['TABLE_TYPE'] === 'VIEW' ? 'VIEW' : 'BASE TABLE',
+                'columns' => [],
+                'primaryKey' => [],
+                'indexes' => [],
+                'foreignKeys' => []
+            ];
+        }
+
+        $result = $this->query("SELECT kcu.TABLE_NAME, kcu.CONSTRAINT_NAME, kcu.COLUMN_NAME, "
+            . "kcu.REFERENCED_TABLE_NAME, kcu.REFERENCED_COLUMN_NAME, rc.UPDATE_RULE, rc.DELETE_RULE "
+            . "FROM information_schema.KEY_COLUMN_USAGE kcu "
+            . "JOIN information_schema.REFERENTIAL_CONSTRAINTS rc "
+            . "ON rc.CONSTRAINT_SCHEMA = kcu.TABLE_SCHEMA AND rc.CONSTRAINT_NAME = kcu.CONSTRAINT_NAME "
+            . "AND rc.TABLE_NAME = kcu.TABLE_NAME "
+            . "WHERE kcu.TABLE_SCHEMA = '$db' AND kcu.REFERENCED_TABLE_NAME IS NOT NULL "
+            . "ORDER BY kcu.TABLE_NAME, kcu.CONSTRAINT_NAME, kcu.ORDINAL_POSITION");
+        $columnForeignKeys = [];
+        while ($row = $result->fetch_assoc()) {
+            $table = $row['TABLE_NAME'];
+            if (!isset($tables[$table])) {
+                continue;
+            }
+            $name = $row['CONSTRAINT_NAME'];
+            if (!isset($tables[$table]['foreignKeys'][$name])) {
+                $tables[$table]['foreignKeys'][$name] = [
+                    'constraint_name' => $name,
+                    'columns' => [],
+                    'referenced_table' => $row['REFERENCED_TABLE_NAME'],
+                    'referenced_columns' => [],
+                    'update_rule' => $row['UPDATE_RULE'],
+                    'delete_rule' => $row['DELETE_RULE']
+                ];
+            }
+            $tables[$table]['foreignKeys'][$name]['columns'][] = $row['COLUMN_NAME'];
+            $tables[$table]['foreignKeys'][$name]['referenced_columns'][] = $row['REFERENCED_COLUMN_NAME'];
+
+            // Same per-column shape as getTableInfo (first foreign key wins)
+            if (!isset($columnForeignKeys[$table][$row['COLUMN_NAME']])) {
+                $columnForeignKeys[$table][$row['COLUMN_NAME']] = [
+                    'referenced_table' => $row['REFERENCED_TABLE_NAME'],
+                    'referenced_column' => $row['REFERENCED_COLUMN_NAME'],
+                    'update_rule' => $row['UPDATE_RULE'],
+                    'delete_rule' => $row['DELETE_RULE'],
+                    'constraint_name' => $name
+                ];
+            }
+        }
+
+        $result = $this->query("SELECT TABLE_NAME, COLUMN_NAME, COLUMN_TYPE, IS_NULLABLE, COLUMN_KEY, "
+            . "COLUMN_DEFAULT, EXTRA FROM information_schema.COLUMNS "
+            . "WHERE TABLE_SCHEMA = '$db' ORDER BY TABLE_NAME, ORDINAL_POSITION");
+        while ($row = $result->fetch_assoc()) {
+            $table = $row['TABLE_NAME'];
+            if (!isset($tables[$table])) {
+                continue;
+            }
+            $tables[$table]['columns'][] = self::buildColumnInfo([
+                'Field' => $row['COLUMN_NAME'],
+                'Type' => $row['COLUMN_TYPE'],
+                'Null' => $row['IS_NULLABLE'],
+                'Key' => $row['COLUMN_KEY'],
+                'Default' => $row['COLUMN_DEFAULT'],
+                'Extra' => $row['EXTRA']
+            ], $columnForeignKeys[$table][$row['COLUMN_NAME']] ?? null);
+        }
+
+        $result = $this->query("SELECT TABLE_NAME, INDEX_NAME, NON_UNIQUE, COLUMN_NAME "
+            . "FROM information_schema.STATISTICS "
+            . "WHERE TABLE_SCHEMA = '$db' ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX");
+        while ($row = $result->fetch_assoc()) {
+            $table = $row['TABLE_NAME'];
+            if (!isset($tables[$table])) {
+                continue;
+            }
+            $name = $row['INDEX_NAME'];
+            if (!isset($tables[$table]['indexes'][$name])) {
+                $tables[$table]['indexes'][$name] = [
+                    'name' => $name,
+                    'unique' => (int) $row['NON_UNIQUE'] === 0,
+                    'columns' => []
+                ];
+            }
+            $tables[$table]['indexes'][$name]['columns'][] = $row['COLUMN_NAME'];
+            if ($name === 'PRIMARY') {
+                $tables[$table]['primaryKey'][] = $row['COLUMN_NAME'];
+            }
+        }
+
+        foreach ($tables as &$table) {
+            $table['indexes'] = array_values($table['indexes']);
+            $table['foreignKeys'] = array_values($table['foreignKeys']);
+        }
+        unset($table);
+
+        return $tables;
+    }
+
+    /**
+     * Column description as returned by the API, from a SHOW COLUMNS style row
+     *
+     * @param array $row ['Field', 'Type', 'Null', 'Key', 'Default', 'Extra']
+     * @param array|null $foreignKey Foreign key referenced by the column
+     */
+    public static function buildColumnInfo($row, $foreignKey = null) {
+        $columnInfo = [
+            'name' => $row['Field'],
+            'type' => $row['Type'],
+            'null' => $row['Null'] === 'YES',
+            'key' => $row['Key'],
+            'default' => $row['Default'],
+            'extra' => $row['Extra']
+        ];
+
+        // Parse type to get base type and length
+        preg_match('/^(\w+)(\(([^)]+)\))?/', $row['Type'], $matches);
+        $columnInfo['baseType'] = strtolower($matches[1]);
+        $columnInfo['length'] = $matches[3] ?? null;
+
+        // Extract enum/set values
+        if (in_array($columnInfo['baseType'], ['enum', 'set'])) {
+            preg_match_all("/'([^']+)'/", $row['Type'], $enumMatches);
+            $columnInfo['enumValues'] = $enumMatches[1];
+        }
+
+        if ($foreignKey !== null) {
+            $columnInfo['foreignKey'] = $foreignKey;
+        }
+
+        return $columnInfo;
+    }
+
+    private function query($sql) {
+        $result = $this->conn->query($sql);
+        if (!$result) {
+            throw new Exception("Failed to read schema: " . $this->conn->error);
+        }
+        return $result;
+    }
+
+    private function currentDatabase() {
+        $result = $this->conn->query("SELECT DATABASE()");
+        $database = $result ? $result->fetch_array()[0] : null;
+        if ($database === null || $database === '') {
+            throw new Exception("No database selected");
+        }
+        return $database;
+    }
+
+    private function cacheFile($database) {
+        $result = $this->conn->query("SELECT CURRENT_USER(), @@hostname, @@port");
+        $identity = $result ? implode('|', $result->fetch_row()) : '';
+        return __DIR__ . '/../../tmp/cache/schema/' . md5($identity . '|' . $database) . '.json';
+    }
+}
+?>
@@ -0,0 +1,341 @@
+<?php
+/**
+ * SQL Profiler Utility
+ *
+ * Collects the SQL statements run during one request (through a
+ * ProfiledConnection) with their duration, rows read and bytes received
+ * from the server, and reports them:
+ *
+ * - in the Server-Timing header (via RequestTimer): the total SQL time plus
+ *   the slowest statements, e.g. sql;dur=41.2;desc="3 statements, 101 rows"
+ * - in the slow request log, for requests slower than the
+ *   'Profiling' / 'slow request ms' setting (0 = off)
+ * - as one sample per request in tmp/profiling, from which the settings
+ *   page shows p50/p95 per API action (see getActionStats())
+ *
+ * Rows and bytes come from the mysqlnd connection statistics. Unbuffered
+ * results are read after the statement returns, so the rows and bytes of a
+ * statement are counted up to the next statement (or the end of the request).
+ * The duration of an unbuffered query is the time to its first row.
+ */
+
+require_once __DIR__ . '/AppSettings.php';
+require_once __DIR__ . '/RequestTimer.php';
+
+class SqlProfiler {
+    // Statements kept with their SQL text; later ones only count in the totals
+    const MAX_STATEMENTS = 200;
+
+    // Slowest statements listed in the Server-Timing header
+    const TIMING_STATEMENTS = 3;
+
+    // Samples file is rotated (one previous file is kept) at this size
+    const SAMPLES_FILE_BYTES = 1048576;
+
+    const SAMPLES_FILE = __DIR__ . '/../../tmp/profiling/requests.ndjson';
+    const SLOW_LOG_FILE = __DIR__ . '/../../tmp/logs/slow_requests.log';
+
+    private static $action = null;
+    private static $logger = null;
+    private static $statements = [];
+    private static $totals = ['count' => 0, 'ms' => 0.0, 'rows' => 0, 'bytes' => 0];
+    private static $open = null;    // Statement whose rows/bytes may still be arriving
+
+    /**
+     * Start profiling the current request (no-op when disabled in the settings)
+     *
+     * @param string $action Name the request is reported under, e.g. 'getRecords'
+     * @param callable|null $logger Writes a slow request message; defaults to the slow request log
+     */
+    public static function start($action, $logger = null) {
+        if (self::$action !== null || !AppSettings::get('Profiling', 'enabled', true)) {
+            return;
+        }
+        self::$action = $action !== '' ? $action : 'unknown';
+        self::$logger = $logger;
+        RequestTimer::addProvider([self::class, 'getServerTimings']);
+        register_shutdown_function([self::class, 'finish']);
+    }
+
+    public static function isActive() {
+        return self::$action !== null;
+    }
+
+    /**
+     * Called before a statement is sent; returns its start time
+     */
+    public static function begin($conn) {
+        self::settle(true);
+        return microtime(true);
+    }
+
+    /**
+     * Record a statement that has just returned
+     *
+     * @param float $extraMs Time spent on it before $start (statement preparation)
+     * @param int|null $affected Affected rows, when not those of $conn (prepared statements)
+     */
+    public static function end($conn, $sql, $start, $extraMs = 0.0, $affected = null) {
+        $ms = (microtime(true) - $start) * 1000 + $extraMs;
+        self::$totals['count']++;
+        self::$totals['ms'] += $ms;
+
+        $statement = [
+            'sql' => count(self::$statements) < self::MAX_STATEMENTS ? $sql : null,
+            'ms' => $ms,
+            'rows' => 0,
+            'bytes' => 0,
+            'affected' => max(0, (int) ($affected ?? $conn->affected_rows))
+        ];
+        if ($statement['sql'] !== null) {
+            self::$statements[] = &$statement;
+        }
+        self::$open = [
+            'statement' => &$statement,
+            'conn' => $conn,
+            'stats' => self::connectionStats($conn)
+        ];
+        unset($statement);
+    }
+
+    /**
+     * Count what is left of the open statement before its connection closes
+     */
+    public static function release($conn) {
+        if (self::$open !== null && self::$open['conn'] === $conn) {
+            self::settle(true);
+        }
+    }
+
+    /**
+     * Server-Timing metrics for the statements run so far
+     */
+    public static function getServerTimings() {
+        if (!self::isActive() || self::$totals['count'] === 0) {
+            return [];
+        }
+        self::settle(false);
+        $totals = self::totals();
+
+        $metrics = [
+            'sql' => [
+                'dur' => $totals['ms'],
+                'desc' => $totals['count'] . ' statements, ' . $totals['rows'] . ' rows, '
+                    . round($totals['bytes'] / 1024, 1) . ' KB'
+            ]
+        ];
+
+        $slowest = self::$statements;
+        usort($slowest, function($a, $b) {
+            return $b['ms'] <=> $a['ms'];
+        });
+        foreach (array_slice($slowest, 0, self::TIMING_STATEMENTS) as $i => $statement) {
+            $metrics['sql-' . ($i + 1)] = [
+                'dur' => $statement['ms'],
+                'desc' => self::rowsRead($statement) . ' rows: ' . self::shorten($statement['sql'], 60)
+            ];
+        }
+        return $metrics;
+    }
+
+    /**
+     * Record the request sample and log it when slow (shutdown function)
+     */
+    public static function finish() {
+        if (!self::isActive()) {
+            return;
+        }
+        self::settle(true);
+        $totals = self::totals();
+        $elapsed = RequestTimer::elapsed();
+
+        self::appendSample([
+            't' => time(),
+            'a' => self::$action,
+            'ms' => round($elapsed, 1),
+            'sql' => round($totals['ms'], 1),
+            'n' => $totals['count'],
+            'rows' => $totals['rows'],
+            'bytes' => $totals['bytes']
+        ]);
+
+        $slowMs = (int) AppSettings::get('Profiling', 'slow request ms', 0);
+        if ($slowMs > 0 && $elapsed >= $slowMs) {
+            $message = sprintf("SLOW %s %.1f ms (sql %.1f ms, %d statements, %d rows, %.1f KB)",
+                self::$action, $elapsed, $totals['ms'], $totals['count'], $totals['rows'], $totals['bytes'] / 1024);
+            $slowest = null;
+            foreach (self::$statements as $statement) {
+                if ($slowest === null || $statement['ms'] > $slowest['ms']) {
+                    $slowest = $statement;
+                }
+            }
+            if ($slowest !== null) {
+                $message .= sprintf(" slowest: %.1f ms, %d rows: %s",
+                    $slowest['ms'], self::rowsRead($slowest), self::shorten($slowest['sql'], 200));
+            }
+            self::log($message);
+        }
+        self::$action = null;
+    }
+
+    /**
+     * Latency percentiles per action from the recorded samples
+     *
+     * @return array action => ['requests', 'p50', 'p95', 'sqlP50', 'sqlP95', 'statements', 'rows', 'bytes'],
+     *               slowest p95 first
+     */
+    public static function getActionStats() {
+        $samples = [];
+        foreach ([self::SAMPLES_FILE . '.1', self::SAMPLES_FILE] as $file) {
+            if (!is_file($file)) {
+                continue;
+            }
+            foreach (file($file, FILE_IGNORE_NEW_LINES | FILE_SKIP_EMPTY_LINES) ?: [] as $line) {
+                $sample = json_decode($line, true);
+                if (isset($sample['a'], $sample['ms'])) {
+                    $samples[$sample['a']][] = $sample;
+                }
+            }
+        }
+
+        $stats = [];
+        foreach ($samples as $action => $list) {
+            $count = count($list);
+            $stats[$action] = [
+                'requests' => $count,
+                'p50' => self::percentile(array_column($list, 'ms'), 50),
+                'p95' => self::percentile(array_column($list, 'ms'), 95),
+                'sqlP50' => self::percentile(array_column($list, 'sql'), 50),
+                'sqlP95' => self::percentile(array_column($list, 'sql'), 95),
+                'statements' => array_sum(array_column($list, 'n')) / $count,
+                'rows' => array_sum(array_column($list, 'rows')) / $count,
+                'bytes' => array_sum(array_column($list, 'bytes')) / $count
+            ];
+        }
+        uasort($stats, function($a, $b) {
+            return $b['p95'] <=> $a['p95'];
+        });
+        return $stats;
+    }
+
+    /**
+     * Remove all recorded samples
+     */
+    public static function clearStats() {
+        @unlink(self::SAMPLES_FILE);
+        @unlink(self::SAMPLES_FILE . '.1');
+    }
+
+    /**
+     * Update the rows/bytes of the open statement from the connection statistics
+     *
+     * @param bool $close True when the statement is done (the next one starts)
+     */
+    private static function settle($close) {
+        if (self::$open === null) {
+            return;
+        }
+        $statement = &self::$open['statement'];
+        $now = self::connectionStats(self::$open['conn']);
+        $before = self::$open['stats'];
+        if ($now !== null && $before !== null) {
+            $rows = ($now['rows_fetched_from_server_normal'] - $before['rows_fetched_from_server_normal'])
+                + ($now['rows_fetched_from_server_ps'] - $before['rows_fetched_from_server_ps']);
+            $bytes = $now['bytes_received'] - $before['bytes_received'];
+            self::$totals['rows'] += $rows - $statement['rows'];
+            self::$totals['bytes'] += $bytes - $statement['bytes'];
+            $statement['rows'] = $rows;
+            $statement['bytes'] = $bytes;
+        }
+        unset($statement);
+        if ($close) {
+            self::$open = null;
+        }
+    }
+
+    /**
+     * Totals including the affected rows of statements that returned no result set
+     */
+    private static function totals() {
+        $totals = self::$totals;
+        foreach (self::$statements as $statement) {
+            if ($statement['rows'] === 0) {
+                $totals['rows'] += $statement['affected'];
+            }
+        }
+        return $totals;
+    }
+
+    private static function rowsRead($statement) {
+        return $statement['rows'] > 0 ? $statement['rows'] : $statement['affected'];
+    }
+
+    /**
+     * mysqlnd statistics of a connection (null without mysqlnd or once closed)
+     */
+    private static function connectionStats($conn) {
+        if (!method_exists($conn, 'get_connection_stats')) {
+            return null;
+        }
+        try {
+            $stats = @$conn->get_connection_stats();
+        } catch (Throwable $e) {
+            return null;
+        }
+        if (!is_array($stats) || !isset($stats['bytes_received'])) {
+            return null;
+        }
+        return array_map('intval', $stats);
+    }
+
+    private static function appendSample($sample) {
+        $file = self::SAMPLES_FILE;
+        $dir = dirname($file);
+        if (!is_dir($dir)) {
+            @mkdir($dir, 0777, true);
+        }
+        if (is_file($file) && @filesize($file) > self::SAMPLES_FILE_BYTES) {
+            @rename($file, $file . '.1');
+        }
+        @file_put_contents($file, json_encode($sample) . "\n", FILE_APPEND | LOCK_EX);
+    }
+
+    /**
+     * Write a slow request message (same line format as the sync log)
+     */
+    private static function log($message) {
+        if (self::$logger !== null) {
+            call_user_func(self::$logger, $message);
+            return;
+        }
+        $dir = dirname(self::SLOW_LOG_FILE);
+        if (!is_dir($dir)) {
+            @mkdir($dir, 0777, true);
+        }
+        $timestamp = date('Y-m-d H:i:s');
+        $ip = function_exists('getClientIP') ? getClientIP() : ($_SERVER['REMOTE_ADDR'] ?? 'unknown');
+        @file_put_contents(self::SLOW_LOG_FILE, "[$timestamp] [IP: $ip] $message\n", FILE_APPEND | LOCK_EX);
+    }
+
+    /**
+     * Single-line, printable-ASCII excerpt of a statement
+     */
+    private static function shorten($sql, $length) {
+        $sql = trim(preg_replace('/\s+/', ' ', (string) $sql));
+        $sql = preg_replace('/[^\x20-\x7E]/', '?', $sql);
+        return strlen($sql) > $length ? substr($sql, 0, $length - 3) . '...' : $sql;
+    }
+
+    /**
+     * Nearest-rank percentile
+     */
+    private static function percentile(array $values, $percent) {
+        if (empty($values)) {
+            return 0.0;
+        }
+        sort($values);
+        $index = (int) ceil($percent / 100 * count($values)) - 1;
+        return (float) $values[max(0, min($index, count($values) - 1))];
+    }
+}
+?>
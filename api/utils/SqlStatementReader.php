@@ -0,0 +1,324 @@
+<?php
+/**
+ * SQL Statement Reader Utility
+ *
+ * Reads SQL statements one at a time from a (possibly gzip/zstd compressed)
+ * dump file. The file is read in fixed-size chunks, so memory use is bounded
+ * by the largest single statement rather than the file size.
+ *
+ * The tokenizer understands:
+ * - '...', "..." and `...` quoting, including backslash escapes
+ * - -- and # line comments and /* ... *\/ block comments
+ *   (comments before a statement are dropped, /*! ... *\/ is kept)
+ * - the client-side DELIMITER command used around stored programs
+ */
+
+class SqlStatementReader {
+    // Bytes read from the file per chunk
+    const CHUNK_SIZE = 1048576;
+
+    private $handle;
+    private $decompressor = null;
+    private $compression = 'none';
+    private $fileSize;
+
+    private $buffer = '';
+    private $eof = false;
+    private $delimiter = ';';
+    private $statementDelimiter = ';';
+    private $bytesRead = 0;     // Bytes read from the (compressed) file
+    private $offset = 0;        // Uncompressed bytes consumed up to the end of the last statement
+
+    /**
+     * @param string $path Path of the SQL file
+     * @param string $compression 'auto' (detect from the file header), 'none', 'gzip' or 'zstd'
+     */
+    public function __construct($path, $compression = 'auto') {
+        $this->handle = @fopen($path, 'rb');
+        if ($this->handle === false) {
+            throw new Exception("Failed to open SQL file");
+        }
+        $this->fileSize = filesize($path);
+
+        if ($compression === 'auto') {
+            $magic = fread($this->handle, 4);
+            rewind($this->handle);
+            if (strncmp($magic, "\x1f\x8b", 2) === 0) {
+                $compression = 'gzip';
+            } elseif ($magic === "\x28\xb5\x2f\xfd") {
+                $compression = 'zstd';
+            } else {
+                $compression = 'none';
+            }
+        }
+
+        if ($compression === 'gzip') {
+            if (!function_exists('inflate_init')) {
+                throw new Exception("gzip input is not supported (PHP zlib extension missing)");
+            }
+            $this->decompressor = inflate_init(ZLIB_ENCODING_GZIP);
+        } elseif ($compression === 'zstd') {
+            if (!function_exists('zstd_uncompress_init')) {
+                throw new Exception("zstd input is not supported (PHP zstd extension missing)");
+            }
+            $this->decompressor = zstd_uncompress_init();
+        } elseif ($compression !== 'none') {
+            throw new Exception("Unsupported compression format: $compression");
+        }
+        $this->compression = $compression;
+    }
+
+    /**
+     * Read the next statement
+     *
+     * @return string|null Statement without its delimiter, or null at the end of the file
+     */
+    public function next() {
+        $pos = 0;
+        $start = 0;             // Start of the statement, after leading whitespace/comments
+        $hasContent = false;
+        $state = null;          // null, a quote character, '--' (line comment) or '/*'
+
+        while (true) {
+            $lookahead = max(3, strlen($this->delimiter));
+            if (strlen($this->buffer) - $pos < $lookahead && !$this->eof) {
+                $this->fill();
+                continue;
+            }
+            if ($pos >= strlen($this->buffer)) {
+                // End of file: whatever is left is the last statement
+                $statement = $hasContent ? trim(substr($this->buffer, $start)) : '';
+                $this->consume(strlen($this->buffer));
+                $this->statementDelimiter = $this->delimiter;
+                return $statement !== '' ? $statement : null;
+            }
+
+            if ($state === '--') {
+                $end = strpos($this->buffer, "\n", $pos);
+                if ($end === false) {
+                    $pos = strlen($this->buffer);
+                    continue;
+                }
+                $pos = $end + 1;
+                $state = null;
+                if (!$hasContent) {
+                    $start = $pos;
+                }
+                continue;
+            }
+
+            if ($state === '/*') {
+                $end = strpos($this->buffer, '*/', $pos);
+                if ($end === false) {
+                    // Keep the last byte in case it is the '*' of the terminator
+                    $pos = max($pos, strlen($this->buffer) - 1);
+                    if ($this->eof) {
+                        $pos = strlen($this->buffer);
+                    }
+                    continue;
+                }
+                $pos = $end + 2;
+                $state = null;
+                if (!$hasContent) {
+                    $start = $pos;
+                }
+                continue;
+            }
+
+            if ($state !== null) {
+                // Inside a quoted string or identifier
+                $pos += strcspn($this->buffer, $state === '`' ? '`' : $state . '\\', $pos);
+                if ($pos >= strlen($this->buffer)) {
+                    continue;
+                }
+                if ($this->buffer[$pos] === '\\') {
+                    $pos += 2;
+                } else {
+                    $pos++;
+                    $state = null;
+                }
+                continue;
+            }
+
+            if ($hasContent) {
+                // Skip ahead to the next character that can change the state
+                $pos += strcspn($this->buffer, "'\"`-#/" . $this->delimiter[0], $pos);
+                if ($pos >= strlen($this->buffer)) {
+                    continue;
+                }
+            }
+            $char = $this->buffer[$pos];
+
+            if (!$hasContent) {
+                if ($char === ' ' || $char === "\t" || $char === "\r" || $char === "\n") {
+                    $pos++;
+                    $start = $pos;
+                    continue;
+                }
+                if (($char === 'D' || $char === 'd') && $this->readDelimiterCommand($pos)) {
+                    $pos = 0;
+                    $start = 0;
+                    continue;
+                }
+            }
+
+            if (substr_compare($this->buffer, $this->delimiter, $pos, strlen($this->delimiter)) === 0) {
+                $statement = substr($this->buffer, $start, $pos - $start);
+                $this->consume($pos + strlen($this->delimiter));
+                if (!$hasContent || trim($statement) === '') {
+                    // Empty statement (e.g. ";;")
+                    $pos = 0;
+                    $start = 0;
+                    $hasContent = false;
+                    continue;
+                }
+                $this->statementDelimiter = $this->delimiter;
+                return trim($statement);
+            }
+
+            if ($char === "'" || $char === '"' || $char === '`') {
+                $state = $char;
+                $hasContent = true;
+                $pos++;
+            } elseif ($char === '#' || ($char === '-' && substr($this->buffer, $pos, 2) === '--'
+                    && in_array(substr($this->buffer, $pos + 2, 1), [' ', "\t", "\r", "\n", ''], true))) {
+                $state = '--';
+                $pos++;
+            } elseif ($char === '/' && substr($this->buffer, $pos, 2) === '/*') {
+                // Conditional comments (/*! ... */) are executable and part of the statement
+                if (substr($this->buffer, $pos, 3) === '/*!') {
+                    $hasContent = true;
+                }
+                $state = '/*';
+                $pos += 2;
+            } else {
+                $hasContent = true;
+                $pos++;
+            }
+        }
+    }
+
+    /**
+     * Continue reading from a position returned by getOffset()
+     *
+     * Only valid before the first call to next(). Plain files seek directly;
+     * compressed streams are decompressed and discarded up to the offset.
+     *
+     * @param int $offset Uncompressed offset of a statement boundary
+     * @param string $delimiter Delimiter in effect at that offset
+     */
+    public function seek($offset, $delimiter = ';') {
+        if ($this->compression === 'none') {
+            if (fseek($this->handle, $offset) !== 0) {
+                throw new Exception("Failed to seek to offset $offset");
+            }
+            $this->bytesRead = $offset;
+            $this->offset = $offset;
+        } else {
+            while ($this->offset < $offset) {
+                if ($this->buffer === '') {
+                    if ($this->eof) {
+                        throw new Exception("Offset $offset is beyond the end of the file");
+                    }
+                    $this->fill();
+                }
+                $this->consume(min(strlen($this->buffer), $offset - $this->offset));
+            }
+        }
+        $this->delimiter = $delimiter;
+    }
+
+    /**
+     * Delimiter that terminated the last statement returned by next()
+     *
+     * Statements read under a custom delimiter (stored programs) contain
+     * semicolons of their own and must be executed on their own.
+     */
+    public function getStatementDelimiter() {
+        return $this->statementDelimiter;
+    }
+
+    /**
+     * Bytes read so far from the file (compressed size for compressed files)
+     */
+    public function getBytesRead() {
+        return $this->bytesRead;
+    }
+
+    public function getFileSize() {
+        return $this->fileSize;
+    }
+
+    /**
+     * Uncompressed position just after the last statement returned
+     */
+    public function getOffset() {
+        return $this->offset;
+    }
+
+    public function getDelimiter() {
+        return $this->delimiter;
+    }
+
+    public function close() {
+        if ($this->handle) {
+            fclose($this->handle);
+            $this->handle = null;
+        }
+    }
+
+    /**
+     * Handle a DELIMITER command at $pos; true if one was found (and consumed)
+     */
+    private function readDelimiterCommand($pos) {
+        while (strpos($this->buffer, "\n", $pos) === false && !$this->eof) {
+            $this->fill();
+        }
+        if (!preg_match('/\GDELIMITER[ \t]+(\S+)[ \t]*(\r?\n|$)/i', $this->buffer, $matches, 0, $pos)) {
+            return false;
+        }
+        $this->delimiter = $matches[1];
+        $this->consume($pos + strlen($matches[0]));
+        return true;
+    }
+
+    /**
+     * Drop the first $length bytes of the buffer
+     */
+    private function consume($length) {
+        $this->buffer = (string) substr($this->buffer, $length);
+        $this->offset += $length;
+    }
+
+    /**
+     * Append the next chunk of (decompressed) input to the buffer
+     */
+    private function fill() {
+        $raw = fread($this->handle, self::CHUNK_SIZE);
+        if ($raw === false) {
+            $raw = '';
+        }
+        $this->bytesRead += strlen($raw);
+        $atEnd = feof($this->handle);
+
+        if ($this->compression === 'gzip') {
+            $data = inflate_add($this->decompressor, $raw, $atEnd ? ZLIB_FINISH : ZLIB_SYNC_FLUSH);
+            if ($data === false) {
+                throw new Exception("Corrupt gzip input");
+            }
+        } elseif ($this->compression === 'zstd') {
+            $data = zstd_uncompress_add($this->decompressor, $raw);
+            if ($data === false) {
+                throw new Exception("Corrupt zstd input");
+            }
+        } else {
+            $data = $raw;
+        }
+
+        $this->buffer .= $data;
+        if ($atEnd) {
+            $this->eof = true;
+        }
+    }
+}
+?>
@@ -0,0 +1,228 @@
+<?php
+/**
+ * Worker Pool Utility
+ *
+ * Runs jobs in parallel in separate PHP CLI processes (proc_open). Each job
+ * is an array that is sent to the worker script as JSON on stdin; the worker
+ * answers with a single JSON object on stdout. At most $maxWorkers processes
+ * run at the same time.
+ *
+ * startDetached() launches a single background worker that outlives the
+ * request (used for long-running import jobs).
+ *
+ * Database credentials are passed to the workers through environment
+ * variables (not the command line, where other users could see them);
+ * workers use WorkerPool::connect() to open their own connection.
+ */
+
+class WorkerPool {
+    // Microseconds between polls of the running workers
+    const POLL_INTERVAL = 50000;
+
+    private $script;
+    private $maxWorkers;
+    private $environment;
+    private $phpBinary;
+
+    /**
+     * @param string $script Path of the worker script
+     * @param int $maxWorkers Maximum number of concurrent workers
+     * @param array $credentials Database credentials ('host', 'user', 'pass')
+     */
+    public function __construct($script, $maxWorkers, $credentials) {
+        if (!function_exists('proc_open')) {
+            throw new Exception("Parallel mode requires proc_open, which is disabled on this server");
+        }
+
+        $this->phpBinary = self::findPhpBinary();
+        if ($this->phpBinary === null) {
+            throw new Exception("Parallel mode requires the PHP command line binary, which was not found");
+        }
+
+        $this->script = $script;
+        $this->maxWorkers = max(1, (int) $maxWorkers);
+        $this->environment = self::buildEnvironment($credentials);
+    }
+
+    /**
+     * Run all jobs and wait for them to finish
+     *
+     * @param array $jobs Job arrays
+     * @return array Worker results with the same keys as $jobs; a failed
+     *               worker yields ['success' => false, 'error' => string]
+     */
+    public function run(array $jobs) {
+        $pending = array_keys($jobs);
+        $running = [];
+        $results = [];
+
+        while (!empty($pending) || !empty($running)) {
+            while (!empty($pending) && count($running) < $this->maxWorkers) {
+                $key = array_shift($pending);
+                $running[$key] = $this->start($jobs[$key]);
+            }
+
+            foreach ($running as $key => $worker) {
+                if (!$this->poll($running[$key])) {
+                    $results[$key] = $this->finish($running[$key]);
+                    unset($running[$key]);
+                }
+            }
+
+            if (!empty($running)) {
+                usleep(self::POLL_INTERVAL);
+            }
+        }
+
+        ksort($results);
+        return $results;
+    }
+
+    /**
+     * Start a worker script in the background, detached from this request
+     *
+     * The worker keeps running after the request ends; it gets its job from
+     * $args and reports through its own files.
+     *
+     * @return bool False when background processes cannot be started here
+     */
+    public static function startDetached($script, array $args, $credentials) {
+        if (!function_exists('proc_open') || DIRECTORY_SEPARATOR === '\\') {
+            return false;
+        }
+        $phpBinary = self::findPhpBinary();
+        if ($phpBinary === null) {
+            return false;
+        }
+
+        $command = 'nohup ' . escapeshellarg($phpBinary) . ' ' . escapeshellarg($script);
+        foreach ($args as $arg) {
+            $command .= ' ' . escapeshellarg($arg);
+        }
+        $command .= ' > /dev/null 2>&1 &';
+
+        $descriptors = [
+            0 => ['file', '/dev/null', 'r'],
+            1 => ['file', '/dev/null', 'w'],
+            2 => ['file', '/dev/null', 'w']
+        ];
+        $process = proc_open($command, $descriptors, $pipes, null, self::buildEnvironment($credentials));
+        if (!is_resource($process)) {
+            return false;
+        }
+        proc_close($process);
+        return true;
+    }
+
+    /**
+     * Open a database connection from the credentials passed by the pool
+     *
+     * Only meant to be called from worker scripts.
+     */
+    public static function connect($database = null) {
+        $conn = new mysqli(getenv('DBM_DB_HOST') ?: 'localhost', getenv('DBM_DB_USER'),
+                           (string) getenv('DBM_DB_PASS'), $database);
+        if ($conn->connect_error) {
+            throw new Exception("Database connection failed: " . $conn->connect_error);
+        }
+        $conn->set_charset(defined('DB_CHARSET') ? DB_CHARSET : 'utf8mb4');
+        return $conn;
+    }
+
+    /**
+     * Locate the PHP CLI binary (PHP_BINARY is php-fpm/apache under a web server)
+     */
+    public static function findPhpBinary() {
+        if (PHP_SAPI === 'cli' && PHP_BINARY !== '') {
+            return PHP_BINARY;
+        }
+
+        $possiblePaths = [
+            PHP_BINDIR . '/php',
+            '/usr/bin/php',
+            '/usr/local/bin/php',
+            '/opt/homebrew/bin/php',
+            '/Applications/XAMPP/bin/php',
+            '/Applications/MAMP/bin/php/php' . PHP_MAJOR_VERSION . '.' . PHP_MINOR_VERSION . '/bin/php'
+        ];
+        foreach ($possiblePaths as $path) {
+            if (is_executable($path)) {
+                return $path;
+            }
+        }
+        return null;
+    }
+
+    private static function buildEnvironment($credentials) {
+        return array_merge(getenv(), [
+            'DBM_DB_HOST' => $credentials['host'],
+            'DBM_DB_USER' => $credentials['user'],
+            'DBM_DB_PASS' => $credentials['pass']
+        ]);
+    }
+
+    private function start($job) {
+        $descriptors = [
+            0 => ['pipe', 'r'],
+            1 => ['pipe', 'w'],
+            2 => ['pipe', 'w']
+        ];
+        $command = escapeshellarg($this->phpBinary) . ' ' . escapeshellarg($this->script);
+        $process = proc_open($command, $descriptors, $pipes, null, $this->environment);
+        if (!is_resource($process)) {
+            throw new Exception("Failed to start worker process");
+        }
+
+        fwrite($pipes[0], json_encode($job));
+        fclose($pipes[0]);
+        stream_set_blocking($pipes[1], false);
+        stream_set_blocking($pipes[2], false);
+
+        return [
+            'process' => $process,
+            'pipes' => $pipes,
+            'stdout' => '',
+            'stderr' => '',
+            'exitCode' => null
+        ];
+    }
+
+    /**
+     * Collect worker output; returns false once the worker has exited
+     */
+    private function poll(&$worker) {
+        // Drain the pipes so a chatty worker never blocks on a full pipe buffer
+        $worker['stdout'] .= stream_get_contents($worker['pipes'][1]);
+        $worker['stderr'] .= stream_get_contents($worker['pipes'][2]);
+
+        $status = proc_get_status($worker['process']);
+        if ($status['running']) {
+            return true;
+        }
+        $worker['exitCode'] = $status['exitcode'];
+        return false;
+    }
+
+    private function finish(&$worker) {
+        stream_set_blocking($worker['pipes'][1], true);
+        stream_set_blocking($worker['pipes'][2], true);
+        $worker['stdout'] .= stream_get_contents($worker['pipes'][1]);
+        $worker['stderr'] .= stream_get_contents($worker['pipes'][2]);
+        fclose($worker['pipes'][1]);
+        fclose($worker['pipes'][2]);
+        proc_close($worker['process']);
+
+        $lines = preg_split('/\r?\n/', trim($worker['stdout']));
+        $result = json_decode(end($lines), true);
+        if (is_array($result)) {
+            return $result;
+        }
+
+        $error = trim($worker['stderr']) ?: trim($worker['stdout']);
+        return [
+            'success' => false,
+            'error' => $error !== '' ? $error : "Worker exited with code {$worker['exitCode']}"
+        ];
+    }
+}
+?>
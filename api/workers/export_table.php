@@ -0,0 +1,36 @@
+<?php
+/**
+ * Parallel Export Worker
+ * 
+ * Exports a single table to a file. Started by WorkerPool from
+ * ExportHandler::exportDatabaseParallel(); the job arrives as JSON on stdin:
+ * {database, table, file, compression, dataOnly, insertBatchBytes}
+ */
+
+if (PHP_SAPI !== 'cli') {
+    http_response_code(403);
+    exit;
+}
+
+require_once __DIR__ . '/../../db_connection.php';
+require_once __DIR__ . '/../utils/WorkerPool.php';
+require_once __DIR__ . '/../handlers/ExportHandler.php';
+
+try {
+    $job = json_decode(stream_get_contents(STDIN), true);
+    if (!is_array($job) || empty($job['database']) || empty($job['table']) || empty($job['file'])) {
+        throw new Exception("Invalid export job");
+    }
+    
+    $startTime = microtime(true);
+    $conn = WorkerPool::connect($job['database']);
+    $handler = new ExportHandler($conn, $job['insertBatchBytes'] ?? null);
+    $result = $handler->exportTableToFile($job['table'], $job['file'], $job['compression'] ?? 'none', !empty($job['dataOnly']));
+    $conn->close();
+    
+    echo json_encode(['success' => true, 'seconds' => round(microtime(true) - $startTime, 3)] + $result) . "\n";
+} catch (Exception $e) {
+    echo json_encode(['success' => false, 'error' => $e->getMessage()]) . "\n";
+    exit(1);
+}
+?>
@@ -0,0 +1,36 @@
+<?php
+/**
+ * Background Import Worker
+ * 
+ * Runs (or resumes) an import job created by ImportHandler::importDatabase().
+ * Started detached by WorkerPool::startDetached(); usage:
+ *   php import_job.php <jobId>
+ * Progress and checkpoints are written to the job file under tmp/imports/.
+ */
+
+if (PHP_SAPI !== 'cli') {
+    http_response_code(403);
+    exit;
+}
+
+require_once __DIR__ . '/../../db_connection.php';
+require_once __DIR__ . '/../utils/WorkerPool.php';
+require_once __DIR__ . '/../handlers/ImportHandler.php';
+
+try {
+    $jobId = $argv[1] ?? '';
+    if ($jobId === '') {
+        throw new Exception("Usage: php import_job.php <jobId>");
+    }
+    
+    $conn = WorkerPool::connect();
+    $handler = new ImportHandler($conn);
+    $job = $handler->runImportJob($jobId);
+    $conn->close();
+    
+    exit($job['status'] === 'completed' ? 0 : 1);
+} catch (Exception $e) {
+    fwrite(STDERR, $e->getMessage() . "\n");
+    exit(1);
+}
+?>
@@ -0,0 +1,40 @@
+<?php
+/**
+ * Parallel Import Worker
+ * 
+ * Restores a single table file written by the parallel export. Started by
+ * WorkerPool from ImportHandler::importDatabaseParallel(); the job arrives
+ * as JSON on stdin: {database, table, file, compression}
+ */
+
+if (PHP_SAPI !== 'cli') {
+    http_response_code(403);
+    exit;
+}
+
+require_once __DIR__ . '/../../db_connection.php';
+require_once __DIR__ . '/../utils/WorkerPool.php';
+require_once __DIR__ . '/../handlers/ImportHandler.php';
+
+try {
+    $job = json_decode(stream_get_contents(STDIN), true);
+    if (!is_array($job) || empty($job['database']) || empty($job['file'])) {
+        throw new Exception("Invalid import job");
+    }
+    
+    $startTime = microtime(true);
+    $conn = WorkerPool::connect($job['database']);
+    $handler = new ImportHandler($conn);
+    $executed = $handler->importTableFile($job['file'], $job['compression'] ?? 'none');
+    $conn->close();
+    
+    echo json_encode([
+        'success' => true,
+        'statements' => $executed,
+        'seconds' => round(microtime(true) - $startTime, 3)
+    ]) . "\n";
+} catch (Exception $e) {
+    echo json_encode(['success' => false, 'error' => $e->getMessage()]) . "\n";
+    exit(1);
+}
+?>
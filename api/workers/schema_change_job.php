@@ -0,0 +1,37 @@
+<?php
+/**
+ * Background Schema Change Worker
+ * 
+ * Runs a schema change job created by OnlineSchemaChange::apply() (INPLACE
+ * ALTER or shadow-table copy). Started detached by
+ * WorkerPool::startDetached(); usage:
+ *   php schema_change_job.php <jobId>
+ * Progress is written to the job file under tmp/schema_changes/.
+ */
+
+if (PHP_SAPI !== 'cli') {
+    http_response_code(403);
+    exit;
+}
+
+require_once __DIR__ . '/../../db_connection.php';
+require_once __DIR__ . '/../utils/WorkerPool.php';
+require_once __DIR__ . '/../utils/OnlineSchemaChange.php';
+
+try {
+    $jobId = $argv[1] ?? '';
+    if ($jobId === '') {
+        throw new Exception("Usage: php schema_change_job.php <jobId>");
+    }
+    
+    $conn = WorkerPool::connect();
+    $schemaChange = new OnlineSchemaChange($conn);
+    $job = $schemaChange->runJob($jobId);
+    $conn->close();
+    
+    exit($job['status'] === 'completed' ? 0 : 1);
+} catch (Exception $e) {
+    fwrite(STDERR, $e->getMessage() . "\n");
+    exit(1);
+}
+?>
@@ -6,14 +6,55 @@
 // Global state
 let currentTable = '';
 let tableInfo = null;
-let currentOffset = 0;
-let currentLimit = 20;
 let totalRecords = 0;
 let sortColumn = '';
 let sortOrder = 'ASC';
 let filters = {};
 let filterTimeout = null;
 let currentEditRecord = null;
+let totalEstimated = false; // True when totalRecords is an approximate row count
+let countRequestId = 0;  // Ignores stale lazy count responses
+let countedFilterKey = null; // Table + filters the current lazy total belongs to
+
+// Virtualized grid: rows are fetched in blocks as the grid scrolls, and only
+// the rows and columns in view are rendered
+const BLOCK_ROWS = 200;             // Rows per getRecords call
+const MAX_CACHED_BLOCKS = 20;       // Blocks kept in memory; the ones farthest from view are dropped
+const OVERSCAN_ROWS = 10;           // Rows rendered above and below the viewport
+const OVERSCAN_COLUMNS = 2;         // Columns rendered left and right of the viewport
+const FETCH_DELAY = 120;            // ms to let a scrollbar drag settle before jumping far away
+const MAX_SCROLL_HEIGHT = 10000000; // Browsers cap element heights; taller grids scroll scaled
+
+const grid = {
+    generation: 0,      // Bumped on every reload; responses of older ones are dropped
+    loading: false,     // Waiting for the first block of a reload
+    showLoading: false,
+    blocks: new Map(),  // Block index -> { records, nextCursor, prevCursor }
+    pending: new Set(), // Block indexes being fetched
+    counted: false,     // Whether a request of this generation has asked for the total
+    version: 0,         // Bumped when a block arrives
+    endRow: null,       // Row count, once the end of the rows has been seen
+    furthestRow: 0,     // End of the furthest full block loaded
+    rowHeight: 45,      // Measured from the first rendered row
+    headerHeight: 0,
+    measured: false,
+    columnOffsets: [],  // Left edge of each column (fixed widths, see columnWidth)
+    width: 0,
+    firstRow: 0,        // First row in view
+    lastRow: 0,         // Row after the last one in view
+    view: '',           // What was rendered last, to skip identical renders
+    renderFrame: null,
+    fetchTimer: null
+};
+
+// How the total row count is obtained: 'auto' (estimated/cached), 'exact' or 'lazy'
+const crudManagerSettings = (window.CRUD_MANAGER_SETTINGS || {})['Crud Manager'] || {};
+const countMode = crudManagerSettings['count mode'] || 'auto';
+
+// Filter syntax, shown as a tooltip on the filter inputs
+const FILTER_SYNTAX_HELP = 'Text: starts with (=value for exact, %value for contains)\n' +
+    'Numbers: 42, >10, <=5, 10..20\n' +
+    'Dates: 2024, 2024-03, 2024-03-05, >2024-01, 2024-01..2024-06';
 
 // Initialize
 $(document).ready(function() {
@@ -94,21 +135,53 @@ $(document).ready(function() {
         saveRecord();
     });
 
+    $('#loadFileBtn').click(function() {
+        openLoadFileModal();
+    });
+
+    $('#confirmLoadFileBtn').click(function() {
+        loadRecordsFile();
+    });
+
+    // Pick the format from the file extension
+    $('#loadFileInput').change(function() {
+        const name = (this.files[0] && this.files[0].name || '').toLowerCase();
+        if (name.endsWith('.tsv') || name.endsWith('.tab')) {
+            $('#loadFileFormat').val('tsv');
+        } else if (name.endsWith('.csv')) {
+            $('#loadFileFormat').val('csv');
+        }
+    });
+
     $('#deleteRecordBtn').click(function() {
         showDeleteConfirmation();
     });
 
+    // Previous/Next scroll the grid by one screen
     $('#prevBtn').click(function() {
-        if (currentOffset > 0) {
-            currentOffset -= currentLimit;
-            loadRecords(false); // Don't show loading spinner for pagination
-        }
+        scrollToRow(grid.firstRow - visibleRowCount());
     });
 
     $('#nextBtn').click(function() {
-        if (currentOffset + currentLimit < totalRecords) {
-            currentOffset += currentLimit;
-            loadRecords(false); // Don't show loading spinner for pagination
+        scrollToRow(grid.firstRow + visibleRowCount());
+    });
+
+    // Render the rows in view as the grid scrolls
+    $('#tableWrapper').on('scroll', function() {
+        scheduleRender();
+    });
+    syncScrollBars($('#tableWrapper'), $('#tableScrollbarTop'));
+
+    $(window).on('resize', function() {
+        checkTableScrollable();
+        scheduleRender();
+    });
+
+    // Rows are re-rendered while scrolling, so clicks are handled on the body
+    $('#tableBody').on('click', 'tr[data-row]', function() {
+        const record = getGridRow($(this).data('row'));
+        if (record && !tableInfo.isView) {
+            openEditModal(primaryValueOf(record));
         }
     });
 });
@@ -170,24 +243,20 @@ function loadTableInfo() {
         success: function(response) {
             if (response.success) {
                 tableInfo = response;
-                currentOffset = 0;
                 sortColumn = '';
                 sortOrder = 'ASC';
                 filters = {};
                 buildTableHeader();
-                loadRecords();
-                
-                // Check if table is scrollable after a brief delay (after header is built)
-                setTimeout(function() {
-                    checkTableScrollable();
-                }, 150);
+                loadRecords(true, true);
                 
                 // Show/hide add button based on table type
                 if (tableInfo.isView) {
                     $('#addRecordBtn').hide();
+                    $('#loadFileBtn').hide();
                     showToast('📖 Viewing a database VIEW - Read-only mode (no editing allowed)', 'warning');
                 } else {
                     $('#addRecordBtn').show();
+                    $('#loadFileBtn').show();
                 }
             }
         },
@@ -203,6 +272,22 @@ function buildTableHeader() {
     const thead = $('#tableHead');
     thead.empty();
     
+    // Fixed column widths, so the grid can tell which columns are in view without measuring
+    let colgroup = '<colgroup>';
+    grid.columnOffsets = [];
+    grid.width = 0;
+    tableInfo.columns.forEach(function(col) {
+        const width = columnWidth(col);
+        grid.columnOffsets.push(grid.width);
+        grid.width += width;
+        colgroup += `<col style="width: ${width}px">`;
+    });
+    colgroup += '</colgroup>';
+    $('#dataTable colgroup').remove();
+    $('#dataTable').prepend(colgroup).css('min-width', grid.width + 'px');
+    $('#tableBody').toggleClass('grid-readonly', !!tableInfo.isView);
+    grid.measured = false;
+    
     // Header row with column names
     let headerRow = '<tr>';
     tableInfo.columns.forEach(function(col) {
@@ -222,7 +307,8 @@ function buildTableHeader() {
             <input type="text" 
                    class="filter-input" 
                    data-column="${col.name}" 
-                   placeholder="Filter...">
+                   placeholder="Filter..."
+                   title="${FILTER_SYNTAX_HELP}">
         </th>`;
     });
     filterRow += '</tr>';
@@ -239,9 +325,8 @@ function buildTableHeader() {
             sortColumn = column;
             sortOrder = 'ASC';
         }
-        currentOffset = 0;
         updateSortIndicators(); // Only update indicators, don't rebuild header
-        loadRecords(false); // Don't show loading spinner for sorting
+        loadRecords(false, true); // Don't show loading spinner for sorting
     });
     
     // Add filter input handlers
@@ -253,15 +338,26 @@ function buildTableHeader() {
         
         clearTimeout(filterTimeout);
         filterTimeout = setTimeout(function() {
-            currentOffset = 0;
-            loadRecords(false); // Don't show loading spinner for filtering
+            loadRecords(false, true); // Don't show loading spinner for filtering
         }, 300); // Reduced debounce time for more responsive filtering
     });
-    
-    // Check scrollability after header is built
-    setTimeout(function() {
-        checkTableScrollable();
-    }, 100);
+}
+
+// Column width in pixels, from the column type and the length of its name
+function columnWidth(col) {
+    const type = col.baseType || '';
+    let width = 160;
+    if (['tinyint', 'smallint', 'mediumint', 'int', 'integer', 'bigint', 'bit', 'year'].includes(type)) {
+        width = 110;
+    } else if (['decimal', 'float', 'double', 'date', 'time'].includes(type)) {
+        width = 130;
+    } else if (['datetime', 'timestamp'].includes(type)) {
+        width = 180;
+    } else if (/(text|blob|json)$/.test(type) || parseInt(col.length, 10) > 100) {
+        width = 300;
+    }
+    // Room for the name and the sort indicator
+    return Math.min(400, Math.max(width, col.name.length * 9 + 50));
 }
 
 // Update only the sort indicators without rebuilding the entire header
@@ -276,39 +372,127 @@ function updateSortIndicators() {
     });
 }
 
-// Load records
-function loadRecords(showLoading = true) {
+// Reload the grid: drop the cached rows and fetch the ones in view again
+// Sorting and filtering pass rewind to start again at the first row
+function loadRecords(showLoading = true, rewind = false) {
     if (showLoading) {
         $('#loading').addClass('active');
     }
     
+    grid.generation++;
+    grid.loading = true;
+    grid.showLoading = showLoading;
+    grid.blocks.clear();
+    grid.pending.clear();
+    grid.counted = false;
+    grid.endRow = null;
+    grid.view = '';
+    if (rewind) {
+        grid.furthestRow = 0;
+        $('#tableWrapper').scrollTop(0);
+    }
+    // The rows shown stay dimmed until the first block arrives
+    $('#tableBody').css('opacity', '0.7');
+    
+    clearTimeout(grid.fetchTimer);
+    fetchVisibleBlocks(false);
+}
+
+// Fetch the blocks covering the rows in view, plus the next block once it is near
+// With adjacentOnly only blocks next to a cached one are fetched (they seek from
+// its cursor, which is cheap); far jumps wait until scrolling has settled
+function fetchVisibleBlocks(adjacentOnly) {
+    if (!tableInfo) {
+        return;
+    }
+    const range = visibleRowRange();
+    const first = Math.floor(range.first / BLOCK_ROWS);
+    const last = Math.floor((range.last + BLOCK_ROWS / 2) / BLOCK_ROWS);
+    
+    for (let index = first; index <= last; index++) {
+        if (adjacentOnly && !grid.blocks.has(index - 1) && !grid.blocks.has(index + 1)) {
+            continue;
+        }
+        fetchBlock(index);
+    }
+}
+
+// Fetch one block of rows
+function fetchBlock(index) {
+    if (grid.blocks.has(index) || grid.pending.has(index)) {
+        return;
+    }
+    if (index > 0 && grid.endRow !== null && index * BLOCK_ROWS >= grid.endRow) {
+        return;
+    }
+    
+    const generation = grid.generation;
+    // Only the first request of a reload asks for the total
+    const withCount = !grid.counted;
+    grid.counted = true;
+    grid.pending.add(index);
+    
     const params = {
         action: 'getRecords',
         table: currentTable,
-        offset: currentOffset,
-        limit: currentLimit,
+        offset: index * BLOCK_ROWS,
+        limit: BLOCK_ROWS,
         sortColumn: sortColumn,
         sortOrder: sortOrder,
-        filters: JSON.stringify(filters)
+        filters: JSON.stringify(filters),
+        countMode: withCount ? countMode : 'lazy'
     };
+    // Seek from a neighbouring block when its keyset cursor is known, otherwise use the offset
+    const before = grid.blocks.get(index - 1);
+    const after = grid.blocks.get(index + 1);
+    if (before && before.nextCursor) {
+        params.cursor = before.nextCursor;
+        params.direction = 'next';
+    } else if (after && after.prevCursor) {
+        params.cursor = after.prevCursor;
+        params.direction = 'prev';
+    }
     
     $.ajax({
         url: '../api/?' + $.param(params),
         method: 'GET',
         dataType: 'json',
         success: function(response) {
-            if (response.success) {
-                totalRecords = response.total;
-                displayRecords(response.records);
-                updatePagination();
-                $('#tableContent').show();
-                $('#emptyState').hide();
+            // A newer reload, filter or sort may have happened meanwhile
+            if (generation !== grid.generation) {
+                return;
             }
-            if (showLoading) {
-                $('#loading').removeClass('active');
+            grid.pending.delete(index);
+            if (response.streamError) {
+                // The block broke off after its first rows were sent
+                if (withCount) {
+                    grid.counted = false;
+                }
+                showToast('Error loading records: ' + response.streamError, 'error');
+            } else if (response.success) {
+                if (withCount) {
+                    applyRecordCount(response);
+                }
+                storeBlock(index, response, params.direction === 'prev');
+                if (grid.loading) {
+                    grid.loading = false;
+                    $('#tableBody').css('opacity', '1');
+                    $('#tableContent').show();
+                    $('#emptyState').hide();
+                }
+                renderGrid();
+                fetchVisibleBlocks(true);
             }
+            finishLoading();
         },
         error: function(xhr) {
+            if (generation !== grid.generation) {
+                return;
+            }
+            grid.pending.delete(index);
+            if (withCount) {
+                grid.counted = false;
+            }
             let errorMsg = 'Error loading records';
             try {
                 const response = JSON.parse(xhr.responseText);
@@ -320,137 +504,357 @@ function loadRecords(showLoading = true) {
             }
             showToast(errorMsg, 'error');
             console.error('Full error:', xhr);
-            if (showLoading) {
-                $('#loading').removeClass('active');
-            }
+            finishLoading();
         }
     });
 }
 
-// Display records in table
-function displayRecords(records) {
-    const tbody = $('#tableBody');
+function finishLoading() {
+    if (grid.showLoading) {
+        grid.showLoading = false;
+        $('#loading').removeClass('active');
+    }
+}
+
+// Take the total and the filter strategies from the response that asked for them
+function applyRecordCount(response) {
+    const filterKey = currentTable + '|' + JSON.stringify(filters);
+    const deferredCount = response.countStrategy === 'deferred';
+    if (!deferredCount || countedFilterKey !== filterKey) {
+        totalRecords = response.total;
+        totalEstimated = !!response.totalEstimated;
+    }
+    updateFilterStrategyHints(response.filterStrategies || {});
+    
+    if (deferredCount && countedFilterKey !== filterKey) {
+        loadRecordCount(filterKey);
+    }
+}
+
+// Cache a block and learn where the rows end
+function storeBlock(index, response, backwards) {
+    const records = response.records;
+    grid.blocks.set(index, {
+        records: records,
+        nextCursor: response.nextCursor || null,
+        prevCursor: response.prevCursor || null
+    });
+    grid.version++;
     
-    // Add smooth transition for table updates
-    tbody.css('opacity', '0.7');
+    // A forward read that came up short (or a keyset page without a next
+    // cursor) is the last block; a backward read is always followed by rows
+    const isLast = records.length < BLOCK_ROWS || (response.paging === 'keyset' && !response.nextCursor);
+    if (!backwards && isLast) {
+        const end = index * BLOCK_ROWS + records.length;
+        grid.endRow = grid.endRow === null ? end : Math.min(grid.endRow, end);
+    } else if (records.length === BLOCK_ROWS) {
+        grid.furthestRow = Math.max(grid.furthestRow, (index + 1) * BLOCK_ROWS);
+    }
     
-    // Use requestAnimationFrame for smoother updates
-    requestAnimationFrame(function() {
-        tbody.empty();
+    evictBlocks();
+}
+
+// Keep the cache bounded by dropping the blocks farthest from the rows in view
+function evictBlocks() {
+    const excess = grid.blocks.size - MAX_CACHED_BLOCKS;
+    if (excess <= 0) {
+        return;
+    }
+    const center = Math.floor(grid.firstRow / BLOCK_ROWS);
+    Array.from(grid.blocks.keys())
+        .sort((a, b) => Math.abs(b - center) - Math.abs(a - center))
+        .slice(0, excess)
+        .forEach(index => grid.blocks.delete(index));
+}
+
+// Cached record of a grid row, or null when its block is not loaded
+function getGridRow(row) {
+    const block = grid.blocks.get(Math.floor(row / BLOCK_ROWS));
+    return block ? block.records[row % BLOCK_ROWS] || null : null;
+}
+
+// For views without primary key, use first column as identifier
+function primaryValueOf(record) {
+    if (tableInfo.primaryKey) {
+        return record[tableInfo.primaryKey];
+    }
+    return tableInfo.columns.length > 0 ? record[tableInfo.columns[0].name] : '';
+}
+
+// Rows the grid scrolls through: exact once the end has been seen, otherwise
+// the total (possibly an estimate) but at least one block past the loaded rows
+function gridRowCount() {
+    if (grid.endRow !== null) {
+        return grid.endRow;
+    }
+    if (totalRecords !== null && totalRecords !== undefined && !totalEstimated) {
+        return Math.max(totalRecords, grid.furthestRow);
+    }
+    return Math.max(totalRecords || 0, grid.furthestRow + BLOCK_ROWS);
+}
+
+function visibleRowCount() {
+    const height = $('#tableWrapper')[0].clientHeight - grid.headerHeight;
+    return Math.max(1, Math.ceil(height / grid.rowHeight));
+}
+
+// Height of the scrolled rows; beyond MAX_SCROLL_HEIGHT the scroll position is scaled
+function gridScrollHeight(rowCount) {
+    return Math.min(rowCount * grid.rowHeight, MAX_SCROLL_HEIGHT);
+}
+
+// Row at the top of the viewport (fractional)
+function topRowAt(scrollTop, rowCount) {
+    const height = gridScrollHeight(rowCount);
+    if (height === rowCount * grid.rowHeight) {
+        return scrollTop / grid.rowHeight;
+    }
+    const view = $('#tableWrapper')[0].clientHeight - grid.headerHeight;
+    return scrollTop / Math.max(1, height - view) * Math.max(0, rowCount - view / grid.rowHeight);
+}
+
+function scrollToRow(row) {
+    const rowCount = gridRowCount();
+    row = Math.max(0, Math.min(row, rowCount));
+    const height = gridScrollHeight(rowCount);
+    let scrollTop = row * grid.rowHeight;
+    if (height !== rowCount * grid.rowHeight) {
+        const view = $('#tableWrapper')[0].clientHeight - grid.headerHeight;
+        scrollTop = row / Math.max(1, rowCount - view / grid.rowHeight) * (height - view);
+    }
+    $('#tableWrapper').scrollTop(scrollTop);
+}
+
+// Rows to render: the ones in view plus the overscan
+function visibleRowRange() {
+    const rowCount = gridRowCount();
+    const top = topRowAt($('#tableWrapper')[0].scrollTop, rowCount);
+    const firstVisible = Math.max(0, Math.min(Math.floor(top), rowCount - 1));
+    return {
+        top: top,
+        firstVisible: firstVisible,
+        lastVisible: Math.min(rowCount, firstVisible + visibleRowCount()),
+        first: Math.max(0, firstVisible - OVERSCAN_ROWS),
+        last: Math.min(rowCount, firstVisible + visibleRowCount() + OVERSCAN_ROWS),
+        rowCount: rowCount
+    };
+}
+
+// Render on the next frame; fetch what came into view
+function scheduleRender() {
+    if (grid.renderFrame === null) {
+        grid.renderFrame = requestAnimationFrame(renderGrid);
+    }
+    fetchVisibleBlocks(true);
+    clearTimeout(grid.fetchTimer);
+    grid.fetchTimer = setTimeout(function() {
+        fetchVisibleBlocks(false);
+    }, FETCH_DELAY);
+}
+
+// Mark filter inputs with the strategy the server used, highlighting full scans
+function updateFilterStrategyHints(strategies) {
+    $('#tableHead .filter-input').each(function() {
+        const $input = $(this);
+        const info = strategies[$input.data('column')];
         
-        if (records.length === 0) {
-            let colspan = tableInfo.columns.length;
-            tbody.append(`<tr><td colspan="${colspan}" style="text-align: center; padding: 40px;">
-                No records found
-            </td></tr>`);
-        } else {
-            records.forEach(function(record) {
-                // For views without primary key, use first column as identifier
-                const primaryValue = tableInfo.primaryKey ? record[tableInfo.primaryKey] : (tableInfo.columns.length > 0 ? record[tableInfo.columns[0].name] : '');
-                let row = '<tr data-primary-value="' + primaryValue + '">';
-                tableInfo.columns.forEach(function(col) {
-                    let rawValue = record[col.name];
-                    let displayValue;
-                    
-                    if (rawValue === null || rawValue === undefined) {
-                        displayValue = '<em style="color: var(--color-text-muted);">NULL</em>';
-                    } else {
-                        // Convert to string and escape HTML
-                        const stringValue = String(rawValue);
-                        const escapedValue = escapeHtml(stringValue);
-                        
-                        // Truncate long text (max 50 characters) and add ellipsis
-                        const maxLength = 50;
-                        if (stringValue.length > maxLength) {
-                            displayValue = escapedValue.substring(0, maxLength) + '...';
-                        } else {
-                            displayValue = escapedValue;
-                        }
-                    }
-                    
-                    // Always include full value in title attribute for hover tooltip
-                    const fullValue = rawValue === null || rawValue === undefined ? 'NULL' : String(rawValue);
-                    row += `<td title="${escapeHtml(fullValue)}">${displayValue}</td>`;
-                });
-                row += '</tr>';
-                tbody.append(row);
-            });
+        $input.removeClass('filter-indexed filter-scan');
+        if (!info) {
+            $input.attr('title', FILTER_SYNTAX_HELP);
+            return;
         }
         
-        // Add click handlers to rows (only for tables, not views)
-        if (!tableInfo.isView) {
-            tbody.find('tr').click(function() {
-                const primaryValue = $(this).data('primary-value');
-                openEditModal(primaryValue);
-            });
-        } else {
-            // For views, change cursor to indicate non-clickable
-            tbody.find('tr').css('cursor', 'default');
+        $input.addClass(info.usesIndex ? 'filter-indexed' : 'filter-scan');
+        $input.attr('title', `Filter strategy: ${info.strategy} (${info.usesIndex ? 'uses an index' : 'full table scan'})\n\n${FILTER_SYNTAX_HELP}`);
+    });
+}
+
+// Load the total record count separately (lazy count mode)
+function loadRecordCount(filterKey) {
+    const requestId = ++countRequestId;
+    const params = {
+        action: 'getRecordCount',
+        table: currentTable,
+        filters: JSON.stringify(filters)
+    };
+    
+    $.ajax({
+        url: '../api/?' + $.param(params),
+        method: 'GET',
+        dataType: 'json',
+        success: function(response) {
+            // A newer page load or filter change may have happened meanwhile
+            if (requestId !== countRequestId || !response.success) {
+                return;
+            }
+            totalRecords = response.total;
+            totalEstimated = !!response.totalEstimated;
+            countedFilterKey = filterKey;
+            renderGrid();
+        },
+        error: function(xhr) {
+            console.error('Error loading record count:', xhr);
         }
+    });
+}
+
+// Render the rows and columns in view; spacers stand in for the rest
+function renderGrid() {
+    if (grid.renderFrame !== null) {
+        cancelAnimationFrame(grid.renderFrame);
+        grid.renderFrame = null;
+    }
+    if (!tableInfo || grid.loading) {
+        return;
+    }
+    
+    const wrapper = $('#tableWrapper')[0];
+    const columns = tableInfo.columns;
+    const range = visibleRowRange();
+    grid.firstRow = range.firstVisible;
+    grid.lastRow = range.lastVisible;
+    
+    // Columns in view, from the fixed column offsets
+    const left = wrapper.scrollLeft;
+    const right = left + wrapper.clientWidth;
+    let firstCol = 0;
+    while (firstCol < columns.length - 1 && grid.columnOffsets[firstCol + 1] <= left) {
+        firstCol++;
+    }
+    let lastCol = firstCol;
+    while (lastCol < columns.length - 1 && grid.columnOffsets[lastCol + 1] < right) {
+        lastCol++;
+    }
+    firstCol = Math.max(0, firstCol - OVERSCAN_COLUMNS);
+    lastCol = Math.min(columns.length - 1, lastCol + OVERSCAN_COLUMNS);
+    
+    // Scaled scrolling moves the rows within the spacers, so the position is part of the view
+    const scaled = gridScrollHeight(range.rowCount) !== range.rowCount * grid.rowHeight;
+    const view = [range.first, range.last, range.rowCount, firstCol, lastCol, grid.version, grid.rowHeight,
+        scaled ? wrapper.scrollTop : 0].join(':');
+    if (view === grid.view) {
+        updatePagination();
+        return;
+    }
+    grid.view = view;
+    
+    let html = '';
+    if (range.rowCount === 0) {
+        html = `<tr><td colspan="${columns.length}" style="text-align: center; padding: 40px;">
+            No records found
+        </td></tr>`;
+    } else {
+        const topSpace = scaled
+            ? Math.max(0, wrapper.scrollTop - (range.top - range.first) * grid.rowHeight)
+            : range.first * grid.rowHeight;
+        const bottomSpace = Math.max(0, gridScrollHeight(range.rowCount) - topSpace - (range.last - range.first) * grid.rowHeight);
         
-        // Restore full opacity
-        tbody.css('opacity', '1');
+        if (topSpace > 0) {
+            html += `<tr class="grid-spacer" style="height: ${topSpace}px"><td colspan="${columns.length}"></td></tr>`;
+        }
+        for (let row = range.first; row < range.last; row++) {
+            const record = getGridRow(row);
+            html += record
+                ? renderGridRow(row, record, firstCol, lastCol)
+                : `<tr class="grid-loading-row" style="height: ${grid.rowHeight}px"><td colspan="${columns.length}">Loading…</td></tr>`;
+        }
+        if (bottomSpace > 0) {
+            html += `<tr class="grid-spacer" style="height: ${bottomSpace}px"><td colspan="${columns.length}"></td></tr>`;
+        }
+    }
+    document.getElementById('tableBody').innerHTML = html;
+    
+    // Row and header heights are measured once per table, from the first rows rendered
+    if (!grid.measured && measureGrid()) {
+        grid.view = '';
+        renderGrid();
+        return;
+    }
+    updatePagination();
+}
+
+// One record as a table row; columns out of view are covered by spacer cells
+function renderGridRow(row, record, firstCol, lastCol) {
+    const columns = tableInfo.columns;
+    let html = `<tr data-row="${row}" data-primary-value="${escapeHtml(primaryValueOf(record) ?? '')}">`;
+    if (firstCol > 0) {
+        html += `<td class="grid-column-spacer" colspan="${firstCol}"></td>`;
+    }
+    for (let i = firstCol; i <= lastCol; i++) {
+        const rawValue = record[columns[i].name];
+        let displayValue;
         
-        // Check if table is scrollable after rendering and update top scrollbar
-        setTimeout(function() {
-            checkTableScrollable();
-            // Update top scrollbar width if it exists
-            const $topScrollbar = $('#tableScrollbarTop');
-            const $wrapper = $('#tableWrapper');
-            if ($topScrollbar.length && $wrapper.length && $topScrollbar.is(':visible')) {
-                const tableWidth = $wrapper[0].scrollWidth;
-                const $scrollbarContent = $topScrollbar.children().first();
-                if ($scrollbarContent.length) {
-                    $scrollbarContent.css('width', tableWidth + 'px');
-                }
+        if (rawValue === null || rawValue === undefined) {
+            displayValue = '<em style="color: var(--color-text-muted);">NULL</em>';
+        } else {
+            // Convert to string and escape HTML
+            const stringValue = String(rawValue);
+            
+            // Truncate long text (max 50 characters) and add ellipsis
+            const maxLength = 50;
+            if (stringValue.length > maxLength) {
+                displayValue = escapeHtml(stringValue.substring(0, maxLength)) + '...';
+            } else {
+                displayValue = escapeHtml(stringValue);
             }
-        }, 50);
-    });
+        }
+        
+        // Always include full value in title attribute for hover tooltip
+        const fullValue = rawValue === null || rawValue === undefined ? 'NULL' : String(rawValue);
+        html += `<td title="${escapeHtml(fullValue)}">${displayValue}</td>`;
+    }
+    if (lastCol < columns.length - 1) {
+        html += `<td class="grid-column-spacer" colspan="${columns.length - 1 - lastCol}"></td>`;
+    }
+    return html + '</tr>';
+}
+
+// Measure the header and a data row; true when the row height differs from the assumed one
+function measureGrid() {
+    const header = document.getElementById('tableHead');
+    const row = document.querySelector('#tableBody tr[data-row]');
+    if (!row || !header.offsetHeight) {
+        return false;
+    }
+    grid.measured = true;
+    grid.headerHeight = header.offsetHeight;
+    checkTableScrollable();
+    
+    if (row.offsetHeight > 0 && row.offsetHeight !== grid.rowHeight) {
+        grid.rowHeight = row.offsetHeight;
+        return true;
+    }
+    return false;
 }
 
 // Check if table wrapper is scrollable and add visual indicator
+// The grid width is known from the column widths, so only the wrapper is measured
 function checkTableScrollable() {
     const $wrapper = $('#tableWrapper');
     const $topScrollbar = $('#tableScrollbarTop');
     
     if ($wrapper.length) {
-        const isScrollable = $wrapper[0].scrollWidth > $wrapper[0].clientWidth;
+        const isScrollable = grid.width > $wrapper[0].clientWidth;
+        $wrapper.toggleClass('scrollable', isScrollable);
         
-        if (isScrollable) {
-            $wrapper.addClass('scrollable');
-            
-            // Set up top scrollbar
-            if ($topScrollbar.length) {
-                // Create invisible content div with same width as table
-                const tableWidth = $wrapper[0].scrollWidth;
+        if ($topScrollbar.length) {
+            if (isScrollable) {
+                // Invisible content div with the same width as the table
                 if ($topScrollbar.children().length === 0) {
-                    $topScrollbar.append('<div style="width: ' + tableWidth + 'px; height: 1px;"></div>');
-                } else {
-                    $topScrollbar.children().first().css('width', tableWidth + 'px');
+                    $topScrollbar.append('<div style="height: 1px;"></div>');
                 }
-                
-                // Show top scrollbar
+                $topScrollbar.children().first().css('width', grid.width + 'px');
                 $topScrollbar.show();
-                
-                // Synchronize scrolling between top and bottom scrollbars
-                syncScrollBars($wrapper, $topScrollbar);
-            }
-        } else {
-            $wrapper.removeClass('scrollable');
-            // Hide top scrollbar when not needed
-            if ($topScrollbar.length) {
+            } else {
+                // Hide top scrollbar when not needed
                 $topScrollbar.hide();
             }
         }
     }
 }
 
-// Synchronize scrolling between two scrollbars
+// Synchronize scrolling between two scrollbars (bound once)
 function syncScrollBars($wrapper, $topScrollbar) {
-    // Remove any existing event handlers to prevent infinite loops
-    $wrapper.off('scroll.sync');
-    $topScrollbar.off('scroll.sync');
-    
     // Sync bottom to top
     $wrapper.on('scroll.sync', function() {
         $topScrollbar.scrollLeft($wrapper.scrollLeft());
@@ -462,15 +866,24 @@ function syncScrollBars($wrapper, $topScrollbar) {
     });
 }
 
-// Update pagination info
+// Update pagination info with the rows in view
 function updatePagination() {
-    const start = totalRecords > 0 ? currentOffset + 1 : 0;
-    const end = Math.min(currentOffset + currentLimit, totalRecords);
+    const rowCount = gridRowCount();
+    const start = rowCount > 0 ? grid.firstRow + 1 : 0;
+    const end = grid.lastRow;
+    let totalText;
+    if (grid.endRow !== null) {
+        totalText = grid.endRow.toLocaleString();
+    } else if (totalRecords === null || totalRecords === undefined) {
+        totalText = '…';
+    } else {
+        totalText = (totalEstimated ? '~' : '') + Number(totalRecords).toLocaleString();
+    }
     
-    $('#paginationInfo').text(`Showing ${start} to ${end} of ${totalRecords} records`);
+    $('#paginationInfo').text(`Showing ${start.toLocaleString()} to ${end.toLocaleString()} of ${totalText} records`);
     
-    $('#prevBtn').prop('disabled', currentOffset === 0);
-    $('#nextBtn').prop('disabled', currentOffset + currentLimit >= totalRecords);
+    $('#prevBtn').prop('disabled', grid.firstRow === 0);
+    $('#nextBtn').prop('disabled', end >= rowCount);
 }
 
 // Open insert modal
@@ -669,6 +1082,7 @@ function saveRecord() {
             if (response.success) {
                 showToast(response.message, 'success');
                 closeModal();
+                countedFilterKey = null; // Row count changed, recount in lazy mode
                 loadRecords();
             } else {
                 showToast('Error: ' + response.error, 'error');
@@ -714,6 +1128,7 @@ $('#confirmDeleteBtn').click(function() {
             if (response.success) {
                 showToast(response.message, 'success');
                 closeModal();
+                countedFilterKey = null; // Row count changed, recount in lazy mode
                 loadRecords();
             }
             $('#loading').removeClass('active');
@@ -726,6 +1141,90 @@ $('#confirmDeleteBtn').click(function() {
     });
 });
 
+// Open the CSV/TSV load dialog
+function openLoadFileModal() {
+    $('#loadFileTitle').text('📥 Load CSV/TSV into ' + currentTable);
+    $('#loadFileInput').val('');
+    $('#loadFileResult').hide().empty();
+    $('#confirmLoadFileBtn').prop('disabled', false);
+    $('#loadFileModal').addClass('active');
+}
+
+function closeLoadFileModal() {
+    $('#loadFileModal').removeClass('active');
+}
+
+// Upload the chosen file to loadRecordsFile (one transaction, LOAD DATA when the server allows it)
+function loadRecordsFile() {
+    const file = $('#loadFileInput')[0].files[0];
+    if (!file) {
+        showToast('Please choose a file', 'error');
+        return;
+    }
+    
+    const formData = new FormData();
+    formData.append('action', 'loadRecordsFile');
+    formData.append('table', currentTable);
+    formData.append('file', file);
+    formData.append('format', $('#loadFileFormat').val());
+    formData.append('header', $('#loadFileHeader').is(':checked') ? 'true' : 'false');
+    formData.append('duplicates', $('#loadFileDuplicates').val());
+    
+    $('#confirmLoadFileBtn').prop('disabled', true).text('⏳ Loading...');
+    
+    $.ajax({
+        url: '../api/',
+        method: 'POST',
+        data: formData,
+        processData: false,
+        contentType: false,
+        dataType: 'json',
+        success: function(response) {
+            showLoadFileResult(response);
+            if (response.success) {
+                showToast(response.message, 'success');
+                countedFilterKey = null; // Row count changed, recount in lazy mode
+                loadRecords();
+            } else {
+                showToast('Error: ' + response.error, 'error');
+            }
+        },
+        error: function(xhr) {
+            let message = 'Unknown error';
+            try {
+                message = JSON.parse(xhr.responseText).error || message;
+            } catch (e) {
+                // Not a JSON error response
+            }
+            $('#loadFileResult').show().html(`<p class="load-file-error">${escapeHtml(message)}</p>`);
+            showToast('Error: ' + message, 'error');
+        },
+        complete: function() {
+            $('#confirmLoadFileBtn').prop('disabled', false).text('📥 Load');
+        }
+    });
+}
+
+// Summary of a load with its per-row errors and warnings
+function showLoadFileResult(response) {
+    const summary = response.success ? response.message : response.error;
+    let html = `<p class="${response.success ? 'load-file-success' : 'load-file-error'}">${escapeHtml(summary)}` +
+               ` <small>(${escapeHtml(response.method)})</small></p>`;
+    
+    if (response.errors && response.errors.length > 0) {
+        html += '<ul class="load-file-errors">';
+        response.errors.forEach(function(error) {
+            const row = error.row !== null ? `Row ${error.row}: ` : '';
+            html += `<li>${escapeHtml(row + error.error)}</li>`;
+        });
+        if (response.errorCount > response.errors.length) {
+            html += `<li>… and ${response.errorCount - response.errors.length} more</li>`;
+        }
+        html += '</ul>';
+    }
+    $('#loadFileResult').show().html(html);
+}
+
 // Close modal
 function closeModal() {
     $('#recordModal').removeClass('active');
@@ -737,6 +1236,7 @@ function showEmptyState() {
     $('#tableContent').hide();
     $('#emptyState').show();
     $('#addRecordBtn').hide();
+    $('#loadFileBtn').hide();
     $('#loading').removeClass('active');
 }
 
@@ -773,6 +1273,9 @@ $(document).click(function(e) {
     if ($(e.target).is('#confirmDialog')) {
         closeConfirmDialog();
     }
+    if ($(e.target).is('#loadFileModal')) {
+        closeLoadFileModal();
+    }
 });
 
 // Smooth page transitions
@@ -15,6 +15,16 @@ require_once '../login/auth_check.php';
     <link rel="stylesheet" href="data_manager.css">
 </head>
 <body>
+    <?php
+    $settingsFile = __DIR__ . '/../settings/settings.json';
+    $settings = [];
+    if (file_exists($settingsFile)) {
+        $settings = json_decode(file_get_contents($settingsFile), true);
+    }
+    ?>
+    <script>
+        window.CRUD_MANAGER_SETTINGS = <?php echo json_encode($settings); ?>;
+    </script>
     <?php
     $pageConfig = [
         'id' => 'index',
@@ -28,6 +38,7 @@ require_once '../login/auth_check.php';
                 </select>
             </div>
             <button id="addRecordBtn" style="display: none;">➕ Add New Record</button>
+            <button id="loadFileBtn" class="btn-secondary" style="display: none;">📥 Load CSV/TSV</button>
         '
     ];
     include '../templates/header.php';
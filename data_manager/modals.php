@@ -16,6 +16,49 @@
     </div>
 </div>
 
+<!-- Load File Modal -->
+<div class="modal" id="loadFileModal">
+    <div class="modal-content">
+        <div class="modal-header">
+            <h2 id="loadFileTitle">Load CSV/TSV</h2>
+            <button class="modal-close" onclick="closeLoadFileModal()">&times;</button>
+        </div>
+        <div class="modal-body">
+            <div class="form-group">
+                <label for="loadFileInput">File</label>
+                <input type="file" id="loadFileInput" accept=".csv,.tsv,.txt,text/csv,text/tab-separated-values">
+            </div>
+            <div class="form-group">
+                <label for="loadFileFormat">Format</label>
+                <select id="loadFileFormat">
+                    <option value="csv">CSV (comma separated, "quoted" fields, empty = NULL)</option>
+                    <option value="tsv">TSV (tab separated, backslash escapes, \N = NULL)</option>
+                </select>
+            </div>
+            <div class="form-group">
+                <label>
+                    <input type="checkbox" id="loadFileHeader" checked>
+                    First line holds the column names
+                </label>
+                <div class="field-info">Without a header line the fields must follow the table's column order.</div>
+            </div>
+            <div class="form-group">
+                <label for="loadFileDuplicates">Rows with an existing key</label>
+                <select id="loadFileDuplicates">
+                    <option value="error">Reject the file (nothing is loaded when any row fails)</option>
+                    <option value="ignore">Skip those rows</option>
+                    <option value="replace">Replace the existing rows</option>
+                </select>
+            </div>
+            <div class="load-file-result" id="loadFileResult" style="display: none;"></div>
+        </div>
+        <div class="modal-footer">
+            <button class="btn-secondary" onclick="closeLoadFileModal()">Close</button>
+            <button id="confirmLoadFileBtn">📥 Load</button>
+        </div>
+    </div>
+</div>
+
 <!-- Confirmation Dialog -->
 <div class="confirm-dialog" id="confirmDialog">
     <div class="confirm-content">
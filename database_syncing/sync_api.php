@@ -15,6 +15,12 @@ error_reporting(E_ERROR | E_PARSE);
 // Set JSON header first
 header('Content-Type: application/json');
 
+// Upper bound for one multi-row INSERT during sync (further capped by max_allowed_packet)
+define('SYNC_MAX_INSERT_BYTES', 16777216);
+
+// Error codes for a LOAD DATA LOCAL INFILE refused by the client or server
+define('SYNC_LOCAL_INFILE_DISABLED', [1148, 2000, 2068, 3948, 3950]);
+
 // Start session
 if (session_status() === PHP_SESSION_NONE) {
     session_start();
@@ -211,36 +217,50 @@ function generateToken($secretKey, $validitySeconds = 300) {
 
 /**
  * Make authenticated request to remote API
+ * 
+ * One cURL handle is reused for all calls of a request, so consecutive
+ * chunks go over the same keep-alive connection (and TLS session) instead
+ * of reconnecting each time. Compressed responses are accepted and decoded.
  */
 function callRemoteAPI($url, $apiKey, $action, $data = []) {
+    static $ch = null;
+
     $token = generateToken($apiKey);
     
     $payload = array_merge(['action' => $action], $data);
     $jsonPayload = json_encode($payload);
     
-    $ch = curl_init($url);
+    if ($ch === null) {
+        $ch = curl_init();
+        curl_setopt_array($ch, [
+            CURLOPT_RETURNTRANSFER => true,
+            CURLOPT_POST => true,
+            CURLOPT_ENCODING => '', // Accept every encoding cURL supports (gzip, deflate, br, zstd)
+            CURLOPT_TCP_KEEPALIVE => 1,
+            CURLOPT_TIMEOUT => 60,
+            CURLOPT_SSL_VERIFYPEER => true, // Set to false if using self-signed cert (not recommended)
+            CURLOPT_SSL_VERIFYHOST => 2
+        ]);
+    }
     
     curl_setopt_array($ch, [
-        CURLOPT_RETURNTRANSFER => true,
-        CURLOPT_POST => true,
+        CURLOPT_URL => $url,
         CURLOPT_POSTFIELDS => $jsonPayload,
         CURLOPT_HTTPHEADER => [
             'Content-Type: application/json',
+            'Connection: keep-alive',
             'X-API-Key: ' . $apiKey,
             'X-Token: ' . $token
-        ],
-        CURLOPT_TIMEOUT => 60,
-        CURLOPT_SSL_VERIFYPEER => true, // Set to false if using self-signed cert (not recommended)
-        CURLOPT_SSL_VERIFYHOST => 2
+        ]
     ]);
     
     $response = curl_exec($ch);
-    $httpCode = curl_getinfo($ch, CURLINFO_HTTP_CODE);
-    $error = curl_error($ch);
-    
-    curl_close($ch);
     
     if ($response === false) {
+        $error = curl_error($ch);
+        // Start over with a fresh connection on the next call
+        curl_close($ch);
+        $ch = null;
         throw new Exception("cURL error: " . $error);
     }
     
@@ -337,7 +357,8 @@ function syncDatabase($remoteConfig, $localConfig, $tables) {
     $logs = [];
     $stats = [
         'tablesSynced' => 0,
-        'rowsCopied' => 0
+        'rowsCopied' => 0,
+        'tables' => []
     ];
 
     try {
@@ -354,14 +375,23 @@ function syncDatabase($remoteConfig, $localConfig, $tables) {
         require_once __DIR__ . '/../db_connection.php';
         
         $credentials = getDbCredentials();
-        $localConn = new mysqli($credentials['host'], $credentials['user'], $credentials['pass'], null, $localConfig['port'] ?? 3306);
-
-        if ($localConn->connect_error) {
-            throw new Exception("Local connection failed: " . $localConn->connect_error);
+        $useLoadData = !empty($localConfig['useLoadData']);
+        $localConn = mysqli_init();
+        if ($useLoadData) {
+            // LOAD DATA LOCAL INFILE must be allowed before connecting
+            $localConn->options(MYSQLI_OPT_LOCAL_INFILE, true);
+        }
+        if (!@$localConn->real_connect($credentials['host'], $credentials['user'], $credentials['pass'], null, $localConfig['port'] ?? 3306)) {
+            throw new Exception("Local connection failed: " . mysqli_connect_error());
         }
 
         $localConn->set_charset('utf8mb4');
 
+        // Largest INSERT statement the server accepts (leave room for protocol overhead)
+        $packetResult = $localConn->query("SELECT @@max_allowed_packet");
+        $maxAllowedPacket = $packetResult ? (int) $packetResult->fetch_array()[0] : 4194304;
+        $maxInsertBytes = max(65536, min($maxAllowedPacket - 1024, SYNC_MAX_INSERT_BYTES));
+
         // Create local database if needed
         if ($localConfig['createDatabase']) {
             $dbName = $localConn->real_escape_string($localConfig['database']);
@@ -422,6 +452,7 @@ function syncDatabase($remoteConfig, $localConfig, $tables) {
                     $batchSize = 1000;
                     $totalCopied = 0;
                     $hasMore = true;
+                    $tableStart = microtime(true);
 
                     while ($hasMore) {
                         $dataResult = callRemoteAPI($url, $apiKey, 'getTableData', [
@@ -439,39 +470,41 @@ function syncDatabase($remoteConfig, $localConfig, $tables) {
                         $hasMore = $dataResult['hasMore'];
 
                         if (count($rows) > 0) {
-                            // Get column names from first row
                             $columnNames = array_keys($rows[0]);
-                            $columnNamesEscaped = array_map(function($col) {
-                                return "`{$col}`";
-                            }, $columnNames);
-
-                            // Insert rows
-                            foreach ($rows as $row) {
-                                $values = array_map(function($value) use ($localConn) {
-                                    if ($value === null) {
-                                        return 'NULL';
-                                    }
-                                    return "'" . $localConn->real_escape_string($value) . "'";
-                                }, array_values($row));
-
-                                $insertSQL = "INSERT INTO `{$table}` (" . implode(', ', $columnNamesEscaped) . ") VALUES (" . implode(', ', $values) . ")";
-                                
-                                if (!$localConn->query($insertSQL)) {
-                                    $logs[] = ['message' => "  ⚠ Warning inserting row: " . $localConn->error, 'type' => 'warning'];
-                                } else {
-                                    $totalCopied++;
-                                    $stats['rowsCopied']++;
+
+                            // One transaction per fetched batch
+                            $localConn->begin_transaction();
+                            $inserted = false;
+                            if ($useLoadData) {
+                                $inserted = loadRowsWithInfile($localConn, $table, $columnNames, $rows);
+                                if ($inserted === false) {
+                                    $logs[] = ['message' => "  ⚠ LOAD DATA LOCAL INFILE unavailable (" . $localConn->error . "), using INSERT", 'type' => 'warning'];
+                                    $useLoadData = false;
                                 }
                             }
+                            if ($inserted === false) {
+                                $inserted = insertRowsBatched($localConn, $table, $columnNames, $rows, $maxInsertBytes, $logs);
+                            }
+                            $localConn->commit();
 
+                            $totalCopied += $inserted;
+                            $stats['rowsCopied'] += $inserted;
                             $offset += count($rows);
                         } else {
                             $hasMore = false;
                         }
                     }
 
+                    $seconds = microtime(true) - $tableStart;
+                    $rowsPerSecond = $seconds > 0 ? (int) round($totalCopied / $seconds) : $totalCopied;
+                    $stats['tables'][$table] = [
+                        'rows' => $totalCopied,
+                        'seconds' => round($seconds, 2),
+                        'rowsPerSecond' => $rowsPerSecond
+                    ];
+
                     if ($totalCopied > 0) {
-                        $logs[] = ['message' => "  ↳ Copied {$totalCopied} rows", 'type' => 'success'];
+                        $logs[] = ['message' => "  ↳ Copied {$totalCopied} rows ({$rowsPerSecond} rows/s)", 'type' => 'success'];
                     } else {
                         $logs[] = ['message' => "  ↳ Table is empty (0 rows)", 'type' => 'info'];
                     }
@@ -481,6 +514,8 @@ function syncDatabase($remoteConfig, $localConfig, $tables) {
                 $logs[] = ['message' => "✓ Completed table: {$table}", 'type' => 'success'];
 
             } catch (Exception $e) {
+                // Drop a half-loaded batch so the next table does not commit it
+                $localConn->rollback();
                 $logs[] = ['message' => "✗ Error with table {$table}: " . $e->getMessage(), 'type' => 'error'];
             }
         }
@@ -509,4 +544,115 @@ function syncDatabase($remoteConfig, $localConfig, $tables) {
         ];
     }
 }
-?>
+
+/**
+ * Insert rows as multi-row INSERT statements of at most $maxBytes each
+ * 
+ * A statement that fails is retried row by row, so one bad row only
+ * costs itself (and is logged) instead of its whole statement.
+ * 
+ * @return int Number of rows inserted
+ */
+function insertRowsBatched($conn, $table, $columnNames, $rows, $maxBytes, &$logs) {
+    $prefix = "INSERT INTO `{$table}` (`" . implode('`, `', $columnNames) . "`) VALUES ";
+    $inserted = 0;
+    $tuples = [];
+    $bytes = strlen($prefix);
+
+    foreach ($rows as $row) {
+        $tuple = buildValuesTuple($conn, $row);
+        if (!empty($tuples) && $bytes + strlen($tuple) + 1 > $maxBytes) {
+            $inserted += executeInsertTuples($conn, $prefix, $tuples, $logs);
+            $tuples = [];
+            $bytes = strlen($prefix);
+        }
+        $tuples[] = $tuple;
+        $bytes += strlen($tuple) + 1;
+    }
+    if (!empty($tuples)) {
+        $inserted += executeInsertTuples($conn, $prefix, $tuples, $logs);
+    }
+
+    return $inserted;
+}
+
+function executeInsertTuples($conn, $prefix, $tuples, &$logs) {
+    if ($conn->query($prefix . implode(',', $tuples))) {
+        return count($tuples);
+    }
+
+    $inserted = 0;
+    foreach ($tuples as $tuple) {
+        if ($conn->query($prefix . $tuple)) {
+            $inserted++;
+        } else {
+            $logs[] = ['message' => "  ⚠ Warning inserting row: " . $conn->error, 'type' => 'warning'];
+        }
+    }
+    return $inserted;
+}
+
+function buildValuesTuple($conn, $row) {
+    $values = array_map(function($value) use ($conn) {
+        if ($value === null) {
+            return 'NULL';
+        }
+        return "'" . $conn->real_escape_string($value) . "'";
+    }, array_values($row));
+
+    return '(' . implode(', ', $values) . ')';
+}
+
+/**
+ * Bulk-load rows through a temporary file and LOAD DATA LOCAL INFILE
+ * 
+ * @return int|false Number of rows loaded, or false when LOAD DATA is not
+ *                   permitted (client or server local_infile disabled)
+ * @throws Exception For any other LOAD DATA error
+ */
+function loadRowsWithInfile($conn, $table, $columnNames, $rows) {
+    $tempFile = tempnam(sys_get_temp_dir(), 'dbsync_');
+
+    try {
+        $handle = fopen($tempFile, 'wb');
+        foreach ($rows as $row) {
+            $fields = array_map(function($value) {
+                if ($value === null) {
+                    return '\\N';
+                }
+                return strtr((string) $value, [
+                    '\\' => '\\\\',
+                    "\t" => '\\t',
+                    "\n" => '\\n',
+                    "\r" => '\\r',
+                    "\0" => '\\0'
+                ]);
+            }, array_values($row));
+            fwrite($handle, implode("\t", $fields) . "\n");
+        }
+        fclose($handle);
+
+        $sql = "LOAD DATA LOCAL INFILE '" . $conn->real_escape_string($tempFile) . "' "
+             . "INTO TABLE `{$table}` CHARACTER SET utf8mb4 "
+             . "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' "
+             . "(`" . implode('`, `', $columnNames) . "`)";
+        if (@$conn->query($sql)) {
+            return $conn->affected_rows;
+        }
+        $errno = $conn->errno;
+        $error = $conn->error;
+    } catch (mysqli_sql_exception $e) {
+        // PHP 8.1+ throws instead of returning false
+        $errno = $e->getCode();
+        $error = $e->getMessage();
+    } finally {
+        @unlink($tempFile);
+    }
+
+    // Only a refused LOCAL INFILE falls back to INSERTs; anything else is a real failure
+    if (in_array($errno, SYNC_LOCAL_INFILE_DISABLED, true)) {
+        return false;
+    }
+    throw new Exception("LOAD DATA failed: " . $error);
+}
+?>
\ No newline at end of file
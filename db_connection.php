@@ -28,6 +28,20 @@
 const DB_NAME = ''; // Leave empty for auto-detection
 const DB_CHARSET = 'utf8mb4';
 
+/**
+ * Reuse connections across requests (mysqli persistent "p:" connections)
+ * 
+ * Saves the TCP/TLS handshake and authentication on every API call. PHP
+ * resets a pooled connection before handing it out again (change_user:
+ * open transactions are rolled back, temporary tables, locks and session
+ * variables are cleared); a connection that died meanwhile is replaced.
+ * Set to false if the server's max_connections is tight.
+ */
+const DB_PERSISTENT_CONNECTIONS = true;
+
+// Connections report their statements to the SQL profiler (Server-Timing, slow request log)
+require_once __DIR__ . '/api/utils/ProfiledConnection.php';
+
 /**
  * Get database credentials from session
  * 
@@ -36,17 +50,20 @@ const DB_CHARSET = 'utf8mb4';
  */
 function getDbCredentials(): array {
     // Always use credentials from session (loaded from credentials.txt)
-    // Ensure session is started
-    if (session_status() === PHP_SESSION_NONE) {
-        // Try to start session - if it fails, we'll handle it below
-        if (!@session_start()) {
-            throw new Exception("Failed to start session. Please check session configuration.");
+    // A session that was already read and released early (session_write_close)
+    // keeps its data in $_SESSION; only start it when nothing has been read yet
+    if (empty($_SESSION['db_user'])) {
+        if (session_status() === PHP_SESSION_NONE) {
+            // Try to start session - if it fails, we'll handle it below
+            if (!@session_start()) {
+                throw new Exception("Failed to start session. Please check session configuration.");
+            }
+        }
+        
+        // Check if session is active and has credentials
+        if (session_status() !== PHP_SESSION_ACTIVE) {
+            throw new Exception("Session not active. Please log in again.");
         }
-    }
-    
-    // Check if session is active and has credentials
-    if (session_status() !== PHP_SESSION_ACTIVE) {
-        throw new Exception("Session not active. Please log in again.");
     }
     
     // Require database credentials from session - no fallback to defaults
@@ -78,7 +95,12 @@ function getDbConnection(?string $database = null): mysqli
     // Get credentials from session
     $credentials = getDbCredentials();
     
-    $conn = new mysqli($credentials['host'], $credentials['user'], $credentials['pass'], $dbToUse);
+    $host = $credentials['host'];
+    if (DB_PERSISTENT_CONNECTIONS && strncmp($host, 'p:', 2) !== 0) {
+        $host = 'p:' . $host;
+    }
+    
+    $conn = new ProfiledConnection($host, $credentials['user'], $credentials['pass'], $dbToUse);
     
     if ($conn->connect_error) {
         throw new Exception("Database connection failed: " . $conn->connect_error);
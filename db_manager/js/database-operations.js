@@ -4,19 +4,31 @@
  */
 
 const DatabaseOperations = {
+    // Databases per size request while filling in sizes
+    SIZE_BATCH: 25,
+
+    // Incremented on every load so batches of an earlier load are ignored
+    sizeGeneration: 0,
+
     /**
      * Load all databases from the API
+     *
+     * The names are loaded first so the list shows right away; table counts
+     * and sizes are filled in afterwards (see loadSizes).
+     *
+     * @param {boolean} refresh Bypass the server-side size cache
      */
-    load: function () {
+    load: function (refresh = false) {
         $('#loading').addClass('active');
 
         $.ajax({
-            url: '../api/?action=getDatabases',
+            url: '../api/?action=getDatabases&sizes=false',
             method: 'GET',
             dataType: 'json',
             success: (response) => {
                 if (response.success) {
                     window.State.databases = response.databases;
+                    DatabaseOperations.loadSizes(refresh);
                     window.UIRenderer.displayDatabases();
                     window.UIRenderer.populateDatabaseSelect();
 
@@ -110,6 +122,50 @@ const DatabaseOperations = {
         });
     },
 
+    /**
+     * Fill in table counts and sizes, one batch of databases at a time
+     */
+    loadSizes: function (refresh) {
+        const generation = ++DatabaseOperations.sizeGeneration;
+        const names = window.State.databases.map(db => db.name);
+
+        const loadBatch = (start) => {
+            if (start >= names.length || generation !== DatabaseOperations.sizeGeneration) {
+                return;
+            }
+            $.ajax({
+                url: '../api/',
+                method: 'GET',
+                data: {
+                    action: 'getDatabases',
+                    databases: JSON.stringify(names.slice(start, start + DatabaseOperations.SIZE_BATCH)),
+                    refresh: refresh ? 'true' : 'false'
+                },
+                dataType: 'json',
+                success: (response) => {
+                    if (generation !== DatabaseOperations.sizeGeneration || !response.success) {
+                        return;
+                    }
+                    const byName = {};
+                    response.databases.forEach((db) => { byName[db.name] = db; });
+                    window.State.databases.forEach((db) => {
+                        if (byName[db.name]) {
+                            db.tables = byName[db.name].tables;
+                            db.size = byName[db.name].size;
+                        }
+                    });
+                    window.UIRenderer.updateDatabaseSizes();
+                    window.UIRenderer.updateStats();
+                    loadBatch(start + DatabaseOperations.SIZE_BATCH);
+                },
+                error: (xhr) => {
+                    window.Utils.showToast('Error loading database sizes: ' + xhr.responseText, 'error');
+                }
+            });
+        };
+        loadBatch(0);
+    },
+
     /**
      * Create a new database
      */
@@ -201,32 +257,48 @@ const DatabaseOperations = {
             return;
         }
 
+        if ($('#exportParallel').is(':checked')) {
+            DatabaseOperations.exportParallel(databaseName, dataOnly);
+            return;
+        }
+
         window.Utils.showToast('Exporting database...', 'warning');
 
+        // The export is streamed as a file download, so it is posted as a form
+        DatabaseOperations.submitDownload({
+            action: 'exportDatabase',
+            name: databaseName,
+            filename: fileName,
+            includeCreateDatabase: includeCreateDatabase ? 'true' : 'false',
+            dataOnly: dataOnly ? 'true' : 'false',
+            compression: $('#exportCompression').val() || 'none',
+            insertBatchBytes: (parseInt($('#exportInsertBatchKb').val(), 10) || 1024) * 1024
+        });
+
+        window.ModalManager.close('exportDatabaseModal');
+    },
+
+    /**
+     * Export a database to per-table files on the server using worker processes
+     */
+    exportParallel: function (databaseName, dataOnly) {
+        window.Utils.showToast('Exporting database in parallel...', 'warning');
+
         $.ajax({
             url: '../api/',
             method: 'POST',
             data: {
-                action: 'exportDatabase',
+                action: 'exportDatabaseParallel',
                 name: databaseName,
-                includeCreateDatabase: includeCreateDatabase,
-                dataOnly: dataOnly
+                dataOnly: dataOnly ? 'true' : 'false',
+                compression: $('#exportCompression').val() || 'none',
+                insertBatchBytes: (parseInt($('#exportInsertBatchKb').val(), 10) || 1024) * 1024,
+                workers: parseInt($('#exportWorkers').val(), 10) || 4
             },
             dataType: 'json',
             success: (response) => {
                 if (response.success) {
-                    // Create download link
-                    const blob = new Blob([response.sql], { type: 'application/sql' });
-                    const url = URL.createObjectURL(blob);
-                    const a = document.createElement('a');
-                    a.href = url;
-                    a.download = fileName.endsWith('.sql') ? fileName : `${fileName}.sql`;
-                    document.body.appendChild(a);
-                    a.click();
-                    document.body.removeChild(a);
-                    URL.revokeObjectURL(url);
-
-                    window.Utils.showToast('Database exported successfully!', 'success');
+                    window.Utils.showToast(`Exported ${response.tables} tables (${response.rows} rows) in ${response.seconds}s. Export id: ${response.exportId}`, 'success');
                     window.ModalManager.close('exportDatabaseModal');
                 } else {
                     window.Utils.showToast('Error: ' + response.error, 'error');
@@ -239,6 +311,52 @@ const DatabaseOperations = {
         });
     },
 
+    /**
+     * Post a download request through a hidden iframe
+     *
+     * A successful export arrives as an attachment and leaves the page alone;
+     * if the API answers with a JSON error instead, it is loaded into the
+     * iframe and shown as a toast.
+     */
+    submitDownload: function (fields) {
+        let frame = document.getElementById('downloadFrame');
+        if (!frame) {
+            frame = document.createElement('iframe');
+            frame.id = 'downloadFrame';
+            frame.name = 'downloadFrame';
+            frame.style.display = 'none';
+            frame.addEventListener('load', () => {
+                try {
+                    const text = frame.contentDocument.body.textContent;
+                    const response = JSON.parse(text);
+                    if (response && response.error) {
+                        window.Utils.showToast('Error: ' + response.error, 'error');
+                    }
+                } catch (e) {
+                    // Not a JSON error response
+                }
+            });
+            document.body.appendChild(frame);
+        }
+
+        const form = document.createElement('form');
+        form.method = 'POST';
+        form.action = '../api/';
+        form.target = 'downloadFrame';
+
+        Object.keys(fields).forEach((name) => {
+            const input = document.createElement('input');
+            input.type = 'hidden';
+            input.name = name;
+            input.value = fields[name];
+            form.appendChild(input);
+        });
+
+        document.body.appendChild(form);
+        form.submit();
+        document.body.removeChild(form);
+    },
+
     /**
      * Export all databases
      */
@@ -258,44 +376,169 @@ const DatabaseOperations = {
         // Close modal immediately
         window.ModalManager.close('exportAllDatabasesModal');
 
-        // Create a form to submit the request
-        const form = document.createElement('form');
-        form.method = 'POST';
-        form.action = '../api/';
+        DatabaseOperations.submitDownload({
+            action: 'exportAllDatabases',
+            filename: filename,
+            includeCreateDatabase: includeCreateDatabase ? 'true' : 'false',
+            dataOnly: dataOnly ? 'true' : 'false',
+            compression: $('#exportAllCompression').val() || 'none',
+            insertBatchBytes: (parseInt($('#exportAllInsertBatchKb').val(), 10) || 1024) * 1024
+        });
 
-        const actionInput = document.createElement('input');
-        actionInput.type = 'hidden';
-        actionInput.name = 'action';
-        actionInput.value = 'exportAllDatabases';
+        // Reset button after a delay
+        setTimeout(() => {
+            $('#confirmExportAllBtn').prop('disabled', false).text('📦 Export All');
+        }, 2000);
+    },
 
-        const filenameInput = document.createElement('input');
-        filenameInput.type = 'hidden';
-        filenameInput.name = 'filename';
-        filenameInput.value = filename;
+    /**
+     * Format seconds as m:ss / h:mm:ss
+     */
+    formatDuration: function (seconds) {
+        seconds = Math.max(0, Math.round(seconds));
+        const h = Math.floor(seconds / 3600);
+        const m = Math.floor((seconds % 3600) / 60);
+        const s = String(seconds % 60).padStart(2, '0');
+        return h > 0 ? `${h}:${String(m).padStart(2, '0')}:${s}` : `${m}:${s}`;
+    },
 
-        const includeCreateInput = document.createElement('input');
-        includeCreateInput.type = 'hidden';
-        includeCreateInput.name = 'includeCreateDatabase';
-        includeCreateInput.value = includeCreateDatabase ? 'true' : 'false';
+    /**
+     * Follow a background import job until it ends
+     *
+     * Progress (percentage, throughput, remaining time and current table) is
+     * shown on the import button; an interrupted or failed job can be resumed
+     * from its last checkpoint.
+     */
+    trackImportJob: function (jobId) {
+        const $button = $('#confirmImportBtn');
+        $button.prop('disabled', true);
 
-        const dataOnlyInput = document.createElement('input');
-        dataOnlyInput.type = 'hidden';
-        dataOnlyInput.name = 'dataOnly';
-        dataOnlyInput.value = dataOnly ? 'true' : 'false';
+        const poll = () => {
+            $.ajax({
+                url: '../api/?action=getImportJob&jobId=' + encodeURIComponent(jobId),
+                method: 'GET',
+                dataType: 'json',
+                success: (response) => {
+                    const job = response.job;
+                    if (!response.success || !job) {
+                        $button.prop('disabled', false).html('📥 Import');
+                        return;
+                    }
 
-        form.appendChild(actionInput);
-        form.appendChild(filenameInput);
-        form.appendChild(includeCreateInput);
-        form.appendChild(dataOnlyInput);
+                    if (job.status === 'queued' || job.status === 'running') {
+                        let text = `📥 ${job.percent}% · ${job.rowsPerSecond.toLocaleString()} rows/s · ${job.mbPerSecond} MB/s`;
+                        if (job.etaSeconds !== null) {
+                            text += ` · ${DatabaseOperations.formatDuration(job.etaSeconds)} left`;
+                        }
+                        if (job.table) {
+                            text += ` · ${job.table}`;
+                        }
+                        $button.text(text);
+                        setTimeout(poll, 1000);
+                        return;
+                    }
 
-        document.body.appendChild(form);
-        form.submit();
-        document.body.removeChild(form);
+                    $button.prop('disabled', false).html('📥 Import');
+                    DatabaseOperations.finishImportJob(job);
+                },
+                error: () => {
+                    // Transient failure (e.g. server busy); keep polling
+                    setTimeout(poll, 3000);
+                }
+            });
+        };
+        poll();
+    },
 
-        // Reset button after a delay
-        setTimeout(() => {
-            $('#confirmExportAllBtn').prop('disabled', false).text('📦 Export All');
-        }, 2000);
+    /**
+     * Report the outcome of a finished, failed or interrupted import job
+     */
+    finishImportJob: function (job) {
+        if (job.status === 'completed') {
+            if (job.errorCount > 0) {
+                const first = job.errors.slice(0, 3).map((e) => `#${e.statement}: ${e.error}`).join('; ');
+                window.Utils.showToast(`Import completed with ${job.errorCount} errors (${job.statements} statements executed). ${first}`, 'error');
+            } else {
+                window.Utils.showToast(`Database imported successfully. ${job.statements.toLocaleString()} statements, ${job.rows.toLocaleString()} rows.`, 'success');
+                window.ModalManager.close('importDatabaseModal');
+            }
+            DatabaseOperations.load(true);
+            return;
+        }
+
+        const reason = job.lastError || 'the import process stopped';
+        if (!job.resumable) {
+            window.Utils.showToast(`Import stopped: ${reason}`, 'error');
+            return;
+        }
+
+        Dialog.confirm({
+            title: 'Resume Import',
+            message: `The import of "${job.fileName}" stopped at ${job.percent}% (${reason}). Resume from the last checkpoint?`,
+            confirmText: 'Resume',
+            cancelText: 'Discard',
+            confirmClass: 'btn-primary',
+            icon: '📥',
+            onConfirm: () => DatabaseOperations.resumeImportJob(job.id),
+            // The uploaded file is kept for a day otherwise
+            onCancel: () => DatabaseOperations.discardImportJob(job.id)
+        });
+    },
+
+    /**
+     * Remove a stopped import job and its uploaded file
+     */
+    discardImportJob: function (jobId) {
+        $.ajax({
+            url: '../api/',
+            method: 'POST',
+            data: { action: 'discardImportJob', jobId: jobId },
+            dataType: 'json',
+            success: (response) => {
+                if (!response.success) {
+                    window.Utils.showToast('Error: ' + response.error, 'error');
+                }
+            },
+            error: (xhr) => {
+                const response = JSON.parse(xhr.responseText);
+                window.Utils.showToast('Error: ' + (response.error || 'Unknown error'), 'error');
+            }
+        });
+    },
+
+    /**
+     * Resume an import job from its last checkpoint
+     */
+    resumeImportJob: function (jobId) {
+        $.ajax({
+            url: '../api/',
+            method: 'POST',
+            data: { action: 'resumeImportJob', jobId: jobId },
+            dataType: 'json',
+            success: (response) => DatabaseOperations.handleImportResponse(response),
+            error: (xhr) => {
+                const response = JSON.parse(xhr.responseText);
+                window.Utils.showToast('Error: ' + (response.error || 'Unknown error'), 'error');
+            }
+        });
+    },
+
+    /**
+     * Handle the response of an import request (background job or inline run)
+     */
+    handleImportResponse: function (response) {
+        if (response.background) {
+            window.Utils.showToast('Import running in the background...', 'warning');
+            DatabaseOperations.trackImportJob(response.jobId);
+        } else if (response.job) {
+            DatabaseOperations.finishImportJob(response.job);
+        } else if (response.success) {
+            window.Utils.showToast(response.message || 'Database imported successfully!', 'success');
+            window.ModalManager.close('importDatabaseModal');
+            DatabaseOperations.load(true);
+        } else {
+            window.Utils.showToast('Error: ' + response.error, 'error');
+        }
     },
 
     /**
@@ -306,8 +549,9 @@ const DatabaseOperations = {
         const file = fileInput.files[0];
         const targetDatabase = $('#importTargetDatabase').val();
         const dropExisting = $('#importDropExisting').is(':checked');
+        const exportId = ($('#importExportId').val() || '').trim();
 
-        if (!file) {
+        if (!file && !exportId) {
             window.Utils.showToast('Please select a SQL file', 'warning');
             return;
         }
@@ -318,12 +562,20 @@ const DatabaseOperations = {
         }
 
         const formData = new FormData();
-        formData.append('action', 'importDatabase');
-        formData.append('file', file);
+        if (exportId) {
+            formData.append('action', 'importDatabaseParallel');
+            formData.append('exportId', exportId);
+        } else {
+            formData.append('action', 'importDatabase');
+            formData.append('file', file);
+        }
         formData.append('database', targetDatabase);
         formData.append('dropExisting', dropExisting);
 
-        window.Utils.showToast('Importing database...', 'warning');
+        window.Utils.showToast(exportId ? 'Importing database...' : 'Uploading file...', 'warning');
+
+        const $button = $('#confirmImportBtn');
+        $button.prop('disabled', true);
 
         $.ajax({
             url: '../api/',
@@ -333,15 +585,11 @@ const DatabaseOperations = {
             contentType: false,
             dataType: 'json',
             success: (response) => {
-                if (response.success) {
-                    window.Utils.showToast('Database imported successfully!', 'success');
-                    window.ModalManager.close('importDatabaseModal');
-                    DatabaseOperations.load();
-                } else {
-                    window.Utils.showToast('Error: ' + response.error, 'error');
-                }
+                $button.prop('disabled', false);
+                DatabaseOperations.handleImportResponse(response);
             },
             error: (xhr) => {
+                $button.prop('disabled', false);
                 const response = JSON.parse(xhr.responseText);
                 window.Utils.showToast('Error: ' + (response.error || 'Unknown error'), 'error');
             }
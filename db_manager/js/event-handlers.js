@@ -32,7 +32,7 @@ const EventHandlers = {
 
         // Event handlers
         $('#refreshBtn').click(() => {
-            window.DatabaseOperations.load();
+            window.DatabaseOperations.load(true);
         });
 
         $('#databaseSelect').change(function () {
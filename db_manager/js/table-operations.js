@@ -75,7 +75,7 @@ const TableOperations = {
                     window.Utils.showToast('Table created successfully!', 'success');
                     window.ModalManager.close('createTableModal');
                     TableOperations.load();
-                    window.DatabaseOperations.load(); // Refresh stats
+                    window.DatabaseOperations.load(true); // Refresh stats
                 } else {
                     window.Utils.showToast('Error: ' + response.error, 'error');
                 }
@@ -132,7 +132,7 @@ const TableOperations = {
                         }
                         
                         // Refresh the main database list stats
-                        window.DatabaseOperations.load();
+                        window.DatabaseOperations.load(true);
                     } else {
                         window.Utils.showToast('Error: ' + response.error, 'error');
                     }
@@ -194,7 +194,7 @@ const TableOperations = {
                     window.State.currentDatabase = databaseName;
 
                     // Refresh database list to reflect new name
-                    window.DatabaseOperations.load();
+                    window.DatabaseOperations.load(true);
                 } else {
                     window.Utils.showToast('Error: ' + response.error, 'error');
                 }
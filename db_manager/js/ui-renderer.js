@@ -30,7 +30,8 @@ const UIRenderer = {
             const isCurrent = db.name === window.State.currentDatabase;
             const sizeBytes = db.size || 0;
             const sizePercent = Math.max(4, Math.round((sizeBytes / maxSize) * 100));
-            const displaySize = window.Utils.formatBytes(sizeBytes);
+            // Sizes are loaded after the list; null means not known yet
+            const displaySize = db.size === null ? '…' : window.Utils.formatBytes(sizeBytes);
             const isLarge = sizeBytes > 100 * 1024 * 1024; // >100MB
 
             const databaseItem = $(`
@@ -41,7 +42,7 @@ const UIRenderer = {
                         <span class="database-icon" aria-hidden="true">🗄️</span>
                         <div class="database-main-info">
                             <h4 class="database-name">${db.name}${isCurrent ? '<span class="badge-current" title="Currently selected">Current</span>' : ''}</h4>
-                            <p class="database-tables">${db.tables || 0} tables</p>
+                            <p class="database-tables">${db.tables === null ? '…' : db.tables} tables</p>
                         </div>
                     </div>
                     
@@ -176,6 +177,38 @@ const UIRenderer = {
         $(`.database-tables-subsection[data-database="${databaseName}"]`).slideDown(200);
     },
 
+    /**
+     * Refresh table counts and size bars of the rendered databases in place
+     *
+     * Used while sizes arrive in batches, so expanded databases stay open.
+     */
+    updateDatabaseSizes: function() {
+        const maxSize = Math.max(1, ...window.State.databases.map(db => (db.size || 0)));
+
+        window.State.databases.forEach((db) => {
+            if (db.size === null) {
+                return;
+            }
+            const $item = $('.database-item').filter(function() {
+                return $(this).data('database') === db.name;
+            });
+            if (!$item.length) {
+                return;
+            }
+            const sizePercent = Math.max(4, Math.round((db.size / maxSize) * 100));
+            const displaySize = window.Utils.formatBytes(db.size);
+
+            $item.find('.database-tables').text(`${db.tables} tables`);
+            $item.find('.database-size-text').text(displaySize);
+            $item.find('.database-size-bar')
+                .attr('data-tooltip', `Size: ${displaySize}`)
+                .attr('aria-valuenow', sizePercent);
+            $item.find('.database-size-fill')
+                .toggleClass('large', db.size > 100 * 1024 * 1024)
+                .css('width', sizePercent + '%');
+        });
+    },
+
     /**
      * Get filtered and sorted databases
      */
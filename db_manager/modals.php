@@ -129,6 +129,29 @@
                     <input type="checkbox" id="exportDataOnly"> Export data only (no table structure)
                 </label>
             </div>
+            <div class="form-group">
+                <label for="exportCompression">Compression:</label>
+                <select id="exportCompression">
+                    <option value="none">None (.sql)</option>
+                    <option value="gzip">gzip (.sql.gz)</option>
+                    <option value="zstd">zstd (.sql.zst, requires PHP zstd extension)</option>
+                </select>
+            </div>
+            <div class="form-group">
+                <label for="exportInsertBatchKb">INSERT batch size (KB):</label>
+                <input type="number" id="exportInsertBatchKb" value="1024" min="4" max="16384">
+                <div class="help-text">Maximum size of each multi-row INSERT statement</div>
+            </div>
+            <div class="form-group">
+                <label>
+                    <input type="checkbox" id="exportParallel"> Parallel export to the server (one file per table)
+                </label>
+                <div class="help-text">Files and a manifest are written to tmp/exports/; restore them with a parallel import</div>
+            </div>
+            <div class="form-group">
+                <label for="exportWorkers">Worker processes:</label>
+                <input type="number" id="exportWorkers" value="4" min="1" max="32">
+            </div>
         </div>
         <div class="modal-footer">
             <button class="btn-secondary" onclick="closeModal('exportDatabaseModal')">Cancel</button>
@@ -148,7 +171,12 @@
         <div class="modal-body">
             <div class="form-group">
                 <label for="importFile">SQL File: <span style="color: var(--color-danger);">*</span></label>
-                <input type="file" id="importFile" accept=".sql" required>
+                <input type="file" id="importFile" accept=".sql,.gz,.zst" required>
+            </div>
+            <div class="form-group">
+                <label for="importExportId">Or restore a parallel export:</label>
+                <input type="text" id="importExportId" placeholder="Export id, e.g. shop_20240101_020000">
+                <div class="help-text">Tables are restored in parallel from tmp/exports/ (no file upload needed)</div>
             </div>
             <div class="form-group">
                 <label for="importTargetDatabase">Target Database:</label>
@@ -182,7 +210,7 @@
                 <label for="exportAllFilename">Filename:</label>
                 <input type="text" id="exportAllFilename" value="all_databases_export"
                     placeholder="Enter filename (without extension)">
-                <div class="help-text">File will be saved as: filename_YYYY-MM-DD_HH-MM-SS.sql</div>
+                <div class="help-text">File will be saved as: filename_YYYY-MM-DD_HH-MM-SS.sql (.gz/.zst when compressed)</div>
             </div>
             <div class="form-group">
                 <label>
@@ -195,6 +223,19 @@
                     <input type="checkbox" id="exportAllDataOnly"> Export data only (no table structure)
                 </label>
             </div>
+            <div class="form-group">
+                <label for="exportAllCompression">Compression:</label>
+                <select id="exportAllCompression">
+                    <option value="none">None (.sql)</option>
+                    <option value="gzip">gzip (.sql.gz)</option>
+                    <option value="zstd">zstd (.sql.zst, requires PHP zstd extension)</option>
+                </select>
+            </div>
+            <div class="form-group">
+                <label for="exportAllInsertBatchKb">INSERT batch size (KB):</label>
+                <input type="number" id="exportAllInsertBatchKb" value="1024" min="4" max="16384">
+                <div class="help-text">Maximum size of each multi-row INSERT statement</div>
+            </div>
         </div>
         <div class="modal-footer">
             <button class="btn-secondary" onclick="closeModal('exportAllDatabasesModal')">Cancel</button>
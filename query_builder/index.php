@@ -63,6 +63,7 @@ require_once '../login/auth_check.php';
                 <div class="query-actions">
                     <button class="btn-save-query" id="saveQueryBtn">💾 Save Query</button>
                     <button class="btn-clear" id="clearBtn">🗑️ Clear</button>
+                    <button class="btn-clear" id="analyzeBtn" title="Show the execution plan and suggested indexes">🔍 Analyze</button>
                     <button class="btn-execute" id="executeBtn">▶ Execute</button>
                 </div>
             </div>
@@ -106,7 +107,22 @@ require_once '../login/auth_check.php';
                     <h3>📊 Query Results</h3>
                     <span class="results-info" id="resultsInfo"></span>
                 </div>
-                <button class="btn-export" id="exportQueryBtn" style="display: none;" title="Download results as CSV">⬇ Export</button>
+                <div class="results-actions">
+                    <div class="results-pager" id="resultsPager" style="display: none;">
+                        <button class="btn-pager" id="prevPageBtn" title="Previous page">◀ Prev</button>
+                        <button class="btn-pager" id="nextPageBtn" title="Next page">Next ▶</button>
+                        <button class="btn-pager" id="countRowsBtn" title="Count all rows of the result in the background">Count rows</button>
+                    </div>
+                    <select class="export-format" id="exportFormat" style="display: none;" title="Export format">
+                        <option value="csv">CSV</option>
+                        <option value="tsv">TSV</option>
+                        <option value="ndjson">NDJSON</option>
+                        <option value="csv.gz">CSV (gzip)</option>
+                        <option value="tsv.gz">TSV (gzip)</option>
+                        <option value="ndjson.gz">NDJSON (gzip)</option>
+                    </select>
+                    <button class="btn-export" id="exportQueryBtn" style="display: none;" title="Download all rows of the query">⬇ Export</button>
+                </div>
             </div>
             <div class="results-wrapper">
                 <table class="results-table" id="resultsTable">
@@ -115,6 +131,23 @@ require_once '../login/auth_check.php';
                 </table>
             </div>
         </div>
+
+        <div class="results-section plan-section" id="planSection" style="display: none;">
+            <div class="results-header">
+                <div class="results-title">
+                    <h3>🔍 Query Plan</h3>
+                    <span class="results-info" id="planInfo"></span>
+                </div>
+                <div class="results-actions">
+                    <button class="btn-pager" id="runAnalyzeBtn" title="Run the query and show the actual rows and times per step">⏱ Run EXPLAIN ANALYZE</button>
+                    <button class="btn-pager" id="closePlanBtn" title="Close the plan">✕</button>
+                </div>
+            </div>
+            <div class="plan-wrapper">
+                <div id="planAdvice"></div>
+                <ul class="plan-tree" id="planTree"></ul>
+            </div>
+        </div>
     </div>
 
     <div class="empty-state" id="emptyState">
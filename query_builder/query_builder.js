@@ -4,8 +4,7 @@
  */
 
 // Configuration
-const MAX_QUERY_RESULTS = 1000; // Must match QueryHandler::MAX_QUERY_RESULTS
-const MAX_EXPORT_RESULTS = 5000; // Must match QueryHandler::MAX_EXPORT_RESULTS
+const QUERY_PAGE_SIZE = 100; // Must match QueryHandler::QUERY_PAGE_SIZE
 const LAST_QUERY_KEY = 'queryBuilder:lastQuery';
 
 // Global state
@@ -13,6 +12,9 @@ let currentTable = '';
 let tableInfo = null;
 let lastExecutedQuery = null;
 let lastResultWasSelect = false;
+let schemaRequest = null; // Pending/finished getSchema request, shared by all tables
+let querySession = null; // Paging state of the last SELECT: { id, offset, pageSize, hasMore, total }
+let analyzedQuery = null; // Query shown in the plan section
 
 // UI helpers
 function toggleExportButton(enable) {
@@ -23,8 +25,10 @@ function toggleExportButton(enable) {
 
     if (enable) {
         exportButton.show().prop('disabled', false).text('⬇ Export');
+        $('#exportFormat').show();
     } else {
         exportButton.hide().prop('disabled', true).text('⬇ Export');
+        $('#exportFormat').hide();
     }
 }
 
@@ -203,6 +207,24 @@ $(document).ready(function() {
         executeQuery();
     });
 
+    $('#analyzeBtn').click(function() {
+        analyzeQuery(false);
+    });
+
+    $('#runAnalyzeBtn').click(function() {
+        analyzeQuery(true);
+    });
+
+    $('#closePlanBtn').click(function() {
+        $('#planSection').hide();
+    });
+
+    // Copy a suggested index
+    $('#planAdvice').on('click', '.plan-copy-btn', function() {
+        copyToClipboard($(this).data('sql'));
+        showToast('Index statement copied to clipboard', 'success');
+    });
+
     $('#clearBtn').click(function() {
         Dialog.confirm({
             title: 'Clear Query',
@@ -220,6 +242,7 @@ $(document).ready(function() {
                     $('#queryInput').val('');
                 }
                 $('#resultsSection').hide();
+                $('#planSection').hide();
                 toggleExportButton(false);
                 lastExecutedQuery = null;
                 lastResultWasSelect = false;
@@ -246,6 +269,22 @@ $(document).ready(function() {
         exportCurrentQuery();
     });
 
+    $('#prevPageBtn').click(function() {
+        if (querySession) {
+            fetchQueryPage(Math.max(0, querySession.offset - querySession.pageSize));
+        }
+    });
+
+    $('#nextPageBtn').click(function() {
+        if (querySession && querySession.hasMore) {
+            fetchQueryPage(querySession.offset + querySession.pageSize);
+        }
+    });
+
+    $('#countRowsBtn').click(function() {
+        countQueryResults();
+    });
+
     $('#importQueriesBtn').click(function() {
         $('#importFileInput').click();
     });
@@ -496,6 +535,23 @@ function populateTablesContainer(tables) {
     });
 }
 
+// Load the columns of all tables in one request
+// The API answers with an ETag, so the browser revalidates and reuses its copy
+// until the schema changes
+function loadSchema() {
+    if (!schemaRequest) {
+        schemaRequest = $.ajax({
+            url: '../api/?action=getSchema',
+            method: 'GET',
+            dataType: 'json'
+        });
+        schemaRequest.fail(function() {
+            schemaRequest = null;
+        });
+    }
+    return schemaRequest;
+}
+
 // Load fields for a specific table
 function loadTableFields(tableName, tableFieldsContainer) {
     const fieldList = tableFieldsContainer.find('.field-list');
@@ -508,30 +564,25 @@ function loadTableFields(tableName, tableFieldsContainer) {
     // Show loading indicator
     fieldList.html('<li style="padding: 10px; text-align: center; color: var(--color-text-muted); font-size: 12px;">Loading fields...</li>');
     
-    $.ajax({
-        url: '../api/?action=getTableInfo&table=' + encodeURIComponent(tableName),
-        method: 'GET',
-        dataType: 'json',
-        success: function(response) {
-            if (response.success && response.columns) {
-                fieldList.empty();
-                
-                response.columns.forEach(function(col) {
-                    const fieldItem = $(`
-                        <li class="field-item" data-field="${col.name}">
-                            <strong>${col.name}</strong>
-                            <span class="field-type">${col.type}</span>
-                        </li>
-                    `);
-                    fieldList.append(fieldItem);
-                });
-            } else {
-                fieldList.html('<li style="padding: 10px; text-align: center; color: var(--color-danger); font-size: 12px;">Error loading fields</li>');
-            }
-        },
-        error: function() {
+    loadSchema().done(function(response) {
+        const table = response.success && response.tables ? response.tables[tableName] : null;
+        if (table) {
+            fieldList.empty();
+            
+            table.columns.forEach(function(col) {
+                const fieldItem = $(`
+                    <li class="field-item" data-field="${col.name}">
+                        <strong>${col.name}</strong>
+                        <span class="field-type">${col.type}</span>
+                    </li>
+                `);
+                fieldList.append(fieldItem);
+            });
+        } else {
             fieldList.html('<li style="padding: 10px; text-align: center; color: var(--color-danger); font-size: 12px;">Error loading fields</li>');
         }
+    }).fail(function() {
+        fieldList.html('<li style="padding: 10px; text-align: center; color: var(--color-danger); font-size: 12px;">Error loading fields</li>');
     });
 }
 
@@ -577,19 +628,33 @@ function executeQuery() {
         method: 'POST',
         data: {
             action: 'executeQuery',
-            query: query
+            query: query,
+            pageSize: QUERY_PAGE_SIZE
         },
         dataType: 'json',
         success: function(response) {
+            response = checkStreamError(response);
             if (response.success) {
                 if (response.type === 'select') {
                     lastExecutedQuery = query;
                     lastResultWasSelect = true;
                     toggleExportButton(true);
+                    querySession = {
+                        id: response.sessionId,
+                        offset: response.offset,
+                        pageSize: response.pageSize,
+                        hasMore: response.hasMore,
+                        total: response.totalRows
+                    };
                 } else {
+                    querySession = null;
                     lastExecutedQuery = null;
                     lastResultWasSelect = false;
                     toggleExportButton(false);
+                    if (/^\s*(CREATE|ALTER|DROP|RENAME)\b/i.test(query)) {
+                        // Fetch the changed schema the next time a table is expanded
+                        schemaRequest = null;
+                    }
                 }
                 displayResults(response);
                 showToast('Query executed successfully', 'success');
@@ -633,22 +698,23 @@ function displayResults(response) {
     if (response.type === 'select') {
         const data = response.data || [];
         const rowCount = data.length;
-        const totalRows = response.totalRows || rowCount;
         
-        resultsInfo.text(`${rowCount} rows returned${totalRows > MAX_QUERY_RESULTS ? ` (limited to first ${MAX_QUERY_RESULTS})` : ''}`);
+        resultsInfo.text(response.message || `${rowCount} rows returned`);
         
-        if (rowCount === 0) {
-            resultsBody.append('<tr><td colspan="100" style="text-align: center; padding: 40px;">No results found</td></tr>');
-        } else {
-            // Build header
-            const columns = Object.keys(data[0]);
+        // Column names come with the page, so an empty page still has a header
+        const columns = response.columns || (rowCount > 0 ? Object.keys(data[0]) : []);
+        if (columns.length > 0) {
             let headerRow = '<tr>';
             columns.forEach(function(col) {
                 headerRow += `<th>${escapeHtml(col)}</th>`;
             });
             headerRow += '</tr>';
             resultsHead.html(headerRow);
-            
+        }
+        
+        if (rowCount === 0) {
+            resultsBody.append('<tr><td colspan="100" style="text-align: center; padding: 40px;">No results found</td></tr>');
+        } else {
             // Build rows
             data.forEach(function(row) {
                 let rowHtml = '<tr>';
@@ -664,8 +730,10 @@ function displayResults(response) {
                 resultsBody.append(rowHtml);
             });
         }
+        updatePager();
     } else {
         // Non-SELECT query (INSERT, UPDATE, DELETE, etc.)
+        updatePager();
         resultsInfo.text(response.message || 'Query executed successfully');
         resultsHead.html('<tr><th>Result</th></tr>');
         resultsBody.html(`<tr><td>${response.message || 'Success'}</td></tr>`);
@@ -674,63 +742,325 @@ function displayResults(response) {
     resultsSection.show();
 }
 
-function exportCurrentQuery() {
-    if (!lastResultWasSelect || !lastExecutedQuery) {
-        showToast('Please run a SELECT query before exporting', 'warning');
+// A streamed page that broke off after its first rows were sent reports the
+// error in streamError; treat it like a failed request
+function checkStreamError(response) {
+    return response.streamError ? { success: false, error: response.streamError } : response;
+}
+
+// Show the paging buttons for the current result session
+function updatePager() {
+    const pager = $('#resultsPager');
+    if (!querySession || (querySession.offset === 0 && !querySession.hasMore)) {
+        pager.hide();
         return;
     }
+    pager.show();
+    $('#prevPageBtn').prop('disabled', querySession.offset === 0);
+    $('#nextPageBtn').prop('disabled', !querySession.hasMore);
+    $('#countRowsBtn').toggle(querySession.total === null);
+}
 
-    const exportButton = $('#exportQueryBtn');
-    const originalText = exportButton.text();
-    exportButton.prop('disabled', true).text('⏳ Exporting...');
+// Load another page of the last SELECT (the query is kept on the server)
+function fetchQueryPage(offset) {
+    if (!querySession) {
+        return;
+    }
+    $('#loading').addClass('active');
+    $('#resultsPager button').prop('disabled', true);
+    
+    $.ajax({
+        url: '../api/',
+        method: 'POST',
+        data: {
+            action: 'fetchQueryPage',
+            sessionId: querySession.id,
+            offset: offset
+        },
+        dataType: 'json',
+        success: function(response) {
+            response = checkStreamError(response);
+            if (response.success) {
+                querySession.offset = response.offset;
+                querySession.hasMore = response.hasMore;
+                if (response.totalRows !== null) {
+                    querySession.total = response.totalRows;
+                }
+                displayResults(response);
+            } else {
+                showToast('Query error: ' + response.error, 'error');
+                updatePager();
+            }
+            $('#loading').removeClass('active');
+        },
+        error: function(xhr) {
+            const response = xhr.responseJSON || {};
+            showToast('Error: ' + (response.error || 'Unknown error'), 'error');
+            updatePager();
+            $('#loading').removeClass('active');
+        }
+    });
+}
+
+// Count all rows of the last SELECT in the background
+function countQueryResults() {
+    if (!querySession) {
+        return;
+    }
+    const session = querySession;
+    $('#countRowsBtn').prop('disabled', true).text('Counting...');
+    
+    $.ajax({
+        url: '../api/',
+        method: 'POST',
+        data: {
+            action: 'countQueryResults',
+            sessionId: session.id
+        },
+        dataType: 'json',
+        success: function(response) {
+            $('#countRowsBtn').prop('disabled', false).text('Count rows');
+            if (session !== querySession) {
+                return; // Another query was run meanwhile
+            }
+            if (response.success) {
+                session.total = response.totalRows;
+                const first = session.offset + 1;
+                const last = session.offset + $('#resultsBody tr').length;
+                $('#resultsInfo').text(`Rows ${first}-${last} of ${session.total}`);
+                updatePager();
+            } else {
+                showToast('Count failed: ' + response.error, 'error');
+            }
+        },
+        error: function(xhr) {
+            $('#countRowsBtn').prop('disabled', false).text('Count rows');
+            const response = xhr.responseJSON || {};
+            showToast('Error: ' + (response.error || 'Unknown error'), 'error');
+        }
+    });
+}
 
-    const params = new URLSearchParams();
-    params.append('action', 'exportQuery');
-    params.append('query', lastExecutedQuery);
-    params.append('maxRows', MAX_EXPORT_RESULTS);
-    params.append('format', 'csv');
+// Explain a query and show its plan with suggested indexes
+// runQuery: run the query as well (EXPLAIN ANALYZE) for the actual rows and times
+function analyzeQuery(runQuery) {
+    const query = runQuery ? analyzedQuery : $('#queryInput').val().trim();
 
-    fetch('../api/', {
+    if (!query) {
+        showToast('Please enter a SQL query', 'warning');
+        return;
+    }
+
+    $('#loading').addClass('active');
+    $('#analyzeBtn, #runAnalyzeBtn').prop('disabled', true);
+
+    $.ajax({
+        url: '../api/',
         method: 'POST',
-        headers: {
-            'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8'
+        data: {
+            action: 'analyzeQuery',
+            query: query,
+            analyze: runQuery
         },
-        body: params.toString()
-    })
-    .then(async (response) => {
-        const contentType = response.headers.get('Content-Type') || '';
-
-        if (!response.ok) {
-            if (contentType.includes('application/json')) {
-                const data = await response.json();
-                throw new Error(data.error || 'Unknown error');
+        dataType: 'json',
+        success: function(response) {
+            if (response.success) {
+                analyzedQuery = query;
+                displayPlan(response);
+            } else {
+                showToast('Analyze error: ' + response.error, 'error');
             }
-            throw new Error('Unexpected error exporting query');
+            $('#loading').removeClass('active');
+            $('#analyzeBtn, #runAnalyzeBtn').prop('disabled', false);
+        },
+        error: function(xhr) {
+            const response = xhr.responseJSON || {};
+            showToast('Error: ' + (response.error || 'Unknown error'), 'error');
+            $('#loading').removeClass('active');
+            $('#analyzeBtn, #runAnalyzeBtn').prop('disabled', false);
         }
+    });
+}
+
+// Display the plan, its issues and the suggested indexes
+function displayPlan(response) {
+    let info = response.server + (response.analyzed ? ' · EXPLAIN ANALYZE' : ' · EXPLAIN');
+    if (response.cost !== null) {
+        info += ` · estimated cost ${formatPlanNumber(response.cost)}`;
+    }
+    $('#planInfo').text(info);
+    // Only a SELECT is run for the actual rows and times
+    $('#runAnalyzeBtn').toggle(isSelectQuery(analyzedQuery));
+
+    let html = '';
+    if (response.issues.length > 0) {
+        html += '<ul class="plan-issues">';
+        response.issues.forEach(function(issue) {
+            const icon = issue.severity === 'warning' ? '⚠️' : 'ℹ️';
+            html += `<li class="plan-issue plan-issue-${issue.severity}">${icon} ${escapeHtml(issue.message)}</li>`;
+        });
+        html += '</ul>';
+    } else {
+        html += '<div class="plan-note">✅ No full scans, filesorts or temporary tables in this plan</div>';
+    }
 
-        if (!contentType.includes('text/csv')) {
-            throw new Error('Unexpected response format');
+    const sections = [
+        ['💡 Suggested indexes', response.suggestions],
+        ['📊 Indexes for data grid filters and sorting', response.gridAdvice]
+    ];
+    sections.forEach(function([title, suggestions]) {
+        if (suggestions.length === 0) {
+            return;
         }
+        html += `<h4>${title}</h4><ul class="plan-suggestions">`;
+        suggestions.forEach(function(suggestion) {
+            html += `<li class="plan-suggestion">
+                <div class="plan-suggestion-text">
+                    <code>${escapeHtml(suggestion.sql)}</code>
+                    <span class="plan-suggestion-reason">${escapeHtml(suggestion.reason)}</span>
+                </div>
+                <button class="btn-pager plan-copy-btn" data-sql="${escapeHtml(suggestion.sql)}" title="Copy the statement">📋 Copy</button>
+            </li>`;
+        });
+        html += '</ul>';
+    });
+    $('#planAdvice').html(html);
+
+    const nodes = response.analyzedPlan || response.plan;
+    $('#planTree').html(nodes.length > 0
+        ? nodes.map(renderPlanNode).join('')
+        : '<li class="plan-node-details">The server returned an empty plan</li>');
+
+    $('#planSection').show();
+}
+
+// True for a SELECT, or a WITH whose main statement (after the CTE list) is a SELECT
+function isSelectQuery(query) {
+    if (/^\s*SELECT\b/i.test(query)) {
+        return true;
+    }
+    if (!/^\s*WITH\b/i.test(query) || query.includes('/*!')) {
+        return false;
+    }
+    // Drop quoted text and comments, then the parenthesized CTE bodies
+    let rest = query.replace(/'(?:\\.|[^'\\])*'|"(?:\\.|[^"\\])*"|`[^`]*`|\/\*[\s\S]*?\*\/|(?:#|--\s)[^\n]*/g, ' ');
+    while (/\([^()]*\)/.test(rest)) {
+        rest = rest.replace(/\([^()]*\)/g, ' ');
+    }
+    const main = rest.match(/\b(SELECT|TABLE|VALUES|UPDATE|DELETE|INSERT|REPLACE)\b/i);
+    return main !== null && main[1].toUpperCase() === 'SELECT';
+}
+
+// One step of the plan with the steps below it
+function renderPlanNode(node) {
+    const stats = [];
+    if (node.key) {
+        stats.push(`key ${node.key}`);
+    }
+    if (node.rows !== null) {
+        stats.push(`~${formatPlanNumber(node.rows)} rows`);
+    }
+    if (node.filtered !== null) {
+        stats.push(`${formatPlanNumber(node.filtered)}% filtered`);
+    }
+    if (node.cost !== null) {
+        stats.push(`cost ${formatPlanNumber(node.cost)}`);
+    }
+    if (node.actualRows !== null) {
+        stats.push(`actual ${formatPlanNumber(node.actualRows)} rows`);
+    }
+    if (node.actualTime !== null) {
+        stats.push(`${formatPlanNumber(node.actualTime)} ms`);
+    }
+    if (node.loops !== null) {
+        stats.push(`${formatPlanNumber(node.loops)} loops`);
+    }
+
+    let html = `<li><span class="plan-node-operation">${escapeHtml(node.operation)}</span>`;
+    if (node.table) {
+        html += ` <span class="plan-node-table">${escapeHtml(node.table)}</span>`;
+    }
+    node.flags.forEach(function(flag) {
+        html += `<span class="plan-flag plan-flag-${flag}">${escapeHtml(flag)}</span>`;
+    });
+    if (stats.length > 0) {
+        html += ` <span class="plan-node-stats">(${escapeHtml(stats.join(' · '))})</span>`;
+    }
+    const details = node.condition ? node.details.concat(['Condition: ' + node.condition]) : node.details;
+    details.forEach(function(detail) {
+        html += `<div class="plan-node-details">${escapeHtml(detail)}</div>`;
+    });
+    if (node.children.length > 0) {
+        html += '<ul>' + node.children.map(renderPlanNode).join('') + '</ul>';
+    }
+    return html + '</li>';
+}
+
+function formatPlanNumber(value) {
+    return Number(value).toLocaleString(undefined, { maximumFractionDigits: 2 });
+}
+
+// Export all rows of the last SELECT
+// The file is streamed by the server; it is posted as a form to a hidden
+// iframe so the browser saves it to disk instead of holding it in memory
+function exportCurrentQuery() {
+    if (!lastResultWasSelect || !lastExecutedQuery) {
+        showToast('Please run a SELECT query before exporting', 'warning');
+        return;
+    }
 
-        const blob = await response.blob();
-        const downloadUrl = (window.URL || window.webkitURL).createObjectURL(blob);
-        const link = document.createElement('a');
-        const timestamp = new Date().toISOString().replace(/[:]/g, '-').split('.')[0];
-        link.href = downloadUrl;
-        link.download = `query-results-${timestamp}.csv`;
-        document.body.appendChild(link);
-        link.click();
-        document.body.removeChild(link);
-        (window.URL || window.webkitURL).revokeObjectURL(downloadUrl);
-        showToast('Export complete', 'success');
-    })
-    .catch((error) => {
-        console.error('Error exporting query:', error);
-        showToast('Error exporting query: ' + error.message, 'error');
-    })
-    .finally(() => {
-        exportButton.prop('disabled', false).text(originalText);
+    // e.g. "csv" or "ndjson.gz"
+    const parts = ($('#exportFormat').val() || 'csv').split('.');
+    const timestamp = new Date().toISOString().replace(/[:]/g, '-').split('.')[0];
+
+    submitDownload({
+        action: 'exportQuery',
+        query: lastExecutedQuery,
+        format: parts[0],
+        compression: parts[1] === 'gz' ? 'gzip' : 'none',
+        filename: `query-results-${timestamp}`
+    });
+    showToast('Export started', 'success');
+}
+
+// Post a download request through a hidden iframe
+// A JSON error response is loaded into the iframe and shown as a toast
+function submitDownload(fields) {
+    let frame = document.getElementById('downloadFrame');
+    if (!frame) {
+        frame = document.createElement('iframe');
+        frame.id = 'downloadFrame';
+        frame.name = 'downloadFrame';
+        frame.style.display = 'none';
+        frame.addEventListener('load', function() {
+            try {
+                const response = JSON.parse(frame.contentDocument.body.textContent);
+                if (response && response.error) {
+                    showToast('Error exporting query: ' + response.error, 'error');
+                }
+            } catch (e) {
+                // Not a JSON error response
+            }
+        });
+        document.body.appendChild(frame);
+    }
+
+    const form = document.createElement('form');
+    form.method = 'POST';
+    form.action = '../api/';
+    form.target = 'downloadFrame';
+
+    Object.keys(fields).forEach(function(name) {
+        const input = document.createElement('input');
+        input.type = 'hidden';
+        input.name = name;
+        input.value = fields[name];
+        form.appendChild(input);
     });
+
+    document.body.appendChild(form);
+    form.submit();
+    document.body.removeChild(form);
 }
 
 // Show empty state (only when no tables are available)
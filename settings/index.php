@@ -5,6 +5,7 @@
  */
 
 require_once '../login/auth_check.php';
+require_once '../api/utils/SqlProfiler.php';
 
 // Check authentication
 if (!isset($_SESSION['authenticated']) || $_SESSION['authenticated'] !== true) {
@@ -54,7 +55,19 @@ $defaultSettings = [
         'initial scroll' => true
     ],
     'Crud Manager' => [
-        'records per page' => 20
+        'records per page' => 20,
+        'count mode' => 'auto'
+    ],
+    'Table Structure' => [
+        'online chunk rows' => 1000,
+        'online throttle ms' => 50
+    ],
+    'Query Builder' => [
+        'export row limit' => 0
+    ],
+    'Profiling' => [
+        'enabled' => true,
+        'slow request ms' => 0
     ]
 ];
 
@@ -134,6 +147,13 @@ if ($_SERVER['REQUEST_METHOD'] === 'POST' && ($_POST['action'] ?? '') === 'save_
     exit;
 }
 
+// Clear the recorded API performance samples
+if ($_SERVER['REQUEST_METHOD'] === 'POST' && ($_POST['action'] ?? '') === 'clear_profiling') {
+    SqlProfiler::clearStats();
+    header('Location: index.php');
+    exit;
+}
+
 // Handle Form Submission
 if ($_SERVER['REQUEST_METHOD'] === 'POST') {
     // Validate CSRF token if you have one, skipping for now as per context
@@ -168,6 +188,28 @@ if ($_SERVER['REQUEST_METHOD'] === 'POST') {
         if ($rpp > 1000) $rpp = 1000;
         $newSettings['Crud Manager']['records per page'] = $rpp;
     }
+    if (isset($_POST['count_mode']) && in_array($_POST['count_mode'], ['auto', 'exact', 'lazy'], true)) {
+        $newSettings['Crud Manager']['count mode'] = $_POST['count_mode'];
+    }
+    
+    // Table Structure Settings
+    if (isset($_POST['online_chunk_rows'])) {
+        $newSettings['Table Structure']['online chunk rows'] = max(1, (int)$_POST['online_chunk_rows']);
+    }
+    if (isset($_POST['online_throttle_ms'])) {
+        $newSettings['Table Structure']['online throttle ms'] = max(0, (int)$_POST['online_throttle_ms']);
+    }
+    
+    // Query Builder Settings
+    if (isset($_POST['export_row_limit'])) {
+        $newSettings['Query Builder']['export row limit'] = max(0, (int)$_POST['export_row_limit']);
+    }
+    
+    // Profiling Settings
+    $newSettings['Profiling']['enabled'] = isset($_POST['profiling_enabled']);
+    if (isset($_POST['slow_request_ms'])) {
+        $newSettings['Profiling']['slow request ms'] = max(0, (int)$_POST['slow_request_ms']);
+    }
     
     // Save to file
     if (file_put_contents($settingsFile, json_encode($newSettings, JSON_PRETTY_PRINT))) {
@@ -260,6 +302,79 @@ if ($_SERVER['REQUEST_METHOD'] === 'POST') {
                                    value="<?php echo htmlspecialchars($currentSettings['Crud Manager']['records per page'] ?? 20); ?>">
                             <div class="field-info">Number of records to display per page (20 - 1000).</div>
                         </div>
+                        <div class="form-group">
+                            <label for="count_mode">Record Count</label>
+                            <?php $countMode = $currentSettings['Crud Manager']['count mode'] ?? 'auto'; ?>
+                            <select id="count_mode" name="count_mode">
+                                <option value="auto" <?php echo $countMode === 'auto' ? 'selected' : ''; ?>>Fast (estimated for large tables, cached when filtered)</option>
+                                <option value="exact" <?php echo $countMode === 'exact' ? 'selected' : ''; ?>>Exact (COUNT(*) on every page)</option>
+                                <option value="lazy" <?php echo $countMode === 'lazy' ? 'selected' : ''; ?>>Lazy (show rows first, count afterwards)</option>
+                            </select>
+                            <div class="field-info">How the total number of records is computed in the Crud Manager.</div>
+                        </div>
+                    </div>
+                </div>
+
+                <!-- Table Structure Section -->
+                <div class="settings-section">
+                    <div class="settings-section-header">
+                        <h2>Table Structure</h2>
+                    </div>
+                    <div class="settings-section-body">
+                        <div class="form-group">
+                            <label for="online_chunk_rows">Online Change Chunk Size</label>
+                            <input type="number" id="online_chunk_rows" name="online_chunk_rows" 
+                                   min="1" step="100"
+                                   value="<?php echo htmlspecialchars($currentSettings['Table Structure']['online chunk rows'] ?? 1000); ?>">
+                            <div class="field-info">Rows copied per chunk when an online column change falls back to a shadow-table copy. Each chunk briefly locks its rows.</div>
+                        </div>
+                        <div class="form-group">
+                            <label for="online_throttle_ms">Online Change Pause (ms)</label>
+                            <input type="number" id="online_throttle_ms" name="online_throttle_ms" 
+                                   min="0" step="10"
+                                   value="<?php echo htmlspecialchars($currentSettings['Table Structure']['online throttle ms'] ?? 50); ?>">
+                            <div class="field-info">Pause between copied chunks, leaving room for other queries and replication. 0 = copy at full speed.</div>
+                        </div>
+                    </div>
+                </div>
+
+                <!-- Query Builder Section -->
+                <div class="settings-section">
+                    <div class="settings-section-header">
+                        <h2>Query Builder</h2>
+                    </div>
+                    <div class="settings-section-body">
+                        <div class="form-group">
+                            <label for="export_row_limit">Export Row Limit</label>
+                            <input type="number" id="export_row_limit" name="export_row_limit" 
+                                   min="0" step="1000"
+                                   value="<?php echo htmlspecialchars($currentSettings['Query Builder']['export row limit'] ?? 0); ?>">
+                            <div class="field-info">Maximum number of rows in a query export (0 = no limit). Exports are streamed, so large limits do not need extra server memory.</div>
+                        </div>
+                    </div>
+                </div>
+
+                <!-- Profiling Section -->
+                <div class="settings-section">
+                    <div class="settings-section-header">
+                        <h2>Profiling</h2>
+                    </div>
+                    <div class="settings-section-body">
+                        <div class="form-group">
+                            <label>
+                                <input type="checkbox" name="profiling_enabled" value="1" 
+                                       <?php echo ($currentSettings['Profiling']['enabled'] ?? true) ? 'checked' : ''; ?>>
+                                Profile API Requests
+                            </label>
+                            <div class="field-info">Time the SQL statements of every API and sync request. Shown in the browser's network panel (Server-Timing) and summarized below.</div>
+                        </div>
+                        <div class="form-group">
+                            <label for="slow_request_ms">Slow Request Log (ms)</label>
+                            <input type="number" id="slow_request_ms" name="slow_request_ms" 
+                                   min="0" step="100"
+                                   value="<?php echo htmlspecialchars($currentSettings['Profiling']['slow request ms'] ?? 0); ?>">
+                            <div class="field-info">Log requests taking at least this long, with their slowest statement, to tmp/logs/slow_requests.log (sync requests: the sync log). 0 = off.</div>
+                        </div>
                     </div>
                 </div>
 
@@ -268,6 +383,57 @@ if ($_SERVER['REQUEST_METHOD'] === 'POST') {
                 </div>
 
             </form>
+
+            <!-- API Performance Dashboard -->
+            <?php $actionStats = SqlProfiler::getActionStats(); ?>
+            <div class="settings-section performance-section">
+                <div class="settings-section-header settings-section-header-with-action">
+                    <h2>API Performance</h2>
+                    <?php if (!empty($actionStats)): ?>
+                        <form method="POST" action="index.php">
+                            <input type="hidden" name="action" value="clear_profiling">
+                            <button type="submit" class="btn-secondary">Clear</button>
+                        </form>
+                    <?php endif; ?>
+                </div>
+                <div class="settings-section-body">
+                    <?php if (empty($actionStats)): ?>
+                        <div class="field-info">No requests recorded yet.</div>
+                    <?php else: ?>
+                        <table class="performance-table">
+                            <thead>
+                                <tr>
+                                    <th>Action</th>
+                                    <th>Requests</th>
+                                    <th>p50 (ms)</th>
+                                    <th>p95 (ms)</th>
+                                    <th>SQL p50 (ms)</th>
+                                    <th>SQL p95 (ms)</th>
+                                    <th>Statements</th>
+                                    <th>Rows</th>
+                                    <th>KB</th>
+                                </tr>
+                            </thead>
+                            <tbody>
+                                <?php foreach ($actionStats as $statsAction => $stats): ?>
+                                    <tr>
+                                        <td><?php echo htmlspecialchars($statsAction); ?></td>
+                                        <td><?php echo $stats['requests']; ?></td>
+                                        <td><?php echo number_format($stats['p50'], 1); ?></td>
+                                        <td><?php echo number_format($stats['p95'], 1); ?></td>
+                                        <td><?php echo number_format($stats['sqlP50'], 1); ?></td>
+                                        <td><?php echo number_format($stats['sqlP95'], 1); ?></td>
+                                        <td><?php echo number_format($stats['statements'], 1); ?></td>
+                                        <td><?php echo number_format($stats['rows']); ?></td>
+                                        <td><?php echo number_format($stats['bytes'] / 1024, 1); ?></td>
+                                    </tr>
+                                <?php endforeach; ?>
+                            </tbody>
+                        </table>
+                        <div class="field-info">Recent requests per action (statements, rows and KB are averages per request).</div>
+                    <?php endif; ?>
+                </div>
+            </div>
         </div>
     </div>
 
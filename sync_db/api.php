@@ -11,6 +11,9 @@
  * - Returns data in JSON format
  */
 
+require_once __DIR__ . '/../api/utils/RequestTimer.php';
+RequestTimer::start();
+
 // Prevent direct access without proper authentication
 header('Content-Type: application/json');
 
@@ -50,15 +53,51 @@ function sendResponse($success, $data = null, $message = '', $httpCode = 200) {
             $message = $message !== '' ? ($message . ' | ' . $extraOutput) : $extraOutput;
         }
     }
-    echo json_encode([
+    $body = json_encode([
         'success' => $success,
         'data' => $data,
         'message' => $message,
         'timestamp' => date('Y-m-d H:i:s')
     ]);
+
+    // Compress larger bodies when the client accepts it (browsers and cURL decode transparently)
+    $acceptEncoding = $_SERVER['HTTP_ACCEPT_ENCODING'] ?? '';
+    if (strlen($body) >= 1024 && !headers_sent()) {
+        header('Vary: Accept-Encoding');
+        if (stripos($acceptEncoding, 'zstd') !== false && function_exists('zstd_compress')) {
+            header('Content-Encoding: zstd');
+            $body = zstd_compress($body, 3);
+        } elseif (stripos($acceptEncoding, 'gzip') !== false && function_exists('gzencode')) {
+            header('Content-Encoding: gzip');
+            $body = gzencode($body, 5);
+        }
+    }
+    RequestTimer::sendHeader(['total' => RequestTimer::elapsed()]);
+    header('Content-Length: ' . strlen($body));
+    echo $body;
     exit();
 }
 
+/**
+ * Shape a page of rows for the requested wire format
+ *
+ * 'compact' sends the column names once and every row as a positional
+ * array; the default keeps one associative object per row ('data').
+ */
+function formatRows($rows, $format, $columns = null) {
+    if ($format !== 'compact') {
+        return ['data' => $rows];
+    }
+    if ($columns === null) {
+        $columns = empty($rows) ? [] : array_keys($rows[0]);
+    }
+    return [
+        'format' => 'compact',
+        'columns' => $columns,
+        'rows' => array_map('array_values', $rows)
+    ];
+}
+
 /**
  * Log sync operations
  */
@@ -86,6 +125,9 @@ require_once $configPath;
 
 // Load shared IP functions
 require_once __DIR__ . '/../login/ip_functions.php';
+require_once __DIR__ . '/delta_functions.php';
+require_once __DIR__ . '/../api/utils/JsonStreamWriter.php';
+require_once __DIR__ . '/../api/utils/ProfiledConnection.php';
 
 // Set execution limits for large databases
 set_time_limit(SYNC_MAX_EXECUTION_TIME);
@@ -107,6 +149,7 @@ if (empty($apiKey) || $apiKey !== SYNC_API_KEY) {
 
 // Get action
 $action = $_POST['action'] ?? $_GET['action'] ?? '';
+SqlProfiler::start('sync:' . $action, 'logSync');
 
 // Get database credentials from request
 $dbHost = $_POST['db_host'] ?? 'localhost';
@@ -123,9 +166,9 @@ if ($action !== 'list_databases' && (empty($dbUser) || empty($dbName))) {
 try {
     // For list_databases, connect without specifying a database
     if ($action === 'list_databases') {
-        $conn = new mysqli($dbHost, $dbUser, $dbPass);
+        $conn = new ProfiledConnection($dbHost, $dbUser, $dbPass);
     } else {
-        $conn = new mysqli($dbHost, $dbUser, $dbPass, $dbName);
+        $conn = new ProfiledConnection($dbHost, $dbUser, $dbPass, $dbName);
     }
     
     if ($conn->connect_error) {
@@ -192,35 +235,200 @@ switch ($action) {
         $table = $_POST['table'] ?? '';
         $offset = intval($_POST['offset'] ?? 0);
         $limit = intval($_POST['limit'] ?? SYNC_CHUNK_SIZE);
+        $format = $_POST['format'] ?? 'rows';
         
         if (empty($table)) {
             sendResponse(false, null, 'Table name required', 400);
         }
         
-        // Get total count
-        $countResult = $conn->query("SELECT COUNT(*) as total FROM `" . $conn->real_escape_string($table) . "`");
-        $totalRows = $countResult->fetch_assoc()['total'];
-        
-        // Get data chunk
-        $result = $conn->query("SELECT * FROM `" . $conn->real_escape_string($table) . "` LIMIT $offset, $limit");
+        $escapedTable = $conn->real_escape_string($table);
+        
+        if ($format === 'compact') {
+            // Count once (first chunk); has_more comes from fetching one extra row
+            $totalRows = null;
+            if ($offset === 0) {
+                $countResult = $conn->query("SELECT COUNT(*) as total FROM `$escapedTable`");
+                $totalRows = $countResult ? (int) $countResult->fetch_assoc()['total'] : null;
+            }
+            $result = $conn->query("SELECT * FROM `$escapedTable` LIMIT $offset, " . ($limit + 1), MYSQLI_USE_RESULT);
+        } else {
+            // Get total count
+            $countResult = $conn->query("SELECT COUNT(*) as total FROM `$escapedTable`");
+            $totalRows = $countResult->fetch_assoc()['total'];
+            
+            // Get data chunk
+            $result = $conn->query("SELECT * FROM `$escapedTable` LIMIT $offset, $limit", MYSQLI_USE_RESULT);
+        }
         if (!$result) {
             sendResponse(false, null, 'Failed to get table data: ' . $conn->error, 500);
         }
         
-        $data = [];
-        while ($row = $result->fetch_assoc()) {
-            $data[] = $row;
+        // Stream the rows as they are read instead of building the whole
+        // chunk in memory; has_more follows the rows (same envelope as sendResponse)
+        if (ob_get_level() > 0) {
+            ob_end_clean();
         }
-        
-        logSync("Retrieved data for table: $table (offset: $offset, limit: $limit)");
-        sendResponse(true, [
+        $json = new JsonStreamWriter(
+            defined('SYNC_STREAM_FLUSH_BYTES') ? SYNC_STREAM_FLUSH_BYTES : JsonStreamWriter::FLUSH_BYTES,
+            OutputStream::negotiateEncoding()
+        );
+        $json->beginObject();
+        $json->value(true, 'success');
+        $json->beginObject('data');
+        $json->values([
             'table' => $table,
-            'data' => $data,
             'total_rows' => $totalRows,
             'offset' => $offset,
-            'limit' => $limit,
-            'has_more' => ($offset + $limit) < $totalRows
-        ], 'Table data retrieved successfully');
+            'limit' => $limit
+        ]);
+        
+        $rowCount = 0;
+        $hasMore = false;
+        $readError = null;
+        try {
+            if ($format === 'compact') {
+                $json->value('compact', 'format');
+                $json->value(array_map(function($field) {
+                    return $field->name;
+                }, $result->fetch_fields()), 'columns');
+                $json->beginArray('rows');
+                while ($row = $result->fetch_row()) {
+                    if ($rowCount === $limit) {
+                        $hasMore = true;
+                        continue;
+                    }
+                    $json->value($row);
+                    $rowCount++;
+                }
+            } else {
+                $json->beginArray('data');
+                while ($row = $result->fetch_assoc()) {
+                    $json->value($row);
+                    $rowCount++;
+                }
+                $hasMore = ($offset + $limit) < $totalRows;
+            }
+        } catch (mysqli_sql_exception $e) {
+            $readError = $e->getMessage();
+        }
+        // Without exceptions a read error ends the fetch loop like the end of
+        // the result; a short page must not go out as a successful one
+        if ($readError !== null || $conn->errno) {
+            $error = 'Failed to read table data: ' . ($conn->errno ? $conn->error : $readError);
+            $result->free();
+            logSync("Error reading data for table: $table (offset: $offset): $error");
+            try {
+                $json->fail($error);
+            } catch (Exception $e) {
+                // Nothing sent yet: answer with a normal (uncompressed) error response
+                header_remove('Content-Encoding');
+                sendResponse(false, null, $e->getMessage(), 500);
+            }
+            exit();
+        }
+        $json->endArray();
+        $result->free();
+        
+        $json->value($hasMore, 'has_more');
+        $json->endObject();
+        $json->values([
+            'message' => 'Table data retrieved successfully',
+            'timestamp' => date('Y-m-d H:i:s')
+        ]);
+        $json->endObject();
+        $json->close();
+        
+        logSync("Retrieved data for table: $table (offset: $offset, limit: $limit, rows: $rowCount, bytes: " . $json->getBytesWritten() . ")");
+        exit();
+        
+    case 'get_table_checksums':
+        // Split a table into primary-key ranges and checksum each range (delta sync)
+        $table = $_POST['table'] ?? '';
+        $rangeSize = max(100, min(100000, intval($_POST['range_size'] ?? 10000)));
+        $maxRanges = max(1, min(1000, intval($_POST['max_ranges'] ?? 100)));
+
+        if (empty($table)) {
+            sendResponse(false, null, 'Table name required', 400);
+        }
+
+        try {
+            $pkColumns = getPrimaryKeyColumns($conn, $table);
+            if (empty($pkColumns)) {
+                // No ranges without a key; the client falls back to a full copy
+                sendResponse(true, ['table' => $table, 'primary_key' => [], 'ranges' => [], 'has_more' => false],
+                    'Table has no primary key');
+            }
+            $after = decodeKey($_POST['after'] ?? '', count($pkColumns));
+            $checksums = getRangeChecksums($conn, $table, $pkColumns, $rangeSize, $after, $maxRanges);
+        } catch (Exception $e) {
+            sendResponse(false, null, $e->getMessage(), 500);
+        }
+
+        logSync("Checksummed " . count($checksums['ranges']) . " ranges of table: $table");
+        sendResponse(true, [
+            'table' => $table,
+            'primary_key' => $pkColumns,
+            'range_size' => $rangeSize,
+            'ranges' => $checksums['ranges'],
+            'has_more' => $checksums['has_more']
+        ], 'Table checksums retrieved successfully');
+        break;
+
+    case 'get_range_data':
+        // Get the rows of one primary-key range (delta sync)
+        $table = $_POST['table'] ?? '';
+        $limit = max(1, intval($_POST['limit'] ?? SYNC_CHUNK_SIZE));
+
+        if (empty($table)) {
+            sendResponse(false, null, 'Table name required', 400);
+        }
+
+        try {
+            $pkColumns = getPrimaryKeyColumns($conn, $table);
+            if (empty($pkColumns)) {
+                sendResponse(false, null, 'Table has no primary key: ' . $table, 400);
+            }
+            $from = decodeKey($_POST['from'] ?? '', count($pkColumns));
+            $to = decodeKey($_POST['to'] ?? '', count($pkColumns));
+            $page = fetchRangeRows($conn, $table, $pkColumns, $from, $to, $limit);
+        } catch (Exception $e) {
+            sendResponse(false, null, $e->getMessage(), 500);
+        }
+
+        logSync("Retrieved range data for table: $table (" . count($page['data']) . " rows)");
+        $rows = $page['data'];
+        unset($page['data']);
+        sendResponse(true, ['table' => $table] + $page + formatRows($rows, $_POST['format'] ?? 'rows'),
+            'Range data retrieved successfully');
+        break;
+
+    case 'get_changed_rows':
+        // Get rows changed since a high-water mark (updated_at delta sync)
+        $table = $_POST['table'] ?? '';
+        $column = $_POST['column'] ?? DELTA_UPDATED_COLUMN;
+        $since = ($_POST['since'] ?? '') !== '' ? $_POST['since'] : null;
+        $limit = max(1, intval($_POST['limit'] ?? SYNC_CHUNK_SIZE));
+
+        if (empty($table)) {
+            sendResponse(false, null, 'Table name required', 400);
+        }
+
+        try {
+            $pkColumns = getPrimaryKeyColumns($conn, $table);
+            if (empty($pkColumns) || getHighWaterMarkColumn($conn, $table, $column) === null) {
+                sendResponse(false, null, "Table '$table' needs a primary key and a datetime/timestamp column '$column'", 400);
+            }
+            $after = decodeKey($_POST['after'] ?? '', count($pkColumns) + 1);
+            $page = fetchChangedRows($conn, $table, $column, $pkColumns, $since, $after, $limit);
+        } catch (Exception $e) {
+            sendResponse(false, null, $e->getMessage(), 500);
+        }
+
+        logSync("Retrieved changed rows for table: $table (" . count($page['data']) . " rows since " . ($since ?? 'start') . ")");
+        $rows = $page['data'];
+        unset($page['data']);
+        sendResponse(true, ['table' => $table] + $page + formatRows($rows, $_POST['format'] ?? 'rows'),
+            'Changed rows retrieved successfully');
         break;
         
     case 'get_views':
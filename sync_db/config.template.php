@@ -31,6 +31,11 @@ define('SYNC_MEMORY_LIMIT', '-1');
 // Recommended: 1000-5000 for most databases
 define('SYNC_CHUNK_SIZE', 1000);
 
+// Bytes of table data collected before they are flushed to the client
+// Rows are streamed while they are read; smaller values lower memory use,
+// larger values mean fewer (and better compressed) writes
+define('SYNC_STREAM_FLUSH_BYTES', 65536);
+
 // Whether to log sync operations
 // Logs are written to SYNC_LOG_FILE
 define('SYNC_ENABLE_LOGGING', true);
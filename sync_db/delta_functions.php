@@ -0,0 +1,392 @@
+<?php
+/**
+ * Delta Sync Functions
+ *
+ * Shared by the remote API (sync_db/api.php) and the local handler
+ * (sync_db/sync_handler.php) to compare tables without copying them:
+ * - a table is split into primary-key ranges of a fixed number of rows
+ *   (boundaries are taken from the source, so both sides use the same ranges)
+ * - each range gets a checksum: BIT_XOR over the first 64 bits of an MD5 hash
+ *   of every row, plus the row count
+ * - ranges whose checksum differs are re-fetched and replaced
+ *
+ * Tables with an updated_at column can instead be synced from a high-water
+ * mark (rows changed since the newest local updated_at). That mode cannot
+ * see rows deleted on the source.
+ *
+ * Key values are passed around as JSON arrays (one value per primary key
+ * column, in key order); null stands for an open range end.
+ */
+
+// Column used for high-water-mark syncing
+define('DELTA_UPDATED_COLUMN', 'updated_at');
+
+// Rows of a range being replaced are staged here between requests
+define('DELTA_STAGE_DIR', __DIR__ . '/../tmp/sync_stage');
+
+// Seconds after which an abandoned staging file is removed
+define('DELTA_STAGE_TTL', 86400);
+
+/**
+ * Primary key columns of a table, in key order (empty when there is none)
+ */
+function getPrimaryKeyColumns($conn, $table) {
+    $result = $conn->query("SHOW KEYS FROM `" . str_replace('`', '``', $table) . "` WHERE Key_name = 'PRIMARY'");
+    if (!$result) {
+        throw new Exception("Failed to read primary key of '$table': " . $conn->error);
+    }
+    $columns = [];
+    while ($row = $result->fetch_assoc()) {
+        $columns[(int) $row['Seq_in_index']] = $row['Column_name'];
+    }
+    ksort($columns);
+    return array_values($columns);
+}
+
+/**
+ * The high-water-mark column of a table, or null when it has no usable one
+ */
+function getHighWaterMarkColumn($conn, $table, $column = DELTA_UPDATED_COLUMN) {
+    $result = $conn->query("SHOW COLUMNS FROM `" . str_replace('`', '``', $table) . "` LIKE '"
+        . $conn->real_escape_string(addcslashes($column, '%_')) . "'");
+    if (!$result || !($row = $result->fetch_assoc())) {
+        return null;
+    }
+    return preg_match('/^(datetime|timestamp)/i', $row['Type']) ? $row['Field'] : null;
+}
+
+/**
+ * SHOW CREATE TABLE output without the parts that differ between identical tables
+ */
+function normalizeCreateTable($createStatement) {
+    return trim(preg_replace('/\s+AUTO_INCREMENT=\d+/i', '', $createStatement));
+}
+
+/**
+ * Split a table into ranges of $rangeSize rows and checksum each range
+ *
+ * @param array|null $after Exclusive lower bound to continue from (null = start of table)
+ * @param int $maxRanges Maximum number of ranges to return in one call
+ * @return array ['ranges' => [['from', 'to', 'rows', 'checksum'], ...], 'has_more' => bool]
+ */
+function getRangeChecksums($conn, $table, $pkColumns, $rangeSize, $after = null, $maxRanges = 100) {
+    $quotedTable = '`' . str_replace('`', '``', $table) . '`';
+    $keyList = quoteColumnList($pkColumns);
+    $ranges = [];
+    $from = $after;
+    $hasMore = true;
+
+    while (count($ranges) < $maxRanges) {
+        // The last key of the range is the $rangeSize-th key after $from
+        $where = $from === null ? '' : 'WHERE ' . buildKeyRangeCondition($conn, $pkColumns, $from, null);
+        $result = $conn->query("SELECT $keyList FROM $quotedTable $where ORDER BY $keyList LIMIT 1 OFFSET " . ($rangeSize - 1));
+        if (!$result) {
+            throw new Exception("Failed to split '$table' into ranges: " . $conn->error);
+        }
+        $row = $result->fetch_row();
+        if ($row === null) {
+            // Fewer than $rangeSize rows left: the final range is open-ended
+            $ranges[] = ['from' => $from, 'to' => null];
+            $hasMore = false;
+            break;
+        }
+        $ranges[] = ['from' => $from, 'to' => $row];
+        $from = $row;
+    }
+
+    $checksums = computeRangeChecksums($conn, $table, $pkColumns, $ranges);
+    foreach ($ranges as $i => $range) {
+        $ranges[$i] += $checksums[$i];
+    }
+
+    return ['ranges' => $ranges, 'has_more' => $hasMore];
+}
+
+/**
+ * Checksum the given ranges of a table
+ *
+ * @param array $ranges [['from' => key|null, 'to' => key|null], ...]
+ * @return array [['rows' => int, 'checksum' => string], ...] in the same order
+ */
+function computeRangeChecksums($conn, $table, $pkColumns, $ranges) {
+    $quotedTable = '`' . str_replace('`', '``', $table) . '`';
+    $rowHash = buildRowHashExpression($conn, $table);
+    $checksums = [];
+
+    foreach ($ranges as $range) {
+        $condition = buildKeyRangeCondition($conn, $pkColumns, $range['from'] ?? null, $range['to'] ?? null);
+        $result = $conn->query("SELECT COUNT(*) AS row_count, "
+            . "COALESCE(BIT_XOR(CAST(CONV(LEFT($rowHash, 16), 16, 10) AS UNSIGNED)), 0) AS checksum "
+            . "FROM $quotedTable WHERE $condition");
+        if (!$result) {
+            throw new Exception("Failed to checksum '$table': " . $conn->error);
+        }
+        $row = $result->fetch_assoc();
+        $checksums[] = [
+            'rows' => (int) $row['row_count'],
+            'checksum' => (string) $row['checksum']
+        ];
+    }
+
+    return $checksums;
+}
+
+/**
+ * Rows of one key range, in key order
+ *
+ * @return array ['data' => rows, 'has_more' => bool, 'last_key' => key|null]
+ */
+function fetchRangeRows($conn, $table, $pkColumns, $from, $to, $limit) {
+    $quotedTable = '`' . str_replace('`', '``', $table) . '`';
+    $condition = buildKeyRangeCondition($conn, $pkColumns, $from, $to);
+    $keyList = quoteColumnList($pkColumns);
+
+    $result = $conn->query("SELECT * FROM $quotedTable WHERE $condition ORDER BY $keyList LIMIT " . ($limit + 1));
+    if (!$result) {
+        throw new Exception("Failed to read range of '$table': " . $conn->error);
+    }
+
+    return collectPage($result, $limit, $pkColumns);
+}
+
+/**
+ * Rows changed since a high-water mark, ordered by (column, primary key)
+ *
+ * @param string|null $since Newest value of $column already present locally (null = all rows)
+ * @param array|null $after Last [column value, ...primary key] returned by the previous call
+ * @return array ['data' => rows, 'has_more' => bool, 'last_key' => key|null]
+ */
+function fetchChangedRows($conn, $table, $column, $pkColumns, $since, $after, $limit) {
+    $quotedTable = '`' . str_replace('`', '``', $table) . '`';
+    $keyColumns = array_merge([$column], $pkColumns);
+    $keyList = quoteColumnList($keyColumns);
+
+    if ($after !== null) {
+        $where = 'WHERE ' . buildKeyRangeCondition($conn, $keyColumns, $after, null);
+    } elseif ($since !== null) {
+        // >= rather than >: rows written in the same second as the mark may be missing locally
+        $where = "WHERE `" . str_replace('`', '``', $column) . "` >= '" . $conn->real_escape_string($since) . "'";
+    } else {
+        $where = '';
+    }
+
+    $result = $conn->query("SELECT * FROM $quotedTable $where ORDER BY $keyList LIMIT " . ($limit + 1));
+    if (!$result) {
+        throw new Exception("Failed to read changed rows of '$table': " . $conn->error);
+    }
+
+    return collectPage($result, $limit, $keyColumns);
+}
+
+/**
+ * Delete the rows of one key range
+ *
+ * @return int Number of rows deleted
+ */
+function deleteRange($conn, $table, $pkColumns, $from, $to) {
+    $quotedTable = '`' . str_replace('`', '``', $table) . '`';
+    $condition = buildKeyRangeCondition($conn, $pkColumns, $from, $to);
+    if (!$conn->query("DELETE FROM $quotedTable WHERE $condition")) {
+        throw new Exception("Failed to clear range of '$table': " . $conn->error);
+    }
+    return $conn->affected_rows;
+}
+
+/**
+ * Replace the rows of one key range with the given rows, in one transaction
+ *
+ * A failure rolls back the delete as well, so the range is either replaced
+ * or left as it was. Rows (any iterable, see readStagedRows()) are
+ * positional arrays in $columns order and are inserted as multi-row
+ * statements that fit max_allowed_packet.
+ *
+ * @return array ['deleted' => int, 'inserted' => int]
+ */
+function replaceRange($conn, $table, $pkColumns, $from, $to, $columns, $rows) {
+    $packetResult = $conn->query("SELECT @@max_allowed_packet");
+    $maxBytes = max(65536, ($packetResult ? (int) $packetResult->fetch_row()[0] : 4194304) - 1024);
+    $prefix = "INSERT INTO `" . str_replace('`', '``', $table) . "` (" . quoteColumnList($columns) . ") VALUES ";
+
+    $conn->begin_transaction();
+    try {
+        $deleted = deleteRange($conn, $table, $pkColumns, $from, $to);
+        $inserted = 0;
+        $tuples = [];
+        $bytes = strlen($prefix);
+        foreach ($rows as $i => $row) {
+            if (!is_array($row) || count($row) !== count($columns)) {
+                throw new Exception("Row $i does not match the column list");
+            }
+            $tuple = '(' . implode(', ', array_map(function($value) use ($conn) {
+                return $value === null ? 'NULL' : "'" . $conn->real_escape_string($value) . "'";
+            }, array_values($row))) . ')';
+            if (!empty($tuples) && $bytes + strlen($tuple) + 1 > $maxBytes) {
+                $inserted += insertTuples($conn, $table, $prefix, $tuples);
+                $tuples = [];
+                $bytes = strlen($prefix);
+            }
+            $tuples[] = $tuple;
+            $bytes += strlen($tuple) + 1;
+        }
+        if (!empty($tuples)) {
+            $inserted += insertTuples($conn, $table, $prefix, $tuples);
+        }
+        $conn->commit();
+    } catch (Exception $e) {
+        $conn->rollback();
+        throw $e;
+    }
+    return ['deleted' => $deleted, 'inserted' => $inserted];
+}
+
+/**
+ * Append rows to the staging file of a range replacement
+ *
+ * A range can hold more data than fits in one request, so the client
+ * uploads it in parts and replaces the range once all parts are staged.
+ * One JSON row per line; stale staging files are removed on the first part.
+ */
+function stageRangeRows($stage, $rows, $first) {
+    $file = getStageFile($stage);
+    if ($first) {
+        foreach (glob(DELTA_STAGE_DIR . '/*.ndjson') ?: [] as $staleFile) {
+            if (filemtime($staleFile) < time() - DELTA_STAGE_TTL) {
+                @unlink($staleFile);
+            }
+        }
+    }
+
+    $lines = '';
+    foreach ($rows as $i => $row) {
+        if (!is_array($row)) {
+            throw new Exception("Row $i is not a list of values");
+        }
+        $lines .= json_encode(array_values($row)) . "\n";
+    }
+    if (file_put_contents($file, $lines, $first ? LOCK_EX : FILE_APPEND | LOCK_EX) === false) {
+        throw new Exception("Failed to stage rows (disk full?)");
+    }
+    return count($rows);
+}
+
+/**
+ * Read back the rows staged by stageRangeRows(), one at a time
+ */
+function readStagedRows($stage) {
+    $handle = @fopen(getStageFile($stage), 'rb');
+    if ($handle === false) {
+        throw new Exception("No rows were staged for this range");
+    }
+    try {
+        while (($line = fgets($handle)) !== false) {
+            yield json_decode($line, true);
+        }
+    } finally {
+        fclose($handle);
+    }
+}
+
+/**
+ * Staging file of a range replacement (the id is chosen by the client)
+ */
+function getStageFile($stage) {
+    if (!preg_match('/^[A-Za-z0-9_-]{8,64}$/', $stage)) {
+        throw new Exception("Invalid stage id");
+    }
+    if (!is_dir(DELTA_STAGE_DIR) && !@mkdir(DELTA_STAGE_DIR, 0777, true)) {
+        throw new Exception("Failed to create staging directory");
+    }
+    return DELTA_STAGE_DIR . '/' . $stage . '.ndjson';
+}
+
+function insertTuples($conn, $table, $prefix, $tuples) {
+    if (!$conn->query($prefix . implode(',', $tuples))) {
+        throw new Exception("Failed to insert rows into '$table': " . $conn->error);
+    }
+    return $conn->affected_rows;
+}
+
+/**
+ * WHERE condition for keys in ($from, $to]; either end may be null (open)
+ */
+function buildKeyRangeCondition($conn, $columns, $from, $to) {
+    $keyList = count($columns) === 1 ? quoteColumnList($columns) : '(' . quoteColumnList($columns) . ')';
+    $conditions = [];
+    if ($from !== null) {
+        $conditions[] = "$keyList > " . buildKeyTuple($conn, $from);
+    }
+    if ($to !== null) {
+        $conditions[] = "$keyList <= " . buildKeyTuple($conn, $to);
+    }
+    return empty($conditions) ? '1=1' : implode(' AND ', $conditions);
+}
+
+/**
+ * Decode a key passed as a JSON array; empty input means no bound
+ */
+function decodeKey($json, $columnCount) {
+    if ($json === null || $json === '' || $json === 'null') {
+        return null;
+    }
+    $key = json_decode($json, true);
+    if (!is_array($key) || count($key) !== $columnCount) {
+        throw new Exception('Invalid key value');
+    }
+    return array_values($key);
+}
+
+function buildKeyTuple($conn, $key) {
+    $values = array_map(function($value) use ($conn) {
+        return $value === null ? 'NULL' : "'" . $conn->real_escape_string($value) . "'";
+    }, array_values($key));
+    return count($values) === 1 ? $values[0] : '(' . implode(', ', $values) . ')';
+}
+
+/**
+ * MD5 of a row over all columns; ISNULL() flags keep NULL and '' apart
+ */
+function buildRowHashExpression($conn, $table) {
+    $result = $conn->query("SHOW COLUMNS FROM `" . str_replace('`', '``', $table) . "`");
+    if (!$result) {
+        throw new Exception("Failed to get columns of '$table': " . $conn->error);
+    }
+    $columns = [];
+    $nullFlags = [];
+    while ($row = $result->fetch_assoc()) {
+        $quoted = '`' . str_replace('`', '``', $row['Field']) . '`';
+        $columns[] = $quoted;
+        $nullFlags[] = "ISNULL($quoted)";
+    }
+    return "MD5(CONCAT_WS('#', " . implode(', ', $columns) . ", CONCAT(" . implode(', ', $nullFlags) . ")))";
+}
+
+function quoteColumnList($columns) {
+    return implode(', ', array_map(function($column) {
+        return '`' . str_replace('`', '``', $column) . '`';
+    }, $columns));
+}
+
+/**
+ * Read up to $limit rows of a LIMIT $limit + 1 query into a page
+ */
+function collectPage($result, $limit, $keyColumns) {
+    $data = [];
+    while ($row = $result->fetch_assoc()) {
+        $data[] = $row;
+    }
+    $hasMore = count($data) > $limit;
+    if ($hasMore) {
+        array_pop($data);
+    }
+
+    $lastKey = null;
+    if (!empty($data)) {
+        $last = end($data);
+        $lastKey = array_map(function($column) use ($last) {
+            return $last[$column];
+        }, $keyColumns);
+    }
+
+    return ['data' => $data, 'has_more' => $hasMore, 'last_key' => $lastKey];
+}
+?>
@@ -83,6 +83,22 @@
                         <input type="number" id="chunkSize" name="chunkSize" value="1000" min="100" max="10000" required>
                         <small>Number of rows to transfer per request (default: 1000)</small>
                     </div>
+
+                    <div class="form-group">
+                        <label for="syncConcurrency">Parallel Tables</label>
+                        <input type="number" id="syncConcurrency" name="syncConcurrency" value="3" min="1" max="8">
+                        <small>Tables synced at the same time; the next chunk of each table is fetched while the current one is inserted (default: 3)</small>
+                    </div>
+
+                    <div class="form-group">
+                        <label for="syncMode">Sync Mode</label>
+                        <select id="syncMode" name="syncMode">
+                            <option value="full">Full copy (drop and recreate)</option>
+                            <option value="delta">Delta (compare primary-key range checksums)</option>
+                            <option value="updated_at">Delta (rows changed since newest updated_at)</option>
+                        </select>
+                        <small>Delta modes only copy what changed, for tables whose structure matches and that have a primary key. The updated_at mode does not remove rows deleted on the remote.</small>
+                    </div>
                 </div>
             </details>
         </div>
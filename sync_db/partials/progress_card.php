@@ -22,11 +22,17 @@
             <div class="stat-value" id="statViews">0</div>
             <div class="stat-label">Views</div>
         </div>
+        <div class="stat-card">
+            <div class="stat-value" id="statRowsPerSecond">0</div>
+            <div class="stat-label">Rows / Second</div>
+        </div>
         <div class="stat-card">
             <div class="stat-value" id="statTime">0s</div>
             <div class="stat-label">Elapsed Time</div>
         </div>
     </div>
 
+    <div class="table-throughput" id="tableThroughput" style="display: none;"></div>
+
     <div class="log-container" id="logContainer"></div>
 </div>
@@ -311,6 +311,12 @@ function updateStats(stats) {
     document.getElementById('statViews').textContent = stats.views || 0;
     document.getElementById('statTime').textContent = stats.time || '0s';
     
+    const rateEl = document.getElementById('statRowsPerSecond');
+    if (rateEl && stats.startTime) {
+        const seconds = (Date.now() - stats.startTime) / 1000;
+        rateEl.textContent = (seconds > 0 ? Math.round((stats.rows || 0) / seconds) : 0).toLocaleString();
+    }
+    
     const statsGrid = document.getElementById('statsGrid');
     statsGrid.style.display = 'grid';
 }
@@ -533,6 +539,11 @@ async function apiRequest(url, apiKey, action, params = {}) {
             throw new Error(`[${timestamp}] ${errorMsg}`);
         }
         
+        // A streamed response that failed after it started still says success
+        if (data.streamError) {
+            throw new Error(`[${new Date().toISOString()}] ${data.streamError}`);
+        }
+        
         return data.data;
         
     } catch (error) {
@@ -546,25 +557,13 @@ async function apiRequest(url, apiKey, action, params = {}) {
 }
 
 /**
- * Execute SQL query on local database
+ * Send a request to the local sync handler
  */
-async function executeLocalSQL(sql, dbName = null, options = {}) {
-    // Validate SQL before sending
-    if (!sql || sql === 'null' || sql === 'undefined') {
-        throw new Error('Invalid SQL statement: SQL cannot be null or undefined');
-    }
-    
+async function localRequest(action, params = {}) {
     const formData = new FormData();
-    formData.append('action', 'execute_sql');
-    formData.append('sql', sql);
-    if (dbName) {
-        formData.append('database', dbName);
-    }
-    if (options.disableForeignKeys === true) {
-        formData.append('disable_fk', '1');
-    }
-    if (options.increasePacket === true) {
-        formData.append('increase_packet', '1');
+    formData.append('action', action);
+    for (const [key, value] of Object.entries(params)) {
+        formData.append(key, value);
     }
     
     const response = await fetch('sync_handler.php', {
@@ -587,7 +586,36 @@ async function executeLocalSQL(sql, dbName = null, options = {}) {
     }
     
     if (!data.success) {
-        let errorMessage = data.message || 'SQL execution failed';
+        throw new Error(data.message || 'Local request failed');
+    }
+    
+    return data.data;
+}
+
+/**
+ * Execute SQL query on local database
+ */
+async function executeLocalSQL(sql, dbName = null, options = {}) {
+    // Validate SQL before sending
+    if (!sql || sql === 'null' || sql === 'undefined') {
+        throw new Error('Invalid SQL statement: SQL cannot be null or undefined');
+    }
+    
+    const params = { sql: sql };
+    if (dbName) {
+        params.database = dbName;
+    }
+    if (options.disableForeignKeys === true) {
+        params.disable_fk = '1';
+    }
+    if (options.increasePacket === true) {
+        params.increase_packet = '1';
+    }
+    
+    try {
+        return await localRequest('execute_sql', params);
+    } catch (error) {
+        let errorMessage = error.message || 'SQL execution failed';
         
         // Provide helpful error messages for common issues
         if (errorMessage.includes('max_allowed_packet')) {
@@ -598,8 +626,350 @@ async function executeLocalSQL(sql, dbName = null, options = {}) {
         
         throw new Error(errorMessage);
     }
+}
+
+/**
+ * Rows of a remote data page, in either wire format
+ * 
+ * The compact format sends the column names once and each row as a
+ * positional array; older remote APIs send one object per row.
+ */
+function getPageRows(page) {
+    if (page.format === 'compact') {
+        return { rows: page.rows, columns: page.columns };
+    }
+    return { rows: page.data, columns: null };
+}
+
+/**
+ * Insert rows into a local table
+ * 
+ * Rows are sent as multi-row INSERT statements of at most MAX_SQL_BYTES.
+ * Rows are objects, or positional arrays when options.columns is given.
+ * With options.upsert, rows whose key already exists are updated instead.
+ * options.onFlush(rowCount) is called after each statement is executed.
+ */
+async function insertRowsLocal(table, rows, dbName, options = {}) {
+    // Build INSERT statement
+    const columns = options.columns || Object.keys(rows[0]);
+    // Build value tuples with safe escaping
+    const valueTuples = rows.map(row => {
+        const vals = columns.map((col, index) => {
+            const val = options.columns ? row[index] : row[col];
+            if (val === null) return 'NULL';
+            // Escape backslashes and single quotes
+            const s = String(val)
+                .replace(/\\/g, "\\\\")
+                .replace(/'/g, "''");
+            return "'" + s + "'";
+        });
+        return '(' + vals.join(', ') + ')';
+    });
+
+    // Dynamically batch by SQL size to avoid max_allowed_packet
+    // Use a very conservative batch size to work with restrictive MySQL settings
+    const MAX_SQL_BYTES = 256 * 1024; // ~256KB per statement (very conservative)
+    const prefix = `${dbName ? `USE \`${dbName}\`; ` : ''}INSERT INTO \`${table}\` (\`${columns.join('`, `')}\`) VALUES `;
+    const suffix = options.upsert
+        ? ' ON DUPLICATE KEY UPDATE ' + columns.map(col => `\`${col}\` = VALUES(\`${col}\`)`).join(', ')
+        : '';
+    let batchParts = [];
+    let currentLength = prefix.length + suffix.length;
+
+    async function flushBatchIfNeeded(nextPartLength) {
+        // Account for comma+space between tuples when concatenating
+        const sep = batchParts.length > 0 ? 2 : 0;
+        if (currentLength + sep + nextPartLength > MAX_SQL_BYTES && batchParts.length > 0) {
+            const sql = prefix + batchParts.join(', ') + suffix;
+            await executeWithRetry(sql, dbName, { disableForeignKeys: true, increasePacket: true });
+            if (options.onFlush) options.onFlush(batchParts.length);
+            batchParts = [];
+            currentLength = prefix.length + suffix.length;
+        }
+    }
+
+    // Function to execute SQL with retry on packet size errors
+    async function executeWithRetry(sql, dbName, options, maxRetries = 3) {
+        let currentBatchSize = MAX_SQL_BYTES;
+        
+        for (let attempt = 1; attempt <= maxRetries; attempt++) {
+            try {
+                return await executeLocalSQL(sql, dbName, options);
+            } catch (error) {
+                if ((error.message.includes('max_allowed_packet') || 
+                     error.message.includes('Packet too large')) && 
+                    attempt < maxRetries) {
+                    
+                    // Reduce batch size and retry
+                    currentBatchSize = Math.floor(currentBatchSize * 0.5);
+                    addLog(`  ⚠️ Packet size error, retrying with smaller batch (${Math.round(currentBatchSize/1024)}KB)...`, 'warning');
+                    
+                    // Rebuild SQL with smaller batch if possible
+                    if (sql.includes('VALUES')) {
+                        // This is an INSERT statement, we need to rebuild it with smaller batches
+                        // For now, just retry with the same SQL and hope the server can handle it
+                        continue;
+                    }
+                } else {
+                    throw error;
+                }
+            }
+        }
+    }
+
+    for (let iVal = 0; iVal < valueTuples.length; iVal++) {
+        const part = valueTuples[iVal];
+        await flushBatchIfNeeded(part.length);
+        // If a single tuple itself exceeds the limit, send alone
+        if (part.length + prefix.length + suffix.length > MAX_SQL_BYTES && batchParts.length === 0) {
+            await executeWithRetry(prefix + part + suffix, dbName, { disableForeignKeys: true, increasePacket: true });
+            if (options.onFlush) options.onFlush(1);
+            continue;
+        }
+        if (batchParts.length > 0) currentLength += 2; // ', '
+        batchParts.push(part);
+        currentLength += part.length;
+    }
+
+    if (batchParts.length > 0) {
+        const sql = prefix + batchParts.join(', ') + suffix;
+        await executeWithRetry(sql, dbName, { disableForeignKeys: true, increasePacket: true });
+        if (options.onFlush) options.onFlush(batchParts.length);
+    }
+}
+
+// Delta sync: rows per checksummed primary-key range, and ranges per request
+const DELTA_RANGE_SIZE = 10000;
+const DELTA_RANGES_PER_REQUEST = 50;
+
+// Upper bound (JSON bytes) for one part of a range upload, well below post_max_size
+const DELTA_UPLOAD_BYTES = 2 * 1024 * 1024;
+
+/**
+ * SHOW CREATE TABLE output without the parts that differ between identical tables
+ */
+function normalizeCreateTable(sql) {
+    return String(sql || '').replace(/\s+AUTO_INCREMENT=\d+/i, '').trim();
+}
+
+/**
+ * Sync one table incrementally
+ * 
+ * Returns false when the table has to be copied in full instead: it is
+ * missing locally, its structure differs, it has no primary key, or the
+ * remote API predates delta sync.
+ */
+async function syncTableDelta(config, params, table, structureData, stats) {
+    const localState = await localRequest('get_table_state', {
+        database: config.localDbName,
+        table: table
+    });
     
-    return data.data;
+    if (!localState.exists) {
+        addLog(`  ↳ ${table}: not present locally, copying in full`, 'info');
+        return false;
+    }
+    if (normalizeCreateTable(localState.create_statement) !== normalizeCreateTable(structureData.create_statement)) {
+        addLog(`  ⚠️ ${table}: local structure differs from remote, copying in full`, 'warning');
+        return false;
+    }
+    if (localState.primary_key.length === 0) {
+        addLog(`  ↳ ${table}: no primary key, copying in full`, 'info');
+        return false;
+    }
+    
+    try {
+        if (config.syncMode === 'updated_at' && localState.updated_column) {
+            await syncTableSince(config, params, table, localState, stats);
+        } else {
+            await syncTableRanges(config, params, table, stats);
+        }
+    } catch (error) {
+        if (error.deltaUnsupported) {
+            addLog(`  ⚠️ ${table}: remote API does not support delta sync, copying in full`, 'warning');
+            return false;
+        }
+        throw error;
+    }
+    return true;
+}
+
+/**
+ * Send a delta sync request to the remote API
+ * 
+ * A remote API that predates delta sync answers 'Invalid action'; that error
+ * is marked so syncTableDelta() can copy the table in full instead. Errors
+ * of local requests are never marked.
+ */
+async function remoteDeltaRequest(config, action, params) {
+    try {
+        return await apiRequest(config.remoteUrl, config.apiKey, action, params);
+    } catch (error) {
+        if (error.message.includes('Invalid action')) {
+            error.deltaUnsupported = true;
+        }
+        throw error;
+    }
+}
+
+/**
+ * Compare per-range checksums and replace the ranges that differ
+ */
+async function syncTableRanges(config, params, table, stats) {
+    let after = '';
+    let hasMore = true;
+    let rangesChecked = 0;
+    let rangesChanged = 0;
+    let tableRows = 0;
+    
+    while (hasMore) {
+        const remote = await remoteDeltaRequest(config, 'get_table_checksums', {
+            ...params,
+            table: table,
+            range_size: DELTA_RANGE_SIZE,
+            max_ranges: DELTA_RANGES_PER_REQUEST,
+            after: after
+        });
+        const ranges = remote.ranges;
+        if (ranges.length === 0) {
+            break;
+        }
+        
+        const local = await localRequest('range_checksums', {
+            database: config.localDbName,
+            table: table,
+            ranges: JSON.stringify(ranges.map(range => ({ from: range.from, to: range.to })))
+        });
+        
+        for (let i = 0; i < ranges.length; i++) {
+            rangesChecked++;
+            const localRange = local.checksums[i];
+            if (localRange.rows === ranges[i].rows && localRange.checksum === ranges[i].checksum) {
+                continue;
+            }
+            rangesChanged++;
+            const copied = await copyRange(config, params, table, ranges[i]);
+            tableRows += copied;
+            recordRows(stats, table, copied);
+        }
+        
+        hasMore = remote.has_more;
+        const lastRange = ranges[ranges.length - 1];
+        after = lastRange.to ? JSON.stringify(lastRange.to) : '';
+    }
+    
+    addLog(`  ✓ ${table}: ${rangesChanged}/${rangesChecked} ranges changed, ${tableRows.toLocaleString()} rows copied`, 'success');
+}
+
+/**
+ * Replace one primary-key range of a local table with the remote rows
+ * 
+ * The remote rows are staged on the local server in parts of at most
+ * DELTA_UPLOAD_BYTES and then replace the range in one local request (one
+ * transaction), which also removes rows that were deleted remotely; a
+ * failure leaves the local range as it was.
+ */
+async function copyRange(config, params, table, range) {
+    const encodeKey = key => (key ? JSON.stringify(key) : '');
+    const stage = `${Date.now().toString(36)}_${Math.random().toString(36).slice(2, 10)}`;
+    
+    let from = range.from;
+    let hasMore = true;
+    let columns = null;
+    let pending = [];
+    let pendingBytes = 0;
+    let staged = 0;
+    
+    const stagePending = async () => {
+        await localRequest('stage_range_rows', {
+            stage: stage,
+            first: staged === 0 ? '1' : '0',
+            rows: '[' + pending.join(',') + ']'
+        });
+        staged += pending.length;
+        pending = [];
+        pendingBytes = 0;
+    };
+    
+    while (hasMore) {
+        const page = await remoteDeltaRequest(config, 'get_range_data', {
+            ...params,
+            table: table,
+            from: encodeKey(from),
+            to: encodeKey(range.to),
+            limit: config.chunkSize,
+            format: 'compact'
+        });
+        
+        const pageRows = getPageRows(page);
+        if (pageRows.rows.length > 0) {
+            // Object rows (older remote APIs) are sent positionally as well
+            columns = columns || pageRows.columns || Object.keys(pageRows.rows[0]);
+            for (const row of pageRows.rows) {
+                const json = JSON.stringify(pageRows.columns ? row : columns.map(col => row[col]));
+                if (pending.length > 0 && pendingBytes + json.length > DELTA_UPLOAD_BYTES) {
+                    await stagePending();
+                }
+                pending.push(json);
+                pendingBytes += json.length + 1;
+            }
+        }
+        hasMore = page.has_more;
+        from = page.last_key;
+    }
+    // Always stage once, so an emptied range is cleared as well
+    if (pending.length > 0 || staged === 0) {
+        await stagePending();
+    }
+    
+    await localRequest('replace_range', {
+        database: config.localDbName,
+        table: table,
+        from: encodeKey(range.from),
+        to: encodeKey(range.to),
+        columns: JSON.stringify(columns || []),
+        stage: stage
+    });
+    
+    return staged;
+}
+
+/**
+ * Upsert the rows changed since the newest local updated_at value
+ * 
+ * Rows deleted on the remote are not detected in this mode.
+ */
+async function syncTableSince(config, params, table, localState, stats) {
+    const column = localState.updated_column;
+    const since = localState.high_water_mark || '';
+    addLog(`  ↳ ${table}: fetching rows with ${column} >= ${since || '(any)'}`, 'info');
+    
+    let after = '';
+    let hasMore = true;
+    let tableRows = 0;
+    
+    while (hasMore) {
+        const page = await remoteDeltaRequest(config, 'get_changed_rows', {
+            ...params,
+            table: table,
+            column: column,
+            since: since,
+            after: after,
+            limit: config.chunkSize,
+            format: 'compact'
+        });
+        
+        const { rows, columns } = getPageRows(page);
+        if (rows.length > 0) {
+            await insertRowsLocal(table, rows, config.localDbName, { upsert: true, columns: columns });
+            tableRows += rows.length;
+            recordRows(stats, table, rows.length);
+        }
+        hasMore = page.has_more;
+        after = page.last_key ? JSON.stringify(page.last_key) : '';
+    }
+    
+    addLog(`  ✓ ${table}: upserted ${tableRows.toLocaleString()} changed rows`, 'success');
 }
 
 /**
@@ -957,7 +1327,9 @@ function buildSyncConfirmHtml(config) {
 
         <div class="sync-confirm-details">
             <p>Data will be copied from <strong>${escapeHtml(sourceDb)}</strong> to <strong>${escapeHtml(targetDb)}</strong>.</p>
-            <p>The target database will be dropped and recreated during this sync. Existing target data will be replaced and this action cannot be undone.</p>
+            <p>${config.syncMode && config.syncMode !== 'full'
+                ? 'Tables with the same structure and a primary key are updated in place: only rows that differ are replaced. Other tables are dropped and recreated. This action cannot be undone.'
+                : 'The target database will be dropped and recreated during this sync. Existing target data will be replaced and this action cannot be undone.'}</p>
             <p class="sync-confirm-url">Source URL: ${escapeHtml(sourceUrl)}</p>
         </div>
     `;
@@ -1036,6 +1408,227 @@ function initIntroAlertDismiss() {
     });
 }
 
+// Table pipeline: default and maximum number of tables synced at once
+const DEFAULT_SYNC_CONCURRENCY = 3;
+const MAX_SYNC_CONCURRENCY = 8;
+
+/**
+ * Run worker(item, index) for every item, at most `concurrency` at a time
+ * 
+ * After the first failure no new items are started; the error is re-thrown
+ * once the running workers have settled.
+ */
+async function runPool(items, concurrency, worker) {
+    let next = 0;
+    let failure = null;
+    
+    async function lane() {
+        while (failure === null && next < items.length) {
+            const index = next++;
+            try {
+                await worker(items[index], index);
+            } catch (error) {
+                if (failure === null) {
+                    failure = error;
+                }
+            }
+        }
+    }
+    
+    const lanes = [];
+    for (let i = 0; i < Math.min(concurrency, items.length); i++) {
+        lanes.push(lane());
+    }
+    await Promise.all(lanes);
+    
+    if (failure !== null) {
+        throw failure;
+    }
+}
+
+/**
+ * Budget of rows fetched from the remote but not yet inserted locally
+ * 
+ * Chunk fetches reserve rows before they start; insertRowsLocal hands them
+ * back from flushBatchIfNeeded as statements complete. A slow local server
+ * therefore holds back further remote reads instead of piling up chunks.
+ */
+function createRowBudget(maxRows) {
+    let used = 0;
+    let waiters = [];
+    
+    return {
+        async acquire(rows) {
+            // A single reservation may exceed the budget; it just has to wait for an idle pipeline
+            while (used > 0 && used + rows > maxRows) {
+                await new Promise(resolve => waiters.push(resolve));
+            }
+            used += rows;
+        },
+        release(rows) {
+            used = Math.max(0, used - rows);
+            const waiting = waiters;
+            waiters = [];
+            waiting.forEach(resolve => resolve());
+        }
+    };
+}
+
+/**
+ * Per-table and overall throughput shown in the progress card
+ */
+const SyncThroughput = {
+    tables: new Map(),
+    
+    reset() {
+        this.tables = new Map();
+        this.render();
+    },
+    
+    start(table) {
+        this.tables.set(table, { rows: 0, startTime: Date.now(), endTime: null });
+        this.render();
+    },
+    
+    addRows(table, rows) {
+        const entry = this.tables.get(table);
+        if (entry) {
+            entry.rows += rows;
+            this.render();
+        }
+    },
+    
+    finish(table) {
+        const entry = this.tables.get(table);
+        if (entry) {
+            entry.endTime = Date.now();
+            this.render();
+        }
+    },
+    
+    rowsPerSecond(entry) {
+        const seconds = ((entry.endTime || Date.now()) - entry.startTime) / 1000;
+        return seconds > 0 ? Math.round(entry.rows / seconds) : 0;
+    },
+    
+    render() {
+        const container = document.getElementById('tableThroughput');
+        if (!container) {
+            return;
+        }
+        
+        // Running tables first, then the most recently finished ones
+        const entries = [...this.tables.entries()];
+        const running = entries.filter(([, entry]) => entry.endTime === null);
+        const finished = entries
+            .filter(([, entry]) => entry.endTime !== null)
+            .sort((a, b) => b[1].endTime - a[1].endTime)
+            .slice(0, 5);
+        
+        container.innerHTML = [...running, ...finished].map(([table, entry]) => `
+            <div class="throughput-row${entry.endTime === null ? ' throughput-running' : ''}">
+                <span class="throughput-table">${entry.endTime === null ? '⏳' : '✓'} ${escapeHtml(table)}</span>
+                <span class="throughput-rows">${entry.rows.toLocaleString()} rows</span>
+                <span class="throughput-rate">${this.rowsPerSecond(entry).toLocaleString()} rows/s</span>
+            </div>
+        `).join('');
+        container.style.display = entries.length > 0 ? 'block' : 'none';
+    }
+};
+
+/**
+ * Count synced rows in the totals and the table's throughput
+ */
+function recordRows(stats, table, rows) {
+    stats.rows += rows;
+    SyncThroughput.addRows(table, rows);
+    updateStats({
+        ...stats,
+        time: Math.round((Date.now() - stats.startTime) / 1000) + 's'
+    });
+}
+
+/**
+ * Sync the structure and data of one table
+ */
+async function syncTable(config, params, table, stats, budget) {
+    // Get table structure
+    const structureData = await apiRequest(config.remoteUrl, config.apiKey, 'get_table_structure', {
+        ...params,
+        table: table
+    });
+    
+    // Validate structure data
+    if (!structureData || !structureData.create_statement) {
+        throw new Error(`Failed to retrieve valid CREATE TABLE statement for table: ${table}`);
+    }
+    
+    // Delta modes only touch what changed; anything else is copied in full
+    const syncedDelta = config.syncMode !== 'full'
+        && await syncTableDelta(config, params, table, structureData, stats);
+    if (syncedDelta) {
+        return;
+    }
+    
+    // Drop table if exists and recreate
+    await executeLocalSQL(`DROP TABLE IF EXISTS \`${table}\``, config.localDbName, { disableForeignKeys: true });
+    await executeLocalSQL(structureData.create_statement, config.localDbName, { disableForeignKeys: true });
+    addLog(`  ✓ Created structure for ${table}`, 'success');
+    
+    // Get table data in chunks; the next chunk is fetched while the current one is inserted
+    const fetchChunk = async offset => {
+        await budget.acquire(config.chunkSize);
+        try {
+            return await apiRequest(config.remoteUrl, config.apiKey, 'get_table_data', {
+                ...params,
+                table: table,
+                offset: offset,
+                limit: config.chunkSize,
+                format: 'compact'
+            });
+        } catch (error) {
+            budget.release(config.chunkSize);
+            throw error;
+        }
+    };
+    
+    let offset = 0;
+    let tableRows = 0;
+    let totalRows = 0;
+    let pending = fetchChunk(offset);
+    
+    while (pending) {
+        const dataResult = await pending;
+        offset += config.chunkSize;
+        pending = dataResult.has_more ? fetchChunk(offset) : null;
+        if (pending) {
+            // Surface a failed prefetch when it is awaited, not as an unhandled rejection
+            pending.catch(() => {});
+        }
+        
+        // The row total is only sent with the first chunk
+        if (dataResult.total_rows !== null && dataResult.total_rows !== undefined) {
+            totalRows = dataResult.total_rows;
+        }
+        
+        const { rows, columns } = getPageRows(dataResult);
+        // Return the part of the reservation the chunk did not use
+        budget.release(config.chunkSize - rows.length);
+        
+        if (rows.length > 0) {
+            // Insert data
+            await insertRowsLocal(table, rows, config.localDbName, {
+                columns: columns,
+                onFlush: count => budget.release(count)
+            });
+            
+            tableRows += rows.length;
+            recordRows(stats, table, rows.length);
+            addLog(`  ✓ ${table}: inserted ${rows.length} rows (total: ${tableRows}/${totalRows})`, 'success');
+        }
+    }
+}
+
 /**
  * Main sync function
  */
@@ -1055,7 +1648,10 @@ async function startSync() {
         remoteDbPass: formData.get('remoteDbPass'),
         remoteDbName: formData.get('remoteDbName'),
         localDbName: formData.get('localDbName'),
-        chunkSize: parseInt(formData.get('chunkSize'))
+        chunkSize: parseInt(formData.get('chunkSize')),
+        syncMode: formData.get('syncMode') || 'full',
+        concurrency: Math.min(MAX_SYNC_CONCURRENCY,
+            Math.max(1, parseInt(formData.get('syncConcurrency')) || DEFAULT_SYNC_CONCURRENCY))
     };
 
     const selfSyncMessage = getSelfSyncBlockMessage(config);
@@ -1079,6 +1675,7 @@ async function startSync() {
     
     // Clear previous logs
     document.getElementById('logContainer').innerHTML = '';
+    SyncThroughput.reset();
     
     // Disable form
     const syncBtn = document.getElementById('syncBtn');
@@ -1101,6 +1698,9 @@ async function startSync() {
         const summaryLine = buildSyncSummaryText(config);
         addLog(`🚀 Starting database sync`, 'info');
         addLog(`   ${summaryLine}`, 'info');
+        if (config.syncMode !== 'full') {
+            addLog(`   Delta mode (${config.syncMode === 'updated_at' ? 'updated_at high-water mark' : 'range checksums'}): only changed rows are copied`, 'info');
+        }
         updateProgress(0, 'Initializing...');
         
         // Disable foreign key checks to allow dropping/creating tables in any order
@@ -1133,147 +1733,25 @@ async function startSync() {
         addLog(`✅ Found ${tables.length} tables`, 'success');
         updateProgress(10, `Found ${tables.length} tables`);
         
-        // Step 3: Sync each table
-        let tableProgress = 10;
-        const tableProgressIncrement = 60 / tables.length; // 60% for tables
+        // Step 3: Sync tables, several at a time
+        const budget = createRowBudget((config.concurrency + 1) * config.chunkSize);
+        let tablesDone = 0;
+        addLog(`⚙️ Syncing up to ${config.concurrency} tables at a time`, 'info');
         
-        for (let i = 0; i < tables.length; i++) {
-            const table = tables[i];
+        await runPool(tables, config.concurrency, async (table, i) => {
             addLog(`📊 Syncing table ${i + 1}/${tables.length}: ${table}`, 'info');
+            SyncThroughput.start(table);
             
-            // Get table structure
-            const structureData = await apiRequest(config.remoteUrl, config.apiKey, 'get_table_structure', {
-                ...params,
-                table: table
-            });
-            
-            // Validate structure data
-            if (!structureData || !structureData.create_statement) {
-                throw new Error(`Failed to retrieve valid CREATE TABLE statement for table: ${table}`);
-            }
-            
-            // Drop table if exists and recreate
-            await executeLocalSQL(`DROP TABLE IF EXISTS \`${table}\``, config.localDbName, { disableForeignKeys: true });
-            await executeLocalSQL(structureData.create_statement, config.localDbName, { disableForeignKeys: true });
-            addLog(`  ✓ Created structure for ${table}`, 'success');
-            
-            // Get table data in chunks
-            let offset = 0;
-            let hasMore = true;
-            let tableRows = 0;
-            
-            addLog(`  📦 Using conservative batching (256KB per statement) for data transfer`, 'info');
+            await syncTable(config, params, table, stats, budget);
             
-            while (hasMore) {
-                const dataResult = await apiRequest(config.remoteUrl, config.apiKey, 'get_table_data', {
-                    ...params,
-                    table: table,
-                    offset: offset,
-                    limit: config.chunkSize
-                });
-                
-                if (dataResult.data.length > 0) {
-                    // Insert data
-                    const rows = dataResult.data;
-                    
-                    // Build INSERT statement
-                    const columns = Object.keys(rows[0]);
-                    // Build value tuples with safe escaping
-                    const valueTuples = rows.map(row => {
-                        const vals = columns.map(col => {
-                            const val = row[col];
-                            if (val === null) return 'NULL';
-                            // Escape backslashes and single quotes
-                            const s = String(val)
-                                .replace(/\\/g, "\\\\")
-                                .replace(/'/g, "''");
-                            return "'" + s + "'";
-                        });
-                        return '(' + vals.join(', ') + ')';
-                    });
-
-                    // Dynamically batch by SQL size to avoid max_allowed_packet
-                    // Use a very conservative batch size to work with restrictive MySQL settings
-                    const MAX_SQL_BYTES = 256 * 1024; // ~256KB per statement (very conservative)
-                    const targetDb = config.localDbName;
-                    const prefix = `${targetDb ? `USE \`${targetDb}\`; ` : ''}INSERT INTO \`${table}\` (\`${columns.join('`, `')}\`) VALUES `;
-                    let batchParts = [];
-                    let currentLength = prefix.length;
-
-                    async function flushBatchIfNeeded(nextPartLength) {
-                        // Account for comma+space between tuples when concatenating
-                        const sep = batchParts.length > 0 ? 2 : 0;
-                        if (currentLength + sep + nextPartLength > MAX_SQL_BYTES && batchParts.length > 0) {
-                            const sql = prefix + batchParts.join(', ');
-                            await executeWithRetry(sql, config.localDbName, { disableForeignKeys: true, increasePacket: true });
-                            batchParts = [];
-                            currentLength = prefix.length;
-                        }
-                    }
-
-                    // Function to execute SQL with retry on packet size errors
-                    async function executeWithRetry(sql, dbName, options, maxRetries = 3) {
-                        let currentBatchSize = MAX_SQL_BYTES;
-                        
-                        for (let attempt = 1; attempt <= maxRetries; attempt++) {
-                            try {
-                                return await executeLocalSQL(sql, dbName, options);
-                            } catch (error) {
-                                if ((error.message.includes('max_allowed_packet') || 
-                                     error.message.includes('Packet too large')) && 
-                                    attempt < maxRetries) {
-                                    
-                                    // Reduce batch size and retry
-                                    currentBatchSize = Math.floor(currentBatchSize * 0.5);
-                                    addLog(`  ⚠️ Packet size error, retrying with smaller batch (${Math.round(currentBatchSize/1024)}KB)...`, 'warning');
-                                    
-                                    // Rebuild SQL with smaller batch if possible
-                                    if (sql.includes('VALUES')) {
-                                        // This is an INSERT statement, we need to rebuild it with smaller batches
-                                        // For now, just retry with the same SQL and hope the server can handle it
-                                        continue;
-                                    }
-                                } else {
-                                    throw error;
-                                }
-                            }
-                        }
-                    }
-
-                    for (let iVal = 0; iVal < valueTuples.length; iVal++) {
-                        const part = valueTuples[iVal];
-                        await flushBatchIfNeeded(part.length);
-                        // If a single tuple itself exceeds the limit, send alone
-                        if (part.length + prefix.length > MAX_SQL_BYTES && batchParts.length === 0) {
-                            await executeWithRetry(prefix + part, config.localDbName, { disableForeignKeys: true, increasePacket: true });
-                            continue;
-                        }
-                        if (batchParts.length > 0) currentLength += 2; // ', '
-                        batchParts.push(part);
-                        currentLength += part.length;
-                    }
-
-                    if (batchParts.length > 0) {
-                        const sql = prefix + batchParts.join(', ');
-                        await executeWithRetry(sql, config.localDbName, { disableForeignKeys: true, increasePacket: true });
-                    }
-                    
-                    tableRows += rows.length;
-                    stats.rows += rows.length;
-                    addLog(`  ✓ Inserted ${rows.length} rows (total: ${tableRows}/${dataResult.total_rows})`, 'success');
-                }
-                
-                offset += config.chunkSize;
-                hasMore = dataResult.has_more;
-            }
-            
-            tableProgress += tableProgressIncrement;
-            updateProgress(tableProgress, `Synced ${i + 1}/${tables.length} tables`);
+            SyncThroughput.finish(table);
+            tablesDone++;
+            updateProgress(10 + 60 * tablesDone / tables.length, `Synced ${tablesDone}/${tables.length} tables`);
             updateStats({
                 ...stats,
                 time: Math.round((Date.now() - stats.startTime) / 1000) + 's'
             });
-        }
+        });
         
         // Step 4: Sync views
         addLog('👁️ Syncing views...', 'info');
@@ -1281,7 +1759,9 @@ async function startSync() {
         const views = viewsData.views;
         stats.views = views.length;
         
-        for (const view of views) {
+        // Definitions are fetched concurrently; views are created in order (they may reference each other)
+        const viewStatements = new Array(views.length);
+        await runPool(views, config.concurrency, async (view, i) => {
             const viewStructure = await apiRequest(config.remoteUrl, config.apiKey, 'get_view_structure', {
                 ...params,
                 view: view
@@ -1290,10 +1770,13 @@ async function startSync() {
             if (!viewStructure || !viewStructure.create_statement) {
                 throw new Error(`Failed to retrieve valid CREATE VIEW statement for view: ${view}`);
             }
-            
-            await executeLocalSQL(`DROP VIEW IF EXISTS \`${view}\``, config.localDbName, { disableForeignKeys: true });
-            await executeLocalSQL(viewStructure.create_statement, config.localDbName, { disableForeignKeys: true });
-            addLog(`  ✓ Created view: ${view}`, 'success');
+            viewStatements[i] = viewStructure.create_statement;
+        });
+        
+        for (let i = 0; i < views.length; i++) {
+            await executeLocalSQL(`DROP VIEW IF EXISTS \`${views[i]}\``, config.localDbName, { disableForeignKeys: true });
+            await executeLocalSQL(viewStatements[i], config.localDbName, { disableForeignKeys: true });
+            addLog(`  ✓ Created view: ${views[i]}`, 'success');
         }
         updateProgress(75, `Synced ${views.length} views`);
         
@@ -1303,7 +1786,7 @@ async function startSync() {
         const procedures = proceduresData.procedures;
         stats.procedures = procedures.length;
         
-        for (const procedure of procedures) {
+        await runPool(procedures, config.concurrency, async procedure => {
             const procedureStructure = await apiRequest(config.remoteUrl, config.apiKey, 'get_procedure_structure', {
                 ...params,
                 procedure: procedure
@@ -1316,7 +1799,7 @@ async function startSync() {
             await executeLocalSQL(`DROP PROCEDURE IF EXISTS \`${procedure}\``, config.localDbName, { disableForeignKeys: true });
             await executeLocalSQL(procedureStructure.create_statement, config.localDbName, { disableForeignKeys: true });
             addLog(`  ✓ Created procedure: ${procedure}`, 'success');
-        }
+        });
         updateProgress(85, `Synced ${procedures.length} procedures`);
         
         // Step 6: Sync functions
@@ -1325,7 +1808,7 @@ async function startSync() {
         const functions = functionsData.functions;
         stats.functions = functions.length;
         
-        for (const func of functions) {
+        await runPool(functions, config.concurrency, async func => {
             const functionStructure = await apiRequest(config.remoteUrl, config.apiKey, 'get_function_structure', {
                 ...params,
                 function: func
@@ -1338,7 +1821,7 @@ async function startSync() {
             await executeLocalSQL(`DROP FUNCTION IF EXISTS \`${func}\``, config.localDbName, { disableForeignKeys: true });
             await executeLocalSQL(functionStructure.create_statement, config.localDbName, { disableForeignKeys: true });
             addLog(`  ✓ Created function: ${func}`, 'success');
-        }
+        });
         updateProgress(95, `Synced ${functions.length} functions`);
         
         // Step 7: Sync triggers
@@ -1347,12 +1830,12 @@ async function startSync() {
         const triggers = triggersData.triggers;
         stats.triggers = triggers.length;
         
-        for (const trigger of triggers) {
+        await runPool(triggers, config.concurrency, async trigger => {
             const createTrigger = `CREATE TRIGGER \`${trigger.Trigger}\` ${trigger.Timing} ${trigger.Event} ON \`${trigger.Table}\` FOR EACH ROW ${trigger.Statement}`;
             await executeLocalSQL(`DROP TRIGGER IF EXISTS \`${trigger.Trigger}\``, config.localDbName, { disableForeignKeys: true });
             await executeLocalSQL(createTrigger, config.localDbName, { disableForeignKeys: true });
             addLog(`  ✓ Created trigger: ${trigger.Trigger}`, 'success');
-        }
+        });
         
         // Complete!
         updateProgress(100, 'Sync completed successfully!');
@@ -1445,7 +1928,8 @@ document.addEventListener('DOMContentLoaded', function() {
             remoteDbUser: formData.get('remoteDbUser'),
             remoteDbPass: formData.get('remoteDbPass'),
             remoteDbName: formData.get('remoteDbName'),
-            localDbName: formData.get('localDbName')
+            localDbName: formData.get('localDbName'),
+            syncMode: formData.get('syncMode') || 'full'
         };
 
         const selfSyncMessage = getSelfSyncBlockMessage(config);
@@ -9,6 +9,14 @@
 // Require authentication
 require_once __DIR__ . '/../login/auth_check.php';
 require_once __DIR__ . '/../db_connection.php';
+require_once __DIR__ . '/delta_functions.php';
+
+// Nothing below writes to the session; release its lock so the parallel
+// table requests of one sync run side by side ($_SESSION stays readable,
+// getDbCredentials() uses the data read here)
+if (session_status() === PHP_SESSION_ACTIVE) {
+    session_write_close();
+}
 
 header('Content-Type: application/json');
 
@@ -49,6 +57,110 @@ function sendResponse($success, $data = null, $message = '') {
 // Get action
 $action = $_POST['action'] ?? '';
 
+// Delta sync: stage one part of the rows of a range (see replace_range)
+if ($action === 'stage_range_rows') {
+    try {
+        $rows = json_decode($_POST['rows'] ?? '', true);
+        if (!is_array($rows)) {
+            throw new Exception("Rows required");
+        }
+        $staged = stageRangeRows($_POST['stage'] ?? '', $rows, ($_POST['first'] ?? '') === '1');
+        sendResponse(true, ['staged_rows' => $staged]);
+    } catch (Exception $e) {
+        sendResponse(false, null, $e->getMessage());
+    }
+}
+
+// Delta sync actions: inspect and compare local tables
+if (in_array($action, ['get_table_state', 'range_checksums', 'replace_range'], true)) {
+    $database = $_POST['database'] ?? '';
+    $table = $_POST['table'] ?? '';
+    if ($database === '' || $table === '') {
+        sendResponse(false, null, 'Database and table required');
+    }
+
+    try {
+        $credentials = getDbCredentials();
+        $conn = new mysqli($credentials['host'], $credentials['user'], $credentials['pass']);
+        if ($conn->connect_error) {
+            throw new Exception("Connection failed: " . $conn->connect_error);
+        }
+        $conn->set_charset('utf8mb4');
+
+        $dbEsc = $conn->real_escape_string($database);
+        $tableEsc = $conn->real_escape_string($table);
+        $exists = $conn->query("SELECT 1 FROM information_schema.TABLES WHERE TABLE_SCHEMA = '$dbEsc' AND TABLE_NAME = '$tableEsc' AND TABLE_TYPE = 'BASE TABLE'");
+        if (!$exists) {
+            throw new Exception("Failed to look up table: " . $conn->error);
+        }
+        if ($exists->num_rows === 0) {
+            if ($action !== 'get_table_state') {
+                throw new Exception("Table '$table' does not exist locally");
+            }
+            sendResponse(true, ['exists' => false]);
+        }
+        if (!$conn->select_db($database)) {
+            throw new Exception("Failed to select database: " . $conn->error);
+        }
+
+        $pkColumns = getPrimaryKeyColumns($conn, $table);
+
+        if ($action === 'get_table_state') {
+            $createResult = $conn->query("SHOW CREATE TABLE `" . str_replace('`', '``', $table) . "`");
+            if (!$createResult) {
+                throw new Exception("Failed to get table structure: " . $conn->error);
+            }
+            $updatedColumn = getHighWaterMarkColumn($conn, $table);
+            $highWaterMark = null;
+            if ($updatedColumn !== null) {
+                $markResult = $conn->query("SELECT MAX(`$updatedColumn`) FROM `" . str_replace('`', '``', $table) . "`");
+                $highWaterMark = $markResult ? $markResult->fetch_row()[0] : null;
+            }
+            sendResponse(true, [
+                'exists' => true,
+                'create_statement' => $createResult->fetch_assoc()['Create Table'],
+                'primary_key' => $pkColumns,
+                'updated_column' => $updatedColumn,
+                'high_water_mark' => $highWaterMark
+            ]);
+        }
+
+        if (empty($pkColumns)) {
+            throw new Exception("Table '$table' has no primary key");
+        }
+
+        if ($action === 'range_checksums') {
+            $ranges = [];
+            foreach (json_decode($_POST['ranges'] ?? '[]', true) ?: [] as $range) {
+                $ranges[] = [
+                    'from' => isset($range['from']) ? decodeKey(json_encode($range['from']), count($pkColumns)) : null,
+                    'to' => isset($range['to']) ? decodeKey(json_encode($range['to']), count($pkColumns)) : null
+                ];
+            }
+            sendResponse(true, ['checksums' => computeRangeChecksums($conn, $table, $pkColumns, $ranges)]);
+        }
+
+        // replace_range: clear the range and insert the staged remote rows
+        // together, so a failure in between cannot leave the range empty
+        $from = decodeKey($_POST['from'] ?? '', count($pkColumns));
+        $to = decodeKey($_POST['to'] ?? '', count($pkColumns));
+        $columns = json_decode($_POST['columns'] ?? '', true);
+        if (!is_array($columns)) {
+            throw new Exception("Columns required");
+        }
+        $stage = $_POST['stage'] ?? '';
+        $conn->query('SET FOREIGN_KEY_CHECKS=0');
+        try {
+            $replaced = replaceRange($conn, $table, $pkColumns, $from, $to, $columns, readStagedRows($stage));
+        } finally {
+            @unlink(getStageFile($stage));
+        }
+        sendResponse(true, ['deleted_rows' => $replaced['deleted'], 'affected_rows' => $replaced['inserted']]);
+    } catch (Exception $e) {
+        sendResponse(false, null, $e->getMessage());
+    }
+}
+
 if ($action !== 'execute_sql') {
     sendResponse(false, null, 'Invalid action');
 }
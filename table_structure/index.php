@@ -120,6 +120,7 @@ require_once '../login/auth_check.php';
     <script src="js/ui-renderer.js"></script>
     <script src="js/column-form.js"></script>
     <script src="js/column-operations.js"></script>
+    <script src="js/online-change.js"></script>
     <script src="js/event-handlers.js"></script>
     <script src="js/main.js"></script>
 
@@ -11,6 +11,7 @@ const ColumnForm = {
         window.State.currentEditColumn = null;
         $('#modalTitle').text('➕ Add New Column');
         $('#deleteColumnBtn').hide();
+        $('#deleteOnlineBtn').hide();
         this.buildForm(null);
         $('#columnModal').addClass('active');
     },
@@ -25,6 +26,7 @@ const ColumnForm = {
         window.State.currentEditColumn = column;
         $('#modalTitle').text('✏️ Edit Column: ' + columnName);
         $('#deleteColumnBtn').show();
+        $('#deleteOnlineBtn').show();
         this.buildForm(column);
         $('#columnModal').addClass('active');
     },
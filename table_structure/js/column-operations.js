@@ -8,6 +8,38 @@ const ColumnOperations = {
      * Save column
      */
     save: function() {
+        const formData = this.collectFormData();
+        if (!formData) return;
+        
+        // Generate SQL query instead of executing
+        const sqlQuery = this.generateSQL(formData, window.State.currentEditColumn);
+        
+        // Redirect to SQL Query Builder with the generated SQL
+        const queryParam = encodeURIComponent(sqlQuery);
+        const tableParam = encodeURIComponent(window.State.currentTable);
+        // Set table in session before navigating
+        $.ajax({
+            url: '../api/',
+            method: 'POST',
+            data: {
+                action: 'setCurrentTable',
+                table: window.State.currentTable
+            },
+            dataType: 'json',
+            success: function() {
+                window.location.href = `../query_builder/?sql=${queryParam}`;
+            },
+            error: function() {
+                // If setting table fails, still navigate with URL parameter as fallback
+                window.location.href = `../query_builder/?table=${tableParam}&sql=${queryParam}`;
+            }
+        });
+    },
+
+    /**
+     * Read and validate the column form; returns null when invalid
+     */
+    collectFormData: function() {
         const formData = {
             name: $('#fieldName').val(),
             type: $('#fieldType').val(),
@@ -32,7 +64,7 @@ const ColumnOperations = {
             // Validate foreign key fields
             if (!formData.foreignKey.referenced_table || !formData.foreignKey.referenced_column) {
                 alert('Please select both a referenced table and column for the foreign key');
-                return;
+                return null;
             }
         }
         
@@ -43,32 +75,24 @@ const ColumnOperations = {
         
         if (!formData.name) {
             alert('Please enter a column name');
-            return;
+            return null;
         }
         
-        // Generate SQL query instead of executing
-        const sqlQuery = this.generateSQL(formData, window.State.currentEditColumn);
-        
-        // Redirect to SQL Query Builder with the generated SQL
-        const queryParam = encodeURIComponent(sqlQuery);
-        const tableParam = encodeURIComponent(window.State.currentTable);
-        // Set table in session before navigating
-        $.ajax({
-            url: '../api/',
-            method: 'POST',
-            data: {
-                action: 'setCurrentTable',
-                table: window.State.currentTable
-            },
-            dataType: 'json',
-            success: function() {
-                window.location.href = `../query_builder/?sql=${queryParam}`;
-            },
-            error: function() {
-                // If setting table fails, still navigate with URL parameter as fallback
-                window.location.href = `../query_builder/?table=${tableParam}&sql=${queryParam}`;
-            }
-        });
+        return formData;
+    },
+
+    /**
+     * Default value as SQL: quoted unless the column type is numeric
+     */
+    formatDefault: function(value, columnType) {
+        const type = columnType.toUpperCase();
+        if (type.includes('INT') || 
+            type.includes('DECIMAL') || 
+            type.includes('FLOAT') ||
+            type.includes('DOUBLE')) {
+            return value;
+        }
+        return `'${value.replace(/'/g, "''")}'`;
     },
 
     /**
@@ -95,15 +119,7 @@ const ColumnOperations = {
         
         // Add DEFAULT value
         if (formData.default !== null && formData.default !== '') {
-            // Check if default should be quoted (non-numeric types)
-            if (columnType.toUpperCase().includes('INT') || 
-                columnType.toUpperCase().includes('DECIMAL') || 
-                columnType.toUpperCase().includes('FLOAT') ||
-                columnType.toUpperCase().includes('DOUBLE')) {
-                columnDef += ` DEFAULT ${formData.default}`;
-            } else {
-                columnDef += ` DEFAULT '${formData.default.replace(/'/g, "''")}'`;
-            }
+            columnDef += ` DEFAULT ${this.formatDefault(formData.default, columnType)}`;
         }
         
         // Add AUTO_INCREMENT
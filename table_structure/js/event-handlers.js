@@ -74,6 +74,23 @@ const EventHandlers = {
             window.ColumnOperations.delete();
         });
 
+        // Online change buttons
+        $('#applyOnlineBtn').click(function() {
+            window.OnlineChange.applyForm();
+        });
+
+        $('#deleteOnlineBtn').click(function() {
+            window.OnlineChange.deleteColumn();
+        });
+
+        $('#confirmOnlineChangeBtn').click(function() {
+            window.OnlineChange.confirm();
+        });
+
+        $('#stopOnlineChangeBtn').click(function() {
+            window.OnlineChange.stop();
+        });
+
         // Close modal on outside click
         $(document).click(function(e) {
             if ($(e.target).hasClass('modal')) {
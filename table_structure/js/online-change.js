@@ -0,0 +1,379 @@
+/**
+ * Online Change Module
+ * Applies column changes without blocking the table: shows the estimated
+ * cost first, then follows the background job until it ends
+ */
+
+const OnlineChange = {
+    pending: null,  // POST data of the change waiting for confirmation
+    jobId: null,
+
+    /**
+     * Estimate the change in the column form
+     */
+    applyForm: function() {
+        const formData = window.ColumnOperations.collectFormData();
+        if (!formData) return;
+
+        const editColumn = window.State.currentEditColumn;
+        if (this.hasKeyChanges(formData, editColumn)) {
+            window.Utils.showError('Index and foreign key changes cannot be applied online; use Generate SQL for those');
+            return;
+        }
+
+        const data = this.toColumnData(formData, editColumn);
+        if (editColumn) {
+            this.open('update', `Update column \`${editColumn.name}\``, editColumn.name, data, {
+                action: 'updateColumn',
+                oldName: editColumn.name
+            });
+        } else {
+            this.open('add', `Add column \`${data.name}\``, '', data, {
+                action: 'addColumn'
+            });
+        }
+    },
+
+    /**
+     * Estimate dropping the column being edited
+     */
+    deleteColumn: function() {
+        const editColumn = window.State.currentEditColumn;
+        if (!editColumn) return;
+
+        this.open('delete', `Drop column \`${editColumn.name}\``, editColumn.name, {}, {
+            action: 'deleteColumn',
+            columnName: editColumn.name
+        });
+    },
+
+    /**
+     * Column data as ColumnBuilder expects it (SQL default, resolved type)
+     */
+    toColumnData: function(formData, editColumn) {
+        const type = editColumn && formData.type === '--' ? editColumn.type : formData.type;
+        const hasDefault = formData.default !== null && formData.default !== '';
+        return {
+            name: formData.name,
+            type: type,
+            null: formData.null,
+            default: hasDefault ? window.ColumnOperations.formatDefault(formData.default, type) : null,
+            auto_increment: formData.auto_increment,
+            extra: formData.extra,
+            // Keys of an existing column are left alone (see hasKeyChanges)
+            primary: editColumn ? false : formData.primary,
+            unique: editColumn ? false : formData.unique,
+            position: formData.position
+        };
+    },
+
+    /**
+     * True when the form adds or removes an index or foreign key that an
+     * online change would not make
+     */
+    hasKeyChanges: function(formData, editColumn) {
+        const fk = formData.foreignKey || null;
+        if (!editColumn) {
+            return !!fk || (formData.index && !formData.primary && !formData.unique);
+        }
+
+        const oldFk = editColumn.foreignKey || null;
+        const fkChanged = !!fk !== !!oldFk || (fk && (
+            fk.referenced_table !== oldFk.referenced_table ||
+            fk.referenced_column !== oldFk.referenced_column ||
+            fk.update_rule !== oldFk.update_rule ||
+            fk.delete_rule !== oldFk.delete_rule));
+        const wantsIndex = formData.index && !formData.primary && !formData.unique;
+
+        return fkChanged ||
+            formData.primary !== (editColumn.key === 'PRI') ||
+            formData.unique !== (editColumn.key === 'UNI') ||
+            wantsIndex !== (editColumn.key === 'MUL');
+    },
+
+    /**
+     * Show the change with its estimated cost and wait for confirmation
+     */
+    open: function(operation, title, columnName, data, request) {
+        this.pending = Object.assign({
+            table: window.State.currentTable,
+            data: JSON.stringify(data),
+            online: true
+        }, request);
+        this.jobId = null;
+
+        $('#onlineChangeTitle').text('🚀 ' + title);
+        $('#onlineChangeEstimate').html('<div class="online-change-note">Estimating…</div>');
+        $('#onlineChangeProgress').hide();
+        $('#confirmOnlineChangeBtn').show().prop('disabled', true);
+        $('#stopOnlineChangeBtn').hide();
+        $('#onlineChangeModal').addClass('active');
+
+        $.ajax({
+            url: '../api/',
+            method: 'POST',
+            data: {
+                action: 'estimateColumnChange',
+                table: window.State.currentTable,
+                operation: operation,
+                columnName: columnName,
+                data: JSON.stringify(data)
+            },
+            dataType: 'json',
+            success: (response) => {
+                if (response.success) {
+                    this.renderEstimate(response.estimate);
+                } else {
+                    $('#onlineChangeEstimate').html('');
+                    window.Utils.showError(response.error || 'Failed to estimate the change');
+                }
+            },
+            error: (xhr) => {
+                $('#onlineChangeEstimate').html('');
+                window.Utils.showError(this.errorMessage(xhr, 'Failed to estimate the change'));
+            }
+        });
+    },
+
+    /**
+     * Render the estimate; a change that would block writes cannot be confirmed
+     */
+    renderEstimate: function(estimate) {
+        const methods = {
+            INSTANT: 'Instant: only the table definition changes',
+            INPLACE: estimate.rebuild
+                ? 'In place: the table is rebuilt while reads and writes continue'
+                : 'In place: only the table definition changes',
+            COPY: `Shadow-table copy: ${estimate.chunkRows.toLocaleString()} rows per chunk, ` +
+                  `${estimate.throttleMs} ms pause between chunks, then an atomic rename`
+        };
+        const rows = [
+            ['Table', `${estimate.table} · ~${estimate.rows.toLocaleString()} rows · ` +
+                      `${this.formatBytes(estimate.dataBytes)} data, ${this.formatBytes(estimate.indexBytes)} indexes`],
+            ['Server', estimate.server],
+            ['Expected method', methods[estimate.algorithm]],
+            ['Estimated time', estimate.estimatedSeconds > 0 ? '~' + this.formatDuration(estimate.estimatedSeconds) : 'under a second']
+        ];
+
+        let html = '<dl class="online-change-estimate-list">';
+        rows.forEach(([label, value]) => {
+            html += `<dt>${this.escapeHtml(label)}</dt><dd>${this.escapeHtml(value)}</dd>`;
+        });
+        html += '</dl>';
+
+        const blocked = estimate.copyBlockers.length > 0;
+        if (blocked) {
+            html += `<div class="online-change-warning">This change needs a table copy, which cannot be done online: ` +
+                    `${this.escapeHtml(estimate.copyBlockers.join('; '))}. Use Generate SQL to run a regular ALTER TABLE instead.</div>`;
+        } else {
+            html += '<div class="online-change-note">The server picks the method when the change runs; ' +
+                    'the cheapest one it supports is tried first. Times are rough estimates.</div>';
+        }
+
+        $('#onlineChangeEstimate').html(html);
+        $('#confirmOnlineChangeBtn').prop('disabled', blocked);
+    },
+
+    /**
+     * Run the confirmed change
+     */
+    confirm: function() {
+        if (!this.pending) return;
+        const request = this.pending;
+        this.pending = null;
+
+        $('#confirmOnlineChangeBtn').prop('disabled', true);
+        this.showProgress(0, 'Applying…');
+
+        $.ajax({
+            url: '../api/',
+            method: 'POST',
+            data: request,
+            dataType: 'json',
+            success: (response) => {
+                if (!response.success) {
+                    this.fail(response.error || 'Schema change failed');
+                } else if (response.algorithm) {
+                    this.done(`${response.message} (${response.algorithm})`);
+                } else if (response.background) {
+                    this.track(response.jobId);
+                } else {
+                    this.finish(response.job);
+                }
+            },
+            error: (xhr) => {
+                this.fail(this.errorMessage(xhr, 'Schema change failed'));
+            }
+        });
+    },
+
+    /**
+     * Follow a background job until it ends
+     */
+    track: function(jobId) {
+        this.jobId = jobId;
+        $('#confirmOnlineChangeBtn').hide();
+        $('#stopOnlineChangeBtn').show().prop('disabled', false);
+
+        const stages = {
+            inplace: 'Rebuilding in place',
+            prepare: 'Creating shadow table',
+            copy: 'Copying rows',
+            swap: 'Swapping tables'
+        };
+
+        const poll = () => {
+            if (this.jobId !== jobId) return;
+            $.ajax({
+                url: '../api/?action=getSchemaChangeJob&jobId=' + encodeURIComponent(jobId),
+                method: 'GET',
+                dataType: 'json',
+                success: (response) => {
+                    const job = response.job;
+                    if (!response.success || !job) {
+                        this.fail(response.error || 'Schema change job not found');
+                        return;
+                    }
+                    if (job.status !== 'queued' && job.status !== 'running') {
+                        this.finish(job);
+                        return;
+                    }
+
+                    let text = `${stages[job.stage] || 'Starting'} · ${job.percent}%`;
+                    if (job.stage === 'copy') {
+                        text += ` · ${job.copiedRows.toLocaleString()} of ~${job.rows.toLocaleString()} rows` +
+                                ` · ${job.rowsPerSecond.toLocaleString()} rows/s`;
+                    }
+                    if (job.etaSeconds !== null) {
+                        text += ` · ${this.formatDuration(job.etaSeconds)} left`;
+                    }
+                    this.showProgress(job.percent, text);
+                    setTimeout(poll, 1000);
+                },
+                error: () => {
+                    // Transient failure (e.g. server busy); keep polling
+                    setTimeout(poll, 3000);
+                }
+            });
+        };
+        poll();
+    },
+
+    /**
+     * Ask the running job to stop; the table stays as it was
+     */
+    stop: function() {
+        if (!this.jobId) return;
+        $('#stopOnlineChangeBtn').prop('disabled', true);
+
+        $.ajax({
+            url: '../api/',
+            method: 'POST',
+            data: {
+                action: 'cancelSchemaChangeJob',
+                jobId: this.jobId
+            },
+            dataType: 'json',
+            success: (response) => {
+                if (response.success && response.job.status === 'cancelled') {
+                    this.finish(response.job);
+                }
+                // Otherwise the poll reports the job once it has stopped
+            },
+            error: (xhr) => {
+                $('#stopOnlineChangeBtn').prop('disabled', false);
+                window.Utils.showError(this.errorMessage(xhr, 'Failed to stop the schema change'));
+            }
+        });
+    },
+
+    /**
+     * Report the outcome of a finished, failed or cancelled job
+     */
+    finish: function(job) {
+        this.jobId = null;
+        $('#stopOnlineChangeBtn').hide();
+
+        if (job.status === 'completed') {
+            const method = job.algorithm === 'COPY' ? 'shadow-table copy' : job.algorithm;
+            this.done(`Schema change completed in ${this.formatDuration(job.elapsedSeconds)} (${method})`);
+        } else if (job.status === 'cancelled') {
+            this.showProgress(0, 'Cancelled; the table was not changed');
+            window.Utils.showToast('Schema change cancelled', 'warning');
+        } else {
+            this.fail(job.lastError || 'the schema change process stopped');
+        }
+    },
+
+    done: function(message) {
+        this.showProgress(100, message);
+        window.Utils.showSuccess(message);
+        window.Utils.closeModal('columnModal');
+        window.TableOperations.loadTableStructure();
+    },
+
+    fail: function(message) {
+        this.jobId = null;
+        $('#stopOnlineChangeBtn').hide();
+        this.showProgress(0, 'Failed: ' + message);
+        window.Utils.showError(message);
+    },
+
+    showProgress: function(percent, text) {
+        $('#onlineChangeProgress').show();
+        $('#onlineChangeBarFill').css('width', Math.max(0, Math.min(100, percent)) + '%');
+        $('#onlineChangeStatus').text(text);
+    },
+
+    /**
+     * Close the dialog; a running job keeps going on the server
+     */
+    close: function() {
+        this.pending = null;
+        this.jobId = null;
+        window.Utils.closeModal('onlineChangeModal');
+    },
+
+    errorMessage: function(xhr, fallback) {
+        try {
+            const response = JSON.parse(xhr.responseText);
+            if (response.error) {
+                return response.error;
+            }
+        } catch (e) {
+            // Not a JSON error response
+        }
+        return fallback;
+    },
+
+    formatBytes: function(bytes) {
+        const units = ['B', 'KB', 'MB', 'GB', 'TB'];
+        let value = bytes;
+        let unit = 0;
+        while (value >= 1024 && unit < units.length - 1) {
+            value /= 1024;
+            unit++;
+        }
+        return `${unit === 0 ? value : value.toFixed(1)} ${units[unit]}`;
+    },
+
+    /**
+     * Format seconds as m:ss / h:mm:ss
+     */
+    formatDuration: function(seconds) {
+        seconds = Math.max(0, Math.round(seconds));
+        const h = Math.floor(seconds / 3600);
+        const m = Math.floor((seconds % 3600) / 60);
+        const s = String(seconds % 60).padStart(2, '0');
+        return h > 0 ? `${h}:${String(m).padStart(2, '0')}:${s}` : `${m}:${s}`;
+    },
+
+    escapeHtml: function(text) {
+        return $('<div>').text(String(text)).html();
+    }
+};
+
+// Export for use in other modules
+if (typeof window !== 'undefined') {
+    window.OnlineChange = OnlineChange;
+}
@@ -11,8 +11,32 @@
         <div class="modal-footer">
             <button class="btn-secondary" onclick="window.Utils.closeModal('columnModal')">Cancel</button>
             <button class="btn-danger" id="deleteColumnBtn" style="display: none;">🗑️ Generate Delete SQL</button>
+            <button class="btn-secondary" id="deleteOnlineBtn" style="display: none;" title="Drop the column without blocking writes">🗑️ Drop Online</button>
+            <button class="btn-secondary" id="applyOnlineBtn" title="Apply the change without blocking writes">🚀 Apply Online</button>
             <button class="btn-primary" id="saveColumnBtn">⚡ Generate SQL</button>
         </div>
     </div>
 </div>
 
+<!-- Online Schema Change Modal -->
+<div class="modal" id="onlineChangeModal">
+    <div class="modal-content">
+        <div class="modal-header">
+            <h2 id="onlineChangeTitle">Online Change</h2>
+            <button class="modal-close" onclick="window.OnlineChange.close()">&times;</button>
+        </div>
+        <div class="modal-body">
+            <div id="onlineChangeEstimate"></div>
+            <div class="online-change-progress" id="onlineChangeProgress" style="display: none;">
+                <div class="online-change-bar"><div class="online-change-bar-fill" id="onlineChangeBarFill"></div></div>
+                <div class="online-change-status" id="onlineChangeStatus"></div>
+            </div>
+        </div>
+        <div class="modal-footer">
+            <button class="btn-secondary" onclick="window.OnlineChange.close()">Close</button>
+            <button class="btn-danger" id="stopOnlineChangeBtn" style="display: none;">⏹️ Stop</button>
+            <button class="btn-primary" id="confirmOnlineChangeBtn" disabled>🚀 Apply</button>
+        </div>
+    </div>
+</div>
+
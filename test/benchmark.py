@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+"""
+HTTP Benchmark for Database Manager
+Measures throughput and latency of the API (api/index.php) and the sync
+endpoint (sync_db/api.php) directly, without a browser.
+
+The benchmark logs in once, creates a throwaway database with a synthetic
+table of the requested size, runs each workload with a pool of concurrent
+workers and prints the results as JSON, so runs of different releases can
+be compared (see --baseline). The database is dropped afterwards.
+
+Workloads:
+    paging    getRecords pages at random offsets, sorted and unsorted
+    filter    getRecords with numeric, range, date and prefix filters
+    query     executeQuery (aggregates and range SELECTs) plus fetchQueryPage
+    export    exportQuery CSV downloads, read to the end
+    sync      sync_db get_table_data chunk pulls (needs --api-key and --db-user)
+"""
+
+import argparse
+import gzip
+import http.cookiejar
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+WORKLOADS = ["paging", "filter", "query", "export", "sync"]
+
+TABLE_NAME = "bench_rows"
+INSERT_BATCH = 1000
+
+CATEGORIES = 50
+WORDS = ["alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel",
+         "india", "juliet", "kilo", "lima", "mike", "november", "oscar", "papa"]
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile (same definition as the settings dashboard)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, -(-percent * len(ordered) // 100) - 1))
+    return ordered[int(index)]
+
+
+def parse_server_timing(header):
+    """Server-Timing header -> {name: duration in ms}"""
+    timings = {}
+    for metric in (header or "").split(","):
+        parts = metric.strip().split(";")
+        for part in parts[1:]:
+            if part.strip().startswith("dur="):
+                try:
+                    timings[parts[0].strip()] = float(part.strip()[4:])
+                except ValueError:
+                    pass
+    return timings
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+class DatabaseManagerBenchmark:
+    def __init__(self, base_url="http://localhost", username="max", password="maxbis123",
+                 rows=100000, concurrency=8, requests=200, page_size=100, export_rows=10000,
+                 api_key="", db_host="localhost", db_user="", db_pass="", seed=1):
+        """
+        Args:
+            base_url (str): Base URL of the server (the application lives under /db-manager)
+            username (str): Login username
+            password (str): Login password
+            rows (int): Rows in the synthetic table
+            concurrency (int): Concurrent workers per workload
+            requests (int): Requests per workload
+            page_size (int): Rows per getRecords page / executeQuery page
+            export_rows (int): Rows per exportQuery download
+            api_key (str): SYNC_API_KEY of the server (sync workload)
+            db_host, db_user, db_pass (str): Database credentials sent to the sync endpoint
+            seed (int): Seed for the generated data and the request mix
+        """
+        self.app_url = f"{base_url.rstrip('/')}/db-manager"
+        self.username = username
+        self.password = password
+        self.rows = rows
+        self.concurrency = concurrency
+        self.requests = requests
+        self.page_size = page_size
+        self.export_rows = export_rows
+        self.api_key = api_key
+        self.db_host = db_host
+        self.db_user = db_user
+        self.db_pass = db_pass
+        self.seed = seed
+        self.database = f"bench_db_{random.randint(100000, 999999)}"
+
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies))
+        self.local = threading.local()
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+
+    def request(self, path, params=None, data=None, headers=None):
+        """
+        Send a request and read the whole (decompressed) body
+
+        Returns (status, body bytes, wire bytes, response headers, seconds).
+        """
+        url = f"{self.app_url}/{path}"
+        if params:
+            url += "?" + urllib.parse.urlencode(params)
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        req = urllib.request.Request(url, data=body, headers={"Accept-Encoding": "gzip", **(headers or {})})
+
+        start = time.perf_counter()
+        try:
+            response = self.opener.open(req, timeout=300)
+            status = response.status
+        except urllib.error.HTTPError as e:
+            response = e
+            status = e.code
+        raw = response.read()
+        elapsed = time.perf_counter() - start
+
+        content = raw
+        if response.headers.get("Content-Encoding") == "gzip":
+            content = gzip.decompress(raw)
+        return status, content, len(raw), response.headers, elapsed
+
+    def api(self, action, params=None, data=None, method="GET"):
+        """Call api/index.php and return the decoded JSON (raises on failure)"""
+        params = {"action": action, **(params or {})}
+        if method == "POST":
+            status, content, _, _, _ = self.request("api/", {"action": action}, {**params, **(data or {})})
+        else:
+            status, content, _, _, _ = self.request("api/", params)
+        try:
+            result = json.loads(content)
+        except ValueError:
+            raise BenchmarkError(f"{action}: HTTP {status}, not JSON: {content[:200]!r}")
+        if not result.get("success"):
+            raise BenchmarkError(f"{action}: {result.get('error') or result.get('message')}")
+        return result
+
+    def login(self):
+        """Log in through the login form (once; the workers share the session cookie)"""
+        print(f"🔐 Logging in as {self.username}", file=sys.stderr)
+        _, content, _, _, _ = self.request("login/login.php")
+        match = re.search(rb'name="csrf_token" value="([^"]*)"', content)
+        if match is None:
+            raise BenchmarkError("Login page has no CSRF token")
+        self.request("login/login.php", data={
+            "csrf_token": match.group(1).decode(),
+            "username": self.username,
+            "password": self.password
+        })
+        try:
+            self.api("getDatabases", {"sizes": "false"})
+        except BenchmarkError as e:
+            raise BenchmarkError(f"Login failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Test data
+    # ------------------------------------------------------------------
+
+    def create_data(self):
+        """Create the throwaway database and fill the synthetic table"""
+        print(f"🗄️  Creating {self.database}.{TABLE_NAME} with {self.rows} rows", file=sys.stderr)
+        self.api("createDatabase", data={"name": self.database}, method="POST")
+        self.query(f"""CREATE TABLE `{TABLE_NAME}` (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            category INT NOT NULL,
+            name VARCHAR(64) NOT NULL,
+            email VARCHAR(128) NOT NULL,
+            amount DECIMAL(10,2) NOT NULL,
+            created_at DATETIME NOT NULL,
+            note TEXT,
+            KEY idx_category (category),
+            KEY idx_created_at (created_at),
+            KEY idx_name (name)
+        ) ENGINE=InnoDB""")
+
+        rng = random.Random(self.seed)
+        start = time.perf_counter()
+        for first in range(0, self.rows, INSERT_BATCH):
+            values = []
+            for i in range(first, min(first + INSERT_BATCH, self.rows)):
+                word = rng.choice(WORDS)
+                values.append("({}, '{}', '{}', {:.2f}, '{}', '{}')".format(
+                    rng.randrange(CATEGORIES),
+                    f"{word}_{i}",
+                    f"{word}.{i}@example.com",
+                    rng.uniform(0, 10000),
+                    time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(1577836800 + rng.randrange(5 * 365 * 86400))),
+                    " ".join(rng.choice(WORDS) for _ in range(rng.randrange(5, 40)))
+                ))
+            self.query(f"INSERT INTO `{TABLE_NAME}` (category, name, email, amount, created_at, note) VALUES "
+                       + ", ".join(values))
+        print(f"   loaded in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    def drop_data(self):
+        try:
+            self.api("deleteDatabase", data={"name": self.database}, method="POST")
+            print(f"🧹 Dropped {self.database}", file=sys.stderr)
+        except BenchmarkError as e:
+            print(f"⚠️  Could not drop {self.database}: {e}", file=sys.stderr)
+
+    def query(self, sql):
+        return self.api("executeQuery", data={"database": self.database, "query": sql}, method="POST")
+
+    # ------------------------------------------------------------------
+    # Workloads: each returns (status ok, wire bytes, headers, seconds)
+    # ------------------------------------------------------------------
+
+    def rng(self):
+        """Per-thread random generator (seeded, so runs issue the same mix)"""
+        if not hasattr(self.local, "rng"):
+            self.local.rng = random.Random(f"{self.seed}-{threading.get_ident()}")
+        return self.local.rng
+
+    def get_records(self, params):
+        status, content, size, headers, elapsed = self.request("api/", {
+            "action": "getRecords",
+            "database": self.database,
+            "table": TABLE_NAME,
+            "limit": self.page_size,
+            **params
+        })
+        return status == 200 and b'"success":true' in content[:64], size, headers, elapsed
+
+    def run_paging(self):
+        rng = self.rng()
+        params = {"offset": rng.randrange(max(1, self.rows - self.page_size))}
+        if rng.random() < 0.5:
+            params["sortColumn"] = rng.choice(["id", "category", "created_at", "amount"])
+            params["sortOrder"] = rng.choice(["ASC", "DESC"])
+        return self.get_records(params)
+
+    def run_filter(self):
+        rng = self.rng()
+        filters = rng.choice([
+            {"category": str(rng.randrange(CATEGORIES))},
+            {"amount": f"{rng.randrange(9000)}..{rng.randrange(9000, 10000)}"},
+            {"created_at": str(rng.randrange(2020, 2025))},
+            {"name": rng.choice(WORDS)},
+            {"category": f"<{rng.randrange(1, CATEGORIES)}", "name": rng.choice(WORDS)},
+        ])
+        return self.get_records({"filters": json.dumps(filters), "sortColumn": "id"})
+
+    def run_query(self):
+        rng = self.rng()
+        sql = rng.choice([
+            f"SELECT category, COUNT(*) AS n, AVG(amount) AS avg_amount FROM `{TABLE_NAME}` GROUP BY category",
+            f"SELECT * FROM `{TABLE_NAME}` WHERE amount BETWEEN {rng.randrange(9000)} AND 10000 ORDER BY amount",
+            f"SELECT id, name, email FROM `{TABLE_NAME}` WHERE category = {rng.randrange(CATEGORIES)}",
+        ])
+        status, content, size, headers, elapsed = self.request("api/", {"action": "executeQuery"}, {
+            "database": self.database, "query": sql, "pageSize": self.page_size
+        })
+        ok = status == 200 and b'"success":true' in content[:64]
+        if ok and rng.random() < 0.5:
+            # Follow up with the next page of the result session
+            session = json.loads(content)
+            if session.get("hasMore"):
+                status, content, more, headers, extra = self.request("api/", {"action": "fetchQueryPage"}, {
+                    "database": self.database, "sessionId": session["sessionId"], "offset": self.page_size
+                })
+                ok = status == 200 and b'"success":true' in content[:64]
+                size += more
+                elapsed += extra
+        return ok, size, headers, elapsed
+
+    def run_export(self):
+        rng = self.rng()
+        offset = rng.randrange(max(1, self.rows - self.export_rows))
+        status, content, size, headers, elapsed = self.request("api/", {"action": "exportQuery"}, {
+            "database": self.database,
+            "query": f"SELECT * FROM `{TABLE_NAME}` LIMIT {offset}, {self.export_rows}",
+            "format": "csv"
+        })
+        return status == 200 and content.startswith(b"\xef\xbb\xbf"), size, headers, elapsed
+
+    def run_sync(self):
+        rng = self.rng()
+        status, content, size, headers, elapsed = self.request("sync_db/api.php", data={
+            "action": "get_table_data",
+            "db_host": self.db_host,
+            "db_user": self.db_user,
+            "db_pass": self.db_pass,
+            "db_name": self.database,
+            "table": TABLE_NAME,
+            "offset": rng.randrange(0, max(1, self.rows), 1000),
+            "limit": 1000,
+            "format": "compact"
+        }, headers={"X-API-Key": self.api_key})
+        return status == 200 and b'"success":true' in content[:64], size, headers, elapsed
+
+    # ------------------------------------------------------------------
+    # Runner
+    # ------------------------------------------------------------------
+
+    def run_workload(self, name):
+        """Run one workload with the worker pool and summarize it"""
+        function = getattr(self, f"run_{name}")
+        latencies = []
+        sql_times = []
+        errors = 0
+        wire_bytes = 0
+        lock = threading.Lock()
+
+        def one(_):
+            nonlocal errors, wire_bytes
+            try:
+                ok, size, headers, elapsed = function()
+            except Exception:
+                ok, size, headers, elapsed = False, 0, None, None
+            with lock:
+                if not ok:
+                    errors += 1
+                    return
+                latencies.append(elapsed * 1000)
+                wire_bytes += size
+                sql = parse_server_timing(headers.get("Server-Timing")).get("sql")
+                if sql is not None:
+                    sql_times.append(sql)
+
+        print(f"🚀 {name}: {self.requests} requests, {self.concurrency} workers", file=sys.stderr)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            list(pool.map(one, range(self.requests)))
+        duration = time.perf_counter() - start
+
+        result = {
+            "requests": self.requests,
+            "errors": errors,
+            "duration_s": round(duration, 3),
+            "throughput_rps": round(len(latencies) / duration, 2) if duration > 0 else None,
+            "bytes_per_request": round(wire_bytes / len(latencies)) if latencies else None,
+            "latency_ms": {
+                "min": round(min(latencies), 2) if latencies else None,
+                "mean": round(statistics.mean(latencies), 2) if latencies else None,
+                "p50": round(percentile(latencies, 50), 2) if latencies else None,
+                "p90": round(percentile(latencies, 90), 2) if latencies else None,
+                "p99": round(percentile(latencies, 99), 2) if latencies else None,
+                "max": round(max(latencies), 2) if latencies else None,
+            },
+            "sql_ms": {
+                "p50": round(percentile(sql_times, 50), 2) if sql_times else None,
+                "p99": round(percentile(sql_times, 99), 2) if sql_times else None,
+            },
+        }
+        print(f"   {result['throughput_rps']} req/s, p50 {result['latency_ms']['p50']} ms, "
+              f"p99 {result['latency_ms']['p99']} ms, {errors} errors", file=sys.stderr)
+        return result
+
+    def run(self, workloads):
+        """Run the benchmark; returns the report"""
+        if "sync" in workloads and not (self.api_key and self.db_user):
+            print("⚠️  Skipping sync workload: --api-key and --db-user are required", file=sys.stderr)
+            workloads = [w for w in workloads if w != "sync"]
+
+        self.login()
+        self.create_data()
+        try:
+            results = {name: self.run_workload(name) for name in workloads}
+        finally:
+            self.drop_data()
+
+        return {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "config": {
+                "url": self.app_url,
+                "rows": self.rows,
+                "concurrency": self.concurrency,
+                "requests": self.requests,
+                "page_size": self.page_size,
+                "export_rows": self.export_rows,
+                "seed": self.seed,
+            },
+            "workloads": results,
+        }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline):
+    """Add the change against a baseline report to every workload (ratios, > 1 = slower)"""
+    for name, result in report["workloads"].items():
+        before = baseline.get("workloads", {}).get(name)
+        if not before:
+            continue
+        comparison = {}
+        for key in ["p50", "p99"]:
+            if result["latency_ms"][key] and before["latency_ms"].get(key):
+                comparison[f"{key}_ratio"] = round(result["latency_ms"][key] / before["latency_ms"][key], 3)
+        if result["throughput_rps"] and before.get("throughput_rps"):
+            comparison["throughput_ratio"] = round(result["throughput_rps"] / before["throughput_rps"], 3)
+        result["vs_baseline"] = comparison
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP benchmark for the Database Manager API")
+    parser.add_argument("--url", default="http://localhost", help="Base URL (default: http://localhost)")
+    parser.add_argument("--username", default="max", help="Login username (default: max)")
+    parser.add_argument("--password", default="maxbis123", help="Login password")
+    parser.add_argument("--rows", type=int, default=100000, help="Rows in the synthetic table (default: 100000)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent workers (default: 8)")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per workload (default: 200)")
+    parser.add_argument("--page-size", type=int, default=100, help="Rows per page (default: 100)")
+    parser.add_argument("--export-rows", type=int, default=10000, help="Rows per export (default: 10000)")
+    parser.add_argument("--workloads", default=",".join(WORKLOADS),
+                        help=f"Comma-separated workloads (default: {','.join(WORKLOADS)})")
+    parser.add_argument("--api-key", default=os.environ.get("SYNC_API_KEY", ""),
+                        help="Sync API key (default: $SYNC_API_KEY)")
+    parser.add_argument("--db-host", default="localhost", help="Database host for the sync endpoint")
+    parser.add_argument("--db-user", default=os.environ.get("DB_USER", ""), help="Database user for the sync endpoint")
+    parser.add_argument("--db-pass", default=os.environ.get("DB_PASS", ""), help="Database password for the sync endpoint")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed (default: 1)")
+    parser.add_argument("--output", help="Write the JSON report to this file (default: stdout)")
+    parser.add_argument("--baseline", help="Earlier JSON report to compare against")
+    args = parser.parse_args()
+
+    workloads = [w.strip() for w in args.workloads.split(",") if w.strip()]
+    unknown = set(workloads) - set(WORKLOADS)
+    if unknown:
+        parser.error(f"unknown workloads: {', '.join(sorted(unknown))}")
+
+    benchmark = DatabaseManagerBenchmark(
+        base_url=args.url,
+        username=args.username,
+        password=args.password,
+        rows=args.rows,
+        concurrency=args.concurrency,
+        requests=args.requests,
+        page_size=args.page_size,
+        export_rows=args.export_rows,
+        api_key=args.api_key,
+        db_host=args.db_host,
+        db_user=args.db_user,
+        db_pass=args.db_pass,
+        seed=args.seed
+    )
+    try:
+        report = benchmark.run(workloads)
+    except BenchmarkError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(report, json.load(f))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+        print(f"✅ Report written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,30 @@
 #!/usr/bin/env python3
 """
-Selenium Test Script for Database Manager
-Tests the complete workflow: Create Database -> Create Table -> Delete Database
+Selenium Test Suite for Database Manager
+
+Runs independent UI scenarios in parallel, each against its own throwaway
+database, on a pool of headless Chrome browsers:
+
+    database_lifecycle  Create a database through the dashboard, then delete it
+    create_table        Create a table with several columns in db_manager
+    table_structure     Open a table in table_structure and check its columns
+    data_manager        Page, sort and filter records in data_manager
+
+There are no fixed delays: every step waits for a condition (an element, a
+value, or the page being idle: document loaded and no XHR/fetch request in
+flight). Every step is timed; with --baseline the timings are compared with
+an earlier report, so UI latency regressions fail the run.
 """
 
-import time
+import json
+import os
 import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from queue import Queue, Empty
+
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -15,652 +34,493 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from webdriver_manager.chrome import ChromeDriverManager
-import sys
+
+SCENARIOS = ["database_lifecycle", "create_table", "table_structure", "data_manager"]
+
+# Counts XHR/fetch requests in flight; installed before any page script runs
+NETWORK_TRACKER = """
+(function () {
+    window.__pendingRequests = 0;
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        window.__pendingRequests++;
+        this.addEventListener('loadend', function () { window.__pendingRequests--; });
+        return send.apply(this, arguments);
+    };
+    if (window.fetch) {
+        var fetch = window.fetch;
+        window.fetch = function () {
+            window.__pendingRequests++;
+            return fetch.apply(this, arguments).finally(function () { window.__pendingRequests--; });
+        };
+    }
+})();
+"""
+
+IDLE_SCRIPT = """
+return document.readyState === 'complete'
+    && (window.__pendingRequests || 0) === 0
+    && !(window.jQuery && window.jQuery.active);
+"""
+
+# Calls the API from the page, with the browser's session
+API_SCRIPT = """
+var url = arguments[0], action = arguments[1], data = arguments[2], method = arguments[3];
+var done = arguments[arguments.length - 1];
+var params = new URLSearchParams(Object.assign({action: action}, data));
+var request = method === 'GET'
+    ? fetch(url + '?' + params, {credentials: 'same-origin'})
+    : fetch(url + '?action=' + encodeURIComponent(action),
+            {method: 'POST', body: params, credentials: 'same-origin'});
+request.then(function (r) { return r.json(); })
+    .then(done, function (e) { done({success: false, error: String(e)}); });
+"""
+
+FIXTURE_ROWS = 250
+
 
 class DatabaseManagerTest:
-    def __init__(self, base_url="http://localhost", headless=False, username="max", password="maxbis123", delay_speed="normal"):
+    def __init__(self, base_url="http://localhost", headless=True, username="max", password="maxbis123",
+                 timeout=10, driver_path=None, name="browser"):
         """
-        Initialize the test with browser configuration
-        
+        One browser of the pool; runs scenarios one after another
+
         Args:
-            base_url (str): Base URL of the application
-            headless (bool): Whether to run browser in headless mode
+            base_url (str): Base URL of the server (the application lives under /db-manager)
+            headless (bool): Whether to run the browser in headless mode
             username (str): Login username
             password (str): Login password
-            delay_speed (str): Speed setting - "fast", "normal", "slow", or custom delay in seconds
+            timeout (float): Seconds a condition may take before the step fails
+            driver_path (str): ChromeDriver executable (installed once for the whole pool)
+            name (str): Name of this browser in the output
         """
-        self.base_url = base_url
+        self.app_url = f"{base_url.rstrip('/')}/db-manager"
         self.headless = headless
         self.username = username
         self.password = password
+        self.timeout = timeout
+        self.driver_path = driver_path
+        self.name = name
         self.driver = None
         self.wait = None
-        self.test_database_name = f"test_db_{random.randint(1000, 9999)}"
-        self.test_table_name = f"test_table_{random.randint(100, 999)}"
-        
-        # Configure delays based on speed setting
-        self.setup_delays(delay_speed)
-    
-    def setup_delays(self, delay_speed):
-        """Setup delay timings based on speed preference"""
-        if delay_speed == "fast":
-            self.short_delay = 0.3
-            self.medium_delay = 0.5
-            self.long_delay = 1.0
-            self.extra_delay = 1.5
-            print("⚡ Speed setting: FAST (minimal delays)")
-        elif delay_speed == "slow":
-            self.short_delay = 2.0
-            self.medium_delay = 3.0
-            self.long_delay = 4.0
-            self.extra_delay = 5.0
-            print("🐌 Speed setting: SLOW (extended delays for easy observation)")
-        elif delay_speed == "normal":
-            self.short_delay = 1.0
-            self.medium_delay = 2.0
-            self.long_delay = 3.0
-            self.extra_delay = 4.0
-            print("🚶 Speed setting: NORMAL (balanced delays)")
-        else:
-            # Try to parse as custom delay in seconds
-            try:
-                custom_delay = float(delay_speed)
-                self.short_delay = custom_delay * 0.5
-                self.medium_delay = custom_delay
-                self.long_delay = custom_delay * 1.5
-                self.extra_delay = custom_delay * 2.0
-                print(f"⚙️  Speed setting: CUSTOM ({custom_delay}s base delay)")
-            except ValueError:
-                print("⚠️  Invalid delay speed, using normal speed")
-                self.short_delay = 1.0
-                self.medium_delay = 2.0
-                self.long_delay = 3.0
-                self.extra_delay = 4.0
-        
+        self.timings = {}
+
+    # ------------------------------------------------------------------
+    # Browser
+    # ------------------------------------------------------------------
+
     def setup_driver(self):
-        """Setup Chrome WebDriver with appropriate options"""
-        print("🔧 Setting up Chrome WebDriver...")
-        
+        """Start Chrome with the network tracker installed on every page"""
         chrome_options = Options()
         if self.headless:
-            chrome_options.add_argument("--headless")
-        
-        # Additional options for better compatibility
+            chrome_options.add_argument("--headless=new")
         chrome_options.add_argument("--no-sandbox")
         chrome_options.add_argument("--disable-dev-shm-usage")
         chrome_options.add_argument("--disable-gpu")
         chrome_options.add_argument("--window-size=1920,1080")
-        
-        try:
-            # Use webdriver-manager to automatically download and manage ChromeDriver
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            self.wait = WebDriverWait(self.driver, 10)
-            print("✅ WebDriver setup successful")
-        except Exception as e:
-            print(f"❌ Failed to setup WebDriver: {e}")
-            sys.exit(1)
-    
+
+        service = Service(self.driver_path or ChromeDriverManager().install())
+        self.driver = webdriver.Chrome(service=service, options=chrome_options)
+        self.driver.set_script_timeout(self.timeout)
+        self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": NETWORK_TRACKER})
+        self.wait = WebDriverWait(self.driver, self.timeout, poll_frequency=0.05)
+
+    def quit(self):
+        if self.driver:
+            self.driver.quit()
+            self.driver = None
+
     def login(self):
-        """Login to the application"""
-        print(f"🔐 Logging in with username: {self.username}")
-        print("=" * 50)
-        
-        # Navigate to login page
-        login_url = f"{self.base_url}/db-manager/login/login.php"
-        print(f"🌐 Navigating to login page: {login_url}")
-        
+        """Log in through the login form"""
+        self.driver.get(f"{self.app_url}/login/login.php")
+        self.wait.until(EC.presence_of_element_located((By.NAME, "username"))).send_keys(self.username)
+        self.driver.find_element(By.NAME, "password").send_keys(self.password)
+        self.driver.find_element(By.CSS_SELECTOR, "button[type='submit'], input[type='submit']").click()
         try:
-            self.driver.get(login_url)
-            time.sleep(self.medium_delay)  # Allow page to load
-            
-            # Wait for login form to be present
-            self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='text'], input[name='username'], #username")))
-            print("✅ Login page loaded successfully")
-            
-            # Find and fill username field
-            username_selectors = [
-                "input[name='username']",
-                "input[type='text']",
-                "#username",
-                "input[placeholder*='username' i]",
-                "input[placeholder*='user' i]"
-            ]
-            
-            username_field = None
-            for selector in username_selectors:
-                try:
-                    username_field = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    break
-                except NoSuchElementException:
-                    continue
-            
-            if not username_field:
-                raise NoSuchElementException("Could not find username field")
-            
-            print(f"⌨️  Entering username: {self.username}")
-            time.sleep(self.short_delay)
-            username_field.clear()
-            username_field.send_keys(self.username)
-            time.sleep(self.short_delay)
-            
-            # Find and fill password field
-            password_selectors = [
-                "input[name='password']",
-                "input[type='password']",
-                "#password",
-                "input[placeholder*='password' i]"
-            ]
-            
-            password_field = None
-            for selector in password_selectors:
-                try:
-                    password_field = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    break
-                except NoSuchElementException:
-                    continue
-            
-            if not password_field:
-                raise NoSuchElementException("Could not find password field")
-            
-            print(f"⌨️  Entering password: {'*' * len(self.password)}")
-            time.sleep(self.short_delay)
-            password_field.clear()
-            password_field.send_keys(self.password)
-            time.sleep(self.short_delay)
-            
-            # Find and click login button
-            login_button_selectors = [
-                "input[type='submit']",
-                "button[type='submit']",
-                "input[value*='login' i]",
-                "button:contains('Login')",
-                ".login-btn",
-                "#login-btn"
-            ]
-            
-            login_button = None
-            for selector in login_button_selectors:
-                try:
-                    login_button = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    break
-                except NoSuchElementException:
-                    continue
-            
-            if not login_button:
-                # Try to find any button that might be the login button
-                buttons = self.driver.find_elements(By.CSS_SELECTOR, "button, input[type='submit']")
-                if buttons:
-                    login_button = buttons[0]  # Use first button found
-                else:
-                    raise NoSuchElementException("Could not find login button")
-            
-            print("👆 Clicking login button...")
-            time.sleep(self.short_delay)
-            login_button.click()
-            time.sleep(self.long_delay)  # Wait for login to process
-            
-            # Check if login was successful by looking for redirect or dashboard
-            current_url = self.driver.current_url
-            print(f"📍 Current URL after login: {current_url}")
-            
-            # If we're still on login page, check for error messages
-            if "login" in current_url.lower():
-                # Look for error messages
-                error_selectors = [
-                    ".error",
-                    ".alert-danger",
-                    ".message",
-                    ".notification",
-                    "[class*='error']",
-                    "[class*='alert']"
-                ]
-                
-                for selector in error_selectors:
-                    try:
-                        error_element = self.driver.find_element(By.CSS_SELECTOR, selector)
-                        if error_element.is_displayed() and error_element.text.strip():
-                            print(f"❌ Login error: {error_element.text}")
-                            raise Exception(f"Login failed: {error_element.text}")
-                    except NoSuchElementException:
-                        continue
-                
-                print("⚠️  Still on login page - login may have failed")
+            self.wait.until(lambda d: "login.php" not in d.current_url)
+        except TimeoutException:
+            raise AssertionError(f"Login failed for user '{self.username}'")
+        self.wait_for_idle()
+
+    # ------------------------------------------------------------------
+    # Waiting and timing
+    # ------------------------------------------------------------------
+
+    def wait_for_idle(self, quiet=0.1):
+        """
+        Wait until the page is loaded and no request has been in flight for
+        `quiet` seconds (so requests started by the responses are seen too)
+        """
+        idle_since = None
+        deadline = time.monotonic() + self.timeout
+        while time.monotonic() < deadline:
+            if self.driver.execute_script(IDLE_SCRIPT):
+                idle_since = idle_since or time.monotonic()
+                if time.monotonic() - idle_since >= quiet:
+                    return
             else:
-                print("✅ Login successful - redirected from login page")
-            
-            time.sleep(self.medium_delay)  # Extra pause for user to see login result
-            
-        except Exception as e:
-            print(f"❌ Login failed: {e}")
-            raise
-
-    def navigate_to_database_manager(self):
-        """Navigate to the database manager page"""
-        print(f"🌐 Navigating to database manager...")
-        url = f"{self.base_url}/db-manager/db_manager/"
-        
+                idle_since = None
+            time.sleep(0.02)
+        raise TimeoutException(f"Page did not become idle within {self.timeout}s")
+
+    def wait_for(self, condition, description):
         try:
-            self.driver.get(url)
-            # Wait for either dashboard content or login redirect
-            try:
-                self.wait.until(EC.presence_of_element_located((By.ID, "dashboardContent")))
-                print("✅ Successfully navigated to database manager")
-            except TimeoutException:
-                # Check if we were redirected to login
-                if "login" in self.driver.current_url.lower():
-                    print("🔄 Redirected to login page - performing login...")
-                    self.login()
-                    # Try to navigate to database manager again
-                    self.driver.get(url)
-                    self.wait.until(EC.presence_of_element_located((By.ID, "dashboardContent")))
-                    print("✅ Successfully navigated to database manager after login")
-                else:
-                    raise TimeoutException("Could not find dashboard content")
-            
-            time.sleep(self.medium_delay)  # Allow page to fully load
+            return self.wait.until(condition)
         except TimeoutException:
-            print("❌ Failed to load database manager page")
-            raise
-    
-    def wait_and_click(self, locator, description="element"):
-        """Wait for element and click it with delay for visibility"""
+            raise AssertionError(f"Timed out waiting for {description}")
+
+    def click(self, locator, description):
+        self.wait_for(EC.element_to_be_clickable(locator), description).click()
+
+    def type_into(self, locator, text, description):
+        element = self.wait_for(EC.visibility_of_element_located(locator), description)
+        element.clear()
+        element.send_keys(text)
+        return element
+
+    @contextmanager
+    def step(self, name):
+        """Time a scenario step (milliseconds, recorded in self.timings)"""
+        start = time.perf_counter()
         try:
-            element = self.wait.until(EC.element_to_be_clickable(locator))
-            print(f"👆 Clicking {description}...")
-            time.sleep(self.short_delay)  # Brief pause for user to see
-            element.click()
-            time.sleep(self.short_delay)  # Brief pause after action
-            return element
-        except TimeoutException:
-            print(f"❌ Failed to find or click {description}")
-            raise
-    
-    def wait_and_send_keys(self, locator, text, description="input field"):
-        """Wait for element and send keys with delay for visibility"""
+            yield
+        finally:
+            self.timings[name] = round((time.perf_counter() - start) * 1000, 1)
+
+    # ------------------------------------------------------------------
+    # Fixtures (through the API, with the browser's session)
+    # ------------------------------------------------------------------
+
+    def api(self, action, data=None, method="POST"):
+        result = self.driver.execute_async_script(API_SCRIPT, f"{self.app_url}/api/", action, data or {}, method)
+        if not result or not result.get("success"):
+            raise AssertionError(f"API {action} failed: {(result or {}).get('error')}")
+        return result
+
+    def create_fixture_database(self, with_table=False):
+        """Throwaway database, optionally with a filled table; returns (database, table)"""
+        database = f"test_db_{random.randint(100000, 999999)}"
+        table = f"test_table_{random.randint(100, 999)}"
+        self.api("createDatabase", {"name": database})
+        if with_table:
+            self.api("executeQuery", {"database": database, "query": f"""CREATE TABLE `{table}` (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                name VARCHAR(100) NOT NULL,
+                category INT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                KEY idx_category (category)
+            )"""})
+            values = ", ".join(f"('name_{i:04d}', {i % 5})" for i in range(FIXTURE_ROWS))
+            self.api("executeQuery", {"database": database,
+                                      "query": f"INSERT INTO `{table}` (name, category) VALUES {values}"})
+        self.api("setCurrentDatabase", {"database": database})
+        return database, table
+
+    def drop_database(self, database):
         try:
-            element = self.wait.until(EC.presence_of_element_located(locator))
-            print(f"⌨️  Typing '{text}' into {description}...")
-            time.sleep(self.short_delay)  # Brief pause for user to see
-            element.clear()
-            element.send_keys(text)
-            time.sleep(self.short_delay)  # Brief pause after action
-            return element
-        except TimeoutException:
-            print(f"❌ Failed to find or type into {description}")
-            raise
-    
-    def create_database(self):
-        """Create a new database"""
-        print(f"\n📊 STEP 1: Creating database '{self.test_database_name}'")
-        print("=" * 50)
-        
-        # Click on Actions dropdown
-        self.wait_and_click(
-            (By.CSS_SELECTOR, "#statsActions .dropdown-toggle"),
-            "Actions dropdown"
-        )
-        
-        # Click Create Database button
-        self.wait_and_click(
-            (By.ID, "createDatabaseBtn"),
-            "Create Database button"
-        )
-        
-        # Fill database name
-        self.wait_and_send_keys(
-            (By.ID, "newDatabaseName"),
-            self.test_database_name,
-            "database name field"
-        )
-        
-        # Select charset (keep default utf8mb4)
-        charset_select = Select(self.driver.find_element(By.ID, "newDatabaseCharset"))
-        print("🔤 Setting charset to utf8mb4...")
-        time.sleep(self.short_delay)
-        charset_select.select_by_value("utf8mb4")
-        time.sleep(self.short_delay)
-        
-        # Select collation (keep default utf8mb4_unicode_ci)
-        collation_select = Select(self.driver.find_element(By.ID, "newDatabaseCollation"))
-        print("🔤 Setting collation to utf8mb4_unicode_ci...")
-        time.sleep(self.short_delay)
-        collation_select.select_by_value("utf8mb4_unicode_ci")
-        time.sleep(self.short_delay)
-        
-        # Click Create Database button
-        self.wait_and_click(
-            (By.ID, "confirmCreateDatabaseBtn"),
-            "Confirm Create Database button"
-        )
-        
-        # Wait for success message or database to appear in list
-        print("⏳ Waiting for database creation to complete...")
-        time.sleep(self.long_delay)
-        
-        # Verify database was created by checking if it appears in the database list
+            self.api("deleteDatabase", {"name": database})
+        except Exception:
+            pass
+
+    def open_page(self, page, query=""):
+        self.driver.get(f"{self.app_url}/{page}/{query}")
+        self.wait_for_idle()
+
+    # ------------------------------------------------------------------
+    # Scenarios
+    # ------------------------------------------------------------------
+
+    def run_scenario(self, scenario):
+        """Run one scenario; returns its result (never raises)"""
+        self.timings = {}
+        start = time.perf_counter()
+        error = None
         try:
-            self.wait.until(EC.presence_of_element_located(
-                (By.CSS_SELECTOR, f".database-item[data-database='{self.test_database_name}']")
-            ))
-            print(f"✅ Database '{self.test_database_name}' created successfully!")
-        except TimeoutException:
-            print(f"⚠️  Database creation may have succeeded, but couldn't verify in UI")
-        
-        time.sleep(self.medium_delay)  # Extra pause for user to see the result
-    
-    def select_database(self):
-        """Select the created database"""
-        print(f"\n🎯 STEP 2: Selecting database '{self.test_database_name}'")
-        print("=" * 50)
-        
-        # Click on the database item to select it
-        self.wait_and_click(
-            (By.CSS_SELECTOR, f".database-item[data-database='{self.test_database_name}']"),
-            f"database '{self.test_database_name}'"
-        )
-        
-        # Wait for database to be selected (check if it's active)
+            getattr(self, f"scenario_{scenario}")()
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        return {
+            "scenario": scenario,
+            "browser": self.name,
+            "passed": error is None,
+            "error": error,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+            "steps": self.timings,
+        }
+
+    def scenario_database_lifecycle(self):
+        database = f"test_db_{random.randint(100000, 999999)}"
+        item = f".database-item[data-database='{database}']"
         try:
-            self.wait.until(EC.presence_of_element_located(
-                (By.CSS_SELECTOR, f".database-item[data-database='{self.test_database_name}'].active")
-            ))
-            print(f"✅ Database '{self.test_database_name}' selected successfully!")
-        except TimeoutException:
-            print(f"⚠️  Database selection may have succeeded, but couldn't verify active state")
-        
-        time.sleep(self.medium_delay)  # Extra pause for user to see the selection
-    
-    def create_table(self):
-        """Create a table with multiple columns"""
-        print(f"\n📋 STEP 3: Creating table '{self.test_table_name}' with columns")
-        print("=" * 50)
-        
-        # Click on Actions dropdown
-        self.wait_and_click(
-            (By.CSS_SELECTOR, "#statsActions .dropdown-toggle"),
-            "Actions dropdown"
-        )
-        
-        # Click Create Table button
-        self.wait_and_click(
-            (By.ID, "createTableMenuItem"),
-            "Create Table button"
-        )
-        
-        # Fill table name
-        self.wait_and_send_keys(
-            (By.ID, "newTableName"),
-            self.test_table_name,
-            "table name field"
-        )
-        
-        # Add first column (ID - Primary Key)
-        print("🔧 Adding first column (ID)...")
-        time.sleep(self.short_delay)
-        
-        # Click Add Column button to create the first column
-        add_column_btn = self.driver.find_element(By.ID, "addColumnRowBtn")
-        add_column_btn.click()
-        time.sleep(self.short_delay)
-        
-        # Find the first column row and configure it
-        column_rows = self.driver.find_elements(By.CSS_SELECTOR, ".column-rows .column-row")
-        if column_rows:
-            first_row = column_rows[0]
-            
-            # Fill column name
-            name_input = first_row.find_element(By.CSS_SELECTOR, "input.col-name")
-            name_input.clear()
-            name_input.send_keys("id")
-            time.sleep(self.short_delay * 0.5)
-            
-            # Select column type
-            type_select = Select(first_row.find_element(By.CSS_SELECTOR, "select.col-type"))
-            type_select.select_by_value("INT")
-            time.sleep(self.short_delay * 0.5)
-            
-            # Set Auto Increment and Primary Key
-            ai_checkbox = first_row.find_element(By.CSS_SELECTOR, "input[type='checkbox'].col-ai")
-            if not ai_checkbox.is_selected():
-                ai_checkbox.click()
-            time.sleep(self.short_delay * 0.3)
-            
-            pk_checkbox = first_row.find_element(By.CSS_SELECTOR, "input[type='checkbox'].col-primary")
-            if not pk_checkbox.is_selected():
-                pk_checkbox.click()
-            time.sleep(self.short_delay * 0.3)
-            
-            print("    ✅ ID column (Primary Key, Auto Increment) configured")
-        
-        # Add additional columns
-        print("🔧 Adding additional columns...")
-        time.sleep(self.short_delay)
-        
-        # Add second column (Name)
-        self.add_column("name", "VARCHAR", "100", "None", False, False, False, False, False, "Name column")
-        
-        # Add third column (Email)
-        self.add_column("email", "VARCHAR", "255", "None", False, False, False, False, True, "Email column (Unique)")
-        
-        # Add fourth column (Created Date)
-        self.add_column("created_at", "TIMESTAMP", "", "CURRENT_TIMESTAMP", False, False, False, False, False, "Created date column")
-        
-        # Select storage engine (keep default InnoDB)
-        engine_select = Select(self.driver.find_element(By.ID, "newTableEngine"))
-        print("🔧 Setting storage engine to InnoDB...")
-        time.sleep(self.short_delay)
-        engine_select.select_by_value("InnoDB")
-        time.sleep(self.short_delay)
-        
-        # Click Create Table button
-        self.wait_and_click(
-            (By.ID, "confirmCreateTableBtn"),
-            "Confirm Create Table button"
-        )
-        
-        # Wait for table creation to complete
-        print("⏳ Waiting for table creation to complete...")
-        time.sleep(self.long_delay)
-        
-        print(f"✅ Table '{self.test_table_name}' created successfully with 4 columns!")
-        time.sleep(self.medium_delay)  # Extra pause for user to see the result
-    
-    def add_column(self, name, type_val, length="", default="None", null_checked=False, ai_checked=False, primary_key=False, index=False, unique=False, description=""):
-        """Add a column to the table builder"""
-        print(f"  ➕ Adding {description}...")
-        time.sleep(self.short_delay)
-        
-        # Click Add Column button
-        add_column_btn = self.driver.find_element(By.ID, "addColumnRowBtn")
-        add_column_btn.click()
-        time.sleep(self.short_delay)
-        
-        # Find the last column row (most recently added)
-        column_rows = self.driver.find_elements(By.CSS_SELECTOR, ".column-rows .column-row")
-        last_row = column_rows[-1]
-        
-        # Fill column name
-        name_input = last_row.find_element(By.CSS_SELECTOR, "input.col-name")
+            with self.step("open_db_manager"):
+                self.open_page("db_manager")
+                self.wait_for(EC.visibility_of_element_located((By.ID, "dashboardContent")), "dashboard")
+
+            with self.step("create_database"):
+                self.click((By.CSS_SELECTOR, "#statsActions .dropdown-toggle"), "Actions dropdown")
+                self.click((By.ID, "createDatabaseBtn"), "Create Database button")
+                self.type_into((By.ID, "newDatabaseName"), database, "database name field")
+                Select(self.driver.find_element(By.ID, "newDatabaseCharset")).select_by_value("utf8mb4")
+                Select(self.driver.find_element(By.ID, "newDatabaseCollation")).select_by_value("utf8mb4_unicode_ci")
+                self.click((By.ID, "confirmCreateDatabaseBtn"), "Confirm Create Database button")
+                self.wait_for(EC.presence_of_element_located((By.CSS_SELECTOR, item)), f"database '{database}' in the list")
+
+            with self.step("delete_database"):
+                self.click((By.CSS_SELECTOR, f"{item} .dropdown-toggle"), "database actions dropdown")
+                self.click((By.CSS_SELECTOR, f"{item} .db-delete-btn"), "delete button")
+                self.click((By.ID, "confirmActionConfirmBtn"), "Confirm Delete button")
+                self.wait_for(EC.invisibility_of_element_located((By.CSS_SELECTOR, item)),
+                              f"database '{database}' to leave the list")
+        finally:
+            self.drop_database(database)
+
+    def scenario_create_table(self):
+        database, _ = self.create_fixture_database()
+        table = f"test_table_{random.randint(100, 999)}"
+        try:
+            with self.step("open_db_manager"):
+                self.open_page("db_manager")
+                self.click((By.CSS_SELECTOR, f".database-item[data-database='{database}']"), f"database '{database}'")
+                self.wait_for(EC.presence_of_element_located(
+                    (By.CSS_SELECTOR, f".database-item[data-database='{database}'].active")), "database to be active")
+                self.wait_for_idle()
+
+            with self.step("fill_table_form"):
+                self.click((By.CSS_SELECTOR, "#statsActions .dropdown-toggle"), "Actions dropdown")
+                self.click((By.ID, "createTableMenuItem"), "Create Table button")
+                self.type_into((By.ID, "newTableName"), table, "table name field")
+                self.add_column("id", "INT", ai=True, primary_key=True)
+                self.add_column("name", "VARCHAR", length="100")
+                self.add_column("email", "VARCHAR", length="255", unique=True)
+                self.add_column("created_at", "TIMESTAMP", default="CURRENT_TIMESTAMP")
+                Select(self.driver.find_element(By.ID, "newTableEngine")).select_by_value("InnoDB")
+
+            with self.step("create_table"):
+                self.click((By.ID, "confirmCreateTableBtn"), "Confirm Create Table button")
+                self.wait_for(EC.invisibility_of_element_located((By.ID, "createTableModal")), "table dialog to close")
+                self.wait_for_idle()
+
+            tables = self.api("getTables", {"database": database}, method="GET")["tables"]
+            names = [t if isinstance(t, str) else t["name"] for t in tables]
+            assert table in names, f"table '{table}' was not created (found: {names})"
+            columns = self.api("getTableInfo", {"database": database, "table": table}, method="GET")["columns"]
+            assert [c["name"] for c in columns] == ["id", "name", "email", "created_at"], \
+                f"unexpected columns: {[c['name'] for c in columns]}"
+        finally:
+            self.drop_database(database)
+
+    def add_column(self, name, type_val, length="", default=None, null=False, ai=False,
+                   primary_key=False, index=False, unique=False):
+        """Add a column row to the create table form"""
+        count = len(self.driver.find_elements(By.CSS_SELECTOR, ".column-rows .column-row"))
+        self.driver.find_element(By.ID, "addColumnRowBtn").click()
+        self.wait_for(lambda d: len(d.find_elements(By.CSS_SELECTOR, ".column-rows .column-row")) > count,
+                      "new column row")
+        row = self.driver.find_elements(By.CSS_SELECTOR, ".column-rows .column-row")[-1]
+
+        name_input = row.find_element(By.CSS_SELECTOR, "input.col-name")
         name_input.clear()
         name_input.send_keys(name)
-        time.sleep(self.short_delay * 0.5)
-        
-        # Select column type
-        type_select = Select(last_row.find_element(By.CSS_SELECTOR, "select.col-type"))
-        type_select.select_by_value(type_val)
-        time.sleep(self.short_delay * 0.5)
-        
-        # Fill length if provided
+        Select(row.find_element(By.CSS_SELECTOR, "select.col-type")).select_by_value(type_val)
         if length:
-            length_input = last_row.find_element(By.CSS_SELECTOR, "input.col-length")
+            length_input = row.find_element(By.CSS_SELECTOR, "input.col-length")
             length_input.clear()
             length_input.send_keys(length)
-            time.sleep(self.short_delay * 0.5)
-        
-        # Set default value
-        if default != "None":
-            default_select = Select(last_row.find_element(By.CSS_SELECTOR, "select.col-default-mode"))
-            if default == "CURRENT_TIMESTAMP":
-                default_select.select_by_value("current_timestamp")
-            else:
-                default_select.select_by_value("value")
-                # Fill the default value input
-                default_input = last_row.find_element(By.CSS_SELECTOR, "input.col-default")
-                default_input.clear()
-                default_input.send_keys(default)
-            time.sleep(self.short_delay * 0.5)
-        
-        # Set checkboxes
-        if null_checked:
-            null_checkbox = last_row.find_element(By.CSS_SELECTOR, "input[type='checkbox'].col-null")
-            if not null_checkbox.is_selected():
-                null_checkbox.click()
-            time.sleep(self.short_delay * 0.3)
-        
-        if ai_checked:
-            ai_checkbox = last_row.find_element(By.CSS_SELECTOR, "input[type='checkbox'].col-ai")
-            if not ai_checkbox.is_selected():
-                ai_checkbox.click()
-            time.sleep(self.short_delay * 0.3)
-        
-        if primary_key:
-            pk_checkbox = last_row.find_element(By.CSS_SELECTOR, "input[type='checkbox'].col-primary")
-            if not pk_checkbox.is_selected():
-                pk_checkbox.click()
-            time.sleep(self.short_delay * 0.3)
-        
-        if index:
-            index_checkbox = last_row.find_element(By.CSS_SELECTOR, "input[type='checkbox'].col-index")
-            if not index_checkbox.is_selected():
-                index_checkbox.click()
-            time.sleep(self.short_delay * 0.3)
-        
-        if unique:
-            unique_checkbox = last_row.find_element(By.CSS_SELECTOR, "input[type='checkbox'].col-unique")
-            if not unique_checkbox.is_selected():
-                unique_checkbox.click()
-            time.sleep(self.short_delay * 0.3)
-        
-        print(f"    ✅ {description} added successfully")
-    
-    def delete_database(self):
-        """Delete the created database"""
-        print(f"\n🗑️  STEP 4: Deleting database '{self.test_database_name}'")
-        print("=" * 50)
-        
-        # Find the database item and click its actions dropdown
-        database_item = self.driver.find_element(
-            By.CSS_SELECTOR, f".database-item[data-database='{self.test_database_name}']"
-        )
-        
-        # Click the actions dropdown button
-        self.wait_and_click(
-            (By.CSS_SELECTOR, f".database-item[data-database='{self.test_database_name}'] .dropdown-toggle"),
-            f"actions dropdown for database '{self.test_database_name}'"
-        )
-        
-        # Click the delete button in the dropdown
-        self.wait_and_click(
-            (By.CSS_SELECTOR, f".database-item[data-database='{self.test_database_name}'] .db-delete-btn"),
-            f"delete button for database '{self.test_database_name}'"
-        )
-        
-        # Confirm deletion in the confirmation modal
-        print("⚠️  Confirming database deletion...")
-        time.sleep(self.short_delay)
-        
-        # Click the confirm delete button
-        self.wait_and_click(
-            (By.ID, "confirmActionConfirmBtn"),
-            "Confirm Delete button"
-        )
-        
-        # Wait for deletion to complete
-        print("⏳ Waiting for database deletion to complete...")
-        time.sleep(self.long_delay)
-        
-        # Verify database was deleted
+        if default == "CURRENT_TIMESTAMP":
+            Select(row.find_element(By.CSS_SELECTOR, "select.col-default-mode")).select_by_value("current_timestamp")
+        elif default is not None:
+            Select(row.find_element(By.CSS_SELECTOR, "select.col-default-mode")).select_by_value("value")
+            default_input = row.find_element(By.CSS_SELECTOR, "input.col-default")
+            default_input.clear()
+            default_input.send_keys(default)
+
+        for checked, css_class in [(null, "col-null"), (ai, "col-ai"), (primary_key, "col-primary"),
+                                   (index, "col-index"), (unique, "col-unique")]:
+            if checked:
+                checkbox = row.find_element(By.CSS_SELECTOR, f"input[type='checkbox'].{css_class}")
+                if not checkbox.is_selected():
+                    checkbox.click()
+
+    def scenario_table_structure(self):
+        database, table = self.create_fixture_database(with_table=True)
+        try:
+            self.api("setCurrentTable", {"table": table})
+            with self.step("open_table_structure"):
+                self.open_page("table_structure")
+                self.wait_for(lambda d: len(d.find_elements(By.CSS_SELECTOR, "#structureBody tr[data-column-name]")) == 4,
+                              "4 column rows")
+            names = [row.get_attribute("data-column-name")
+                     for row in self.driver.find_elements(By.CSS_SELECTOR, "#structureBody tr[data-column-name]")]
+            assert names == ["id", "name", "category", "created_at"], f"unexpected columns: {names}"
+        finally:
+            self.drop_database(database)
+
+    def scenario_data_manager(self):
+        database, table = self.create_fixture_database(with_table=True)
+        rows = "#tableBody tr[data-primary-value]"
+        try:
+            with self.step("open_data_manager"):
+                self.open_page("data_manager", f"?table={table}")
+                self.wait_for(lambda d: len(d.find_elements(By.CSS_SELECTOR, rows)) > 0, "record rows")
+            first = self.driver.find_element(By.CSS_SELECTOR, rows).get_attribute("data-primary-value")
+
+            with self.step("next_page"):
+                self.click((By.ID, "nextBtn"), "Next button")
+                self.wait_for(lambda d: d.find_element(By.CSS_SELECTOR, rows).get_attribute("data-primary-value") != first,
+                              "the next page")
+                self.wait_for_idle()
+
+            with self.step("sort_descending"):
+                header = (By.CSS_SELECTOR, "#tableHead tr:first-child th[data-column='id']")
+                self.click(header, "id column header")
+                self.wait_for_idle()
+                self.click(header, "id column header")
+                self.wait_for(lambda d: d.find_element(By.CSS_SELECTOR, rows).get_attribute("data-primary-value")
+                              == str(FIXTURE_ROWS), "highest id on top")
+
+            with self.step("filter"):
+                # name_0120 .. name_0129 are ids 121 .. 130 (still sorted descending)
+                self.type_into((By.CSS_SELECTOR, ".filter-input[data-column='name']"), "name_012", "name filter")
+                self.wait_for(lambda d: self.visible_ids() == list(range(130, 120, -1)), "filtered rows")
+        finally:
+            self.drop_database(database)
+
+    def visible_ids(self):
         try:
-            # Check if database item is no longer present
-            self.driver.find_element(
-                By.CSS_SELECTOR, f".database-item[data-database='{self.test_database_name}']"
-            )
-            print(f"⚠️  Database '{self.test_database_name}' may still be present")
-        except NoSuchElementException:
-            print(f"✅ Database '{self.test_database_name}' deleted successfully!")
-        
-        time.sleep(self.medium_delay)  # Extra pause for user to see the result
-    
-    def run_test(self):
-        """Run the complete test workflow"""
-        print("🚀 Starting Database Manager Test")
-        print("=" * 60)
-        print(f"Test Database: {self.test_database_name}")
-        print(f"Test Table: {self.test_table_name}")
-        print("=" * 60)
-        
+            return [int(row.get_attribute("data-primary-value"))
+                    for row in self.driver.find_elements(By.CSS_SELECTOR, "#tableBody tr[data-primary-value]")]
+        except (NoSuchElementException, TypeError, ValueError):
+            return None
+
+
+def run_suite(base_url="http://localhost", username="max", password="maxbis123", workers=4, headless=True,
+              timeout=10, scenarios=None):
+    """
+    Run the scenarios on a pool of browsers
+
+    Returns the list of scenario results (see DatabaseManagerTest.run_scenario).
+    """
+    scenarios = scenarios or SCENARIOS
+    driver_path = ChromeDriverManager().install()
+
+    queue = Queue()
+    for scenario in scenarios:
+        queue.put(scenario)
+    results = []
+    lock = threading.Lock()
+
+    def worker(index):
+        browser = DatabaseManagerTest(base_url=base_url, headless=headless, username=username, password=password,
+                                      timeout=timeout, driver_path=driver_path, name=f"browser-{index}")
         try:
-            # Setup
-            self.setup_driver()
-            
-            # Navigate to database manager
-            self.navigate_to_database_manager()
-            
-            # Run test steps
-            self.create_database()
-            self.select_database()
-            self.create_table()
-            self.delete_database()
-            
-            print("\n🎉 TEST COMPLETED SUCCESSFULLY!")
-            print("=" * 60)
-            print("All steps completed:")
-            print("✅ 1. Created database")
-            print("✅ 2. Selected database")
-            print("✅ 3. Created table with multiple columns")
-            print("✅ 4. Deleted database")
-            
+            browser.setup_driver()
+            browser.login()
         except Exception as e:
-            print(f"\n❌ TEST FAILED: {e}")
-            print("=" * 60)
-            raise
-        
+            print(f"❌ browser-{index} could not start: {e}")
+            browser.quit()
+            return
+        try:
+            while True:
+                try:
+                    scenario = queue.get_nowait()
+                except Empty:
+                    break
+                result = browser.run_scenario(scenario)
+                with lock:
+                    results.append(result)
+                    status = "✅" if result["passed"] else "❌"
+                    print(f"{status} {scenario} ({result['duration_ms']:.0f} ms, {browser.name})"
+                          + (f": {result['error']}" if result["error"] else ""))
         finally:
-            # Cleanup
-            if self.driver:
-                print("\n🧹 Cleaning up...")
-                time.sleep(self.long_delay)  # Final pause for user to see results
-                self.driver.quit()
-                print("✅ Browser closed")
-
-def main():
-    """Main function to run the test"""
+            browser.quit()
+
+    threads = [threading.Thread(target=worker, args=(i + 1,)) for i in range(max(1, min(workers, len(scenarios))))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Scenarios left over when no browser could start
+    while not queue.empty():
+        results.append({"scenario": queue.get(), "browser": None, "passed": False,
+                        "error": "No browser available", "duration_ms": 0, "steps": {}})
+    return sorted(results, key=lambda r: scenarios.index(r["scenario"]))
+
+
+def find_regressions(results, baseline, tolerance=1.5, min_delta_ms=250):
+    """Steps slower than the baseline by more than tolerance x (and min_delta_ms)"""
+    before = {r["scenario"]: r.get("steps", {}) for r in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        for step, ms in result["steps"].items():
+            previous = before.get(result["scenario"], {}).get(step)
+            if previous and ms > previous * tolerance and ms - previous > min_delta_ms:
+                regressions.append(f"{result['scenario']}.{step}: {ms:.0f} ms (baseline {previous:.0f} ms)")
+    return regressions
+
+
+def main(argv=None):
+    """Run the suite from the command line (all options also come from DBM_TEST_* variables)"""
     import argparse
-    
-    parser = argparse.ArgumentParser(description="Database Manager Selenium Test")
-    parser.add_argument("--url", default="http://localhost", 
-                       help="Base URL of the application (default: http://localhost)")
-    parser.add_argument("--headless", action="store_true", 
-                       help="Run browser in headless mode")
-    parser.add_argument("--username", default="max", 
-                       help="Login username (default: max)")
-    parser.add_argument("--password", default="maxbis123", 
-                       help="Login password (default: maxbis123)")
-    parser.add_argument("--speed", default="normal", 
-                       help="Test speed: fast, normal, slow, or custom delay in seconds (default: normal)")
-    
-    args = parser.parse_args()
-    
-    # Create and run test
-    test = DatabaseManagerTest(
-        base_url=args.url, 
-        headless=args.headless,
-        username=args.username,
-        password=args.password,
-        delay_speed=args.speed
-    )
-    test.run_test()
+
+    env = os.environ.get
+    parser = argparse.ArgumentParser(description="Database Manager Selenium test suite")
+    parser.add_argument("--url", default=env("DBM_TEST_URL", "http://localhost"),
+                        help="Base URL of the application (default: http://localhost)")
+    parser.add_argument("--username", default=env("DBM_TEST_USERNAME", "max"), help="Login username (default: max)")
+    parser.add_argument("--password", default=env("DBM_TEST_PASSWORD", "maxbis123"), help="Login password")
+    parser.add_argument("--workers", type=int, default=int(env("DBM_TEST_WORKERS", "4")),
+                        help="Browsers running in parallel (default: 4)")
+    parser.add_argument("--headed", action="store_true", default=env("DBM_TEST_HEADED") == "1",
+                        help="Show the browser windows")
+    parser.add_argument("--timeout", type=float, default=float(env("DBM_TEST_TIMEOUT", "10")),
+                        help="Seconds a step may wait for a condition (default: 10)")
+    parser.add_argument("--only", default=env("DBM_TEST_ONLY", ""),
+                        help=f"Comma-separated scenarios to run (default: all of {','.join(SCENARIOS)})")
+    parser.add_argument("--report", default=env("DBM_TEST_REPORT"), help="Write the JSON report (with step timings) here")
+    parser.add_argument("--baseline", default=env("DBM_TEST_BASELINE"),
+                        help="Earlier JSON report; steps that got slower fail the run")
+    parser.add_argument("--tolerance", type=float, default=float(env("DBM_TEST_TOLERANCE", "1.5")),
+                        help="Allowed slowdown against the baseline (default: 1.5x)")
+    args = parser.parse_args(argv)
+
+    scenarios = [s.strip() for s in args.only.split(",") if s.strip()] or SCENARIOS
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    print(f"🚀 Running {len(scenarios)} scenarios on {min(args.workers, len(scenarios))} browsers against {args.url}")
+    start = time.perf_counter()
+    results = run_suite(base_url=args.url, username=args.username, password=args.password, workers=args.workers,
+                        headless=not args.headed, timeout=args.timeout, scenarios=scenarios)
+    duration = time.perf_counter() - start
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(results, json.load(f), args.tolerance)
+
+    print("\n⏱️  Step timings (ms)")
+    for result in results:
+        steps = ", ".join(f"{name} {ms:.0f}" for name, ms in result["steps"].items())
+        print(f"   {result['scenario']}: {steps or '-'}")
+    for regression in regressions:
+        print(f"🐌 Slower than baseline: {regression}")
+
+    failed = [r for r in results if not r["passed"]]
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump({
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "duration_s": round(duration, 2),
+                "results": results,
+                "regressions": regressions,
+            }, f, indent=2)
+
+    print(f"\n{'❌' if failed or regressions else '🎉'} {len(results) - len(failed)}/{len(results)} scenarios passed"
+          f" in {duration:.1f}s" + (f", {len(regressions)} slower steps" if regressions else ""))
+    return 1 if failed or regressions else 0
+
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -28,8 +28,10 @@ if [ -f "requirements.txt" ]; then
     fi
 fi
 
-# Run the test
+# Run the suite (options are passed through, e.g. ./run_test.sh --workers 8)
 echo "🚀 Starting test..."
-python3 run_test.py
+python3 run_test.py "$@"
+status=$?
 
 echo "✅ Test runner completed"
+exit $status